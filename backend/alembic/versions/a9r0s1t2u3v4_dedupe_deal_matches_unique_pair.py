@@ -0,0 +1,53 @@
+"""dedupe deal_matches and enforce unique (signal_id, deal_id)
+
+Revision ID: a9r0s1t2u3v4
+Revises: z8q9r0s1t2u3
+Create Date: 2026-03-14
+
+Match writers now rely on INSERT ... ON CONFLICT (signal_id, deal_id) DO NOTHING.
+uq_deal_matches_signal_deal is already declared on the model and in 7cf8bd12c66b,
+so on most databases this only verifies it. Where the table was created without
+it, remove duplicate pairs (keeping favourites, then the earliest match) and add
+the constraint.
+"""
+from alembic import op
+
+
+revision = "a9r0s1t2u3v4"
+down_revision = "z8q9r0s1t2u3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DELETE FROM deal_matches dm
+        USING (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY signal_id, deal_id
+                       ORDER BY is_favourite DESC, matched_at ASC, id ASC
+                   ) AS rn
+            FROM deal_matches
+        ) ranked
+        WHERE dm.id = ranked.id AND ranked.rn > 1
+    """)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conname = 'uq_deal_matches_signal_deal'
+                  AND conrelid = 'deal_matches'::regclass
+            ) THEN
+                ALTER TABLE deal_matches
+                    ADD CONSTRAINT uq_deal_matches_signal_deal UNIQUE (signal_id, deal_id);
+            END IF;
+        END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    # The constraint predates this revision on most databases; leave it in place.
+    pass
@@ -0,0 +1,28 @@
+"""add book_window to signal_intel_cache
+
+Revision ID: b0s1t2u3v4w5
+Revises: a9r0s1t2u3v4
+Create Date: 2026-03-16
+
+Book Window results are computed for all active signals after each scrape and
+read by the Scout endpoints instead of being recomputed per request.
+"""
+from alembic import op
+
+
+revision = "b0s1t2u3v4w5"
+down_revision = "a9r0s1t2u3v4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE signal_intel_cache ADD COLUMN IF NOT EXISTS book_window JSONB")
+    op.execute(
+        "ALTER TABLE signal_intel_cache ADD COLUMN IF NOT EXISTS book_window_refreshed_at TIMESTAMPTZ"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE signal_intel_cache DROP COLUMN IF EXISTS book_window_refreshed_at")
+    op.execute("ALTER TABLE signal_intel_cache DROP COLUMN IF EXISTS book_window")
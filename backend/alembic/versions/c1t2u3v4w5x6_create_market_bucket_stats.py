@@ -0,0 +1,44 @@
+"""create market_bucket_stats table
+
+Revision ID: c1t2u3v4w5x6
+Revises: b0s1t2u3v4w5
+Create Date: 2026-03-17
+
+Precomputed market bucket statistics, rebuilt after each scrape cycle and read
+by compute_market_stats instead of loading every deal in the bucket.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "c1t2u3v4w5x6"
+down_revision = "b0s1t2u3v4w5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "market_bucket_stats",
+        sa.Column("origin", sa.Text(), nullable=False),
+        sa.Column("destination", sa.Text(), nullable=False),
+        sa.Column("duration_bucket", sa.Text(), nullable=False),
+        sa.Column("star_key", sa.Text(), nullable=False),
+        sa.Column("sample_size", sa.Integer(), nullable=False),
+        sa.Column("unique_package_count", sa.Integer(), nullable=False),
+        sa.Column("unique_resort_count", sa.Integer(), nullable=False),
+        sa.Column("min_price", sa.Integer(), nullable=True),
+        sa.Column("p25_price", sa.Float(), nullable=True),
+        sa.Column("median_price", sa.Float(), nullable=True),
+        sa.Column("p75_price", sa.Float(), nullable=True),
+        sa.Column("max_price", sa.Integer(), nullable=True),
+        sa.Column("price_stddev", sa.Float(), nullable=True),
+        sa.Column("prices", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("computed_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("origin", "destination", "duration_bucket", "star_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("market_bucket_stats")
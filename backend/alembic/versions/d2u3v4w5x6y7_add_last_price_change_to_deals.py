@@ -0,0 +1,51 @@
+"""add last price change columns to deals
+
+Revision ID: d2u3v4w5x6y7
+Revises: c1t2u3v4w5x6
+Create Date: 2026-03-18
+
+The most recent price change of each deal is kept on the row itself and
+maintained at upsert time, so price-drop readers no longer scan
+deal_price_history with LAG() window queries. Existing deals are backfilled
+from their last two price history entries.
+"""
+from alembic import op
+
+
+revision = "d2u3v4w5x6y7"
+down_revision = "c1t2u3v4w5x6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE deals ADD COLUMN IF NOT EXISTS prev_price_cents INTEGER")
+    op.execute("ALTER TABLE deals ADD COLUMN IF NOT EXISTS last_price_change_at TIMESTAMPTZ")
+    op.execute("ALTER TABLE deals ADD COLUMN IF NOT EXISTS last_price_delta_cents INTEGER")
+    op.execute("""
+        UPDATE deals d
+        SET prev_price_cents = h.prev_price,
+            last_price_change_at = h.recorded_at,
+            last_price_delta_cents = h.price_cents - h.prev_price
+        FROM (
+            SELECT DISTINCT ON (deal_id) deal_id, price_cents, recorded_at, prev_price
+            FROM (
+                SELECT deal_id, price_cents, recorded_at,
+                       LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) AS prev_price
+                FROM deal_price_history
+            ) ordered
+            ORDER BY deal_id, recorded_at DESC
+        ) h
+        WHERE h.deal_id = d.id AND h.prev_price IS NOT NULL
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_deals_last_price_change_at ON deals (last_price_change_at) "
+        "WHERE last_price_change_at IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_deals_last_price_change_at")
+    op.execute("ALTER TABLE deals DROP COLUMN IF EXISTS last_price_delta_cents")
+    op.execute("ALTER TABLE deals DROP COLUMN IF EXISTS last_price_change_at")
+    op.execute("ALTER TABLE deals DROP COLUMN IF EXISTS prev_price_cents")
@@ -3,7 +3,7 @@ import hmac
 import logging
 import os
 
-from fastapi import Header, HTTPException
+from fastapi import Header, HTTPException, Request
 
 from app.core.clerk_auth import verify_clerk_token
 
@@ -20,6 +20,15 @@ def verify_admin(x_admin_token: str | None = Header(None, alias="X-Admin-Token")
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
+async def raw_body(request: Request) -> bytes:
+    """Read the raw request body on the event loop.
+
+    Lets webhook handlers that verify signatures over the exact bytes be plain
+    ``def`` functions (run in the threadpool) while still receiving the body.
+    """
+    return await request.body()
+
+
 def get_clerk_user_id(
     authorization: str | None = Header(None),
 ) -> str:
@@ -12,6 +12,8 @@ from sqlalchemy import func, select, text
 from sqlalchemy.orm import Session
 
 from app.api.deps import verify_admin
+from app.core.cache import cache_stats
+from app.core.http import get_http_client, http_stats
 from app.core.rate_limit import limiter
 from app.db.models.deal import Deal
 from app.db.models.hotel_link import HotelLink
@@ -20,7 +22,7 @@ from app.db.models.scrape_run import ScrapeRun
 from app.db.models.signal import Signal
 from app.db.models.signal_run import SignalRun
 from app.db.models.user import User
-from app.db.session import get_db
+from app.db.session import db_pool_stats, get_db
 from app.services.account import delete_account, restore_account
 
 logger = logging.getLogger(__name__)
@@ -147,6 +149,9 @@ def system_health(
         "last_scrape": last_scrape.isoformat() if last_scrape else None,
         "last_signal_run": last_signal_run.isoformat() if last_signal_run else None,
         "hotels_missing_review_url": hotels_missing_review_url,
+        "db_pool": db_pool_stats(),
+        "caches": cache_stats(),
+        "http": http_stats(),
     }
 
 
@@ -1085,8 +1090,6 @@ _TA_URL_RE = _re.compile(
 
 def _search_startpage(query: str, use_proxy: bool = True) -> str | None:
     """Search Startpage for a TripAdvisor Hotel_Review URL."""
-    import requests as _requests
-
     headers = {
         "User-Agent": (
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -1103,12 +1106,11 @@ def _search_startpage(query: str, use_proxy: bool = True) -> str | None:
             proxies = {"http": proxy_url, "https": proxy_url}
 
     try:
-        resp = _requests.post(
+        resp = get_http_client().post(
             "https://www.startpage.com/sp/search",
             data={"query": query},
             headers=headers,
             proxies=proxies,
-            timeout=15,
         )
         if resp.status_code != 200:
             return None
@@ -1447,6 +1449,7 @@ def upsert_email_template(
     """Create or update a template override."""
     from app.db.models.email_template_override import EmailTemplateOverride
     from app.services.email_orchestrator import EmailType
+    from app.services.email_templates import invalidate_override
 
     try:
         et = EmailType(email_type)
@@ -1477,6 +1480,7 @@ def upsert_email_template(
         db.add(override)
 
     db.commit()
+    invalidate_override(et)
     logger.info("[ADMIN] upsert_email_template: %s", et.value)
 
     return {
@@ -1495,6 +1499,7 @@ def delete_email_template(
     """Delete a template override, reverting to the Python default."""
     from app.db.models.email_template_override import EmailTemplateOverride
     from app.services.email_orchestrator import EmailType
+    from app.services.email_templates import invalidate_override
 
     try:
         et = EmailType(email_type)
@@ -1510,6 +1515,7 @@ def delete_email_template(
 
     db.delete(override)
     db.commit()
+    invalidate_override(et)
     logger.info("[ADMIN] delete_email_template: %s (reverted to default)", et.value)
 
     return {"ok": True, "email_type": et.value, "has_override": False}
@@ -1670,7 +1676,7 @@ def backfill_value_labels(
 ):
     """Backfill value_label on existing deal_matches using market scoring."""
     from app.db.models.deal_match import DealMatch
-    from app.services.market_intel import score_deal_for_match
+    from app.services.market_intel import deal_bucket_key, score_deals_for_match
 
     matches = (
         db.query(DealMatch)
@@ -1679,15 +1685,47 @@ def backfill_value_labels(
         .all()
     )
 
+    by_bucket: dict[tuple, list[DealMatch]] = {}
+    for match in matches:
+        by_bucket.setdefault(deal_bucket_key(match.deal), []).append(match)
+
+    # Score one bucket at a time so a failing bucket only skips its own matches
     stats_cache: dict = {}
     updated = 0
-    for match in matches:
+    for key, bucket_matches in by_bucket.items():
         try:
-            label = score_deal_for_match(db, match.deal, stats_cache=stats_cache)
+            with db.begin_nested():
+                labels = score_deals_for_match(db, [m.deal for m in bucket_matches], stats_cache=stats_cache)
+        except Exception as e:
+            logger.warning("Backfill error for bucket %s (%d matches): %s", key, len(bucket_matches), e)
+            continue
+        for match, label in zip(bucket_matches, labels, strict=True):
             match.value_label = label  # None if not positive
             updated += 1
-        except Exception as e:
-            logger.warning("Backfill error for match %s: %s", match.id, e)
 
     db.commit()
     return {"ok": True, "matches_processed": len(matches), "updated": updated}
+
+
+@router.post("/backfill-market-snapshots")
+def backfill_market_snapshots(
+    start: date_type,
+    end: date_type,
+    db: Session = Depends(get_db),
+):
+    """Rebuild daily market snapshots for past dates from deal price history."""
+    from app.services.market_intel import SnapshotBackfillError, backfill_daily_snapshots
+
+    if start > end or (end - start).days >= 366:
+        raise HTTPException(status_code=400, detail="start must be on or before end, at most 366 days apart")
+    try:
+        created = backfill_daily_snapshots(db, start, end)
+    except SnapshotBackfillError as e:
+        logger.error("%s: %s", e, e.__cause__)
+        return JSONResponse(status_code=500, content={
+            "ok": False,
+            "error": str(e),
+            "snapshots_created": e.created,
+            "failed_from": e.start.isoformat(),
+        })
+    return {"ok": True, "snapshots_created": created}
@@ -12,7 +12,7 @@ from sqlalchemy import select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_clerk_user_id
+from app.api.deps import get_clerk_user_id, raw_body
 from app.core.config import settings
 from app.core.rate_limit import limiter
 from app.db.models.signal import Signal
@@ -38,7 +38,7 @@ def get_current_user(clerk_user_id: str = Depends(get_clerk_user_id), db: Sessio
 
 @router.post("/checkout")
 @limiter.limit("5/minute")
-async def create_checkout_session(
+def create_checkout_session(
     request: Request,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -63,7 +63,7 @@ async def create_checkout_session(
 
 @router.post("/portal")
 @limiter.limit("5/minute")
-async def create_portal_session(request: Request, user: User = Depends(get_current_user)):
+def create_portal_session(request: Request, user: User = Depends(get_current_user)):
     if not user.stripe_customer_id:
         raise HTTPException(status_code=400, detail="No billing account found")
 
@@ -75,8 +75,7 @@ async def create_portal_session(request: Request, user: User = Depends(get_curre
 
 
 @router.post("/webhook")
-async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
-    payload = await request.body()
+def stripe_webhook(request: Request, payload: bytes = Depends(raw_body), db: Session = Depends(get_db)):
     sig_header = request.headers.get("stripe-signature")
 
     try:
@@ -9,6 +9,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 from svix.webhooks import Webhook, WebhookVerificationError
 
+from app.api.deps import raw_body
 from app.core.email_validation import is_valid_email
 from app.db.models.user import User
 from app.db.session import get_db
@@ -21,8 +22,9 @@ CLERK_WEBHOOK_SECRET = os.getenv("CLERK_WEBHOOK_SECRET", "")
 
 
 @router.post("/clerk/webhook")
-async def clerk_webhook(
+def clerk_webhook(
     request: Request,
+    body: bytes = Depends(raw_body),
     db: Session = Depends(get_db),
 ):
     """Handle Clerk webhook events (user.created, user.updated)."""
@@ -30,9 +32,6 @@ async def clerk_webhook(
         logger.error("CLERK_WEBHOOK_SECRET not configured")
         raise HTTPException(status_code=500, detail="Webhook not configured")
 
-    # Read raw body for signature verification
-    body = await request.body()
-
     # Verify Svix signature
     headers = {
         "svix-id": request.headers.get("svix-id", ""),
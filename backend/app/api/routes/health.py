@@ -1,10 +1,11 @@
 """Health check endpoints."""
 import logging
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 
 logger = logging.getLogger(__name__)
 
@@ -12,13 +13,11 @@ router = APIRouter()
 
 
 @router.get("/health")
-async def health_check() -> dict:
+async def health_check(db: AsyncSession = Depends(get_async_db)) -> dict:
     """Health check endpoint with DB connectivity test."""
     db_status = "ok"
     try:
-        db = next(get_db())
-        db.execute(text("SELECT 1"))
-        db.close()
+        await db.execute(text("SELECT 1"))
     except Exception:
         logger.exception("Health check DB ping failed")
         db_status = "error"
@@ -9,6 +9,7 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.models.deal_match import DealMatch
 from app.db.models.signal import Signal
@@ -62,7 +63,8 @@ router = APIRouter(prefix="/api/market", tags=["market"])
 
 @router.get("/overview")
 @limiter.limit("30/minute")
-async def market_overview(request: Request, db: Session = Depends(get_db)):
+@heavy_route
+def market_overview(request: Request, db: Session = Depends(get_db)):
     """Public market overview metrics for the signals page header."""
     coverage = compute_market_coverage(db)
     activity = compute_market_activity(db)
@@ -78,14 +80,16 @@ async def market_overview(request: Request, db: Session = Depends(get_db)):
 
 @router.get("/events")
 @limiter.limit("30/minute")
-async def market_events(request: Request, db: Session = Depends(get_db)):
+@heavy_route
+def market_events(request: Request, db: Session = Depends(get_db)):
     """Today's signals and market movers. Public endpoint."""
     return compute_market_events(db)
 
 
 @router.get("/top-destinations/{origin}")
 @limiter.limit("30/minute")
-async def top_destinations(
+@heavy_route
+def top_destinations(
     request: Request,
     origin: str,
     db: Session = Depends(get_db),
@@ -97,7 +101,8 @@ async def top_destinations(
 
 @router.get("/signal/{signal_id}/intelligence")
 @limiter.limit("20/minute")
-async def signal_market_intelligence(
+@heavy_route
+def signal_market_intelligence(
     request: Request,
     signal_id: UUID,
     db: Session = Depends(get_db),
@@ -149,7 +154,8 @@ async def signal_market_intelligence(
 
 @router.post("/draft/insights")
 @limiter.limit("20/minute")
-async def draft_signal_insights(
+@heavy_route
+def draft_signal_insights(
     request: Request,
     draft: DraftSignalRequest,
     db: Session = Depends(get_db),
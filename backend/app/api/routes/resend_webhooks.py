@@ -10,6 +10,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 from svix.webhooks import Webhook, WebhookVerificationError
 
+from app.api.deps import raw_body
 from app.core.config import settings
 from app.db.models.email_log import EmailLog
 from app.db.models.user import User
@@ -37,8 +38,9 @@ def _lookup_user_from_message_id(db, message_id: str) -> tuple[EmailLog | None,
 
 
 @router.post("/resend")
-async def resend_webhook(
+def resend_webhook(
     request: Request,
+    body: bytes = Depends(raw_body),
     db: Session = Depends(get_db),
     svix_id: str | None = Header(None, alias="svix-id"),
     svix_timestamp: str | None = Header(None, alias="svix-timestamp"),
@@ -49,8 +51,6 @@ async def resend_webhook(
         logger.error("SECURITY | resend_webhook_secret_missing | rejecting — RESEND_WEBHOOK_SECRET not configured")
         return JSONResponse(status_code=500, content={"error": "webhook not configured"})
 
-    body = await request.body()
-
     # Verify signature using svix library (same approach as Clerk webhook)
     headers = {
         "svix-id": svix_id or "",
@@ -4,6 +4,7 @@ from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.models.deal import Deal
 from app.db.models.deal_match import DealMatch
@@ -17,7 +18,8 @@ router = APIRouter()
 
 @router.get("/action-queue")
 @limiter.limit("20/minute")
-async def action_queue(
+@heavy_route
+def action_queue(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
@@ -72,21 +74,14 @@ async def action_queue(
         text("""
             SELECT dm.signal_id::text, dm.deal_id::text,
                    d.destination, d.hotel_name,
-                   ph.prev_price, ph.price_cents,
-                   (ph.prev_price - ph.price_cents) as drop_cents
+                   d.prev_price_cents, d.price_cents,
+                   (d.prev_price_cents - d.price_cents) as drop_cents
             FROM deal_matches dm
             JOIN deals d ON d.id = dm.deal_id
-            JOIN (
-                SELECT deal_id, price_cents,
-                       LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) AS prev_price,
-                       ROW_NUMBER() OVER (PARTITION BY deal_id ORDER BY recorded_at DESC) AS rn
-                FROM deal_price_history
-            ) ph ON ph.deal_id = dm.deal_id
             WHERE dm.signal_id = ANY(:signal_ids)
               AND d.is_active = true
-              AND ph.rn = 1
-              AND ph.prev_price IS NOT NULL
-              AND ph.price_cents < ph.prev_price
+              AND d.prev_price_cents IS NOT NULL
+              AND d.price_cents < d.prev_price_cents
             ORDER BY drop_cents DESC
             LIMIT 5
         """),
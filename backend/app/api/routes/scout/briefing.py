@@ -7,18 +7,22 @@ from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy import func, text
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.models.deal import Deal
 from app.db.models.deal_match import DealMatch
 from app.db.models.signal import Signal
 from app.db.models.signal_intel_cache import SignalIntelCache
 from app.db.models.signal_run import SignalRun
+from app.db.models.user import User
 from app.db.session import get_db
-from app.services.book_window import get_book_window
+from app.services import briefing_cache
+from app.services.book_window import get_book_windows
 from app.services.market_intel import (
     build_market_bucket_from_signal,
     compute_empty_state_insights,
@@ -494,12 +498,17 @@ def _sort_signals(signals_data: list[dict]) -> list[dict]:
 
 @router.get("/briefing")
 @limiter.limit("20/minute")
-async def briefing(
+@heavy_route
+def briefing(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
 ):
-    """Scout V2 briefing — card-ready intelligence for the simplified Scout page."""
+    """Scout V2 briefing — card-ready intelligence for the simplified Scout page.
+
+    Served from the briefing cache until the next scrape cycle lands or the
+    user's signals change.
+    """
     user, signals = _get_user_and_signals(db, clerk_user_id)
 
     if not signals:
@@ -510,6 +519,51 @@ async def briefing(
             "meta": {"version": "v2"},
         }
 
+    return _cached_briefing(db, user, signals)
+
+
+def _cached_briefing(db: Session, user: User, signals: list[Signal]) -> dict:
+    key = briefing_cache.cache_key(briefing_cache.get_generation(db), signals)
+    cached = briefing_cache.get(user.id, key)
+    if cached is not None:
+        return cached
+    result: dict = jsonable_encoder(build_briefing(db, signals))
+    briefing_cache.put(user.id, key, result)
+    return result
+
+
+def warm_briefing_cache(db: Session, active_within_days: int) -> int:
+    """Build and cache briefings for Pro users who logged in recently. Returns users warmed."""
+    since = datetime.now(timezone.utc) - timedelta(days=active_within_days)
+    users = (
+        db.query(User)
+        .filter(
+            User.plan_type == "pro",
+            User.deleted_at.is_(None),
+            User.last_login_at >= since,
+        )
+        .all()
+    )
+    warmed = 0
+    for user in users:
+        signals = (
+            db.query(Signal)
+            .filter(Signal.user_id == user.id, Signal.status == "active")
+            .all()
+        )
+        if not signals:
+            continue
+        try:
+            _cached_briefing(db, user, signals)
+            warmed += 1
+        except Exception:
+            logger.exception("Briefing pre-warm failed for user %s", user.id)
+            db.rollback()
+    return warmed
+
+
+def build_briefing(db: Session, signals: list[Signal]) -> dict:
+    """Compute the full briefing response for a user's active signals."""
     signal_ids = [s.id for s in signals]
 
     # ── Batch queries (reuse patterns from insights.py) ──
@@ -549,30 +603,25 @@ async def briefing(
         if dm.signal_id not in best_deal_per_signal:
             best_deal_per_signal[dm.signal_id] = (dm, deal)
 
-    # Price deltas for best deals
-    best_deal_ids = [deal.id for _, (_, deal) in best_deal_per_signal.items()]
-    delta_map: dict[UUID, tuple[int, int]] = {}
-    if best_deal_ids:
-        delta_rows = db.execute(
-            text("""
-                SELECT deal_id, price_cents, prev_price
-                FROM (
-                    SELECT deal_id, price_cents,
-                           LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) AS prev_price,
-                           ROW_NUMBER() OVER (PARTITION BY deal_id ORDER BY recorded_at DESC) AS rn
-                    FROM deal_price_history
-                    WHERE deal_id = ANY(:deal_ids)
-                ) sub
-                WHERE rn = 1 AND prev_price IS NOT NULL
-            """),
-            {"deal_ids": [str(did) for did in best_deal_ids]},
-        ).all()
-        for row in delta_rows:
-            delta_map[row[0]] = (row[2], row[1])  # (prev_price, current_price)
-
-    # Market stats + book windows per signal
-    market_stats_map = {}
+    # Price deltas for best deals (last price change, maintained on the deal at upsert)
+    delta_map: dict[UUID, tuple[int, int]] = {
+        deal.id: (deal.prev_price_cents, deal.price_cents)  # (prev_price, current_price)
+        for _, deal in best_deal_per_signal.values()
+        if deal.prev_price_cents is not None
+    }
+
+    # Book windows for signals with matches (persisted after each scrape)
     book_window_map: dict[UUID, dict] = {}
+    matched_signals = [s for s in signals if match_counts.get(s.id, 0) > 0]
+    try:
+        for signal_id, result in get_book_windows(db, matched_signals, intel_map).items():
+            if result:
+                book_window_map[signal_id] = result.model_dump()
+    except Exception:
+        logger.exception("Book windows failed for signals %s", [str(s.id) for s in matched_signals])
+
+    # Market stats per signal
+    market_stats_map = {}
     empty_state_map: dict[UUID, dict] = {}
 
     for s in signals:
@@ -583,14 +632,7 @@ async def briefing(
                 market_stats_map[s.id] = stats
 
         mc = match_counts.get(s.id, 0)
-        if mc > 0:
-            try:
-                bw = get_book_window(s.id, s.name, _build_route_label(s), db)
-                if bw.result:
-                    book_window_map[s.id] = bw.result.model_dump()
-            except Exception:
-                logger.exception("Book window failed for signal %s", s.id)
-        else:
+        if mc == 0:
             # Empty state insights for signals with 0 matches
             if bucket:
                 try:
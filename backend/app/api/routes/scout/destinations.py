@@ -7,6 +7,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.models.deal import Deal
 from app.db.models.deal_match import DealMatch
@@ -21,7 +22,8 @@ router = APIRouter()
 
 @router.get("/destinations")
 @limiter.limit("20/minute")
-async def destinations(
+@heavy_route
+def destinations(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
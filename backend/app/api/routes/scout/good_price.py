@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.session import get_db
 from app.services.market_intel import (
@@ -17,7 +18,8 @@ router = APIRouter()
 
 @router.get("/what-is-a-good-price")
 @limiter.limit("20/minute")
-async def what_is_a_good_price(
+@heavy_route
+def what_is_a_good_price(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
@@ -7,13 +7,15 @@ from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.models.deal import Deal
 from app.db.models.deal_match import DealMatch
 from app.db.models.signal_intel_cache import SignalIntelCache
 from app.db.models.signal_run import SignalRun
 from app.db.session import get_db
-from app.services.book_window import get_book_window
+from app.schemas.book_window import BookWindowOut
+from app.services.book_window import get_book_windows
 from app.services.market_intel import (
     build_market_bucket_from_signal,
     compute_market_stats,
@@ -31,7 +33,8 @@ router = APIRouter()
 
 @router.get("/insights")
 @limiter.limit("20/minute")
-async def insights(
+@heavy_route
+def insights(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
@@ -93,21 +96,14 @@ async def insights(
                    d.destination, d.hotel_name, d.star_rating,
                    d.price_cents, d.origin, d.depart_date, d.return_date,
                    d.deeplink_url, dm.is_favourite,
-                   ph.prev_price, ph.price_cents as hist_price,
-                   (ph.prev_price - ph.price_cents) as drop_cents
+                   d.prev_price_cents, d.price_cents as hist_price,
+                   (d.prev_price_cents - d.price_cents) as drop_cents
             FROM deal_matches dm
             JOIN deals d ON d.id = dm.deal_id
-            JOIN (
-                SELECT deal_id, price_cents,
-                       LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) AS prev_price,
-                       ROW_NUMBER() OVER (PARTITION BY deal_id ORDER BY recorded_at DESC) AS rn
-                FROM deal_price_history
-            ) ph ON ph.deal_id = dm.deal_id
             WHERE dm.signal_id = ANY(:signal_ids)
               AND d.is_active = true
-              AND ph.rn = 1
-              AND ph.prev_price IS NOT NULL
-              AND ph.price_cents < ph.prev_price
+              AND d.prev_price_cents IS NOT NULL
+              AND d.price_cents < d.prev_price_cents
             ORDER BY drop_cents DESC
             LIMIT 10
         """),
@@ -143,26 +139,12 @@ async def insights(
         .all()
     )
 
-    # Build price delta map for best deals
-    best_deal_ids = [d.id for _, d in best_deal_rows]
-    delta_map: dict[UUID, tuple[int, int]] = {}  # deal_id -> (prev_price, current_price)
-    if best_deal_ids:
-        delta_rows = db.execute(
-            text("""
-                SELECT deal_id, price_cents, prev_price
-                FROM (
-                    SELECT deal_id, price_cents,
-                           LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) AS prev_price,
-                           ROW_NUMBER() OVER (PARTITION BY deal_id ORDER BY recorded_at DESC) AS rn
-                    FROM deal_price_history
-                    WHERE deal_id = ANY(:deal_ids)
-                ) sub
-                WHERE rn = 1 AND prev_price IS NOT NULL
-            """),
-            {"deal_ids": [str(did) for did in best_deal_ids]},
-        ).all()
-        for row in delta_rows:
-            delta_map[row[0]] = (row[2], row[1])  # (prev_price, current_price)
+    # Price delta map for best deals (last price change, maintained on the deal at upsert)
+    delta_map: dict[UUID, tuple[int, int]] = {
+        d.id: (d.prev_price_cents, d.price_cents)  # (prev_price, current_price)
+        for _, d in best_deal_rows
+        if d.prev_price_cents is not None
+    }
 
     # Market stats per signal for price context
     market_stats_map: dict[UUID, object] = {}
@@ -421,14 +403,21 @@ async def insights(
     # ── Build book windows ──
 
     book_windows = []
-    for s in signals:
-        if match_counts.get(s.id, 0) == 0:
+    matched_signals = [s for s in signals if match_counts.get(s.id, 0) > 0]
+    try:
+        bw_results = get_book_windows(db, matched_signals, intel_map)
+    except Exception:
+        logger.exception("Book window computation failed for signals %s", [str(s.id) for s in matched_signals])
+        bw_results = {}
+    for s in matched_signals:
+        if s.id not in bw_results:
             continue
-        try:
-            bw = get_book_window(s.id, s.name, _build_route_label(s), db)
-            book_windows.append(bw.model_dump())
-        except Exception:
-            logger.exception("Book window computation failed for signal %s", s.id)
+        book_windows.append(BookWindowOut(
+            signal_id=str(s.id),
+            signal_name=s.name,
+            route_label=_build_route_label(s),
+            result=bw_results[s.id],
+        ).model_dump())
 
     # Check if any book window recommends "book_now" for briefing nudge
     book_now_nudge = None
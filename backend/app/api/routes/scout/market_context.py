@@ -6,6 +6,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.models.deal import Deal
 from app.db.models.route_intel_cache import RouteIntelCache
@@ -18,7 +19,8 @@ router = APIRouter()
 
 @router.get("/market-context")
 @limiter.limit("20/minute")
-async def market_context(
+@heavy_route
+def market_context(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.session import get_db
 from app.services.market_intel import (
@@ -19,7 +20,8 @@ router = APIRouter()
 
 @router.get("/price-baseline")
 @limiter.limit("20/minute")
-async def price_baseline(
+@heavy_route
+def price_baseline(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
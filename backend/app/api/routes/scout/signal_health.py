@@ -6,6 +6,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
+from app.core.concurrency import heavy_route
 from app.core.rate_limit import limiter
 from app.db.models.deal import Deal
 from app.db.models.deal_match import DealMatch
@@ -19,7 +20,8 @@ router = APIRouter()
 
 @router.get("/signal-health")
 @limiter.limit("20/minute")
-async def signal_health(
+@heavy_route
+def signal_health(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
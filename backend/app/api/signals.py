@@ -5,7 +5,8 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_clerk_user_id
@@ -15,7 +16,7 @@ from app.db.models.deal_match import DealMatch
 from app.db.models.signal import Signal
 from app.db.models.signal_intel_cache import SignalIntelCache
 from app.db.models.user import User
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.schemas.signals import (
     SignalCreate,
     SignalIntel,
@@ -23,6 +24,7 @@ from app.schemas.signals import (
     SignalStatus,
     SignalUpdate,
 )
+from app.services import briefing_cache
 from app.services.market_intel import score_deal_for_match
 from app.services.market_intel import (
     MarketStats,
@@ -79,96 +81,57 @@ def _signal_to_out(signal: Signal) -> SignalOut:
     )
 
 
+async def _get_owned_signal(db: AsyncSession, clerk_user_id: str, signal_id: UUID) -> Signal:
+    """Load one of the current user's signals or raise 404."""
+    user_id = (await db.execute(
+        select(User.id).where(User.clerk_id == clerk_user_id)
+    )).scalar_one_or_none()
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    signal = (await db.execute(
+        select(Signal).where(Signal.id == signal_id, Signal.user_id == user_id)
+    )).scalar_one_or_none()
+    if not signal:
+        raise HTTPException(status_code=404, detail="Signal not found")
+    return signal
+
+
 def _match_signal_against_deals(db: Session, signal: Signal) -> int:
     """Match a newly created signal against all active deals (synchronous).
 
     Returns the number of new matches created.
     No email is sent — deals just appear on the dashboard immediately.
     """
-    from datetime import datetime, timedelta
-
-    from app.workers.shared.regions import deal_matches_signal_region
+    from app.workers.shared.matching import SignalIndex
 
-    config = signal.config or {}
-    budget = config.get("budget", {})
-    travel_window = config.get("travel_window", {})
+    index = SignalIndex([signal])
+    if not index.compiled:
+        return 0
 
-    deals = db.execute(select(Deal).where(Deal.is_active)).scalars().all()
+    # Only deals departing from one of the signal's airports can match
+    deals = db.execute(
+        select(Deal).where(Deal.is_active, Deal.origin.in_(signal.departure_airports))
+    ).scalars().all()
     new_matches = 0
-    seen_deal_ids: set = set()
 
     for deal in deals:
-        try:
-            # Gateway check
-            if deal.origin not in signal.departure_airports:
-                continue
-            # Region check
-            dest = deal.destination or ""
-            if not deal_matches_signal_region(dest, signal.destination_regions):
-                continue
-
-            # Duration check
-            duration_days = (deal.return_date - deal.depart_date).days if deal.return_date else 7
-
-            # Travel window — exact dates
-            start_date_str = travel_window.get("start_date")
-            end_date_str = travel_window.get("end_date")
-            if start_date_str and end_date_str:
-                start_dt = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-                end_dt = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-                if deal.depart_date < start_dt:
-                    continue
-                deal_return = deal.return_date or (deal.depart_date + timedelta(days=duration_days))
-                if deal_return > end_dt:
-                    continue
-            else:
-                start_month_str = travel_window.get("start_month")
-                end_month_str = travel_window.get("end_month")
-                if start_month_str and end_month_str:
-                    start_month = datetime.strptime(start_month_str, "%Y-%m").date().replace(day=1)
-                    end_month_dt = datetime.strptime(end_month_str, "%Y-%m")
-                    if end_month_dt.month == 12:
-                        end_month = end_month_dt.replace(day=31).date()
-                    else:
-                        end_month = (end_month_dt.replace(month=end_month_dt.month + 1, day=1) - timedelta(days=1)).date()
-                    if not (start_month <= deal.depart_date <= end_month):
-                        continue
-
-            min_nights = travel_window.get("min_nights")
-            max_nights = travel_window.get("max_nights")
-            if min_nights and duration_days < min_nights:
-                continue
-            if max_nights and duration_days > max_nights:
-                continue
-
-            # Star rating check
-            preferences = config.get("preferences", {})
-            min_star_rating = preferences.get("min_star_rating")
-            if min_star_rating and deal.star_rating is not None:
-                if deal.star_rating < float(min_star_rating):
-                    continue
-
-            # Budget check (per-person)
-            target_pp = budget.get("target_pp")
-            if target_pp:
-                budget_cents = int(target_pp) * 100
-                if deal.price_cents > budget_cents:
-                    continue
-
-            # Dedup within this batch
-            if deal.id in seen_deal_ids:
-                continue
-            seen_deal_ids.add(deal.id)
+        duration_days = (deal.return_date - deal.depart_date).days if deal.return_date else 7
+        deal_meta = {
+            "gateway": deal.origin,
+            "region": deal.destination or "",
+            "duration_days": duration_days,
+        }
+        if not index.match(deal, deal_meta):
+            continue
 
-            try:
-                vlabel = score_deal_for_match(db, deal)
-            except Exception:
-                vlabel = None
-            match = DealMatch(signal_id=signal.id, deal_id=deal.id, value_label=vlabel)
-            db.add(match)
-            new_matches += 1
+        try:
+            vlabel = score_deal_for_match(db, deal)
         except Exception:
-            continue
+            vlabel = None
+        match = DealMatch(signal_id=signal.id, deal_id=deal.id, value_label=vlabel)
+        db.add(match)
+        new_matches += 1
 
     if new_matches:
         db.flush()
@@ -182,7 +145,7 @@ def _match_signal_against_deals(db: Session, signal: Signal) -> int:
 
 @router.post("", response_model=SignalOut, status_code=status.HTTP_201_CREATED)
 @limiter.limit("10/minute")
-async def create_signal(
+def create_signal(
     request: Request,
     signal_data: SignalCreate,
     db: Session = Depends(get_db),
@@ -230,6 +193,7 @@ async def create_signal(
     match_count = _match_signal_against_deals(db, signal)
 
     db.commit()
+    briefing_cache.invalidate_user(user.id)
 
     # Trigger first-signal email if this is the user's first signal (idempotent)
     try:
@@ -254,7 +218,7 @@ async def create_signal(
 
 @router.get("", response_model=List[SignalOut])
 @limiter.limit("30/minute")
-async def list_signals(
+def list_signals(
     request: Request,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
@@ -395,17 +359,11 @@ async def list_signals(
 async def get_signal(
     request: Request,
     signal_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
 ) -> SignalOut:
     """Get a signal by ID."""
-    user = db.query(User).filter(User.clerk_id == clerk_user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    signal = db.query(Signal).filter(Signal.id == signal_id, Signal.user_id == user.id).first()
-    if not signal:
-        raise HTTPException(status_code=404, detail="Signal not found")
+    signal = await _get_owned_signal(db, clerk_user_id, signal_id)
     return _signal_to_out(signal)
 
 
@@ -414,32 +372,31 @@ async def get_signal(
 async def delete_signal(
     request: Request,
     signal_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
 ) -> None:
     """Delete a signal."""
-    user = db.query(User).filter(User.clerk_id == clerk_user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    signal = db.query(Signal).filter(Signal.id == signal_id, Signal.user_id == user.id).first()
-    if not signal:
-        raise HTTPException(status_code=404, detail="Signal not found")
-
-    db.delete(signal)
-    db.commit()
+    signal = await _get_owned_signal(db, clerk_user_id, signal_id)
+    user_id = signal.user_id
+    await db.delete(signal)
+    await db.commit()
+    briefing_cache.invalidate_user(user_id)
 
 
 @router.patch("/{signal_id}", response_model=SignalOut)
 @limiter.limit("10/minute")
-async def update_signal(
+def update_signal(
     request: Request,
     signal_id: UUID,
     signal_update: SignalUpdate,
     db: Session = Depends(get_db),
     clerk_user_id: str = Depends(get_clerk_user_id),
 ) -> SignalOut:
-    """Update a signal."""
+    """Update a signal.
+
+    Plain def with a sync session: a criteria change re-matches and scores
+    deals, which is CPU-bound and must run in the threadpool, not on the loop.
+    """
     user = db.query(User).filter(User.clerk_id == clerk_user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -487,11 +444,12 @@ async def update_signal(
     # Re-match deals if search criteria changed
     if update_dict and ("departure" in update_dict or "destination" in update_dict
                         or "travel_window" in update_dict or "budget" in update_dict):
-        db.query(DealMatch).filter(DealMatch.signal_id == signal.id).delete()
+        db.execute(delete(DealMatch).where(DealMatch.signal_id == signal.id))
         db.flush()
         _match_signal_against_deals(db, signal)
 
     db.commit()
     db.refresh(signal)
+    briefing_cache.invalidate_user(signal.user_id)
 
     return _signal_to_out(signal)
@@ -0,0 +1,409 @@
+"""Small read-through cache shared by API workers.
+
+Each Cache has two tiers:
+- an in-process LRU;
+- optionally, a directory shared by the workers on one host
+  (settings.SHARED_CACHE_DIR). Pointing it at tmpfs, e.g.
+  /dev/shm/tripsignal-cache, keeps the shared tier in memory.
+  Entries are JSON files replaced atomically.
+
+get_or_compute() adds stampede protection on top:
+- single flight: one caller per key computes, across threads (a lock) and
+  across workers (flock on the shared directory). The others wait and then
+  read its result.
+- stale-while-revalidate: for stale_seconds after an entry expires, callers
+  that lose the race are served the stale value instead of waiting. The stale
+  value is also served if the recompute raises.
+
+Writes also sweep the cache's shared directory, at most once per
+SHARED_SWEEP_INTERVAL_SECONDS per process: entries past their stale window
+are deleted, then the oldest files until at most max_entries remain. Without
+it the directory (often tmpfs) would keep a file for every key ever written.
+
+Every named cache keeps hit/miss/latency counters; cache_stats() reports them
+for the admin health endpoint.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How long a worker waits for another worker's computation before doing it itself
+FLIGHT_WAIT_SECONDS = 30.0
+_FLIGHT_POLL_SECONDS = 0.05
+# Minimum gap between two sweeps of a cache's shared directory by one process
+SHARED_SWEEP_INTERVAL_SECONDS = 60.0
+
+_registry: dict[str, "Cache"] = {}
+_registry_lock = threading.Lock()
+
+
+class Cache:
+    """Named TTL cache with an in-process LRU and an optional shared directory tier."""
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        *,
+        stale_seconds: float = 0,
+        max_entries: int = 256,
+        shared: bool = True,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()  # key -> (stored_at, value)
+        self._flights: dict[str, _Flight] = {}
+        self._next_sweep = 0.0
+        self._counters = {
+            "hits": 0,
+            "shared_hits": 0,
+            "stale_hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "errors": 0,
+            "compute_ms_total": 0.0,
+            "compute_ms_max": 0.0,
+        }
+        with _registry_lock:
+            _registry[name] = self
+
+    # ── Public API ─────────────────────────────────────────────────────────
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, computing it (once across workers) when missing or expired."""
+        entry = self._lookup(key)
+        if entry is not None and self._age(entry) < self.ttl_seconds:
+            return entry[1]
+        stale = entry if entry is not None and self._age(entry) < self.ttl_seconds + self.stale_seconds else None
+
+        with self._flight(key) as flight:
+            if stale is None:
+                flight.acquire()
+            elif not flight.acquire(blocking=False):
+                self._count("stale_hits")
+                return stale[1]
+            try:
+                with self._shared_lock(key, wait=stale is None) as owned:
+                    if not owned:
+                        if stale is not None:
+                            self._count("stale_hits")
+                            return stale[1]
+                        # Another worker held the lock past FLIGHT_WAIT_SECONDS; compute anyway
+                    entry = self._lookup(key, count=False)
+                    if entry is not None and self._age(entry) < self.ttl_seconds:
+                        self._count("coalesced")
+                        return entry[1]
+                    return self._compute(key, compute, stale)
+            finally:
+                flight.release()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._lookup(key, count=False)
+        if entry is None or self._age(entry) >= self.ttl_seconds:
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        stored_at = time.time()
+        self._remember(key, stored_at, value)
+        path = self._path(key)
+        if path is None:
+            return
+        tmp = None
+        try:
+            payload = json.dumps({"key": key, "stored_at": stored_at, "value": value})
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".entry-")
+            with os.fdopen(fd, "w") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Cache %s: shared write failed for %s: %s", self.name, key, e)
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+            return
+        now = time.monotonic()
+        with self._lock:
+            due = now >= self._next_sweep
+            if due:
+                self._next_sweep = now + SHARED_SWEEP_INTERVAL_SECONDS
+        if due:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Delete shared entries past their stale window, then the oldest beyond max_entries.
+
+        Returns how many entry files were removed. A removed entry's lock file
+        goes too, unless a worker is computing that key right now.
+        """
+        directory = self._directory()
+        if directory is None:
+            return 0
+        entries: list[tuple[float, Path]] = []
+        try:
+            for path in directory.glob("*.json"):
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except FileNotFoundError:
+                    continue
+        except OSError as e:
+            logger.warning("Cache %s: shared sweep failed: %s", self.name, e)
+            return 0
+
+        entries.sort(reverse=True)  # newest first
+        cutoff = time.time() - (self.ttl_seconds + self.stale_seconds)
+        doomed = [path for i, (mtime, path) in enumerate(entries) if mtime < cutoff or i >= self.max_entries]
+        removed = 0
+        for path in doomed:
+            try:
+                path.unlink(missing_ok=True)
+                removed += 1
+            except OSError as e:
+                logger.warning("Cache %s: shared sweep failed for %s: %s", self.name, path, e)
+                continue
+            _unlink_idle_lock(path.with_suffix(".lock"))
+        return removed
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or every key when key is None, from both tiers."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        directory = self._directory()
+        if directory is None:
+            return
+        paths: Iterable[Path] = directory.glob("*.json") if key is None else [directory / self._filename(key)]
+        for path in paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Cache %s: shared invalidation failed for %s: %s", self.name, path, e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        computed = counters["misses"] + counters["errors"]
+        lookups = computed + counters["hits"] + counters["shared_hits"] + counters["stale_hits"] + counters["coalesced"]
+        return {
+            **counters,
+            "compute_ms_total": round(counters["compute_ms_total"], 1),
+            "compute_ms_avg": round(counters["compute_ms_total"] / computed, 1) if computed else 0.0,
+            "compute_ms_max": round(counters["compute_ms_max"], 1),
+            "hit_rate": round((lookups - computed) / lookups, 3) if lookups else 0.0,
+            "entries": size,
+            "shared": self._directory() is not None,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0.0 if name.startswith("compute_ms") else 0
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    def _compute(self, key: str, compute: Callable[[], Any], stale: Optional[tuple[float, Any]]) -> Any:
+        t0 = time.perf_counter()
+        try:
+            value = compute()
+        except Exception:
+            self._count("errors")
+            if stale is None:
+                raise
+            logger.exception("Cache %s: recompute of %s failed; serving stale value", self.name, key)
+            return stale[1]
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self._counters["misses"] += 1
+            self._counters["compute_ms_total"] += elapsed_ms
+            self._counters["compute_ms_max"] = max(self._counters["compute_ms_max"], elapsed_ms)
+        self.set(key, value)
+        return value
+
+    def _lookup(self, key: str, count: bool = True) -> Optional[tuple[float, Any]]:
+        """Freshest entry for key from either tier (expired entries included)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None and self._age(entry) < self.ttl_seconds:
+            if count:
+                self._count("hits")
+            return entry
+
+        shared = self._read_shared(key)
+        if shared is not None and (entry is None or shared[0] > entry[0]):
+            self._remember(key, *shared)
+            if count and self._age(shared) < self.ttl_seconds:
+                self._count("shared_hits")
+            return shared
+        return entry
+
+    def _read_shared(self, key: str) -> Optional[tuple[float, Any]]:
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            stored = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if stored.get("key") != key:
+            return None
+        return stored["stored_at"], stored["value"]
+
+    def _remember(self, key: str, stored_at: float, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @contextmanager
+    def _flight(self, key: str) -> Iterator[threading.Lock]:
+        """The key's single-flight lock, dropped once no caller is using it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            flight.users += 1
+        try:
+            yield flight.lock
+        finally:
+            with self._lock:
+                flight.users -= 1
+                if flight.users == 0:
+                    del self._flights[key]
+
+    def _shared_lock(self, key: str, wait: bool) -> "_FileLock":
+        path = self._path(key)
+        return _FileLock(path.with_suffix(".lock") if path is not None else None, wait)
+
+    def _directory(self) -> Optional[Path]:
+        if not self.shared or not settings.SHARED_CACHE_DIR:
+            return None
+        return Path(settings.SHARED_CACHE_DIR) / self.name
+
+    def _path(self, key: str) -> Optional[Path]:
+        directory = self._directory()
+        if directory is None:
+            return None
+        return directory / self._filename(key)
+
+    @staticmethod
+    def _filename(key: str) -> str:
+        return f"{hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()}.json"
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    @staticmethod
+    def _age(entry: tuple[float, Any]) -> float:
+        return time.time() - entry[0]
+
+
+class _Flight:
+    """A key's single-flight lock and how many callers currently hold or await it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class _FileLock:
+    """Exclusive flock on a lock file; a no-op when there is no shared directory.
+
+    Entering yields True once the lock is held. With wait=False, or after
+    FLIGHT_WAIT_SECONDS, it yields False instead of blocking further.
+    """
+
+    def __init__(self, path: Optional[Path], wait: bool):
+        self.path = path
+        self.wait = wait
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> bool:
+        if self.path is None:
+            return True
+        deadline = time.monotonic() + (FLIGHT_WAIT_SECONDS if self.wait else 0)
+        while True:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = self._fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+            except OSError as e:
+                logger.warning("Cache lock %s unavailable: %s", self.path, e)
+                return True
+            if not _flock(fd, deadline):
+                return False
+            # A sweep may have unlinked the file between open and flock. A lock on
+            # the orphaned inode excludes nobody (the next worker creates a fresh
+            # file at the path), so reopen and lock whatever is there now.
+            try:
+                if os.stat(self.path).st_ino == os.fstat(fd).st_ino:
+                    return True
+            except FileNotFoundError:
+                pass
+            self._close()
+
+    def __exit__(self, *exc) -> None:
+        self._close()
+
+    def _close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)  # releases the flock
+            self._fd = None
+
+
+def _flock(fd: int, deadline: float) -> bool:
+    """Take an exclusive flock on fd, polling until deadline; False if it never frees up."""
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(_FLIGHT_POLL_SECONDS)
+
+
+def _unlink_idle_lock(path: Path) -> None:
+    """Delete a lock file unless another worker holds its flock."""
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except OSError:
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass  # held (BlockingIOError) or already gone
+    finally:
+        os.close(fd)
+
+
+def cache_stats() -> dict:
+    """Counters for every named cache in this process."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
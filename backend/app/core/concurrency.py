@@ -0,0 +1,36 @@
+"""Dedicated thread pool for CPU-heavy sync route handlers.
+
+FastAPI runs plain ``def`` handlers in anyio's default thread pool, which is
+shared with sync dependencies, background tasks and every other sync route.
+The Scout and market handlers are CPU-bound (scoring, market stats), so they
+run under their own CapacityLimiter instead: at most HEAVY_ROUTE_THREADS of
+them compete for the GIL at once, and the default pool keeps its full size for
+everything else.
+"""
+import functools
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import anyio
+import anyio.to_thread
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+heavy_route_limiter = anyio.CapacityLimiter(settings.HEAVY_ROUTE_THREADS)
+
+
+def heavy_route(fn: Callable[..., T]) -> Callable[..., Any]:
+    """Run a sync route handler on the heavy-route limiter.
+
+    Place it below @limiter.limit so FastAPI and slowapi see an async handler
+    with the original signature.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await anyio.to_thread.run_sync(
+            functools.partial(fn, *args, **kwargs), limiter=heavy_route_limiter,
+        )
+
+    return wrapper
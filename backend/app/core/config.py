@@ -1,4 +1,6 @@
 """Application configuration from environment variables."""
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -28,12 +30,40 @@ class Settings(BaseSettings):
     # Unsubscribe token signing
     UNSUB_SECRET: str = ""
 
+    # Scout briefing pre-warm: how recently a Pro user must have logged in (0 = off)
+    BRIEFING_PREWARM_DAYS: int = 7
+    # Shared tier for app.core.cache (briefings, market events, public stats): a directory shared by
+    # API workers on one host, ideally on tmpfs such as /dev/shm/tripsignal-cache ("" = in-process only)
+    SHARED_CACHE_DIR: str = ""
+
+    # Outbound provider calls (app.core.http): pooled connections per host, and
+    # retries with jittered exponential backoff for transient failures
+    HTTP_POOL_MAXSIZE: int = 10
+    HTTP_MAX_RETRIES: int = 2
+    HTTP_BACKOFF_SECONDS: float = 0.5
+
     # Database Settings
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "tripsignal"
     POSTGRES_HOST: str = "postgres"
     POSTGRES_PORT: int = 5432
+    # Optional URL for the async engine (e.g. postgresql+asyncpg://...); defaults to psycopg async
+    ASYNC_DATABASE_URL: str = ""
+    # Threads for the CPU-bound Scout/market handlers (see app/core/concurrency.py).
+    # Other sync handlers keep anyio's default thread pool.
+    HEAVY_ROUTE_THREADS: int = 4
+
+    # Connection pool profile: api | scraper | email_worker (see app/db/pool.py)
+    DB_ROLE: str = "api"
+    # Optional overrides of the role's profile
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[float] = None
+    DB_POOL_RECYCLE: Optional[int] = None
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    # Connecting through PgBouncer (transaction pooling): no prepared statements or startup options
+    DB_PGBOUNCER: bool = False
 
     @property
     def database_url(self) -> str:
@@ -43,6 +73,11 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        """Database URL for the async engine. psycopg 3 serves both sync and async."""
+        return self.ASYNC_DATABASE_URL or self.database_url
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
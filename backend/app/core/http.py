@@ -0,0 +1,193 @@
+"""Shared outbound HTTP client for provider calls (Resend, Clerk, search pages).
+
+One requests.Session per process, so calls to the same host reuse pooled
+keep-alive connections instead of paying a TCP + TLS handshake each time.
+
+On top of the session:
+- per-host timeouts (HOST_TIMEOUTS, else DEFAULT_TIMEOUT) unless the caller
+  passes ``timeout``;
+- retries with full-jitter exponential backoff on connection errors, timeouts
+  and RETRY_STATUSES (honouring Retry-After). Only idempotent methods are
+  retried, plus POSTs that carry an Idempotency-Key header (Resend supports
+  it), so a retry never sends an email twice;
+- per-host call/retry/error counters and latency, reported by http_stats()
+  for the admin health endpoint. Each call is also logged at DEBUG.
+"""
+import logging
+import random
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (5.0, 15.0)
+HOST_TIMEOUTS: dict[str, tuple[float, float]] = {
+    "api.resend.com": (5.0, 30.0),
+    "api.clerk.com": (5.0, 10.0),
+    "www.startpage.com": (10.0, 15.0),
+    "html.duckduckgo.com": (10.0, 15.0),
+}
+
+RETRY_STATUSES = frozenset({502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+_RETRIABLE_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+class HttpClient:
+    """Pooled session with per-host timeouts, jittered retries and latency counters."""
+
+    def __init__(
+        self,
+        *,
+        pool_maxsize: int = 10,
+        max_retries: int = 2,
+        backoff_seconds: float = 0.5,
+        backoff_max_seconds: float = 8.0,
+    ):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict] = {}
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        retries: Optional[int] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request, retrying transient failures when that is safe.
+
+        Returns the last response (which may still be an error status) or
+        raises the last exception once retries are exhausted.
+        """
+        method = method.upper()
+        host = urlsplit(url).hostname or ""
+        kwargs.setdefault("timeout", HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT))
+        headers = kwargs.get("headers") or {}
+        retriable = method in IDEMPOTENT_METHODS or any(k.lower() == "idempotency-key" for k in headers)
+        attempts = 1 + (self.max_retries if retries is None else retries) if retriable else 1
+
+        attempt = 0
+        while True:
+            attempt += 1
+            t0 = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except _RETRIABLE_ERRORS as e:
+                elapsed = time.perf_counter() - t0
+                self._record(host, elapsed, error=True)
+                logger.debug("http %s %s failed in %.0fms: %s", method, host, elapsed * 1000, e)
+                if attempt >= attempts:
+                    raise
+                self._retry(host, attempt, None)
+                continue
+            elapsed = time.perf_counter() - t0
+            self._record(host, elapsed, server_error=resp.status_code >= 500)
+            logger.debug("http %s %s -> %d in %.0fms", method, host, resp.status_code, elapsed * 1000)
+            if resp.status_code not in RETRY_STATUSES or attempt >= attempts:
+                return resp
+            self._retry(host, attempt, resp.headers.get("Retry-After"))
+            resp.close()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = {host: dict(counters) for host, counters in self._hosts.items()}
+        for counters in hosts.values():
+            calls = counters["calls"]
+            counters["latency_ms_avg"] = round(counters["latency_ms_total"] / calls, 1) if calls else 0.0
+            counters["latency_ms_total"] = round(counters["latency_ms_total"], 1)
+            counters["latency_ms_max"] = round(counters["latency_ms_max"], 1)
+        return hosts
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+    def close(self) -> None:
+        self.session.close()
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    def _retry(self, host: str, attempt: int, retry_after: Optional[str]) -> None:
+        cap = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+        delay = random.uniform(0, cap)  # noqa: S311 - retry jitter, not security-sensitive
+        if retry_after is not None:
+            try:
+                delay = min(self.backoff_max_seconds, max(delay, float(retry_after)))
+            except ValueError:
+                pass
+        with self._lock:
+            self._counters(host)["retries"] += 1
+        time.sleep(delay)
+
+    def _record(self, host: str, elapsed: float, *, error: bool = False, server_error: bool = False) -> None:
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            counters = self._counters(host)
+            counters["calls"] += 1
+            counters["errors"] += int(error)
+            counters["server_errors"] += int(server_error)
+            counters["latency_ms_total"] += elapsed_ms
+            counters["latency_ms_max"] = max(counters["latency_ms_max"], elapsed_ms)
+
+    def _counters(self, host: str) -> dict:
+        counters = self._hosts.get(host)
+        if counters is None:
+            counters = self._hosts[host] = {
+                "calls": 0,
+                "retries": 0,
+                "errors": 0,
+                "server_errors": 0,
+                "latency_ms_total": 0.0,
+                "latency_ms_max": 0.0,
+            }
+        return counters
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """The process-wide client, created on first use from settings."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(
+                pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+                max_retries=settings.HTTP_MAX_RETRIES,
+                backoff_seconds=settings.HTTP_BACKOFF_SECONDS,
+            )
+        return _client
+
+
+def http_stats() -> dict:
+    """Per-host counters of the process-wide client (empty before first use)."""
+    with _client_lock:
+        client = _client
+    return client.stats() if client is not None else {}
@@ -6,3 +6,4 @@ from .signal import Signal  # noqa: F401
 from .signal_intel_cache import SignalIntelCache  # noqa: F401
 from .system_config import SystemConfig  # noqa: F401
 from .hotel_intel import HotelIntel  # noqa: F401
+from .market_bucket_stats import MarketBucketStats  # noqa: F401
@@ -3,7 +3,7 @@ import uuid
 from datetime import date
 from datetime import datetime
 
-from sqlalchemy import Date, Integer, Text, TIMESTAMP, text
+from sqlalchemy import Date, Index, Integer, Text, TIMESTAMP, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -58,6 +58,10 @@ class Deal(Base):
     discount_pct: Mapped[int | None] = mapped_column(Integer, nullable=True)
     destination_str: Mapped[str | None] = mapped_column(Text, nullable=True)
     star_rating: Mapped[float | None] = mapped_column(nullable=True)
+    # Most recent price change, maintained at upsert (mirrors the last two deal_price_history rows)
+    prev_price_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    last_price_change_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    last_price_delta_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)  # new - prev; negative = drop
 
     price_history: Mapped[list["DealPriceHistory"]] = relationship(
         "DealPriceHistory",
@@ -73,6 +77,13 @@ class Deal(Base):
         passive_deletes=True,
     )
 
+    __table_args__ = (
+        Index(
+            "ix_deals_last_price_change_at", "last_price_change_at",
+            postgresql_where=text("last_price_change_at IS NOT NULL"),
+        ),
+    )
+
     def __repr__(self) -> str:
         """String representation of Deal."""
         return (
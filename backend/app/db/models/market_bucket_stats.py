@@ -0,0 +1,39 @@
+"""MarketBucketStats database model — precomputed price distribution per market bucket."""
+from datetime import datetime
+
+from sqlalchemy import TIMESTAMP, Float, Integer, Text, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class MarketBucketStats(Base):
+    """Market stats per bucket, rebuilt in one grouped pass after each scrape cycle.
+
+    star_key is "any", a STAR_BUCKETS key, or "min:<rating>" for the
+    minimum-star thresholds signals use. Percentiles are stored as the raw
+    percentile_cont value and rounded when read, exactly like compute_percentile.
+    """
+
+    __tablename__ = "market_bucket_stats"
+
+    origin: Mapped[str] = mapped_column(Text, primary_key=True)
+    destination: Mapped[str] = mapped_column(Text, primary_key=True)
+    duration_bucket: Mapped[str] = mapped_column(Text, primary_key=True)
+    star_key: Mapped[str] = mapped_column(Text, primary_key=True)
+
+    sample_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    unique_package_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    unique_resort_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    min_price: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    p25_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    median_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    p75_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    max_price: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    price_stddev: Mapped[float | None] = mapped_column(Float, nullable=True)
+    prices: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)  # sorted, for scoring
+
+    computed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"),
+    )
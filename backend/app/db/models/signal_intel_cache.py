@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import Boolean, Float, ForeignKey, Integer, TIMESTAMP, Text, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -59,6 +59,12 @@ class SignalIntelCache(Base):
     # Module 7: Price-to-Quality Value Score (0-100)
     value_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
+    # Book Window result (BookWindowResult dump, NULL = not enough data), written after each scrape
+    book_window: Mapped[dict | None] = mapped_column(JSONB(none_as_null=True), nullable=True)
+    book_window_refreshed_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True,
+    )
+
     # Metadata
     total_matches: Mapped[int | None] = mapped_column(
         Integer, nullable=True, server_default=text("0"),
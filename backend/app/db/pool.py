@@ -0,0 +1,210 @@
+"""Connection pool profiles and pool metrics.
+
+Each process role gets its own pool sizing, recycle interval and statement
+timeout:
+- ``api``: many short requests.
+- ``scraper``: a few long bulk writes.
+- ``email_worker``: a single-threaded drain loop.
+
+The role comes from ``DB_ROLE``. Individual ``DB_POOL_*`` /
+``DB_STATEMENT_TIMEOUT_MS`` settings override the profile.
+
+Engines built here use an instrumented QueuePool. It records checkout wait
+time, overflow checkouts and checkout timeouts, so pool exhaustion shows up in
+``pool_stats()`` (admin system health, orchestrator cycle log) instead of only
+as slow requests.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Checkout waits kept for percentile reporting (per pool)
+_WAIT_SAMPLES = 1024
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float  # seconds to wait for a connection before TimeoutError
+    pool_recycle: int  # seconds; recycle before PgBouncer/server idle timeouts
+    statement_timeout_ms: int  # 0 = no timeout
+
+
+POOL_PROFILES: dict[str, PoolProfile] = {
+    "api": PoolProfile(
+        pool_size=10, max_overflow=10, pool_timeout=10, pool_recycle=1800, statement_timeout_ms=30_000,
+    ),
+    "scraper": PoolProfile(
+        pool_size=5, max_overflow=5, pool_timeout=30, pool_recycle=1800, statement_timeout_ms=300_000,
+    ),
+    "email_worker": PoolProfile(
+        pool_size=3, max_overflow=2, pool_timeout=30, pool_recycle=1800, statement_timeout_ms=60_000,
+    ),
+}
+
+
+def resolve_profile(settings) -> PoolProfile:
+    """Profile for settings.DB_ROLE with any DB_POOL_* / DB_STATEMENT_TIMEOUT_MS overrides applied."""
+    profile = POOL_PROFILES.get(settings.DB_ROLE)
+    if profile is None:
+        logger.warning("Unknown DB_ROLE %r, using the api pool profile", settings.DB_ROLE)
+        profile = POOL_PROFILES["api"]
+
+    overrides = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+    }
+    return replace(profile, **{k: v for k, v in overrides.items() if v is not None})
+
+
+def connect_args(url: str, profile: PoolProfile, pgbouncer: bool) -> dict:
+    """DBAPI connect() kwargs for the driver in ``url``.
+
+    Behind PgBouncer in transaction mode:
+    - Prepared-statement caching is disabled, because server connections change
+      between transactions.
+    - The statement timeout is not sent as a startup option, because PgBouncer
+      rejects unknown startup parameters. Set it on the database role instead
+      (ALTER ROLE ... SET statement_timeout).
+    """
+    args: dict = {}
+    if url.startswith("postgresql+asyncpg"):
+        if pgbouncer:
+            args["statement_cache_size"] = 0
+        elif profile.statement_timeout_ms:
+            args["server_settings"] = {"statement_timeout": str(profile.statement_timeout_ms)}
+        return args
+
+    # psycopg 3
+    if pgbouncer:
+        args["prepare_threshold"] = None
+    elif profile.statement_timeout_ms:
+        args["options"] = f"-c statement_timeout={profile.statement_timeout_ms}"
+    return args
+
+
+def engine_kwargs(url: str, settings, async_: bool = False) -> dict:
+    """create_engine/create_async_engine kwargs for this process role."""
+    profile = resolve_profile(settings)
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_ else InstrumentedQueuePool,
+        "pool_size": profile.pool_size,
+        "max_overflow": profile.max_overflow,
+        "pool_timeout": profile.pool_timeout,
+        "pool_recycle": profile.pool_recycle,
+        "pool_pre_ping": True,
+        "pool_logging_name": f"{settings.DB_ROLE}{'-async' if async_ else ''}",
+        "connect_args": connect_args(url, profile, settings.DB_PGBOUNCER),
+    }
+
+
+class PoolMetrics:
+    """Thread-safe checkout counters for one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait: float, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if overflow:
+                self.overflow_checkouts += 1
+            self._waits.append(wait)
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "checkout_timeouts": self.timeouts,
+                "wait_ms_p50": round(_percentile(waits, 0.50) * 1000, 2),
+                "wait_ms_p99": round(_percentile(waits, 0.99) * 1000, 2),
+                "wait_ms_max": round(self.max_wait * 1000, 2),
+            }
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# Keyed by pool logging name so metrics survive engine.dispose() / pool.recreate()
+_metrics: dict[str, PoolMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def _metrics_for(name: str) -> PoolMetrics:
+    metrics = _metrics.get(name)
+    if metrics is None:
+        with _metrics_lock:
+            metrics = _metrics.setdefault(name, PoolMetrics())
+    return metrics
+
+
+class _InstrumentedPool(QueuePool):
+    # Metrics key: the pool's logging name, which recreate() passes on to the new pool
+    metrics_name: str
+
+    def __init__(self, *args, logging_name: str | None = None, **kwargs):
+        self.metrics_name = logging_name or "default"
+        super().__init__(*args, logging_name=logging_name, **kwargs)
+
+    def _do_get(self):
+        metrics = _metrics_for(self.metrics_name)
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except sa_exc.TimeoutError:
+            metrics.record_timeout(time.perf_counter() - start)
+            logger.warning(
+                "DB pool %s exhausted: %d checked out (size %d, overflow %d)",
+                self.metrics_name, self.checkedout(), self.size(), self.overflow(),
+            )
+            raise
+        metrics.record_checkout(time.perf_counter() - start, overflow=self.checkedout() > self.size())
+        return conn
+
+
+class InstrumentedQueuePool(_InstrumentedPool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(engine) -> dict:
+    """Current pool occupancy plus cumulative checkout metrics for ``engine``."""
+    pool = engine.pool
+    stats = {
+        "pool": pool.metrics_name,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    stats.update(_metrics_for(pool.metrics_name).snapshot())
+    return stats
@@ -1,22 +1,42 @@
-"""Database session management."""
+"""Database session management.
+
+Sync ``Session`` (get_db) is for plain ``def`` routes, which FastAPI runs in its
+threadpool, and for workers. ``async def`` routes must use ``AsyncSession``
+(get_async_db) so queries never block the event loop.
+
+Pool sizing, recycle and statement timeout follow the process role
+(settings.DB_ROLE); see app/db/pool.py.
+"""
+from collections.abc import AsyncIterator
+
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.db.pool import engine_kwargs, pool_stats
 
 logger = get_logger(__name__)
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,  # Verify connections before using
     echo=settings.DEBUG,  # Log SQL queries in debug mode
+    **engine_kwargs(settings.database_url, settings),
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for async def routes
+async_engine = create_async_engine(
+    settings.async_database_url,
+    echo=settings.DEBUG,
+    **engine_kwargs(settings.async_database_url, settings, async_=True),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db() -> Session:
     """
@@ -32,6 +52,18 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency function to get an async database session for async def routes.
+    Same contract as get_db: rollback before close keeps pooled connections clean.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        finally:
+            await db.rollback()
+
+
 def check_db_connection() -> bool:
     """Check if database connection is available."""
     try:
@@ -41,3 +73,12 @@ def check_db_connection() -> bool:
     except Exception as e:
         logger.error(f"Database connection check failed: {e}")
         return False
+
+
+def db_pool_stats() -> dict:
+    """Pool occupancy and checkout metrics for this process's engines."""
+    return {
+        "role": settings.DB_ROLE,
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine),
+    }
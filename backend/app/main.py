@@ -2,9 +2,10 @@
 import logging
 import time
 import traceback
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
-from fastapi import Depends, FastAPI, Request
+from fastapi import BackgroundTasks, Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
 from slowapi import _rate_limit_exceeded_handler
@@ -22,6 +23,7 @@ from app.api.routes.deal_public import router as deal_public_router
 from app.api.routes.stats import router as stats_router
 from app.api.routes.hotel_intel import router as hotel_intel_router
 from app.api.routes.scout import router as scout_router
+from app.api.routes.scout.briefing import warm_briefing_cache
 from app.api.routes.market import router as market_router
 from app.api.routes.resend_webhooks import router as resend_webhook_router
 from app.api.routes.unsubscribe import router as unsubscribe_router
@@ -32,13 +34,22 @@ from app.core.logging import setup_logging
 from app.core.rate_limit import limiter
 from app.db.models.notification_outbox import NotificationOutbox
 from app.db.models.scrape_run import ScrapeRun
-from app.db.session import get_db
+from app.db.session import SessionLocal, async_engine, get_db
+from app.services import briefing_cache
 
 # Setup logging
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await async_engine.dispose()
+
+
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="TripSignal API",
     description="Backend API for TripSignal",
     version="1.0.0",
@@ -232,10 +243,35 @@ def collection_complete(payload: dict, db: Session = Depends(get_db)):
         )
         db.add(run)
 
+    # New deals/matches are in: every cached Scout briefing is now stale
+    briefing_cache.bump_generation(db)
     db.commit()
     return {"ok": True, "run_id": run.id}
 
 
+def _warm_briefings() -> None:
+    db = SessionLocal()
+    try:
+        warmed = warm_briefing_cache(db, settings.BRIEFING_PREWARM_DAYS)
+        _logger.info("Pre-warmed %d Scout briefings", warmed)
+    except Exception:
+        _logger.exception("Briefing pre-warm failed")
+    finally:
+        db.rollback()
+        db.close()
+
+
+@app.post("/api/system/briefing-prewarm", dependencies=[Depends(verify_admin)])
+def briefing_prewarm(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """Called by the orchestrator after a cycle. Bumps the briefing generation and
+    rebuilds briefings for recently active Pro users in the background."""
+    briefing_cache.bump_generation(db)
+    db.commit()
+    if settings.BRIEFING_PREWARM_DAYS > 0:
+        background_tasks.add_task(_warm_briefings)
+    return {"ok": True, "prewarm": settings.BRIEFING_PREWARM_DAYS > 0}
+
+
 # 1x1 transparent PNG
 _PIXEL_PNG = (
     b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01"
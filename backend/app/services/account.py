@@ -6,12 +6,12 @@ import os
 from datetime import datetime, timezone
 from dataclasses import dataclass
 
-import requests as http_requests
 import stripe
 from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.http import get_http_client
 from app.db.models.email_log import EmailLog
 from app.db.models.notification_outbox import NotificationOutbox
 from app.db.models.signal import Signal
@@ -212,7 +212,7 @@ def _delete_clerk_user(clerk_id: str) -> bool:
     if not clerk_id or clerk_id.startswith("deleted:"):
         return False
     try:
-        resp = http_requests.delete(
+        resp = get_http_client().delete(
             f"https://api.clerk.com/v1/users/{clerk_id}",
             headers={"Authorization": f"Bearer {secret}"},
             timeout=10,
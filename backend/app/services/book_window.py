@@ -6,19 +6,24 @@ Uses three heuristics:
 3. Inventory Pressure — is the number of available deals shrinking or growing?
 
 Results are combined into a recommendation with confidence level.
+
+get_book_windows() evaluates many signals from one snapshot query. Its results
+are persisted on signal_intel_cache after each scrape (persist_book_windows), so
+request handlers usually only read them.
 """
 import logging
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, cast
 from uuid import UUID
 
-from sqlalchemy import func, select, text
+from sqlalchemy import Table, bindparam, select, text, update
 from sqlalchemy.orm import Session
 
 from app.db.models.deal import Deal
 from app.db.models.deal_match import DealMatch
 from app.db.models.deal_price_history import DealPriceHistory
+from app.db.models.signal_intel_cache import SignalIntelCache
 from app.schemas.book_window import BookWindowFactor, BookWindowOut, BookWindowResult
 
 logger = logging.getLogger("book_window")
@@ -26,6 +31,9 @@ logger = logging.getLogger("book_window")
 # Minimum price observations required to produce a recommendation
 MIN_DATA_POINTS = 10
 HIGH_CONFIDENCE_THRESHOLD = 50
+# Signals per snapshot query when evaluating in bulk
+SNAPSHOT_BATCH_SIZE = 200
+CYCLE_SECONDS = 6 * 3600
 
 
 def _get_price_snapshots(
@@ -48,8 +56,37 @@ def _get_price_snapshots(
     return [(r[0], r[1]) for r in rows]
 
 
+def _get_price_snapshots_bulk(
+    db: Session, signal_ids: list[UUID], days: int = 90
+) -> dict[UUID, list[tuple[datetime, int]]]:
+    """_get_price_snapshots for many signals in one query, partitioned by signal."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = db.execute(
+        select(DealMatch.signal_id, DealPriceHistory.recorded_at, DealPriceHistory.price_cents)
+        .join(DealMatch, DealMatch.deal_id == DealPriceHistory.deal_id)
+        .where(
+            DealMatch.signal_id.in_(signal_ids),
+            DealPriceHistory.recorded_at >= cutoff,
+        )
+        .order_by(DealMatch.signal_id, DealPriceHistory.recorded_at)
+    ).all()
+    snapshots: dict[UUID, list[tuple[datetime, int]]] = defaultdict(list)
+    for signal_id, recorded_at, price_cents in rows:
+        snapshots[signal_id].append((recorded_at, price_cents))
+    return snapshots
+
+
+def _group_cycles(snapshots: list[tuple[datetime, int]]) -> dict[int, list[int]]:
+    """Prices per 6-hour scrape cycle, keyed by cycle number."""
+    cycles: dict[int, list[int]] = defaultdict(list)
+    for ts, price in snapshots:
+        cycles[int(ts.timestamp()) // CYCLE_SECONDS].append(price)
+    return cycles
+
+
 def _compute_trend_direction(
     snapshots: list[tuple[datetime, int]],
+    cycles: Optional[dict[int, list[int]]] = None,
 ) -> Optional[BookWindowFactor]:
     """Heuristic 1: Are prices rising, declining, or stable?
 
@@ -59,11 +96,7 @@ def _compute_trend_direction(
     if len(snapshots) < 6:
         return None
 
-    # Group into 6-hour buckets
-    buckets: dict[int, list[int]] = defaultdict(list)
-    for ts, price in snapshots:
-        bucket_key = int(ts.timestamp()) // (6 * 3600)
-        buckets[bucket_key].append(price)
+    buckets = cycles if cycles is not None else _group_cycles(snapshots)
 
     if len(buckets) < 3:
         return None
@@ -110,7 +143,7 @@ def _compute_trend_direction(
 
 
 def _compute_seasonal_pattern(
-    db: Session, signal_id: UUID, snapshots: list[tuple[datetime, int]]
+    snapshots: list[tuple[datetime, int]], now: Optional[datetime] = None
 ) -> Optional[BookWindowFactor]:
     """Heuristic 2: Is the current price favorable compared to historical average?
 
@@ -130,7 +163,7 @@ def _compute_seasonal_pattern(
     historical_avg = sum(prices) / len(prices)
 
     # Current average = last 3 days
-    three_days_ago = datetime.now(timezone.utc) - timedelta(days=3)
+    three_days_ago = (now or datetime.now(timezone.utc)) - timedelta(days=3)
     recent_prices = [p for ts, p in snapshots if ts >= three_days_ago]
     if not recent_prices:
         return None
@@ -159,6 +192,7 @@ def _compute_seasonal_pattern(
 
 def _compute_inventory_pressure(
     snapshots: list[tuple[datetime, int]],
+    cycles: Optional[dict[int, list[int]]] = None,
 ) -> Optional[BookWindowFactor]:
     """Heuristic 3: Is availability shrinking or growing?
 
@@ -167,12 +201,10 @@ def _compute_inventory_pressure(
     if len(snapshots) < 10:
         return None
 
-    # Group by 6-hour bucket, count unique prices as proxy for unique deals
+    # Count unique prices per cycle as proxy for unique deals
     # (since we don't have deal_id in snapshots, we use distinct prices as an approximation)
-    buckets: dict[int, set[int]] = defaultdict(set)
-    for ts, price in snapshots:
-        bucket_key = int(ts.timestamp()) // (6 * 3600)
-        buckets[bucket_key].append(price) if not isinstance(buckets[bucket_key], set) else buckets[bucket_key].add(price)
+    grouped = cycles if cycles is not None else _group_cycles(snapshots)
+    buckets = {k: set(prices) for k, prices in grouped.items()}
 
     sorted_keys = sorted(buckets.keys())
     if len(sorted_keys) < 4:
@@ -206,13 +238,15 @@ def _compute_inventory_pressure(
         )
 
 
-def _compute_current_percentile(snapshots: list[tuple[datetime, int]]) -> float:
+def _compute_current_percentile(
+    snapshots: list[tuple[datetime, int]], now: Optional[datetime] = None
+) -> float:
     """Where does the current price sit relative to all observed prices? 0.0 = cheapest ever."""
     if not snapshots:
         return 0.5
 
     prices = sorted(set(p for _, p in snapshots))
-    three_days_ago = datetime.now(timezone.utc) - timedelta(days=3)
+    three_days_ago = (now or datetime.now(timezone.utc)) - timedelta(days=3)
     recent_prices = [p for ts, p in snapshots if ts >= three_days_ago]
     current = sum(recent_prices) / len(recent_prices) if recent_prices else prices[len(prices) // 2]
 
@@ -231,23 +265,90 @@ def get_book_window(
     Returns BookWindowOut with result=None if not enough data.
     """
     snapshots = _get_price_snapshots(db, signal_id)
+    return BookWindowOut(
+        signal_id=str(signal_id),
+        signal_name=signal_name,
+        route_label=route_label,
+        result=_evaluate(signal_id, snapshots, datetime.now(timezone.utc)),
+    )
+
+
+def compute_book_windows(
+    db: Session, signal_ids: list[UUID]
+) -> dict[UUID, Optional[BookWindowResult]]:
+    """Evaluate Book Window for many signals from one snapshot query per batch.
+
+    Returns {signal_id: result}; result is None where get_book_window's would be.
+    """
+    now = datetime.now(timezone.utc)
+    results: dict[UUID, Optional[BookWindowResult]] = {}
+    for i in range(0, len(signal_ids), SNAPSHOT_BATCH_SIZE):
+        batch = signal_ids[i:i + SNAPSHOT_BATCH_SIZE]
+        snapshots = _get_price_snapshots_bulk(db, batch)
+        for signal_id in batch:
+            results[signal_id] = _evaluate(signal_id, snapshots.get(signal_id, []), now)
+    return results
+
+
+def get_book_windows(
+    db: Session, signals: list, intel_map: Optional[dict] = None
+) -> dict[UUID, Optional[BookWindowResult]]:
+    """Book Window results for a user's signals.
+
+    Pass the signals' SignalIntelCache rows as intel_map to reuse results
+    persisted after the last scrape. A persisted result is used unless the
+    signal was edited after it was computed. Everything else is evaluated live
+    in one batch.
+    """
+    results: dict[UUID, Optional[BookWindowResult]] = {}
+    live: list[UUID] = []
+    for s in signals:
+        intel = intel_map.get(s.id) if intel_map else None
+        refreshed_at = intel.book_window_refreshed_at if intel is not None else None
+        if intel is not None and refreshed_at is not None and (s.updated_at is None or s.updated_at <= refreshed_at):
+            results[s.id] = BookWindowResult(**intel.book_window) if intel.book_window else None
+        else:
+            live.append(s.id)
+    if live:
+        results.update(compute_book_windows(db, live))
+    return results
+
+
+def persist_book_windows(db: Session, signal_ids: list[UUID]) -> int:
+    """Store Book Window results on existing signal_intel_cache rows. Caller commits."""
+    if not signal_ids:
+        return 0
+    now = datetime.now(timezone.utc)
+    results = compute_book_windows(db, list(signal_ids))
+    table = cast(Table, SignalIntelCache.__table__)
+    db.execute(
+        update(table)
+        .where(table.c.signal_id == bindparam("sid"))
+        .values(book_window=bindparam("bw"), book_window_refreshed_at=now),
+        [
+            {"sid": sid, "bw": result.model_dump() if result else None}
+            for sid, result in results.items()
+        ],
+    )
+    return len(results)
 
+
+def _evaluate(
+    signal_id: UUID, snapshots: list[tuple[datetime, int]], now: datetime
+) -> Optional[BookWindowResult]:
+    """Run the three heuristics and the decision matrix over one signal's snapshots."""
     if len(snapshots) < MIN_DATA_POINTS:
-        return BookWindowOut(
-            signal_id=str(signal_id),
-            signal_name=signal_name,
-            route_label=route_label,
-            result=None,
-        )
+        return None
 
-    # Compute heuristics
-    trend = _compute_trend_direction(snapshots)
-    seasonal = _compute_seasonal_pattern(db, signal_id, snapshots)
-    inventory = _compute_inventory_pressure(snapshots)
+    # Compute heuristics (trend and inventory share the per-cycle grouping)
+    cycles = _group_cycles(snapshots)
+    trend = _compute_trend_direction(snapshots, cycles)
+    seasonal = _compute_seasonal_pattern(snapshots, now)
+    inventory = _compute_inventory_pressure(snapshots, cycles)
 
     factors = [f for f in [trend, seasonal, inventory] if f is not None]
     data_points = len(snapshots)
-    percentile = _compute_current_percentile(snapshots)
+    percentile = _compute_current_percentile(snapshots, now)
 
     # Extract signals for decision matrix
     trend_sig = trend.signal if trend else "unknown"
@@ -300,18 +401,13 @@ def get_book_window(
     else:
         confidence = "low"
 
-    return BookWindowOut(
+    return BookWindowResult(
         signal_id=str(signal_id),
-        signal_name=signal_name,
-        route_label=route_label,
-        result=BookWindowResult(
-            signal_id=str(signal_id),
-            recommendation=recommendation,
-            confidence=confidence,
-            reasoning=reasoning,
-            factors=factors,
-            data_points=data_points,
-        ),
+        recommendation=recommendation,
+        confidence=confidence,
+        reasoning=reasoning,
+        factors=factors,
+        data_points=data_points,
     )
 
 
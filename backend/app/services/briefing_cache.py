@@ -0,0 +1,76 @@
+"""Per-user Scout briefing cache.
+
+A briefing only changes when a scrape cycle lands or when the user's signals
+change, so each built briefing is cached under a key made of:
+- the user;
+- the scrape generation, a counter in system_config bumped by
+  /api/system/collection-complete and after the orchestrator's intel refresh;
+- a fingerprint of the user's active signals (ids + updated_at).
+
+Every part of the key is read from the database, so several API workers agree
+on when an entry is stale without talking to each other. Signal edits also
+drop the user's entry eagerly via invalidate_user().
+
+Entries are held in an app.core.cache.Cache, one per user: a bounded
+in-process LRU plus, when settings.SHARED_CACHE_DIR is set, a JSON file that
+other API workers on the same host can reuse. Each entry stores the key it was
+built for, so a lookup with a newer key misses.
+"""
+import hashlib
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.cache import Cache
+
+GENERATION_KEY = "scrape_generation"
+MAX_ENTRIES = 2048
+# Upper bound on entry age; next_scan_at in the briefing is time-relative
+ENTRY_TTL_SECONDS = 6 * 3600
+
+_briefings = Cache("scout_briefings", ttl_seconds=ENTRY_TTL_SECONDS, max_entries=MAX_ENTRIES)
+
+
+def get_generation(db: Session) -> str:
+    row = db.execute(
+        text("SELECT value FROM system_config WHERE key = :key"), {"key": GENERATION_KEY}
+    ).first()
+    return row[0] if row and row[0] else "0"
+
+
+def bump_generation(db: Session) -> None:
+    """Mark every cached briefing stale. Caller commits."""
+    db.execute(text(
+        "INSERT INTO system_config (key, value, updated_at) VALUES (:key, '1', now()) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        "value = (COALESCE(NULLIF(system_config.value, ''), '0')::bigint + 1)::text, updated_at = now()"
+    ), {"key": GENERATION_KEY})
+
+
+def cache_key(generation: str, signals) -> str:
+    parts = sorted(f"{s.id}:{s.updated_at.isoformat() if s.updated_at else ''}" for s in signals)
+    digest = hashlib.sha1("|".join(parts).encode(), usedforsecurity=False).hexdigest()
+    return f"{generation}:{digest}"
+
+
+def get(user_id, key: str) -> Optional[dict]:
+    entry: Optional[dict[str, Any]] = _briefings.get(str(user_id))
+    if entry is None or entry.get("key") != key:
+        return None
+    value: dict = entry["value"]
+    return value
+
+
+def put(user_id, key: str, value: dict) -> None:
+    """Cache a JSON-serializable briefing response."""
+    _briefings.set(str(user_id), {"key": key, "value": value})
+
+
+def invalidate_user(user_id) -> None:
+    _briefings.invalidate(str(user_id))
+
+
+def clear() -> None:
+    """Drop every cached briefing, in this process and the shared directory."""
+    _briefings.invalidate()
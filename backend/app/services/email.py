@@ -5,10 +5,10 @@ import logging
 import os
 import threading
 import time
-
-import requests
+import uuid
 
 from app.core.config import settings
+from app.core.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -52,11 +52,12 @@ def send_email(to: str, subject: str, html: str) -> str | None:
         _last_send_time = time.monotonic()
 
     try:
-        resp = requests.post(
+        resp = get_http_client().post(
             "https://api.resend.com/emails",
             headers={
                 "Authorization": f"Bearer {RESEND_API_KEY}",
                 "Content-Type": "application/json",
+                "Idempotency-Key": f"send-email/{uuid.uuid4()}",
             },
             json={
                 "from": FROM_EMAIL,
@@ -1,7 +1,8 @@
 """
 Centralized Email Orchestrator — single entry point for all lifecycle emails.
 
-Every email in the system flows through ``trigger()`` which:
+Every email in the system flows through ``trigger()`` (or ``trigger_many()``
+for a whole batch of one email type, e.g. a cycle's match alerts) which:
 1. Loads user + validates state.
 2. Applies suppression rules (see ``_check_suppression``).
 3. Computes a deterministic idempotency key and dedupes via email_log.
@@ -15,10 +16,13 @@ The actual sending happens in the email queue drain worker, not here.
 from __future__ import annotations
 
 import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
@@ -153,15 +157,7 @@ def trigger(
         return {"status": "error", "reason": str(e)}
 
     # ── 5. Render template ────────────────────────────────────────────────
-    if "_unsub_url" not in context:
-        try:
-            from app.core.tokens import generate_unsub_token
-            token = generate_unsub_token(str(user.id))
-            context["_unsub_url"] = f"https://tripsignal.ca/unsubscribe?token={token}"
-        except Exception:
-            logger.warning("orchestrator: failed to generate unsub token for %s", user_id)
-
-    context.setdefault("_notification_frequency", getattr(user, "notification_delivery_frequency", "all") or "all")
+    _add_render_context(user, context)
 
     from app.services.email_templates import render_template
     subject, html = render_template(email_type, user=user, context=context, db=db)
@@ -207,6 +203,209 @@ def trigger(
     }
 
 
+# Requests handled per round of preloading, bulk inserts and commit in trigger_many()
+TRIGGER_MANY_CHUNK = 500
+
+
+def trigger_many(
+    *,
+    db: Session,
+    email_type: str | EmailType,
+    items: list[dict],
+    chunk_size: int = TRIGGER_MANY_CHUNK,
+) -> list[dict]:
+    """Batch form of ``trigger()`` for many emails of one type.
+
+    Each item is ``{"user_id": ..., "context": {...}, "idempotency_key": ...}``
+    (context and key optional). Returns one result per item, in order, with
+    the same outcome ``trigger()`` would give it, including for repeated keys
+    within the batch. A template that fails to render gives
+    ``{"status": "error", "reason": "trigger_exception"}`` for that item only.
+
+    Per chunk: users, suppression history and existing idempotency keys are
+    loaded in a few queries; emails are rendered together by render_many();
+    email_log and email_queue rows are inserted in bulk; and the chunk
+    commits once. A chunk that raises is rolled back and its items get
+    ``trigger_exception``; chunks already committed keep their results and
+    later chunks still run.
+    """
+    email_type = EmailType(email_type) if isinstance(email_type, str) else email_type
+    category = EMAIL_TYPE_CATEGORY.get(email_type, EmailCategory.TRANSACTIONAL)
+    results: list[dict] = []
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        try:
+            results.extend(_trigger_chunk(db, email_type, category, chunk))
+        except Exception:
+            logger.exception(
+                "orchestrator: trigger_many %s failed for items %d-%d",
+                email_type.value, start, start + len(chunk) - 1,
+            )
+            db.rollback()
+            results.extend({"status": "error", "reason": "trigger_exception"} for _ in chunk)
+    return results
+
+
+def _trigger_chunk(
+    db: Session, email_type: EmailType, category: EmailCategory, items: list[dict],
+) -> list[dict]:
+    from app.services.email_queue import enqueue_many
+    from app.services.email_templates import render_many
+
+    # ── 1. Load users ─────────────────────────────────────────────────────
+    user_ids: dict[int, uuid.UUID] = {}
+    for i, item in enumerate(items):
+        try:
+            user_ids[i] = uuid.UUID(str(item["user_id"]))
+        except ValueError:
+            pass
+    users = {
+        user.id: user
+        for user in db.execute(select(User).where(User.id.in_(set(user_ids.values())))).scalars()
+    } if user_ids else {}
+    item_users = {i: users[uid] for i, uid in user_ids.items() if uid in users}
+
+    # ── 2. Suppression history + existing idempotency keys ────────────────
+    history = _load_suppression_history(db, list(users), email_type, category)
+    keys: dict[int, str] = {}
+    for i, item in enumerate(items):
+        user = item_users.get(i)
+        if user is not None:
+            keys[i] = item.get("idempotency_key") or _build_idempotency_key(
+                email_type, str(user.id), item.get("context") or {},
+            )
+    seen = set(db.execute(
+        select(EmailLog.idempotency_key).where(EmailLog.idempotency_key.in_(set(keys.values())))
+    ).scalars()) if keys else set()
+
+    results: dict[int, dict] = {}  # item index -> result; every index is filled below
+    audit_rows: list[dict] = []   # suppressed + deferred email_log rows
+    to_send: list[tuple[int, User, dict, str]] = []
+
+    for i, item in enumerate(items):
+        user = item_users.get(i)
+        if user is None:
+            logger.warning("orchestrator: user %s not found", item["user_id"])
+            results[i] = {"status": "error", "reason": "user_not_found"}
+            continue
+
+        context = item.get("context") or {}
+        idempotency_key = item.get("idempotency_key")
+        suppression = _suppression_reason(user, email_type, category, history.get(user.id, _SuppressionHistory()))
+        if suppression in ("quiet_hours", "frequency_deferred"):
+            row = _deferred_row(user, email_type, category, idempotency_key, context)
+            if row["idempotency_key"] not in seen:
+                seen.add(row["idempotency_key"])
+                audit_rows.append(row)
+            results[i] = {"status": "deferred", "reason": suppression}
+            continue
+        if suppression:
+            audit_rows.append(_suppressed_row(user, email_type, category, idempotency_key, suppression))
+            results[i] = {"status": "suppressed", "reason": suppression}
+            continue
+
+        key = keys[i]
+        if key in seen:
+            logger.info("orchestrator: duplicate key %s for %s", key, email_type.value)
+            results[i] = {"status": "duplicate", "reason": "idempotency_key_exists"}
+            continue
+        seen.add(key)
+        to_send.append((i, user, context, key))
+
+    # ── 3. Render ─────────────────────────────────────────────────────────
+    log_rows: list[dict] = []
+    queue_rows: list[dict] = []
+    for _, user, context, _ in to_send:
+        _add_render_context(user, context)
+    rendered = render_many(email_type, [(user, context) for _, user, context, _ in to_send], db=db)
+    for (i, user, context, key), output in zip(to_send, rendered, strict=True):
+        if output is None:
+            logger.error("orchestrator: failed to render %s for user %s", email_type.value, user.id)
+            results[i] = {"status": "error", "reason": "trigger_exception"}
+            continue
+        subject, html = output
+        log_id = uuid.uuid4()
+        log_rows.append({
+            "id": log_id,
+            "user_id": user.id,
+            "email_type": email_type.value,
+            "category": category.value,
+            "idempotency_key": key,
+            "to_email": user.email,
+            "subject": subject,
+            "status": "queued",
+            "metadata_json": context if context else None,
+        })
+        queue_rows.append({
+            "to_email": user.email,
+            "subject": subject,
+            "html_body": html,
+            "email_log_id": log_id,
+            "email_type": email_type.value,
+            "category": category.value,
+            "user_id": str(user.id),
+        })
+        results[i] = {"status": "queued", "reason": None, "idempotency_key": key}
+
+    # ── 4. Bulk insert email_log, enqueue, stamp users, commit ────────────
+    queued = [i for i, *_ in to_send if results[i]["status"] == "queued"]
+    recipients = {i: user.email for i, user, _, _ in to_send}  # users expire on commit
+    try:
+        if audit_rows:
+            try:
+                with db.begin_nested():
+                    for status in ("suppressed", "deferred"):  # the two row shapes
+                        rows = [r for r in audit_rows if r["status"] == status]
+                        if rows:
+                            db.execute(
+                                pg_insert(EmailLog).on_conflict_do_nothing(index_elements=["idempotency_key"]),
+                                rows,
+                            )
+            except Exception:
+                logger.exception("orchestrator: failed to log %d suppressed/deferred emails", len(audit_rows))
+        if log_rows:
+            inserted = set(db.execute(
+                pg_insert(EmailLog)
+                .on_conflict_do_nothing(index_elements=["idempotency_key"])
+                .returning(EmailLog.idempotency_key),
+                log_rows,
+            ).scalars())
+            # Lost a race with a concurrent trigger for the same key
+            for i in queued:
+                if results[i]["idempotency_key"] not in inserted:
+                    results[i] = {"status": "duplicate", "reason": "idempotency_key_exists"}
+            queue_rows = [q for q, r in zip(queue_rows, log_rows, strict=True) if r["idempotency_key"] in inserted]
+            try:
+                with db.begin_nested():
+                    enqueue_many(db, queue_rows)
+            except Exception as e:
+                logger.error("orchestrator: enqueue error: %s", e)
+                db.execute(
+                    update(EmailLog)
+                    .where(EmailLog.id.in_([q["email_log_id"] for q in queue_rows]))
+                    .values(status="failed")
+                )
+        now = datetime.now(timezone.utc)
+        for i, user, _, _ in to_send:
+            if results[i]["status"] == "queued":
+                _stamp_user_sent(user, email_type, now)
+        db.commit()
+    except Exception as e:
+        logger.error("orchestrator: commit error: %s", e)
+        db.rollback()
+        for i in queued:
+            results[i] = {"status": "error", "reason": str(e)}
+
+    for i, _, _, key in to_send:
+        if results[i]["status"] == "queued":
+            logger.info("orchestrator: %s → %s (queued) key=%s", email_type.value, recipients[i], key)
+    logger.info(
+        "orchestrator: trigger_many %s — %d items, %d queued",
+        email_type.value, len(items), sum(1 for r in results.values() if r["status"] == "queued"),
+    )
+    return [results[i] for i in range(len(items))]  # KeyError if an item was left without a result
+
+
 # ── Suppression logic ────────────────────────────────────────────────────────
 #
 # Evaluation order matters — most decisive rules first.
@@ -220,10 +419,28 @@ def trigger(
 # 7. Canceled-after-deletion guard
 #
 
+@dataclass(frozen=True)
+class _SuppressionHistory:
+    """A user's recent email_log history, as far as the suppression rules need it."""
+
+    lifecycle_sent_24h: int = 0      # ENGAGEMENT + UPSELL sent in the last 24h
+    trial_warning_48h: bool = False  # TRIAL_EXPIRING_SOON sent in the last 48h
+    alerts_today: int = 0            # ALERT emails sent since UTC midnight
+    reengaged_60d: bool = False      # INACTIVE_REENGAGEMENT sent in the last 60 days
+
+
 def _check_suppression(
     db: Session, user: User, email_type: EmailType, category: EmailCategory,
 ) -> str | None:
     """Return a suppression reason string, or None if email should be sent."""
+    history = _load_suppression_history(db, [user.id], email_type, category)
+    return _suppression_reason(user, email_type, category, history.get(user.id, _SuppressionHistory()))
+
+
+def _suppression_reason(
+    user: User, email_type: EmailType, category: EmailCategory, history: _SuppressionHistory,
+) -> str | None:
+    """Apply the suppression rules to a user and their preloaded history."""
 
     # 1. Global noncritical suspension: suppress ENGAGEMENT and UPSELL emails.
     #    NEVER suppresses BILLING, TRANSACTIONAL, or ALERT.
@@ -246,29 +463,12 @@ def _check_suppression(
 
     # 5. Rate limit: max 2 non-alert lifecycle emails per 24h.
     #    Counts "sent" and "dry_run" statuses to prevent dry-run floods.
-    if category in SUPPRESSIBLE_CATEGORIES:
-        recent_count = db.execute(
-            select(func.count(EmailLog.id)).where(
-                EmailLog.user_id == user.id,
-                EmailLog.category.in_(["engagement", "upsell"]),
-                EmailLog.status.in_(["sent", "dry_run"]),
-                EmailLog.sent_at >= datetime.now(timezone.utc) - timedelta(hours=24),
-            )
-        ).scalar() or 0
-        if recent_count >= 2:
-            return "rate_limit_24h"
+    if category in SUPPRESSIBLE_CATEGORIES and history.lifecycle_sent_24h >= 2:
+        return "rate_limit_24h"
 
     # 6. Upsell cooldown: suppress UPSELL within 48h of a TRIAL_EXPIRING_SOON email.
     if category == EmailCategory.UPSELL and email_type != EmailType.TRIAL_EXPIRING_SOON:
-        trial_email = db.execute(
-            select(EmailLog).where(
-                EmailLog.user_id == user.id,
-                EmailLog.email_type == EmailType.TRIAL_EXPIRING_SOON.value,
-                EmailLog.status.in_(["sent", "dry_run"]),
-                EmailLog.sent_at >= datetime.now(timezone.utc) - timedelta(hours=48),
-            ).limit(1)
-        ).scalar_one_or_none()
-        if trial_email:
+        if history.trial_warning_48h:
             return "upsell_after_trial_warning"
 
     # 7. Suppress SUBSCRIPTION_CANCELED if account was deleted within last 24h.
@@ -280,16 +480,7 @@ def _check_suppression(
 
     # 8. Daily cap: max 3 instant alerts per user per day.
     if category == EmailCategory.ALERT and email_type != EmailType.WEEKLY_DIGEST:
-        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        alert_today = db.execute(
-            select(func.count(EmailLog.id)).where(
-                EmailLog.user_id == user.id,
-                EmailLog.category == "alert",
-                EmailLog.status.in_(["sent", "dry_run", "delivered"]),
-                EmailLog.sent_at >= today_start,
-            )
-        ).scalar() or 0
-        if alert_today >= 3:
+        if history.alerts_today >= 3:
             return "daily_cap"
 
     # 10. Frequency-based deferral: non-"all" users get deferred for batch delivery.
@@ -298,19 +489,74 @@ def _check_suppression(
             return "frequency_deferred"
 
     # 11. Re-engagement cap: max 1 re-engagement email per 60 days.
+    if email_type == EmailType.INACTIVE_REENGAGEMENT and history.reengaged_60d:
+        return "reengage_cap_60d"
+
+    return None
+
+
+def _load_suppression_history(
+    db: Session, user_ids: list, email_type: EmailType, category: EmailCategory,
+) -> dict:
+    """Per-user suppression history for user_ids, one grouped query per rule that applies.
+
+    Users without any relevant history are absent from the result.
+    """
+    if not user_ids:
+        return {}
+    now = datetime.now(timezone.utc)
+    fields: dict = defaultdict(dict)
+
+    if category in SUPPRESSIBLE_CATEGORIES:
+        rows = db.execute(
+            select(EmailLog.user_id, func.count(EmailLog.id)).where(
+                EmailLog.user_id.in_(user_ids),
+                EmailLog.category.in_(["engagement", "upsell"]),
+                EmailLog.status.in_(["sent", "dry_run"]),
+                EmailLog.sent_at >= now - timedelta(hours=24),
+            ).group_by(EmailLog.user_id)
+        ).all()
+        for user_id, count in rows:
+            fields[user_id]["lifecycle_sent_24h"] = count
+
+    if category == EmailCategory.UPSELL and email_type != EmailType.TRIAL_EXPIRING_SOON:
+        recipients = db.execute(
+            select(EmailLog.user_id).distinct().where(
+                EmailLog.user_id.in_(user_ids),
+                EmailLog.email_type == EmailType.TRIAL_EXPIRING_SOON.value,
+                EmailLog.status.in_(["sent", "dry_run"]),
+                EmailLog.sent_at >= now - timedelta(hours=48),
+            )
+        ).scalars()
+        for user_id in recipients:
+            fields[user_id]["trial_warning_48h"] = True
+
+    if category == EmailCategory.ALERT and email_type != EmailType.WEEKLY_DIGEST:
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        rows = db.execute(
+            select(EmailLog.user_id, func.count(EmailLog.id)).where(
+                EmailLog.user_id.in_(user_ids),
+                EmailLog.category == "alert",
+                EmailLog.status.in_(["sent", "dry_run", "delivered"]),
+                EmailLog.sent_at >= today_start,
+            ).group_by(EmailLog.user_id)
+        ).all()
+        for user_id, count in rows:
+            fields[user_id]["alerts_today"] = count
+
     if email_type == EmailType.INACTIVE_REENGAGEMENT:
-        recent_reengage = db.execute(
-            select(EmailLog).where(
-                EmailLog.user_id == user.id,
+        recipients = db.execute(
+            select(EmailLog.user_id).distinct().where(
+                EmailLog.user_id.in_(user_ids),
                 EmailLog.email_type == EmailType.INACTIVE_REENGAGEMENT.value,
                 EmailLog.status.in_(["sent", "dry_run", "delivered"]),
-                EmailLog.sent_at >= datetime.now(timezone.utc) - timedelta(days=60),
-            ).limit(1)
-        ).scalar_one_or_none()
-        if recent_reengage:
-            return "reengage_cap_60d"
+                EmailLog.sent_at >= now - timedelta(days=60),
+            )
+        ).scalars()
+        for user_id in recipients:
+            fields[user_id]["reengaged_60d"] = True
 
-    return None
+    return {user_id: _SuppressionHistory(**values) for user_id, values in fields.items()}
 
 
 # ── Deterministic idempotency keys ───────────────────────────────────────────
@@ -430,6 +676,61 @@ def _stamp_user_sent(user: User, email_type: EmailType, now: datetime) -> None:
         setattr(user, attr, now)
 
 
+def _add_render_context(user: User, context: dict) -> None:
+    """Add the unsubscribe URL and delivery frequency every template expects."""
+    if "_unsub_url" not in context:
+        try:
+            from app.core.tokens import generate_unsub_token
+            token = generate_unsub_token(str(user.id))
+            context["_unsub_url"] = f"https://tripsignal.ca/unsubscribe?token={token}"
+        except Exception:
+            logger.warning("orchestrator: failed to generate unsub token for %s", user.id)
+
+    context.setdefault("_notification_frequency", getattr(user, "notification_delivery_frequency", "all") or "all")
+
+
+def _suppressed_row(
+    user: User,
+    email_type: EmailType,
+    category: EmailCategory,
+    idempotency_key: str | None,
+    reason: str,
+) -> dict:
+    key = idempotency_key or _build_idempotency_key(email_type, str(user.id), {})
+    logger.info("orchestrator: SUPPRESSED %s → %s reason=%s", email_type.value, user.email, reason)
+    return {
+        "user_id": user.id,
+        "email_type": email_type.value,
+        "category": category.value,
+        "idempotency_key": f"suppressed:{key}:{reason}",
+        "to_email": user.email,
+        "status": "suppressed",
+        "suppressed_reason": reason,
+    }
+
+
+def _deferred_row(
+    user: User,
+    email_type: EmailType,
+    category: EmailCategory,
+    idempotency_key: str | None,
+    context: dict | None,
+) -> dict:
+    key = idempotency_key or _build_idempotency_key(email_type, str(user.id), context or {})
+    reason = "frequency_deferred" if not user.is_instant_delivery else "quiet_hours"
+    logger.info("orchestrator: DEFERRED %s → %s reason=%s", email_type.value, user.email, reason)
+    return {
+        "user_id": user.id,
+        "email_type": email_type.value,
+        "category": category.value,
+        "idempotency_key": key,
+        "to_email": user.email,
+        "status": "deferred",
+        "suppressed_reason": reason,
+        "metadata_json": context,
+    }
+
+
 def _log_suppressed(
     db: Session,
     user: User,
@@ -439,22 +740,13 @@ def _log_suppressed(
     reason: str,
 ) -> None:
     """Record a suppressed email in the log for audit purposes."""
-    key = idempotency_key or _build_idempotency_key(email_type, str(user.id), {})
+    row = _suppressed_row(user, email_type, category, idempotency_key, reason)
     try:
-        stmt = pg_insert(EmailLog).values(
-            user_id=user.id,
-            email_type=email_type.value,
-            category=category.value,
-            idempotency_key=f"suppressed:{key}:{reason}",
-            to_email=user.email,
-            status="suppressed",
-            suppressed_reason=reason,
-        ).on_conflict_do_nothing(index_elements=["idempotency_key"])
+        stmt = pg_insert(EmailLog).values(**row).on_conflict_do_nothing(index_elements=["idempotency_key"])
         db.execute(stmt)
         db.commit()
     except Exception:
         db.rollback()
-    logger.info("orchestrator: SUPPRESSED %s → %s reason=%s", email_type.value, user.email, reason)
 
 
 def _log_deferred(
@@ -466,24 +758,13 @@ def _log_deferred(
     context: dict | None,
 ) -> None:
     """Record a deferred email with full context for later delivery."""
-    key = idempotency_key or _build_idempotency_key(email_type, str(user.id), context or {})
-    reason = "frequency_deferred" if not user.is_instant_delivery else "quiet_hours"
+    row = _deferred_row(user, email_type, category, idempotency_key, context)
     try:
-        stmt = pg_insert(EmailLog).values(
-            user_id=user.id,
-            email_type=email_type.value,
-            category=category.value,
-            idempotency_key=key,
-            to_email=user.email,
-            status="deferred",
-            suppressed_reason=reason,
-            metadata_json=context,
-        ).on_conflict_do_nothing(index_elements=["idempotency_key"])
+        stmt = pg_insert(EmailLog).values(**row).on_conflict_do_nothing(index_elements=["idempotency_key"])
         db.execute(stmt)
         db.commit()
     except Exception:
         db.rollback()
-    logger.info("orchestrator: DEFERRED %s → %s reason=%s", email_type.value, user.email, reason)
 
 
 FREQUENCY_WINDOWS = {
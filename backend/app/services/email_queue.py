@@ -3,8 +3,10 @@ Email Queue Service — rate-limited, prioritized, retry-aware email delivery.
 
 All emails flow through this queue:
   1. ``enqueue()`` inserts a row with priority + rendered HTML.
-  2. ``drain()`` pulls eligible rows (queued + retryable) ordered by priority,
-     sends via Resend (single or batch), and handles retries with backoff.
+  2. ``drain()`` claims eligible rows (queued + retryable) ordered by priority
+     with FOR UPDATE SKIP LOCKED, sends via Resend (single or batch) with
+     several calls in flight, and handles retries with backoff. Several
+     drainers can run at once; each claims a disjoint set of rows.
 
 Priority levels:
   1 = critical  (transactional, billing — welcome, payment failed, etc.)
@@ -12,8 +14,9 @@ Priority levels:
   3 = low       (engagement, upsell — trial expiring, inactive, etc.)
 
 Rate limiting:
-  Enforces a configurable sends-per-second ceiling (default 2/sec for Resend
-  free tier, 10/sec for pro). Uses a token bucket in the drain loop.
+  Enforces a configurable API-calls-per-second ceiling (default 2/sec for
+  Resend free tier, 10/sec for pro). The token bucket lives in a system_config
+  row, so the ceiling holds across every drainer process.
 
 Retry policy:
   Failed sends retry up to 3 times with exponential backoff:
@@ -30,21 +33,25 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 
 import requests
-from sqlalchemy import func, select, update
+from sqlalchemy import Engine, func, insert, select, text, update
 from sqlalchemy.orm import Session
 
-from app.db.models.email_queue import EmailQueue
+from app.core.http import get_http_client
 from app.db.models.email_log import EmailLog
+from app.db.models.email_queue import EmailQueue
 from app.db.models.user import User
 
 logger = logging.getLogger(__name__)
 
 RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
+RESEND_API_URL = os.getenv("RESEND_API_URL", "https://api.resend.com").rstrip("/")
 FROM_EMAIL = "Trip Signal <hello@tripsignal.ca>"
 
 # Rate limit: requests per second (Resend free = 2/s, pro = 10/s)
@@ -56,6 +63,16 @@ BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "100"))
 # Max emails to process per drain cycle
 DRAIN_LIMIT = int(os.getenv("EMAIL_DRAIN_LIMIT", "500"))
 
+# API calls in flight per drainer (each on a pooled keep-alive connection;
+# keep it within HTTP_POOL_MAXSIZE)
+SEND_CONCURRENCY = int(os.getenv("EMAIL_SEND_CONCURRENCY", "4"))
+
+# A row stuck in "sending" this long (its drainer died) is claimed again
+SENDING_LEASE_SECONDS = 600
+
+# system_config key holding the shared token bucket
+RATE_BUCKET_KEY = "email_queue_rate_bucket"
+
 # Retry backoff schedule (seconds): attempt 1, 2, 3
 RETRY_DELAYS = [60, 300, 1800]  # 1 min, 5 min, 30 min
 
@@ -115,39 +132,202 @@ def enqueue(
     return row.id
 
 
-# ── Drain ────────────────────────────────────────────────────────────────────
+def enqueue_many(db: Session, emails: list[dict]) -> list[uuid.UUID]:
+    """Insert many emails into the queue in one statement.
 
-def drain(db: Session) -> dict:
-    """Process queued and retryable emails with rate limiting.
+    Each dict takes the keyword arguments of ``enqueue()``. Returns the queue
+    row IDs in input order.
+    """
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "priority": CATEGORY_PRIORITY.get(email.get("category") or "", PRIORITY_HIGH),
+            "to_email": email["to_email"],
+            "subject": email["subject"],
+            "html_body": email["html_body"],
+            "email_log_id": email.get("email_log_id"),
+            "email_type": email.get("email_type"),
+            "user_id": uuid.UUID(str(email["user_id"])) if email.get("user_id") else None,
+            "metadata_json": email.get("metadata"),
+            "status": "queued",
+        }
+        for email in emails
+    ]
+    if rows:
+        db.execute(insert(EmailQueue), rows)
+        logger.info("email_queue: enqueued %d emails", len(rows))
+    return [row["id"] for row in rows]
+
+
+# ── Shared rate limit ────────────────────────────────────────────────────────
+
+_BUCKET_INIT_SQL = text(
+    "INSERT INTO system_config (key, value, updated_at) "
+    "VALUES (:key, CAST(:capacity AS text) || ':' || CAST(extract(epoch FROM clock_timestamp()) AS text), now()) "
+    "ON CONFLICT (key) DO NOTHING"
+)
+_BUCKET_READ_SQL = text(
+    "SELECT value, CAST(extract(epoch FROM clock_timestamp()) AS float8) "
+    "FROM system_config WHERE key = :key FOR UPDATE"
+)
+_BUCKET_WRITE_SQL = text(
+    "UPDATE system_config SET value = :value, updated_at = now() WHERE key = :key"
+)
+
+
+class SharedTokenBucket:
+    """Token bucket stored in a system_config row, shared by every drainer.
+
+    One token is one Resend API call (a batch of up to BATCH_SIZE emails counts
+    once). Refill and debit happen under a row lock using the database clock,
+    so drainers in different threads, processes or containers never spend more
+    than ``rate`` calls per second between them.
+    """
 
-    Returns stats dict: {sent, failed, dead, skipped, batches, elapsed_ms}.
+    def __init__(self, engine: Engine, rate: float, capacity: float | None = None, key: str = RATE_BUCKET_KEY):
+        self.engine = engine
+        self.rate = rate
+        # No burst by default: calls are spaced 1/rate apart, which also keeps
+        # a sliding one-second window (how Resend counts) under the limit.
+        self.capacity = capacity if capacity is not None else 1.0
+        self.key = key
+        self._initialized = False
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            tokens = self._take()
+            if tokens >= 1:
+                return waited
+            delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def _take(self) -> float:
+        """Refill the bucket, spend one token if there is one; returns tokens before spending."""
+        with self.engine.begin() as conn:
+            if not self._initialized:
+                conn.execute(_BUCKET_INIT_SQL, {"key": self.key, "capacity": self.capacity})
+                self._initialized = True
+            value, db_now = conn.execute(_BUCKET_READ_SQL, {"key": self.key}).one()
+            now = float(db_now)
+            try:
+                stored, stamp = (float(part) for part in value.split(":"))
+            except ValueError:
+                stored, stamp = self.capacity, now
+            tokens = min(self.capacity, stored + max(0.0, now - stamp) * self.rate)
+            remaining = tokens - 1 if tokens >= 1 else tokens
+            conn.execute(_BUCKET_WRITE_SQL, {"key": self.key, "value": f"{remaining:.6f}:{now:.6f}"})
+        return tokens
+
+
+def _default_bucket() -> SharedTokenBucket | None:
+    if RATE_LIMIT_PER_SEC <= 0:
+        return None
+    from app.db.session import engine
+    return SharedTokenBucket(engine, RATE_LIMIT_PER_SEC)
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+def _post(payload: list[dict]) -> requests.Response:
+    """Send one API call: the single endpoint for one email, the batch endpoint otherwise.
+
+    Goes through the shared keep-alive client. The per-call Idempotency-Key
+    lets it retry transient failures without sending anything twice.
     """
-    from app.core.config import settings
+    headers = {
+        "Authorization": f"Bearer {RESEND_API_KEY}",
+        "Content-Type": "application/json",
+        "Idempotency-Key": f"email-queue/{uuid.uuid4()}",
+    }
+    client = get_http_client()
+    if len(payload) == 1:
+        return client.post(f"{RESEND_API_URL}/emails", headers=headers, json=payload[0], timeout=15)
+    return client.post(f"{RESEND_API_URL}/emails/batch", headers=headers, json=payload, timeout=30)
 
-    now = datetime.now(timezone.utc)
-    stats = {"sent": 0, "failed": 0, "dead": 0, "skipped": 0, "batches": 0, "elapsed_ms": 0}
-    start = time.monotonic()
 
-    # Fetch eligible rows: queued OR failed-with-retry-ready
+# ── Drain ────────────────────────────────────────────────────────────────────
+
+def _claim(db: Session, now: datetime) -> list[EmailQueue]:
+    """Claim up to DRAIN_LIMIT eligible rows for this drainer.
+
+    Rows are locked with FOR UPDATE SKIP LOCKED and moved to "sending" in one
+    short transaction, so concurrent drainers each get a disjoint set. Rows left
+    in "sending" longer than SENDING_LEASE_SECONDS (a drainer died mid-send)
+    become eligible again; delivery is at-least-once.
+    """
+    lease_expired = now - timedelta(seconds=SENDING_LEASE_SECONDS)
     rows = db.execute(
         select(EmailQueue).where(
             (
                 (EmailQueue.status == "queued")
-                | (
-                    (EmailQueue.status == "failed")
-                    & (EmailQueue.attempts < EmailQueue.max_attempts)
-                    & (
-                        (EmailQueue.next_retry_at.is_(None))
-                        | (EmailQueue.next_retry_at <= now)
-                    )
+                & (
+                    (EmailQueue.next_retry_at.is_(None))
+                    | (EmailQueue.next_retry_at <= now)
+                )
+            )
+            | (
+                (EmailQueue.status == "failed")
+                & (EmailQueue.attempts < EmailQueue.max_attempts)
+                & (
+                    (EmailQueue.next_retry_at.is_(None))
+                    | (EmailQueue.next_retry_at <= now)
                 )
             )
+            | (
+                (EmailQueue.status == "sending")
+                & (EmailQueue.last_attempt_at < lease_expired)
+            )
         ).order_by(
             EmailQueue.priority.asc(),
             EmailQueue.created_at.asc(),
-        ).limit(DRAIN_LIMIT)
+        ).limit(DRAIN_LIMIT).with_for_update(skip_locked=True)
     ).scalars().all()
+    if not rows:
+        db.commit()
+        return []
+
+    ids = [row.id for row in rows]
+    for row in rows:
+        row.attempts += 1
+        row.last_attempt_at = now
+        row.status = "sending"
+    db.commit()
+    return _load(db, ids)
+
+
+def _load(db: Session, ids: list[uuid.UUID]) -> list[EmailQueue]:
+    """Reload queue rows in one query (in ids order) after a commit expired them."""
+    by_id = {
+        row.id: row
+        for row in db.execute(select(EmailQueue).where(EmailQueue.id.in_(ids))).scalars()
+    }
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def drain(db: Session, bucket: SharedTokenBucket | None = None) -> dict:
+    """Claim and send queued and retryable emails, several API calls in flight.
+
+    Any number of drainers may run at once: rows are claimed with SKIP LOCKED
+    and every API call takes a token from the shared bucket (RATE_LIMIT_PER_SEC
+    across all drainers), so throughput is bounded by the provider limit rather
+    than by request latency. Results are committed as each call completes.
+
+    Returns stats dict: {sent, failed, dead, skipped, batches, elapsed_ms}.
+    """
+    from app.core.config import settings
 
+    now = datetime.now(timezone.utc)
+    stats = {"sent": 0, "failed": 0, "dead": 0, "skipped": 0, "batches": 0, "elapsed_ms": 0}
+    start = time.monotonic()
+
+    if not settings.EMAIL_DRY_RUN and not RESEND_API_KEY:
+        logger.warning("email_queue: RESEND_API_KEY not set, skipping drain")
+        return stats
+
+    rows = _claim(db, now)
     if not rows:
         return stats
 
@@ -158,8 +338,6 @@ def drain(db: Session) -> dict:
         for row in rows:
             row.status = "sent"
             row.sent_at = now
-            row.attempts += 1
-            row.last_attempt_at = now
             row.provider_message_id = "dry_run"
             _sync_email_log(db, row, "sent", "dry_run")
             stats["sent"] += 1
@@ -167,27 +345,30 @@ def drain(db: Session) -> dict:
         stats["elapsed_ms"] = int((time.monotonic() - start) * 1000)
         return stats
 
-    if not RESEND_API_KEY:
-        logger.warning("email_queue: RESEND_API_KEY not set, skipping drain")
-        return stats
-
-    # Group into batches for the batch API
-    batches = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+    if bucket is None:
+        bucket = _default_bucket()
 
-    for batch in batches:
-        if len(batch) == 1:
-            # Single email — use standard endpoint
-            row = batch[0]
-            _send_single(db, row, now, stats)
-        else:
-            # Multiple emails — use batch endpoint
-            _send_batch(db, batch, now, stats)
-        stats["batches"] += 1
+    # Payloads are built up front: committing a result expires the other rows
+    batches = [
+        ([row.id for row in chunk], [_payload(row) for row in chunk])
+        for chunk in (rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE))
+    ]
 
-        # Rate limit between batches: sleep to respect per-second limit
-        if RATE_LIMIT_PER_SEC > 0 and stats["batches"] < len(batches):
-            # For batch API, each batch counts as 1 API call
-            time.sleep(1.0 / RATE_LIMIT_PER_SEC)
+    slots = threading.BoundedSemaphore(max(SEND_CONCURRENCY, 1))
+    pending: dict[Future, list[uuid.UUID]] = {}
+    with ThreadPoolExecutor(max_workers=max(SEND_CONCURRENCY, 1), thread_name_prefix="email-send") as pool:
+        for ids, payload in batches:
+            slots.acquire()
+            for future in [f for f in pending if f.done()]:
+                _record(db, pending.pop(future), future, stats)
+            if bucket is not None:
+                bucket.acquire()
+            future = pool.submit(_post, payload)
+            future.add_done_callback(lambda _: slots.release())
+            pending[future] = ids
+            stats["batches"] += 1
+        for future in as_completed(list(pending)):
+            _record(db, pending.pop(future), future, stats)
 
     stats["elapsed_ms"] = int((time.monotonic() - start) * 1000)
     logger.info(
@@ -197,123 +378,67 @@ def drain(db: Session) -> dict:
     return stats
 
 
-# ── Single send ──────────────────────────────────────────────────────────────
+def _payload(row: EmailQueue) -> dict:
+    return {
+        "from": FROM_EMAIL,
+        "to": [row.to_email],
+        "subject": row.subject,
+        "html": row.html_body,
+    }
+
 
-def _send_single(db: Session, row: EmailQueue, now: datetime, stats: dict) -> None:
-    """Send a single email via Resend's standard endpoint."""
-    row.attempts += 1
-    row.last_attempt_at = now
-    row.status = "sending"
-    db.flush()
+# ── Recording results ────────────────────────────────────────────────────────
 
+def _record(db: Session, ids: list[uuid.UUID], future: Future, stats: dict) -> None:
+    """Apply the outcome of one API call to its claimed rows and commit."""
+    now = datetime.now(timezone.utc)
+    batch = _load(db, ids)
     try:
-        resp = requests.post(
-            "https://api.resend.com/emails",
-            headers={
-                "Authorization": f"Bearer {RESEND_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "from": FROM_EMAIL,
-                "to": [row.to_email],
-                "subject": row.subject,
-                "html": row.html_body,
-            },
-            timeout=15,
-        )
+        resp = future.result()
+    except Exception as e:
+        for row in batch:
+            _handle_failure(db, row, now, str(e), stats)
+        db.commit()
+        return
 
-        if resp.status_code in (200, 201):
-            message_id = ""
-            try:
-                message_id = resp.json().get("id", "")
-            except Exception:
-                pass
+    if resp.status_code in (200, 201):
+        message_ids = dict(zip(ids, _message_ids(resp, len(ids)), strict=True))
+        for row in batch:
+            msg_id = message_ids[row.id]
             row.status = "sent"
             row.sent_at = now
-            row.provider_message_id = message_id or "sent"
-            _sync_email_log(db, row, "sent", message_id)
+            row.provider_message_id = msg_id or ("sent" if len(ids) == 1 else "batch_sent")
+            _sync_email_log(db, row, "sent", msg_id)
             stats["sent"] += 1
-        elif resp.status_code == 429:
-            # Rate limited — back off, don't count as attempt
+    elif resp.status_code == 429:
+        # Rate limited — re-queue, don't count as attempt
+        for row in batch:
             row.attempts -= 1
             row.status = "queued"
             row.next_retry_at = now + timedelta(seconds=30)
             stats["skipped"] += 1
-            logger.warning("email_queue: rate limited by Resend, backing off 30s")
-        else:
-            _handle_failure(db, row, now, f"HTTP {resp.status_code}: {resp.text[:200]}", stats)
-    except Exception as e:
-        _handle_failure(db, row, now, str(e), stats)
+        logger.warning("email_queue: rate limited by Resend, backing off 30s")
+    else:
+        prefix = "HTTP" if len(ids) == 1 else "Batch HTTP"
+        error_msg = f"{prefix} {resp.status_code}: {resp.text[:200]}"
+        for row in batch:
+            _handle_failure(db, row, now, error_msg, stats)
 
     db.commit()
 
 
-# ── Batch send ───────────────────────────────────────────────────────────────
-
-def _send_batch(db: Session, batch: list[EmailQueue], now: datetime, stats: dict) -> None:
-    """Send multiple emails via Resend's batch endpoint."""
-    for row in batch:
-        row.attempts += 1
-        row.last_attempt_at = now
-        row.status = "sending"
-    db.flush()
-
-    payload = [
-        {
-            "from": FROM_EMAIL,
-            "to": [row.to_email],
-            "subject": row.subject,
-            "html": row.html_body,
-        }
-        for row in batch
-    ]
+def _message_ids(resp: requests.Response, count: int) -> list[str]:
+    """Provider message ids in request order ("" where missing).
 
+    Single response: {"id": "msg_id"}; batch response: {"data": [{"id": "msg_id"}, ...]}.
+    """
     try:
-        resp = requests.post(
-            "https://api.resend.com/emails/batch",
-            headers={
-                "Authorization": f"Bearer {RESEND_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-            timeout=30,
-        )
-
-        if resp.status_code in (200, 201):
-            # Batch response: {"data": [{"id": "msg_id"}, ...]}
-            results = []
-            try:
-                data = resp.json()
-                results = data.get("data", [])
-            except Exception:
-                pass
-
-            for i, row in enumerate(batch):
-                msg_id = results[i].get("id", "") if i < len(results) else ""
-                row.status = "sent"
-                row.sent_at = now
-                row.provider_message_id = msg_id or "batch_sent"
-                _sync_email_log(db, row, "sent", msg_id)
-                stats["sent"] += 1
-        elif resp.status_code == 429:
-            # Rate limited — re-queue all
-            for row in batch:
-                row.attempts -= 1
-                row.status = "queued"
-                row.next_retry_at = now + timedelta(seconds=30)
-                stats["skipped"] += 1
-            logger.warning("email_queue: batch rate limited by Resend, backing off 30s")
-        else:
-            error_msg = f"Batch HTTP {resp.status_code}: {resp.text[:200]}"
-            for row in batch:
-                _handle_failure(db, row, now, error_msg, stats)
-
-    except Exception as e:
-        error_msg = str(e)
-        for row in batch:
-            _handle_failure(db, row, now, error_msg, stats)
-
-    db.commit()
+        data = resp.json()
+        results = [data] if count == 1 else data.get("data", [])
+    except Exception:
+        results = []
+    ids = [r.get("id", "") if isinstance(r, dict) else "" for r in results[:count]]
+    return ids + [""] * (count - len(ids))
 
 
 # ── Failure handling with exponential backoff ────────────────────────────────
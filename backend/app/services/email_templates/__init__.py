@@ -3,21 +3,35 @@ Email template registry.
 
 Each template is a function(user, context) -> (subject, html).
 The render_template() dispatcher calls the right one, but checks the DB
-for admin overrides first.
+for admin overrides first. Overrides are cached per email type for
+OVERRIDE_CACHE_SECONDS; the admin endpoints invalidate on write.
+
+render_many() renders a batch of one email type (match alerts, weekly
+digests): the override is looked up once, route-level fragments are
+memoized across the batch (base.fragment_cache), and with
+EMAIL_RENDER_WORKERS > 1 large batches are split across a process pool.
 """
 from __future__ import annotations
 
 import logging
+import multiprocessing
+import os
 import re
+import threading
+import traceback
 from collections import defaultdict
-from typing import TYPE_CHECKING
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Protocol, cast
 
 if TYPE_CHECKING:
     from app.db.models.user import User
     from sqlalchemy.orm import Session
 
+from app.core.cache import Cache
 from app.services.email_orchestrator import EmailType
-from app.services.email_templates.base import wrap
+from app.services.email_templates.base import fragment_cache, wrap
 from app.services.email_templates.subject_preview import (  # noqa: F401
     build_subject,
     build_preview,
@@ -46,6 +60,19 @@ from app.services.email_templates.templates import (
 
 logger = logging.getLogger(__name__)
 
+# Admin edits reach other processes (e.g. the scheduler) within this long
+OVERRIDE_CACHE_SECONDS = 60
+
+# Processes used by render_many(); 1 renders in-process. A render takes ~50µs,
+# so shipping contexts and HTML between processes usually costs more than it
+# saves; measure with benchmarks/bench_email_render.py before raising it.
+RENDER_WORKERS = int(os.getenv("EMAIL_RENDER_WORKERS", "1"))
+# Smaller batches render in-process: shipping them to workers costs more than it saves
+PARALLEL_RENDER_MIN = 200
+_RENDER_CHUNK = 250
+
+_override_cache = Cache("email_template_overrides", ttl_seconds=OVERRIDE_CACHE_SECONDS, max_entries=64)
+
 _REGISTRY: dict[EmailType, callable] = {
     EmailType.WELCOME: welcome,
     EmailType.FIRST_SIGNAL: first_signal,
@@ -119,21 +146,44 @@ def render_template(
     If a DB override exists (checked via *db*), use it.
     Otherwise fall back to the Python default template.
     """
-    # Try DB override first
-    if db is not None:
+    return _render(email_type, user, context, _lookup_override(db, email_type))
+
+
+def render_many(
+    email_type: EmailType,
+    items: list[tuple["User", dict]],
+    *,
+    db: "Session | None" = None,
+    workers: Optional[int] = None,
+) -> list[Optional[tuple[str, str]]]:
+    """Render (subject, html) for each (user, context) item, in order.
+
+    A failed render is logged and returned as None. Output is identical to
+    calling render_template() per item.
+    """
+    override = _lookup_override(db, email_type)
+    workers = RENDER_WORKERS if workers is None else workers
+    if workers > 1 and len(items) >= PARALLEL_RENDER_MIN:
         try:
-            override = _get_override(db, email_type)
-            if override and (override.subject or override.body_html):
-                subject, body = _render_override(override, email_type, user, context)
-                return subject, wrap(body, unsub_url=context.get("_unsub_url", ""), user_email=getattr(user, "email", "") or "")
-        except Exception:
-            logger.exception("Error loading template override for %s, falling back to default", email_type.value)
+            return _render_parallel(email_type, items, override, workers)
+        except (BrokenProcessPool, OSError):
+            logger.exception("Render pool failed for %s; rendering in-process", email_type.value)
+            _reset_render_pool()
 
-    # Fall back to Python default
-    fn = _REGISTRY.get(email_type)
-    if not fn:
-        raise ValueError(f"No template registered for {email_type}")
-    return fn(user=user, context=context)
+    results: list[Optional[tuple[str, str]]] = []
+    with fragment_cache():
+        for user, context in items:
+            try:
+                results.append(_render(email_type, user, context, override))
+            except Exception:
+                logger.exception("Failed to render %s for %s", email_type.value, getattr(user, "email", "?"))
+                results.append(None)
+    return results
+
+
+def invalidate_override(email_type: Optional[EmailType] = None) -> None:
+    """Drop the cached override for one email type (or all) after an admin edit."""
+    _override_cache.invalidate(email_type.value if email_type is not None else None)
 
 
 def get_default_body(email_type: EmailType) -> tuple[str, str]:
@@ -166,28 +216,73 @@ def get_default_body(email_type: EmailType) -> tuple[str, str]:
 
 # ── Internal helpers ──────────────────────────────────────────────────────────
 
-def _get_override(db: "Session", email_type: EmailType):
-    """Load an override row from the DB, or None."""
+def _lookup_override(db: "Session | None", email_type: EmailType) -> Optional[dict]:
+    """Cached override for email_type, or None (no db, no override, or lookup failed)."""
+    if db is None:
+        return None
+    try:
+        return cast(
+            Optional[dict], _override_cache.get_or_compute(email_type.value, lambda: _get_override(db, email_type)),
+        )
+    except Exception:
+        logger.exception("Error loading template override for %s, falling back to default", email_type.value)
+        return None
+
+
+def _get_override(db: "Session", email_type: EmailType) -> Optional[dict]:
+    """Load an override row from the DB as {"subject", "body_html"}, or None."""
     from sqlalchemy import select
     from app.db.models.email_template_override import EmailTemplateOverride
 
-    return db.execute(
-        select(EmailTemplateOverride).where(
+    row = db.execute(
+        select(EmailTemplateOverride.subject, EmailTemplateOverride.body_html).where(
             EmailTemplateOverride.email_type == email_type.value
         )
-    ).scalar_one_or_none()
+    ).one_or_none()
+    return {"subject": row.subject, "body_html": row.body_html} if row else None
+
+
+class _TemplateUser(Protocol):
+    """The user fields templates read: satisfied by User and by _RenderUser in pool workers."""
+
+    @property
+    def email(self) -> str: ...
+    @property
+    def display_name(self) -> Optional[str]: ...
+    @property
+    def first_name(self) -> Optional[str]: ...
+    @property
+    def plan_type(self) -> Optional[str]: ...
+    @property
+    def plan_status(self) -> Optional[str]: ...
+
 
+def _render(email_type: EmailType, user: _TemplateUser, context: dict, override: Optional[dict]) -> tuple[str, str]:
+    """Render with the override when it sets anything, else the Python default."""
+    if override and (override["subject"] or override["body_html"]):
+        try:
+            subject, body = _render_override(override, email_type, user, context)
+            user_email = getattr(user, "email", "") or ""
+            return subject, wrap(body, unsub_url=context.get("_unsub_url", ""), user_email=user_email)
+        except Exception:
+            logger.exception("Error rendering template override for %s, falling back to default", email_type.value)
 
-def _render_override(override, email_type: EmailType, user: "User", context: dict) -> tuple[str, str]:
+    fn = _REGISTRY.get(email_type)
+    if not fn:
+        raise ValueError(f"No template registered for {email_type}")
+    return fn(user=user, context=context)
+
+
+def _render_override(override: dict, email_type: EmailType, user: _TemplateUser, context: dict) -> tuple[str, str]:
     """Render a DB override, interpolating variables. Returns (subject, body_html)."""
     # Get default subject as fallback
     default_subject, _ = get_default_body(email_type)
 
-    subject = override.subject if override.subject else default_subject
+    subject = override["subject"] if override["subject"] else default_subject
     subject = _interpolate(subject, user, context)
 
-    if override.body_html:
-        body = _interpolate(override.body_html, user, context)
+    if override["body_html"]:
+        body = _interpolate(override["body_html"], user, context)
     else:
         # No body override — use Python default
         fn = _REGISTRY.get(email_type)
@@ -200,7 +295,89 @@ def _render_override(override, email_type: EmailType, user: "User", context: dic
     return subject, body
 
 
-def _interpolate(template_str: str, user: "User", context: dict) -> str:
+# ── Process pool rendering ────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class _RenderUser:
+    """The User fields templates read, picklable for pool workers."""
+
+    email: str
+    display_name: Optional[str]
+    first_name: Optional[str]
+    plan_type: Optional[str]
+    plan_status: Optional[str]
+
+    @classmethod
+    def of(cls, user: "User") -> "_RenderUser":
+        return cls(
+            email=getattr(user, "email", "") or "",
+            display_name=getattr(user, "display_name", None),
+            first_name=getattr(user, "first_name", None),
+            plan_type=getattr(user, "plan_type", None),
+            plan_status=getattr(user, "plan_status", None),
+        )
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _render_pool(workers: int) -> ProcessPoolExecutor:
+    """Long-lived pool, so worker start-up (importing the app) is paid once per process."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn: forking a process with open DB connections and threads is unsafe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _render_parallel(
+    email_type: EmailType, items: list[tuple["User", dict]], override: Optional[dict], workers: int,
+) -> list[Optional[tuple[str, str]]]:
+    pairs = [(_RenderUser.of(user), context) for user, context in items]
+    chunks = [pairs[start:start + _RENDER_CHUNK] for start in range(0, len(pairs), _RENDER_CHUNK)]
+    pool = _render_pool(workers)
+    results: list[Optional[tuple[str, str]]] = []
+    for chunk in pool.map(_render_chunk, [email_type.value] * len(chunks), [override] * len(chunks), chunks):
+        for rendered in chunk:
+            if isinstance(rendered, str):
+                user, _ = pairs[len(results)]
+                logger.error("Failed to render %s for %s:\n%s", email_type.value, user.email, rendered)
+                results.append(None)
+            else:
+                results.append(rendered)
+    return results
+
+
+def _render_chunk(
+    email_type_value: str, override: Optional[dict], items: list[tuple[_RenderUser, dict]],
+) -> list[tuple[str, str] | str]:
+    """Pool worker: render a chunk with shared fragments memoized; failures come back as tracebacks."""
+    email_type = EmailType(email_type_value)
+    rendered: list[tuple[str, str] | str] = []
+    with fragment_cache():
+        for user, context in items:
+            try:
+                rendered.append(_render(email_type, user, context, override))
+            except Exception:
+                rendered.append(traceback.format_exc())
+    return rendered
+
+
+def _interpolate(template_str: str, user: _TemplateUser, context: dict) -> str:
     """Safely interpolate {variable_name} placeholders in a template string.
 
     Supports user fields (email, plan_type) and all context variables.
@@ -1,13 +1,58 @@
 """Shared email layout wrapper."""
 from __future__ import annotations
 
+import functools
 import html as _html
-from typing import TYPE_CHECKING
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Iterator
 
 if TYPE_CHECKING:
     from app.db.models.user import User
 
 
+# Fragments rendered so far in the current batch: (fragment name, args JSON) -> html
+_fragment_memo: ContextVar[dict | None] = ContextVar("email_fragment_memo", default=None)
+
+
+@contextmanager
+def fragment_cache() -> Iterator[None]:
+    """Memoize @shared_fragment renderings until the block exits.
+
+    Used around a batch of renders in one cycle, where many users share the
+    same route data (heatmap, destination index, deal rows). Nested blocks
+    reuse the outer memo.
+    """
+    if _fragment_memo.get() is not None:
+        yield
+        return
+    token = _fragment_memo.set({})
+    try:
+        yield
+    finally:
+        _fragment_memo.reset(token)
+
+
+def shared_fragment(fn: Callable[..., str]) -> Callable[..., str]:
+    """Mark a fragment whose HTML depends only on its (JSON-able) arguments.
+
+    Inside fragment_cache(), calls with equal arguments return the first
+    rendering; outside it the function is called as usual.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args) -> str:
+        memo = _fragment_memo.get()
+        if memo is None:
+            return fn(*args)
+        key = (fn.__name__, json.dumps(args, sort_keys=True, default=str))
+        html = memo.get(key)
+        if html is None:
+            html = memo[key] = fn(*args)
+        return html
+    return wrapper
+
+
 def esc(value: str | None) -> str:
     """HTML-escape a string to prevent injection in email templates."""
     if value is None:
@@ -213,6 +258,7 @@ def arbitrage_line(airport: str, savings_cents: int) -> str:
     )
 
 
+@shared_fragment
 def destination_index_html(destinations: list[dict]) -> str:
     """Render a destination price index leaderboard table.
 
@@ -258,6 +304,7 @@ def destination_index_html(destinations: list[dict]) -> str:
     )
 
 
+@shared_fragment
 def departure_heatmap_html(weeks: list[dict]) -> str:
     """Render a departure window heatmap showing avg price by week.
 
@@ -19,6 +19,7 @@ from app.services.market_intel.types import (  # noqa: F401
     ZSCORE_GOOD,
     ZSCORE_GREAT,
     ZSCORE_RARE,
+    DealLite,
     DealValueScore,
     EmptyStateInsights,
     MarketBucket,
@@ -27,6 +28,7 @@ from app.services.market_intel.types import (  # noqa: F401
     build_market_bucket_from_draft,
     build_market_bucket_from_signal,
     compute_percentile,
+    compute_stddev,
     duration_to_bucket,
     freshness_cutoff,
     star_to_bucket,
@@ -35,14 +37,21 @@ from app.services.market_intel.types import (  # noqa: F401
 # Core queries
 from app.services.market_intel.core import (  # noqa: F401
     compute_market_stats,
+    compute_market_stats_live,
     deals_in_bucket,
 )
 
+# Precomputed bucket stats
+from app.services.market_intel.stats_store import refresh_market_bucket_stats  # noqa: F401
+
 # Scoring
 from app.services.market_intel.scoring import (  # noqa: F401
+    deal_bucket_key,
     score_deal,
     score_deal_for_match,
     score_deal_resort_anomaly,
+    score_deals,
+    score_deals_for_match,
 )
 
 # Coverage
@@ -69,7 +78,11 @@ from app.services.market_intel.insights import (  # noqa: F401
 )
 
 # Snapshots
-from app.services.market_intel.snapshots import generate_daily_snapshots  # noqa: F401
+from app.services.market_intel.snapshots import (  # noqa: F401
+    SnapshotBackfillError,
+    backfill_daily_snapshots,
+    generate_daily_snapshots,
+)
 
 # Backward compatibility aliases
 from app.services.formatting import DESTINATION_LABELS, dest_label  # noqa: F401
@@ -1,26 +1,30 @@
 """Core market queries and stats computation."""
-import math
 from datetime import date
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.db.models.deal import Deal
+from app.services.market_intel import vectorized
+from app.services.market_intel.stats_store import get_stored_stats
 from app.services.market_intel.types import (
     DURATION_BUCKETS,
     STAR_BUCKETS,
+    DealLite,
     MarketBucket,
     MarketStats,
-    compute_percentile,
     freshness_cutoff,
 )
 
+# Deal columns loaded into DealLite, in field order
+_DEAL_LITE_COLUMNS = tuple(getattr(Deal, name) for name in DealLite._fields)
 
-def _base_fresh_deals_query():
-    """Return a base query for fresh, active deals."""
+
+def _base_fresh_deals_query(*columns):
+    """Return a base query for fresh, active deals (full entities unless columns given)."""
     cutoff = freshness_cutoff()
     return (
-        select(Deal)
+        select(*(columns or (Deal,)))
         .where(Deal.is_active == True)  # noqa: E712
         .where(Deal.last_seen_at >= cutoff)
         .where(Deal.depart_date >= date.today())
@@ -29,13 +33,14 @@ def _base_fresh_deals_query():
 
 def deals_in_bucket(
     db: Session, bucket: MarketBucket, ignore_star: bool = False, limit: int = 2000,
-) -> list[Deal]:
+) -> list[DealLite]:
     """Fetch active, fresh deals matching a market bucket.
 
     Results are ordered by price (cheapest first) and capped at *limit* rows
-    to prevent unbounded memory usage on large buckets.
+    to prevent unbounded memory usage on large buckets. Only the columns in
+    DealLite are loaded; callers that need a full Deal should query it by id.
     """
-    stmt = _base_fresh_deals_query()
+    stmt = _base_fresh_deals_query(*_DEAL_LITE_COLUMNS)
     stmt = stmt.where(Deal.origin == bucket.origin)
     stmt = stmt.where(Deal.destination == bucket.destination)
 
@@ -62,11 +67,25 @@ def deals_in_bucket(
                 stmt = stmt.where(Deal.star_rating.between(lo, hi))
 
     stmt = stmt.order_by(Deal.price_cents).limit(limit)
-    return db.execute(stmt).scalars().all()
+    return [DealLite._make(row) for row in db.execute(stmt)]
+
+
+def compute_market_stats(db: Session, bucket: MarketBucket, live: bool = False) -> MarketStats:
+    """Distribution statistics for a market bucket.
+
+    Served from market_bucket_stats (refreshed after each scrape cycle) when
+    the store covers the bucket; otherwise, or with live=True, computed from
+    the deals table.
+    """
+    if not live:
+        stats = get_stored_stats(db, bucket)
+        if stats is not None:
+            return stats
+    return compute_market_stats_live(db, bucket)
 
 
-def compute_market_stats(db: Session, bucket: MarketBucket) -> MarketStats:
-    """Compute distribution statistics for a market bucket."""
+def compute_market_stats_live(db: Session, bucket: MarketBucket) -> MarketStats:
+    """Compute distribution statistics for a market bucket from current deals."""
     deals = deals_in_bucket(db, bucket)
 
     if not deals:
@@ -86,20 +105,12 @@ def compute_market_stats(db: Session, bucket: MarketBucket) -> MarketStats:
         if d.hotel_name:
             resort_names.add(d.hotel_name.lower().strip())
 
-    n = len(prices)
-    mean = sum(prices) / n
-    variance = sum((p - mean) ** 2 for p in prices) / n if n > 1 else 0
-    stddev = math.sqrt(variance) if variance > 0 else None
-
-    return MarketStats(
-        sample_size=n,
-        unique_package_count=len(package_keys),
-        unique_resort_count=len(resort_names),
-        min_price=prices[0],
-        p25_price=compute_percentile(prices, 0.25),
-        median_price=compute_percentile(prices, 0.50),
-        p75_price=compute_percentile(prices, 0.75),
-        max_price=prices[-1],
-        price_stddev=stddev,
-        prices=prices,
-    )
+    stats = _price_distribution(prices)
+    stats.unique_package_count = len(package_keys)
+    stats.unique_resort_count = len(resort_names)
+    return stats
+
+
+def _price_distribution(prices: list[int]) -> MarketStats:
+    """Price fields of MarketStats for a sorted, non-empty list of positive prices."""
+    return vectorized.price_distribution(prices)
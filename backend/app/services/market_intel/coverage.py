@@ -38,19 +38,10 @@ def compute_market_activity(db: Session) -> dict:
     cutoff_24h = datetime.now(timezone.utc) - timedelta(hours=24)
 
     price_drops = db.execute(text("""
-        SELECT COUNT(*) FROM (
-            SELECT deal_id
-            FROM (
-                SELECT
-                    deal_id,
-                    price_cents,
-                    LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) AS prev_price,
-                    ROW_NUMBER() OVER (PARTITION BY deal_id ORDER BY recorded_at DESC) AS rn
-                FROM deal_price_history
-                WHERE recorded_at >= :cutoff
-            ) sub
-            WHERE rn = 1 AND prev_price IS NOT NULL AND price_cents < prev_price
-        ) drops
+        SELECT COUNT(*)
+        FROM deals
+        WHERE last_price_change_at >= :cutoff
+          AND last_price_delta_cents < 0
     """), {"cutoff": cutoff_24h}).scalar() or 0
 
     return {
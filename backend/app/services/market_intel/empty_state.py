@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.db.models.deal_match import DealMatch
 from app.services.market_intel.types import (
+    DealLite,
     EmptyStateInsights,
     MarketBucket,
     MarketStats,
@@ -98,7 +99,7 @@ def _compute_adjustment_recommendation(
     db: Session, signal, bucket: MarketBucket,
     budget_cents: Optional[int], tw: dict,
     result: EmptyStateInsights,
-    broad_deals: list,
+    broad_deals: list[DealLite],
 ):
     """Find the smallest meaningful adjustment to improve match coverage."""
     # Count current matches
@@ -1,18 +1,17 @@
 """Market events — today's signals and market movers."""
-import threading
 from datetime import date, datetime, timedelta, timezone
+from typing import cast
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.core.cache import Cache
 from app.services.formatting import dest_label
 from app.services.market_intel.types import freshness_cutoff
 
-# In-memory cache for market events (refreshed every 10 minutes)
-_events_cache: dict | None = None
-_events_cache_time: datetime | None = None
-_events_cache_lock = threading.Lock()
-_EVENTS_CACHE_TTL = timedelta(minutes=10)
+# Market events are the same for every user: computed once per 10 minutes across
+# all API workers, with a 5-minute stale window so expiry never blocks requests
+_events_cache = Cache("market_events", ttl_seconds=600, stale_seconds=300, max_entries=1)
 
 
 def compute_market_events(db: Session) -> dict:
@@ -24,23 +23,10 @@ def compute_market_events(db: Session) -> dict:
     Returns dict with 'todays_signals' and 'market_movers' lists (max 5 each).
     Empty lists when data is insufficient.
 
-    Results are cached in-memory for 10 minutes to avoid running 5 heavy
-    analytical queries on every request.
+    Results are cached for 10 minutes (shared by API workers) to avoid running
+    5 heavy analytical queries on every request.
     """
-    global _events_cache, _events_cache_time
-
-    now = datetime.now(timezone.utc)
-    with _events_cache_lock:
-        if _events_cache is not None and _events_cache_time and (now - _events_cache_time) < _EVENTS_CACHE_TTL:
-            return _events_cache
-
-    result = _compute_market_events_uncached(db)
-
-    with _events_cache_lock:
-        _events_cache = result
-        _events_cache_time = now
-
-    return result
+    return cast(dict, _events_cache.get_or_compute("events", lambda: _compute_market_events_uncached(db)))
 
 
 def _compute_market_events_uncached(db: Session) -> dict:
@@ -57,31 +43,18 @@ def _compute_market_events_uncached(db: Session) -> dict:
     drop_rows = db.execute(text("""
         SELECT
             d.destination,
-            COUNT(DISTINCT sub.deal_id) AS drop_count,
-            AVG(sub.drop_pct) AS avg_drop_pct
-        FROM (
-            SELECT
-                deal_id,
-                price_cents,
-                LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) AS prev_price,
-                CASE WHEN LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) > 0
-                     THEN (LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) - price_cents)::float
-                          / LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) * 100
-                     ELSE 0 END AS drop_pct,
-                ROW_NUMBER() OVER (PARTITION BY deal_id ORDER BY recorded_at DESC) AS rn
-            FROM deal_price_history
-            WHERE recorded_at >= :cutoff_24h
-        ) sub
-        JOIN deals d ON d.id = sub.deal_id
-        WHERE sub.rn = 1
-          AND sub.prev_price IS NOT NULL
-          AND sub.price_cents < sub.prev_price
-          AND sub.drop_pct >= 2.0
+            COUNT(*) AS drop_count,
+            AVG(-d.last_price_delta_cents::float / d.prev_price_cents * 100) AS avg_drop_pct
+        FROM deals d
+        WHERE d.last_price_change_at >= :cutoff_24h
+          AND d.prev_price_cents > 0
+          AND d.last_price_delta_cents < 0
+          AND -d.last_price_delta_cents::float / d.prev_price_cents * 100 >= 2.0
           AND d.is_active = true
           AND d.depart_date >= :today
         GROUP BY d.destination
-        HAVING COUNT(DISTINCT sub.deal_id) >= 3
-        ORDER BY AVG(sub.drop_pct) DESC
+        HAVING COUNT(*) >= 3
+        ORDER BY AVG(-d.last_price_delta_cents::float / d.prev_price_cents * 100) DESC
         LIMIT 5
     """), {"cutoff_24h": cutoff_24h, "today": today_date}).all()
 
@@ -174,31 +147,23 @@ def _compute_market_events_uncached(db: Session) -> dict:
     # ── Market Movers: destination-level strongest shifts ──
     price_mover_rows = db.execute(text("""
         SELECT
-            d.destination,
+            sub.destination,
             AVG(sub.change_pct) AS avg_change_pct,
-            COUNT(DISTINCT sub.deal_id) AS deal_count,
+            COUNT(*) AS deal_count,
             CASE WHEN AVG(sub.change_pct) > 0 THEN 'up' ELSE 'down' END AS direction
         FROM (
             SELECT
-                deal_id,
-                price_cents,
-                LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) AS prev_price,
-                CASE WHEN LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) > 0
-                     THEN (price_cents::float - LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at))
-                          / LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at) * 100
-                     ELSE 0 END AS change_pct,
-                ROW_NUMBER() OVER (PARTITION BY deal_id ORDER BY recorded_at DESC) AS rn
-            FROM deal_price_history
-            WHERE recorded_at >= :cutoff_24h
+                d.destination,
+                d.last_price_delta_cents::float / d.prev_price_cents * 100 AS change_pct
+            FROM deals d
+            WHERE d.last_price_change_at >= :cutoff_24h
+              AND d.prev_price_cents > 0
+              AND d.is_active = true
+              AND d.depart_date >= :today
         ) sub
-        JOIN deals d ON d.id = sub.deal_id
-        WHERE sub.rn = 1
-          AND sub.prev_price IS NOT NULL
-          AND ABS(sub.change_pct) >= 2.0
-          AND d.is_active = true
-          AND d.depart_date >= :today
-        GROUP BY d.destination
-        HAVING COUNT(DISTINCT sub.deal_id) >= 3
+        WHERE ABS(sub.change_pct) >= 2.0
+        GROUP BY sub.destination
+        HAVING COUNT(*) >= 3
            AND ABS(AVG(sub.change_pct)) >= 3.0
         ORDER BY ABS(AVG(sub.change_pct)) DESC
         LIMIT 3
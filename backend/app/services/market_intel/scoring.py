@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from app.db.models.deal import Deal
 from app.services.market_intel.types import (
     DURATION_BUCKETS,
+    DealLite,
     DealValueScore,
     GAP_GREAT_ABS,
     GAP_GREAT_PCT,
@@ -23,6 +24,7 @@ from app.services.market_intel.types import (
     freshness_cutoff,
     star_to_bucket,
 )
+from app.services.market_intel import vectorized
 from app.services.market_intel.core import compute_market_stats
 
 logger = logging.getLogger("market_intel")
@@ -76,7 +78,17 @@ def score_deal(price_cents: int, stats: MarketStats) -> DealValueScore:
     return result
 
 
-def _deal_bucket_key(deal: Deal) -> tuple:
+def score_deals(prices: list[int], stats: MarketStats) -> list[DealValueScore]:
+    """score_deal for many prices in the same bucket, NumPy-vectorized."""
+    return vectorized.score_prices(prices, stats)
+
+
+def label_deals(prices: list[int], stats: MarketStats) -> list[Optional[str]]:
+    """Value label of each price in the same bucket (score_deal(...).label)."""
+    return vectorized.label_prices(prices, stats)
+
+
+def deal_bucket_key(deal: Deal) -> tuple:
     """Return a hashable key for a deal's market bucket."""
     duration = (deal.return_date - deal.depart_date).days if deal.return_date else 7
     dur_bucket = duration_to_bucket(duration) or "one_week"
@@ -84,6 +96,23 @@ def _deal_bucket_key(deal: Deal) -> tuple:
     return (deal.origin, deal.destination, dur_bucket, star_bkt)
 
 
+def _bucket_stats(db: Session, deal: Deal, stats_cache: Optional[dict[tuple, MarketStats]]) -> MarketStats:
+    cache_key = deal_bucket_key(deal)
+    if stats_cache is not None and cache_key in stats_cache:
+        return stats_cache[cache_key]
+
+    origin, destination, dur_bucket, star_bkt = cache_key
+    stats = compute_market_stats(db, MarketBucket(
+        origin=origin,
+        destination=destination,
+        duration_bucket=dur_bucket,
+        star_bucket=star_bkt,
+    ))
+    if stats_cache is not None:
+        stats_cache[cache_key] = stats
+    return stats
+
+
 def score_deal_for_match(
     db: Session,
     deal: Deal,
@@ -100,24 +129,7 @@ def score_deal_for_match(
     if not deal.price_cents:
         return None
 
-    cache_key = _deal_bucket_key(deal)
-
-    if stats_cache is not None and cache_key in stats_cache:
-        stats = stats_cache[cache_key]
-    else:
-        duration = (deal.return_date - deal.depart_date).days if deal.return_date else 7
-        dur_bucket = duration_to_bucket(duration) or "one_week"
-        star_bkt = star_to_bucket(deal.star_rating)
-        bucket = MarketBucket(
-            origin=deal.origin,
-            destination=deal.destination,
-            duration_bucket=dur_bucket,
-            star_bucket=star_bkt,
-        )
-        stats = compute_market_stats(db, bucket)
-        if stats_cache is not None:
-            stats_cache[cache_key] = stats
-
+    stats = _bucket_stats(db, deal, stats_cache)
     if not stats.is_scorable():
         return None
 
@@ -129,11 +141,38 @@ def score_deal_for_match(
     return None
 
 
+def score_deals_for_match(
+    db: Session,
+    deals: list[Deal],
+    stats_cache: Optional[dict[tuple, MarketStats]] = None,
+) -> list[Optional[str]]:
+    """score_deal_for_match for many deals, scoring each bucket's deals in one batch."""
+    if stats_cache is None:
+        stats_cache = {}
+    labels: list[Optional[str]] = [None] * len(deals)
+    by_bucket: dict[tuple, list[int]] = {}
+    for i, deal in enumerate(deals):
+        if deal.price_cents:
+            by_bucket.setdefault(deal_bucket_key(deal), []).append(i)
+
+    for indexes in by_bucket.values():
+        stats = _bucket_stats(db, deals[indexes[0]], stats_cache)
+        if not stats.is_scorable():
+            continue
+        bucket_labels = label_deals([deals[i].price_cents for i in indexes], stats)
+        for i, label in zip(indexes, bucket_labels, strict=True):
+            if label in ("Rare value", "Great value"):
+                labels[i] = label
+    return labels
+
+
 def score_deal_resort_anomaly(
-    db: Session, deal: Deal, price_cents: int
+    db: Session, deal: Deal | DealLite, price_cents: int
 ) -> tuple[bool, Optional[float]]:
     """Check if this deal is unusually cheap for the same resort across other dates.
 
+    Accepts a Deal or a DealLite from deals_in_bucket.
+
     Groups by: hotel_id + origin + duration_bucket
     Returns: (is_anomaly, discount_pct)
     """
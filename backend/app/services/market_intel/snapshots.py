@@ -1,91 +1,174 @@
-"""Daily market snapshot generation."""
+"""Daily market snapshot generation.
+
+Snapshots are written by one INSERT ... SELECT per call: every
+(origin, destination, duration bucket) is aggregated in a single grouped pass
+with the same 2000-cheapest cap and statistics as compute_market_stats (any
+star rating). Re-running a date replaces that date's snapshot rows.
+
+backfill_daily_snapshots() rebuilds past dates from deal_price_history, so a
+new snapshot metric can be populated for history already collected. It writes
+and commits one week per statement so each stays well inside the API role's
+statement timeout.
+
+Write errors are rolled back and raised to the caller.
+"""
 import logging
-from datetime import date
+from datetime import date, timedelta
 
-from sqlalchemy import func, select
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.db.models.deal import Deal
-from app.db.models.market_snapshot import MarketSnapshot
-from app.services.market_intel.types import DURATION_BUCKETS, MarketBucket, freshness_cutoff
-from app.services.market_intel.core import compute_market_stats
+from app.services.market_intel.types import DURATION_BUCKETS, FRESHNESS_DAYS, freshness_cutoff
 
 logger = logging.getLogger("market_intel")
 
+BUCKET_DEAL_LIMIT = 2000  # same cap as deals_in_bucket
+BACKFILL_CHUNK_DAYS = 7
 
-def generate_daily_snapshots(db: Session) -> int:
-    """Generate daily market snapshot rows for all active market buckets.
+# Deals priced as of today: the live deals table
+_PRICED_TODAY = """
+    WITH priced AS (
+        SELECT CAST(:start AS date) AS snapshot_date, d.origin, d.destination,
+               d.depart_date, d.return_date, d.price_cents, d.hotel_name
+        FROM deals d
+        WHERE d.is_active = true
+          AND d.last_seen_at >= :cutoff
+          AND d.depart_date >= :start
+          AND d.return_date IS NOT NULL
+    ),
+"""
+
+# Deals priced as of the end of each past day. A deal counts on a day when it
+# had been found by then, was last seen no earlier than the freshness window
+# before the day's end, and had not been deactivated (reactivation clears
+# deactivated_at). Its price is the last deal_price_history entry up to that
+# day, or the current price when it has no history.
+_PRICED_HISTORY = """
+    WITH priced AS (
+        SELECT day.snapshot_date, d.origin, d.destination, d.depart_date, d.return_date,
+               COALESCE(h.price_cents, d.price_cents) AS price_cents, d.hotel_name
+        FROM (
+            SELECT CAST(gs AS date) AS snapshot_date,
+                   CAST(gs AS timestamptz) + interval '1 day' AS day_end
+            FROM generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') AS gs
+        ) day
+        JOIN deals d
+          ON d.found_at < day.day_end
+         AND d.last_seen_at >= day.day_end - make_interval(days => :freshness_days)
+         AND (d.deactivated_at IS NULL OR d.deactivated_at >= day.day_end)
+         AND d.depart_date >= day.snapshot_date
+         AND d.return_date IS NOT NULL
+        LEFT JOIN LATERAL (
+            SELECT ph.price_cents
+            FROM deal_price_history ph
+            WHERE ph.deal_id = d.id AND ph.recorded_at < day.day_end
+            ORDER BY ph.recorded_at DESC
+            LIMIT 1
+        ) h ON true
+    ),
+"""
+
+_AGGREGATE_INSERT = """
+    dur AS (
+        SELECT * FROM unnest(CAST(:dur_keys AS text[]), CAST(:dur_lo AS int[]), CAST(:dur_hi AS int[]))
+            AS dur(key, lo, hi)
+    ),
+    bucketed AS (
+        SELECT p.snapshot_date, p.origin, p.destination, dur.key AS duration_bucket,
+               p.price_cents, p.hotel_name,
+               ROW_NUMBER() OVER (
+                   PARTITION BY p.snapshot_date, p.origin, p.destination, dur.key
+                   ORDER BY p.price_cents
+               ) AS rn
+        FROM priced p
+        JOIN dur ON p.return_date - p.depart_date BETWEEN dur.lo AND dur.hi
+    )
+    INSERT INTO market_snapshots (
+        snapshot_date, departure_airport, destination_region, duration_bucket, star_bucket,
+        package_count, unique_resort_count, min_price, median_price, p75_price, max_price, price_stddev
+    )
+    SELECT snapshot_date, origin, destination, duration_bucket, NULL,
+           COUNT(*) FILTER (WHERE price_cents > 0),
+           COUNT(DISTINCT lower(btrim(hotel_name, E' \\t\\n\\r'))) FILTER (WHERE hotel_name <> ''),
+           MIN(price_cents) FILTER (WHERE price_cents > 0),
+           round(percentile_cont(0.5) WITHIN GROUP (ORDER BY price_cents) FILTER (WHERE price_cents > 0)),
+           round(percentile_cont(0.75) WITHIN GROUP (ORDER BY price_cents) FILTER (WHERE price_cents > 0)),
+           MAX(price_cents) FILTER (WHERE price_cents > 0),
+           NULLIF(stddev_pop(price_cents) FILTER (WHERE price_cents > 0), 0)
+    FROM bucketed
+    WHERE rn <= :limit
+    GROUP BY snapshot_date, origin, destination, duration_bucket
+    HAVING COUNT(*) FILTER (WHERE price_cents > 0) > 0
+"""
+
+_SNAPSHOT_TODAY_SQL = text(_PRICED_TODAY + _AGGREGATE_INSERT)
+_SNAPSHOT_HISTORY_SQL = text(_PRICED_HISTORY + _AGGREGATE_INSERT)
+
+_DELETE_SQL = text(
+    "DELETE FROM market_snapshots "
+    "WHERE snapshot_date BETWEEN :start AND :end AND star_bucket IS NULL"
+)
+
+
+def _duration_params() -> dict:
+    return {
+        "dur_keys": list(DURATION_BUCKETS),
+        "dur_lo": [lo for lo, _ in DURATION_BUCKETS.values()],
+        "dur_hi": [hi for _, hi in DURATION_BUCKETS.values()],
+        "limit": BUCKET_DEAL_LIMIT,
+    }
+
+
+class SnapshotBackfillError(RuntimeError):
+    """A backfill chunk failed. Chunks before ``start`` are committed."""
+
+    def __init__(self, start: date, end: date, created: int):
+        super().__init__(f"Market snapshot backfill failed for {start}..{end}")
+        self.start = start
+        self.end = end
+        self.created = created
 
-    Iterates every distinct (origin, destination) pair with active deals,
-    computes stats per duration bucket, and inserts a snapshot row for each.
+
+def _write(db: Session, sql, start: date, end: date, **params) -> int:
+    try:
+        db.execute(_DELETE_SQL, {"start": start, "end": end})
+        result = db.execute(sql, {"start": start, "end": end, **_duration_params(), **params})
+        created = int(result.rowcount)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return created
+
+
+def generate_daily_snapshots(db: Session) -> int:
+    """Generate today's market snapshot row for every active market bucket.
 
     Returns: number of snapshot rows created.
     """
     today = date.today()
-    cutoff = freshness_cutoff()
-
-    # Find all distinct active routes
-    routes = db.execute(
-        select(
-            func.distinct(Deal.origin),
-            Deal.destination,
-        )
-        .where(Deal.is_active == True)  # noqa: E712
-        .where(Deal.last_seen_at >= cutoff)
-        .where(Deal.depart_date >= today)
-    ).all()
+    created = _write(db, _SNAPSHOT_TODAY_SQL, today, today, cutoff=freshness_cutoff())
+    logger.info("Generated %d daily market snapshots for %s", created, today)
+    return created
+
+
+def backfill_daily_snapshots(db: Session, start: date, end: date) -> int:
+    """Rebuild snapshots for each day in [start, end] from deal_price_history.
 
+    Days before today only; returns the number of snapshot rows created.
+    Raises SnapshotBackfillError if a chunk fails.
+    """
+    end = min(end, date.today() - timedelta(days=1))
+    if start > end:
+        return 0
     created = 0
-    batch_size = 50
-    pending = 0
-
-    for origin, destination in routes:
-        for dur_key in DURATION_BUCKETS:
-            bucket = MarketBucket(
-                origin=origin,
-                destination=destination,
-                duration_bucket=dur_key,
-                star_bucket=None,
-            )
-            stats = compute_market_stats(db, bucket)
-            if stats.sample_size == 0:
-                continue
-
-            snapshot = MarketSnapshot(
-                snapshot_date=today,
-                departure_airport=origin,
-                destination_region=destination,
-                duration_bucket=dur_key,
-                star_bucket=None,
-                package_count=stats.sample_size,
-                unique_resort_count=stats.unique_resort_count,
-                min_price=stats.min_price,
-                median_price=stats.median_price,
-                p75_price=stats.p75_price,
-                max_price=stats.max_price,
-                price_stddev=stats.price_stddev,
-            )
-            db.add(snapshot)
-            created += 1
-            pending += 1
-
-            if pending >= batch_size:
-                try:
-                    db.commit()
-                except Exception:
-                    logger.exception("Failed to commit snapshot batch at %d", created)
-                    db.rollback()
-                    return created - pending
-                pending = 0
-
-    # Commit remaining
-    if pending > 0:
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), end)
         try:
-            db.commit()
-        except Exception:
-            logger.exception("Failed to commit final snapshot batch")
-            db.rollback()
-            return created - pending
-
-    logger.info("Generated %d daily market snapshots for %s", created, today)
+            created += _write(db, _SNAPSHOT_HISTORY_SQL, chunk_start, chunk_end, freshness_days=FRESHNESS_DAYS)
+        except Exception as e:
+            raise SnapshotBackfillError(chunk_start, chunk_end, created) from e
+        chunk_start = chunk_end + timedelta(days=1)
+    logger.info("Backfilled %d market snapshots for %s..%s", created, start, end)
     return created
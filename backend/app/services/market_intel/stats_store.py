@@ -0,0 +1,219 @@
+"""Precomputed market bucket statistics (market_bucket_stats).
+
+refresh_market_bucket_stats() rebuilds the table in one grouped pass after each
+scrape cycle. The pass covers every (origin, destination, duration bucket) with
+fresh deals, and for each one:
+- any star rating;
+- each STAR_BUCKETS range;
+- each minimum-star threshold signals can set.
+
+Like deals_in_bucket, each bucket keeps only its 2000 cheapest deals.
+
+get_stored_stats() reads a bucket through a short-lived in-process cache. It
+returns None for buckets the store does not cover, such as arbitrary
+min_star_rating values or a store that has not been refreshed recently, so the
+caller can fall back to the live query.
+"""
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.db.models.market_bucket_stats import MarketBucketStats
+from app.services.market_intel.types import (
+    DURATION_BUCKETS,
+    STAR_BUCKETS,
+    MarketBucket,
+    MarketStats,
+    freshness_cutoff,
+)
+
+logger = logging.getLogger("market_intel")
+
+# Signals store min_star_rating as a whole number of stars (schemas.signals)
+MIN_STAR_THRESHOLDS = (1.0, 2.0, 3.0, 4.0, 5.0)
+BUCKET_DEAL_LIMIT = 2000  # same cap as deals_in_bucket
+# A store older than this is treated as missing (refresh has stopped running)
+STORE_MAX_AGE = timedelta(hours=12)
+# In-process read-through cache
+CACHE_TTL_SECONDS = 300
+_CACHE_MAX_ENTRIES = 4096
+
+_REFRESH_SQL = text("""
+    WITH dur AS (
+        SELECT * FROM unnest(CAST(:dur_keys AS text[]), CAST(:dur_lo AS int[]), CAST(:dur_hi AS int[]))
+            AS dur(key, lo, hi)
+    ),
+    star AS (
+        SELECT * FROM unnest(CAST(:star_keys AS text[]), CAST(:star_lo AS float8[]), CAST(:star_hi AS float8[]))
+            AS star(key, lo, hi)
+    ),
+    bucketed AS (
+        SELECT d.origin, d.destination, dur.key AS duration_bucket, star.key AS star_key,
+               d.price_cents, d.hotel_id, d.hotel_name, d.depart_date,
+               d.return_date - d.depart_date AS nights,
+               ROW_NUMBER() OVER (
+                   PARTITION BY d.origin, d.destination, dur.key, star.key
+                   ORDER BY d.price_cents
+               ) AS rn
+        FROM deals d
+        JOIN dur ON d.return_date - d.depart_date BETWEEN dur.lo AND dur.hi
+        JOIN star ON star.lo IS NULL
+                  OR (d.star_rating IS NOT NULL AND d.star_rating >= star.lo
+                      AND (star.hi IS NULL OR d.star_rating <= star.hi))
+        WHERE d.is_active = true
+          AND d.last_seen_at >= :cutoff
+          AND d.depart_date >= :today
+          AND d.return_date IS NOT NULL
+    )
+    SELECT origin, destination, duration_bucket, star_key,
+           COUNT(*) FILTER (WHERE price_cents > 0) AS sample_size,
+           COUNT(DISTINCT (
+               COALESCE(NULLIF(hotel_id, ''), NULLIF(hotel_name, ''), 'unk'), depart_date, nights
+           )) AS unique_package_count,
+           COUNT(DISTINCT lower(btrim(hotel_name, E' \\t\\n\\r'))) FILTER (WHERE hotel_name <> '')
+               AS unique_resort_count,
+           MIN(price_cents) FILTER (WHERE price_cents > 0) AS min_price,
+           percentile_cont(0.25) WITHIN GROUP (ORDER BY price_cents) FILTER (WHERE price_cents > 0) AS p25_price,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY price_cents) FILTER (WHERE price_cents > 0) AS median_price,
+           percentile_cont(0.75) WITHIN GROUP (ORDER BY price_cents) FILTER (WHERE price_cents > 0) AS p75_price,
+           MAX(price_cents) FILTER (WHERE price_cents > 0) AS max_price,
+           NULLIF(stddev_pop(price_cents) FILTER (WHERE price_cents > 0), 0) AS price_stddev,
+           array_agg(price_cents ORDER BY price_cents) FILTER (WHERE price_cents > 0) AS prices
+    FROM bucketed
+    WHERE rn <= :limit
+    GROUP BY origin, destination, duration_bucket, star_key
+    HAVING COUNT(*) FILTER (WHERE price_cents > 0) > 0
+""")
+
+_cache_lock = threading.Lock()
+_cache: dict[tuple, tuple[float, Optional[MarketStats]]] = {}
+_store_state: dict = {"checked_at": None, "fresh": False}
+
+
+def star_key(bucket: MarketBucket) -> str:
+    """Store key for the bucket's star filter (mirrors deals_in_bucket)."""
+    if bucket.min_star_rating is not None:
+        return f"min:{float(bucket.min_star_rating):g}"
+    if bucket.star_bucket in STAR_BUCKETS:
+        return bucket.star_bucket
+    return "any"
+
+
+def _covered(bucket: MarketBucket, key: str) -> bool:
+    if bucket.duration_bucket not in DURATION_BUCKETS:
+        return False
+    if key.startswith("min:"):
+        return bucket.min_star_rating is not None and float(bucket.min_star_rating) in MIN_STAR_THRESHOLDS
+    return True
+
+
+def _star_params() -> dict:
+    keys = ["any"]
+    lows: list[float | None] = [None]
+    highs: list[float | None] = [None]
+    for name, (lo, hi) in STAR_BUCKETS.items():
+        keys.append(name)
+        lows.append(float(lo))
+        highs.append(float(hi))
+    for threshold in MIN_STAR_THRESHOLDS:
+        keys.append(f"min:{threshold:g}")
+        lows.append(threshold)
+        highs.append(None)
+    return {"star_keys": keys, "star_lo": lows, "star_hi": highs}
+
+
+def refresh_market_bucket_stats(db: Session) -> int:
+    """Rebuild market_bucket_stats from current fresh deals. Returns buckets written."""
+    params = {
+        "dur_keys": list(DURATION_BUCKETS),
+        "dur_lo": [lo for lo, _ in DURATION_BUCKETS.values()],
+        "dur_hi": [hi for _, hi in DURATION_BUCKETS.values()],
+        "cutoff": freshness_cutoff(),
+        "today": date.today(),
+        "limit": BUCKET_DEAL_LIMIT,
+        **_star_params(),
+    }
+    rows = [dict(row._mapping) for row in db.execute(_REFRESH_SQL, params)]
+    now = datetime.now(timezone.utc)
+    for row in rows:
+        row["computed_at"] = now
+
+    db.execute(delete(MarketBucketStats))
+    if rows:
+        # render_nulls keeps rows with a NULL price_stddev in the same executemany batch
+        db.execute(insert(MarketBucketStats).execution_options(render_nulls=True), rows)
+    db.commit()
+    clear_cache()
+    logger.info("Refreshed market_bucket_stats: %d buckets", len(rows))
+    return len(rows)
+
+
+def _rounded(value: Optional[float]) -> Optional[int]:
+    return round(value) if value is not None else None
+
+
+def _to_stats(row: Optional[MarketBucketStats]) -> MarketStats:
+    if row is None:
+        # Covered bucket with no fresh priced deals
+        return MarketStats()
+    return MarketStats(
+        sample_size=row.sample_size,
+        unique_package_count=row.unique_package_count,
+        unique_resort_count=row.unique_resort_count,
+        min_price=row.min_price,
+        p25_price=_rounded(row.p25_price),
+        median_price=_rounded(row.median_price),
+        p75_price=_rounded(row.p75_price),
+        max_price=row.max_price,
+        price_stddev=row.price_stddev,
+        prices=list(row.prices),
+    )
+
+
+def _store_is_fresh(db: Session) -> bool:
+    now = time.monotonic()
+    checked_at = _store_state["checked_at"]
+    if checked_at is not None and now - checked_at < CACHE_TTL_SECONDS:
+        return bool(_store_state["fresh"])
+    latest = db.execute(
+        select(MarketBucketStats.computed_at).order_by(MarketBucketStats.computed_at.desc()).limit(1)
+    ).scalar()
+    fresh = latest is not None and datetime.now(timezone.utc) - latest < STORE_MAX_AGE
+    with _cache_lock:
+        _store_state.update(checked_at=now, fresh=fresh)
+    return fresh
+
+
+def get_stored_stats(db: Session, bucket: MarketBucket) -> Optional[MarketStats]:
+    """Stats for a bucket from the store, or None when the store can't answer."""
+    key = star_key(bucket)
+    if not _covered(bucket, key):
+        return None
+
+    cache_key = (bucket.origin, bucket.destination, bucket.duration_bucket, key)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(cache_key)
+    if hit is not None and now - hit[0] < CACHE_TTL_SECONDS:
+        return hit[1]
+
+    if not _store_is_fresh(db):
+        return None
+
+    stats = _to_stats(db.get(MarketBucketStats, cache_key))
+    with _cache_lock:
+        if len(_cache) >= _CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[cache_key] = (now, stats)
+    return stats
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+        _store_state.update(checked_at=None, fresh=False)
@@ -1,8 +1,9 @@
 """Market intelligence types, constants, and pure helpers (no DB dependencies)."""
 import math
+import uuid
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple, Optional
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -63,6 +64,23 @@ class MarketBucket:
     min_star_rating: Optional[float] = None  # >= filter (used by signals with min_star pref)
 
 
+class DealLite(NamedTuple):
+    """Column projection of a Deal row used by market queries.
+
+    Avoids ORM identity-map and instance-state overhead when a bucket loads
+    thousands of deals that are only read.
+    """
+    id: uuid.UUID
+    origin: str
+    destination: str
+    depart_date: date
+    return_date: Optional[date]
+    price_cents: int
+    star_rating: Optional[float]
+    hotel_id: Optional[str]
+    hotel_name: Optional[str]
+
+
 @dataclass
 class MarketStats:
     """Distribution statistics for a market bucket."""
@@ -204,6 +222,16 @@ def compute_percentile(sorted_prices: list[int], pct: float) -> int:
     return round(sorted_prices[lo] * (1 - frac) + sorted_prices[hi] * frac)
 
 
+def compute_stddev(prices: list[int]) -> Optional[float]:
+    """Population standard deviation of a price list, or None when it is zero."""
+    n = len(prices)
+    if n < 2:
+        return None
+    mean = sum(prices) / n
+    variance = sum((p - mean) ** 2 for p in prices) / n
+    return math.sqrt(variance) if variance > 0 else None
+
+
 def freshness_cutoff() -> datetime:
     """Return the timestamp for the freshness window."""
     return datetime.now(timezone.utc) - timedelta(days=FRESHNESS_DAYS)
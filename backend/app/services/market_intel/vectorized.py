@@ -0,0 +1,171 @@
+"""NumPy backend for price distributions and batch deal scoring.
+
+Every function here returns exactly what the pure-Python helpers return
+(compute_percentile, compute_stddev, score_deal), just computed over whole
+arrays at once.
+
+Exactness notes:
+- Percentile interpolation uses the same float64 operations in the same order
+  as compute_percentile, and np.rint rounds half to even like round().
+- Standard deviation is compute_stddev itself, run on each bucket's price
+  list: the mean/variance float sums are order and Python-version sensitive
+  (sum() compensates float rounding from 3.12 on), so they stay in Python.
+- Z-scores are (median - price) / stddev in float64, as in score_deal.
+"""
+from typing import Optional, Sequence, cast
+
+import numpy as np
+
+from app.services.market_intel.types import (
+    GAP_GREAT_ABS,
+    GAP_GREAT_PCT,
+    GAP_RARE_ABS,
+    GAP_RARE_PCT,
+    ZSCORE_GOOD,
+    ZSCORE_GREAT,
+    ZSCORE_RARE,
+    DealValueScore,
+    MarketStats,
+    compute_stddev,
+)
+
+PERCENTILES = (0.25, 0.50, 0.75)
+LABELS = ("Rare value", "Great value", "Good price", "Typical price", "High for market")
+
+
+def _percentiles(sorted_prices, starts, counts) -> list:
+    """compute_percentile for each bucket of a bucket-sorted price array."""
+    out = []
+    for pct in PERCENTILES:
+        idx = (counts - 1) * pct
+        lo = np.floor(idx).astype(np.int64)
+        hi = np.ceil(idx).astype(np.int64)
+        frac = idx - lo
+        a = sorted_prices[starts + lo]
+        b = sorted_prices[starts + hi]
+        interpolated = np.rint(a * (1 - frac) + b * frac).astype(np.int64)
+        out.append(np.where(lo == hi, a, interpolated))
+    return out
+
+
+def bucket_distributions(bucket_ids: Sequence[int], prices: Sequence[int]) -> dict[int, MarketStats]:
+    """Price distribution for every bucket in one pass.
+
+    bucket_ids and prices are parallel arrays (one entry per deal, any order).
+    Non-positive prices are ignored, as in compute_market_stats_live. Only the
+    price fields of MarketStats are filled; package and resort counts need the
+    deal rows and are left at 0.
+    """
+    buckets = np.asarray(bucket_ids, dtype=np.int64)
+    values = np.asarray(prices, dtype=np.int64)
+    keep = values > 0
+    buckets, values = buckets[keep], values[keep]
+    if values.size == 0:
+        return {}
+
+    order = np.lexsort((values, buckets))
+    buckets, values = buckets[order], values[order]
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    counts = np.diff(np.r_[starts, values.size])
+
+    p25, p50, p75 = (p.tolist() for p in _percentiles(values, starts, counts))
+    mins = values[starts].tolist()
+    maxs = values[starts + counts - 1].tolist()
+    bounds = zip(starts.tolist(), counts.tolist(), strict=True)
+
+    result = {}
+    for i, (start, n) in enumerate(bounds):
+        bucket_prices = values[start:start + n].tolist()
+        result[int(buckets[start])] = MarketStats(
+            sample_size=n,
+            min_price=mins[i],
+            p25_price=p25[i],
+            median_price=p50[i],
+            p75_price=p75[i],
+            max_price=maxs[i],
+            price_stddev=compute_stddev(bucket_prices),
+            prices=bucket_prices,
+        )
+    return result
+
+
+def price_distribution(sorted_prices: list[int]) -> MarketStats:
+    """Price fields of MarketStats for one bucket's sorted positive prices."""
+    if not sorted_prices:
+        return MarketStats()
+    return bucket_distributions([0] * len(sorted_prices), sorted_prices)[0]
+
+
+def price_ranks(sorted_prices: list[int], prices: Sequence[int]) -> list[float]:
+    """Fraction of the bucket priced strictly below each price (0.0 = cheapest)."""
+    if not sorted_prices:
+        return [0.0] * len(prices)
+    below = np.searchsorted(np.asarray(sorted_prices, dtype=np.int64), np.asarray(prices, dtype=np.int64))
+    return cast(list[float], (below / len(sorted_prices)).tolist())
+
+
+def _label_indexes(values, stats: MarketStats):
+    """Index into LABELS plus z-scores and deltas, for a scorable bucket."""
+    deltas = stats.median_price - values
+    z = deltas / stats.price_stddev
+
+    sorted_prices = stats.prices
+    gap = np.zeros(values.size, dtype=np.int64)
+    gap_pct = np.zeros(values.size, dtype=np.float64)
+    if len(sorted_prices) >= 2:
+        cheapest = values <= sorted_prices[0]
+        gap[cheapest] = sorted_prices[1] - sorted_prices[0]
+        if sorted_prices[1] > 0:
+            gap_pct[cheapest] = gap[cheapest] / sorted_prices[1]
+
+    rare = (z >= ZSCORE_RARE) & ((gap >= GAP_RARE_ABS) | (gap_pct >= GAP_RARE_PCT))
+    great = (z >= ZSCORE_GREAT) & ((gap >= GAP_GREAT_ABS) | (gap_pct >= GAP_GREAT_PCT))
+    label_idx = np.select([rare, great, z >= ZSCORE_GOOD, z >= -0.5], [0, 1, 2, 3], default=4)
+    if not stats.is_strong():
+        label_idx[label_idx == 0] = 1
+    return label_idx, z, deltas
+
+
+def _scorable(stats: MarketStats) -> bool:
+    return stats.is_scorable() and stats.median_price is not None and stats.price_stddev is not None
+
+
+def label_prices(prices: Sequence[int], stats: MarketStats) -> list[Optional[str]]:
+    """score_deal(...).label for many prices, without building DealValueScore objects."""
+    if not _scorable(stats):
+        return [None] * len(prices)
+    label_idx, _, _ = _label_indexes(np.asarray(prices, dtype=np.int64), stats)
+    return [LABELS[i] for i in label_idx.tolist()]
+
+
+def score_prices(prices: Sequence[int], stats: MarketStats) -> list[DealValueScore]:
+    """score_deal for many prices against the same bucket."""
+    values = np.asarray(prices, dtype=np.int64)
+    n = stats.sample_size
+    if values.size == 0:
+        return []
+
+    if not _scorable(stats):
+        if stats.median_price is None:
+            return [DealValueScore(comparable_sample_size=n) for _ in range(values.size)]
+        deltas = (stats.median_price - values).tolist()
+        return [
+            DealValueScore(
+                comparable_sample_size=n,
+                price_delta_amount=abs(d),
+                price_delta_direction="below" if d > 0 else "above",
+            )
+            for d in deltas
+        ]
+
+    label_idx, z, deltas = _label_indexes(values, stats)
+    return [
+        DealValueScore(
+            label=LABELS[label],
+            z_score=z_score,
+            price_delta_amount=abs(d),
+            price_delta_direction="below" if d > 0 else "above",
+            comparable_sample_size=n,
+        )
+        for label, z_score, d in zip(label_idx.tolist(), z.tolist(), deltas.tolist(), strict=True)
+    ]
@@ -28,7 +28,7 @@ from app.db.models.route_intel_cache import RouteIntelCache
 from app.db.models.signal import Signal
 from app.db.models.signal_intel_cache import SignalIntelCache
 from app.db.models.user import User
-from app.services.email_orchestrator import trigger as email_trigger, EmailType
+from app.services.email_orchestrator import trigger_many as email_trigger_many, EmailType
 from app.services.signal_intel import get_airport_arbitrage, get_departure_heatmap
 
 logger = logging.getLogger(__name__)
@@ -312,6 +312,7 @@ def _process_single_signal(
     signal_id_str: str,
     deals: list[dict],
     run_id: str,
+    heatmaps: dict[tuple[str, str], list[dict] | None] | None = None,
 ) -> dict | None:
     """Process intelligence + filtering for one signal. Returns context dict or None.
 
@@ -483,9 +484,15 @@ def _process_single_signal(
         if arbitrage:
             signal_context["arbitrage"] = arbitrage
 
-    # ── 4c. Departure heatmap (computed per-email) ──────────────────
+    # ── 4c. Departure heatmap (once per route per run when heatmaps is given) ──
     if deal_origin and deal_destination:
-        heatmap = get_departure_heatmap(db, deal_origin, deal_destination)
+        route_key = (deal_origin, deal_destination)
+        if heatmaps is not None and route_key in heatmaps:
+            heatmap = heatmaps[route_key]
+        else:
+            heatmap = get_departure_heatmap(db, deal_origin, deal_destination)
+            if heatmaps is not None:
+                heatmaps[route_key] = heatmap
         if heatmap:
             signal_context["departure_heatmap"] = heatmap
 
@@ -549,11 +556,13 @@ def process_signal_matches(
     Returns:
         List of orchestrator results (one per user).
     """
-    results = []
+    results: list[dict] = []
 
     # ── Phase 1: Process each signal individually ──────────────────
     # Collect per-signal contexts, grouped by user_id
     user_signals: dict[str, list[dict]] = defaultdict(list)
+    # Departure heatmaps by (origin, destination): signals on one route share them
+    heatmaps: dict[tuple[str, str], list[dict] | None] = {}
 
     for signal_id_str, deals in signal_deals.items():
         if not deals:
@@ -561,18 +570,24 @@ def process_signal_matches(
 
         sig_run_id = (run_ids or {}).get(signal_id_str, run_id or "unknown")
 
-        signal_ctx = _process_single_signal(db, signal_id_str, deals, sig_run_id)
+        signal_ctx = _process_single_signal(db, signal_id_str, deals, sig_run_id, heatmaps)
         if signal_ctx:
             user_id = signal_ctx.pop("_user_id")
             user_signals[user_id].append(signal_ctx)
 
-    # ── Phase 2: Build consolidated context per user & trigger email ──
+    # ── Phase 2: Build consolidated context per user & trigger emails ──
+    # Active signals for every user with activity, in one query
+    active_signals: dict[str, list] = defaultdict(list)
+    if user_signals:
+        for s in db.execute(
+            select(Signal.user_id, Signal.id, Signal.name)
+            .where(Signal.user_id.in_(list(user_signals)), Signal.status == "active")
+        ).all():
+            active_signals[str(s.user_id)].append(s)
+
+    items = []
     for user_id, signal_contexts in user_signals.items():
-        # Query user's total active signal count for quiet_signals
-        active_signal_count = db.execute(
-            select(Signal.id, Signal.name)
-            .where(Signal.user_id == user_id, Signal.status == "active")
-        ).all()
+        active_signal_count = active_signals.get(user_id, [])
 
         active_signal_ids = {str(s.id) for s in active_signal_count}
         activity_signal_ids = {sc["signal_id"] for sc in signal_contexts}
@@ -613,23 +628,21 @@ def process_signal_matches(
 
         # Idempotency key: one email per user per run
         first_run_id = signal_contexts[0].get("run_id", "unknown")
-        idempotency_key = f"match_alert:{user_id}:{first_run_id}"
-
-        try:
-            result = email_trigger(
-                db=db,
-                email_type=EmailType.MATCH_ALERT,
-                user_id=user_id,
-                context=context,
-                idempotency_key=idempotency_key,
-            )
-            results.append(result)
-        except Exception:
-            logger.exception(
-                "match_alert: failed to trigger consolidated email for user %s",
-                user_id,
-            )
-            results.append({"status": "error", "reason": "trigger_exception"})
+        items.append({
+            "user_id": user_id,
+            "context": context,
+            "idempotency_key": f"match_alert:{user_id}:{first_run_id}",
+        })
+
+    if not items:
+        return results
+
+    # trigger_many reports failures per item, so one bad chunk does not mark the rest
+    results.extend(email_trigger_many(
+        db=db,
+        email_type=EmailType.MATCH_ALERT,
+        items=items,
+    ))
 
     return results
 
@@ -14,9 +14,11 @@ is computed separately via refresh_route_intel_cache().
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from datetime import datetime, timezone
+from typing import Any, cast
 
-from sqlalchemy import func, select, text as sa_text
+from sqlalchemy import Table, func, select, text as sa_text
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
@@ -25,6 +27,7 @@ from app.db.models.deal_match import DealMatch
 from app.db.models.route_intel_cache import RouteIntelCache
 from app.db.models.signal import Signal
 from app.db.models.signal_intel_cache import SignalIntelCache
+from app.services.book_window import persist_book_windows
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +49,124 @@ NEARBY_AIRPORTS: dict[str, list[str]] = {
 }
 
 
+def _trend_values(weekly_avgs: Sequence[Any], prev_direction: str | None) -> dict:
+    """Modules 2, 2b, 2c from (week, avg_price) rows, newest first (at most 6).
+
+    prev_direction is the signal's cached trend_direction before this refresh.
+    """
+    values: dict = {}
+    if len(weekly_avgs) >= 2:
+        directions = []
+        week_deltas = []  # price change per week (newer - older, negative = dropping)
+        for i in range(len(weekly_avgs) - 1):
+            newer_price = weekly_avgs[i][1]
+            older_price = weekly_avgs[i + 1][1]
+            week_deltas.append(newer_price - older_price)
+            # Only count as directional if delta exceeds 2% of the older price
+            threshold = older_price * 0.02 if older_price else 0
+            if newer_price < older_price - threshold:
+                directions.append("down")
+            elif newer_price > older_price + threshold:
+                directions.append("up")
+            else:
+                directions.append("stable")
+
+        # Require majority of directions to agree; default to stable
+        down_count = sum(1 for d in directions if d == "down")
+        up_count = sum(1 for d in directions if d == "up")
+        total_dirs = len(directions)
+
+        if down_count > total_dirs / 2:
+            current_direction = "down"
+        elif up_count > total_dirs / 2:
+            current_direction = "up"
+        else:
+            current_direction = "stable"
+
+        consecutive = 1
+        for d in directions[1:]:
+            if d == current_direction:
+                consecutive += 1
+            else:
+                break
+
+        values["trend_direction"] = current_direction
+        values["trend_consecutive_weeks"] = consecutive
+
+        # ── Module 2b: Velocity — is the change accelerating or decelerating? ──
+        values["trend_last_week_delta_cents"] = week_deltas[0] if week_deltas else None
+        values["trend_prev_week_delta_cents"] = week_deltas[1] if len(week_deltas) >= 2 else None
+
+        if len(week_deltas) >= 2:
+            last_delta = abs(week_deltas[0])
+            prev_delta = abs(week_deltas[1])
+            # Both moving in the same direction?
+            same_direction = (
+                (week_deltas[0] < 0 and week_deltas[1] < 0)
+                or (week_deltas[0] > 0 and week_deltas[1] > 0)
+            )
+            if same_direction:
+                if last_delta > prev_delta * 1.15:  # 15% threshold
+                    values["trend_velocity"] = "accelerating"
+                elif last_delta < prev_delta * 0.85:
+                    values["trend_velocity"] = "decelerating"
+                else:
+                    values["trend_velocity"] = "steady"
+            else:
+                values["trend_velocity"] = "steady"
+        else:
+            values["trend_velocity"] = None
+
+        # ── Module 2c: Inflection Detection ──
+        if (
+            prev_direction is not None
+            and prev_direction == "down"
+            and current_direction == "up"
+            and len(week_deltas) >= 1
+            and weekly_avgs[1][1] > 0  # older week price > 0
+        ):
+            pct_change = round(week_deltas[0] / weekly_avgs[1][1] * 100, 1)
+            if pct_change > 3:  # Only flag meaningful inflections (>3%)
+                values["trend_inflection"] = True
+                values["inflection_pct_change"] = pct_change
+            else:
+                values["trend_inflection"] = False
+                values["inflection_pct_change"] = None
+        else:
+            values["trend_inflection"] = False
+            values["inflection_pct_change"] = None
+    else:
+        values["trend_direction"] = "stable"
+        values["trend_consecutive_weeks"] = 0
+        values["trend_velocity"] = None
+        values["trend_last_week_delta_cents"] = None
+        values["trend_prev_week_delta_cents"] = None
+        values["trend_inflection"] = False
+        values["inflection_pct_change"] = None
+    return values
+
+
+def _night_values(duration_stats: Sequence[Any]) -> dict:
+    """Module 3 from (nights, avg_per_night, sample_size) rows, cheapest per-night first."""
+    values: dict = {}
+    if len(duration_stats) >= 2:
+        best = duration_stats[0]
+        second = duration_stats[1]
+        values["best_value_nights"] = best[0]
+        if second[1] and second[1] > 0:
+            pct_saving = round((1 - best[1] / second[1]) * 100, 1)
+            values["best_value_pct_saving"] = pct_saving
+        else:
+            values["best_value_pct_saving"] = None
+    elif len(duration_stats) == 1:
+        values["best_value_nights"] = duration_stats[0][0]
+        values["best_value_pct_saving"] = None
+    else:
+        values["best_value_nights"] = None
+        values["best_value_pct_saving"] = None
+    return values
+
+
 def refresh_intel_cache(db: Session, signal_id) -> dict | None:
     """Recompute and upsert intelligence cache for a single signal.
 
@@ -105,100 +226,14 @@ def refresh_intel_cache(db: Session, signal_id) -> dict | None:
             {"sid": str(signal_id)},
         ).fetchall()
 
+        prev_direction = None
         if len(weekly_avgs) >= 2:
-            directions = []
-            week_deltas = []  # price change per week (newer - older, negative = dropping)
-            for i in range(len(weekly_avgs) - 1):
-                newer_price = weekly_avgs[i][1]
-                older_price = weekly_avgs[i + 1][1]
-                week_deltas.append(newer_price - older_price)
-                # Only count as directional if delta exceeds 2% of the older price
-                threshold = older_price * 0.02 if older_price else 0
-                if newer_price < older_price - threshold:
-                    directions.append("down")
-                elif newer_price > older_price + threshold:
-                    directions.append("up")
-                else:
-                    directions.append("stable")
-
-            # Require majority of directions to agree; default to stable
-            down_count = sum(1 for d in directions if d == "down")
-            up_count = sum(1 for d in directions if d == "up")
-            total_dirs = len(directions)
-
-            if down_count > total_dirs / 2:
-                current_direction = "down"
-            elif up_count > total_dirs / 2:
-                current_direction = "up"
-            else:
-                current_direction = "stable"
-
-            consecutive = 1
-            for d in directions[1:]:
-                if d == current_direction:
-                    consecutive += 1
-                else:
-                    break
-
-            values["trend_direction"] = current_direction
-            values["trend_consecutive_weeks"] = consecutive
-
-            # ── Module 2b: Velocity — is the change accelerating or decelerating? ──
-            values["trend_last_week_delta_cents"] = week_deltas[0] if week_deltas else None
-            values["trend_prev_week_delta_cents"] = week_deltas[1] if len(week_deltas) >= 2 else None
-
-            if len(week_deltas) >= 2:
-                last_delta = abs(week_deltas[0])
-                prev_delta = abs(week_deltas[1])
-                # Both moving in the same direction?
-                same_direction = (
-                    (week_deltas[0] < 0 and week_deltas[1] < 0)
-                    or (week_deltas[0] > 0 and week_deltas[1] > 0)
-                )
-                if same_direction:
-                    if last_delta > prev_delta * 1.15:  # 15% threshold
-                        values["trend_velocity"] = "accelerating"
-                    elif last_delta < prev_delta * 0.85:
-                        values["trend_velocity"] = "decelerating"
-                    else:
-                        values["trend_velocity"] = "steady"
-                else:
-                    values["trend_velocity"] = "steady"
-            else:
-                values["trend_velocity"] = None
-
-            # ── Module 2c: Inflection Detection ──
-            # Load previous cache to detect direction change
-            prev_cache = db.execute(
+            # Load previous cache to detect direction change (Module 2c)
+            prev_direction = db.execute(
                 select(SignalIntelCache.trend_direction)
                 .where(SignalIntelCache.signal_id == signal_id)
             ).scalar_one_or_none()
-
-            if (
-                prev_cache is not None
-                and prev_cache == "down"
-                and current_direction == "up"
-                and len(week_deltas) >= 1
-                and weekly_avgs[1][1] > 0  # older week price > 0
-            ):
-                pct_change = round(week_deltas[0] / weekly_avgs[1][1] * 100, 1)
-                if pct_change > 3:  # Only flag meaningful inflections (>3%)
-                    values["trend_inflection"] = True
-                    values["inflection_pct_change"] = pct_change
-                else:
-                    values["trend_inflection"] = False
-                    values["inflection_pct_change"] = None
-            else:
-                values["trend_inflection"] = False
-                values["inflection_pct_change"] = None
-        else:
-            values["trend_direction"] = "stable"
-            values["trend_consecutive_weeks"] = 0
-            values["trend_velocity"] = None
-            values["trend_last_week_delta_cents"] = None
-            values["trend_prev_week_delta_cents"] = None
-            values["trend_inflection"] = False
-            values["inflection_pct_change"] = None
+        values.update(_trend_values(weekly_avgs, prev_direction))
 
         # ── Module 3: Night Length Sweet Spot — Per-Night Value ──
         duration_stats = db.execute(
@@ -219,21 +254,7 @@ def refresh_intel_cache(db: Session, signal_id) -> dict | None:
             {"sid": str(signal_id)},
         ).fetchall()
 
-        if len(duration_stats) >= 2:
-            best = duration_stats[0]
-            second = duration_stats[1]
-            values["best_value_nights"] = best[0]
-            if second[1] and second[1] > 0:
-                pct_saving = round((1 - best[1] / second[1]) * 100, 1)
-                values["best_value_pct_saving"] = pct_saving
-            else:
-                values["best_value_pct_saving"] = None
-        elif len(duration_stats) == 1:
-            values["best_value_nights"] = duration_stats[0][0]
-            values["best_value_pct_saving"] = None
-        else:
-            values["best_value_nights"] = None
-            values["best_value_pct_saving"] = None
+        values.update(_night_values(duration_stats))
 
         # ── Module 4: Star-Price Anomaly Detection ──
         # Find the hero deal (cheapest active deal for this signal)
@@ -355,18 +376,284 @@ def _upsert(db: Session, values: dict) -> None:
     db.commit()
 
 
-def refresh_all_active_signal_caches(db: Session) -> int:
-    """Refresh intel cache for all active signals. Returns count refreshed."""
-    signal_ids = db.execute(
+# ── Set-based refresh (all signals in a handful of queries) ──────────────────
+
+_BULK_MATCH_STATS_SQL = sa_text("""
+    SELECT signal_id,
+           COUNT(*) AS total,
+           MIN(price_cents) AS min_price,
+           MIN(current_best) AS current_best,
+           COUNT(*) FILTER (WHERE price_cents < current_best) AS cheaper_count
+    FROM (
+        SELECT dm.signal_id, d.price_cents,
+               MIN(d.price_cents) FILTER (WHERE d.is_active = true)
+                   OVER (PARTITION BY dm.signal_id) AS current_best
+        FROM deal_matches dm
+        JOIN deals d ON d.id = dm.deal_id
+        WHERE dm.signal_id = ANY(CAST(:sids AS uuid[]))
+    ) m
+    GROUP BY signal_id
+""")
+
+_BULK_WEEKLY_AVGS_SQL = sa_text("""
+    SELECT signal_id, week, avg_price
+    FROM (
+        SELECT dm.signal_id,
+               DATE_TRUNC('week', dm.matched_at) AS week,
+               AVG(d.price_cents)::int AS avg_price,
+               ROW_NUMBER() OVER (
+                   PARTITION BY dm.signal_id ORDER BY DATE_TRUNC('week', dm.matched_at) DESC
+               ) AS rn
+        FROM deal_matches dm
+        JOIN deals d ON d.id = dm.deal_id
+        WHERE dm.signal_id = ANY(CAST(:sids AS uuid[]))
+        GROUP BY dm.signal_id, week
+    ) w
+    WHERE rn <= 6
+    ORDER BY signal_id, week DESC
+""")
+
+_BULK_NIGHTS_SQL = sa_text("""
+    SELECT signal_id, nights, avg_per_night, sample_size
+    FROM (
+        SELECT dm.signal_id,
+               (d.return_date - d.depart_date) AS nights,
+               AVG(d.price_cents / NULLIF((d.return_date - d.depart_date), 0))::int AS avg_per_night,
+               COUNT(*) AS sample_size,
+               ROW_NUMBER() OVER (
+                   PARTITION BY dm.signal_id
+                   ORDER BY AVG(d.price_cents / NULLIF((d.return_date - d.depart_date), 0))::int ASC,
+                            (d.return_date - d.depart_date) ASC
+               ) AS rn
+        FROM deal_matches dm
+        JOIN deals d ON d.id = dm.deal_id
+        WHERE dm.signal_id = ANY(CAST(:sids AS uuid[]))
+          AND d.return_date IS NOT NULL
+          AND d.return_date > d.depart_date
+        GROUP BY dm.signal_id, nights
+        HAVING COUNT(*) >= 10
+    ) n
+    WHERE rn <= 2
+    ORDER BY signal_id, rn
+""")
+
+# Hero deal per signal, then anomaly and value-score counts once per distinct
+# hero (many signals share a route and therefore a hero).
+_BULK_HERO_SQL = sa_text("""
+    WITH heroes AS (
+        SELECT DISTINCT ON (dm.signal_id)
+               dm.signal_id, d.price_cents, d.star_rating, d.origin, d.destination
+        FROM deal_matches dm
+        JOIN deals d ON d.id = dm.deal_id
+        WHERE dm.signal_id = ANY(CAST(:sids AS uuid[]))
+          AND d.is_active = true
+          AND d.star_rating IS NOT NULL
+        ORDER BY dm.signal_id, d.price_cents ASC
+    ),
+    hero_keys AS (
+        SELECT DISTINCT price_cents, star_rating, origin, destination
+        FROM heroes
+        WHERE star_rating > 0
+    ),
+    hero_counts AS (
+        SELECT k.price_cents, k.star_rating, k.origin, k.destination,
+               a.more_expensive, a.total_lower_star, v.better_count, v.total_count
+        FROM hero_keys k
+        CROSS JOIN LATERAL (
+            SELECT
+                COUNT(*) FILTER (WHERE d.price_cents > k.price_cents) AS more_expensive,
+                COUNT(*) AS total_lower_star
+            FROM deals d
+            WHERE d.is_active = true
+              AND d.origin = k.origin
+              AND d.destination = k.destination
+              AND d.star_rating IS NOT NULL
+              AND d.star_rating < k.star_rating
+        ) a
+        CROSS JOIN LATERAL (
+            SELECT
+                COUNT(*) FILTER (
+                    WHERE d.price_cents::float / (d.star_rating * NULLIF((d.return_date - d.depart_date), 0))
+                        > CAST(k.price_cents AS float) / (k.star_rating * NULLIF(7, 0))
+                ) AS better_count,
+                COUNT(*) AS total_count
+            FROM deals d
+            WHERE d.origin = k.origin
+              AND d.destination = k.destination
+              AND d.star_rating IS NOT NULL AND d.star_rating > 0
+              AND d.return_date IS NOT NULL AND d.return_date > d.depart_date
+        ) v
+    )
+    SELECT h.signal_id, h.star_rating,
+           c.more_expensive, c.total_lower_star, c.better_count, c.total_count
+    FROM heroes h
+    LEFT JOIN hero_counts c
+      ON c.price_cents = h.price_cents
+     AND c.star_rating = h.star_rating
+     AND c.origin = h.origin
+     AND c.destination = h.destination
+""")
+
+
+def compute_intel_values_bulk(db: Session, signal_ids: list) -> dict:
+    """Compute Modules 1-7 for many signals at once.
+
+    Produces the same values as refresh_intel_cache (value for value) using
+    one grouped/windowed query per module family instead of ~10 queries per
+    signal. Returns {signal_id: values}; signals with no matches only carry
+    total_matches, as in the per-signal path.
+    """
+    now = datetime.now(timezone.utc)
+    sids = list(signal_ids)
+    params = {"sids": sids}
+
+    match_stats = {row.signal_id: row for row in db.execute(_BULK_MATCH_STATS_SQL, params)}
+
+    weekly_avgs: dict = {}
+    for row in db.execute(_BULK_WEEKLY_AVGS_SQL, params):
+        weekly_avgs.setdefault(row.signal_id, []).append((row.week, row.avg_price))
+
+    duration_stats: dict = {}
+    for row in db.execute(_BULK_NIGHTS_SQL, params):
+        duration_stats.setdefault(row.signal_id, []).append(
+            (row.nights, row.avg_per_night, row.sample_size)
+        )
+
+    heroes = {row.signal_id: row for row in db.execute(_BULK_HERO_SQL, params)}
+
+    prev_directions: dict[Any, str | None] = {
+        row.signal_id: row.trend_direction
+        for row in db.execute(
+            select(SignalIntelCache.signal_id, SignalIntelCache.trend_direction)
+            .where(SignalIntelCache.signal_id.in_(sids))
+        )
+    }
+
+    results: dict = {}
+    for sid in sids:
+        values: dict = {"signal_id": sid, "cache_refreshed_at": now}
+        stats = match_stats.get(sid)
+        total = stats.total if stats is not None else 0
+        values["total_matches"] = total
+        if stats is None or total == 0:
+            results[sid] = values
+            continue
+
+        # Module 1
+        min_price = stats.min_price
+        current_best = stats.current_best
+        values["min_price_ever_cents"] = min_price
+        if current_best is not None and total > 1:
+            values["current_deal_percentile"] = round(stats.cheaper_count / total, 3)
+        else:
+            values["current_deal_percentile"] = 0.0
+
+        # Modules 2, 2b, 2c
+        weeks = weekly_avgs.get(sid, [])
+        prev_direction = prev_directions.get(sid) if len(weeks) >= 2 else None
+        values.update(_trend_values(weeks, prev_direction))
+
+        # Module 3
+        values.update(_night_values(duration_stats.get(sid, [])))
+
+        # Module 4
+        hero = heroes.get(sid)
+        if hero is not None and not (hero.star_rating is not None and hero.star_rating > 0):
+            hero = None
+        if hero is not None:
+            values["hero_star_rating"] = hero.star_rating
+            if hero.total_lower_star:
+                values["star_price_anomaly_pct"] = round(hero.more_expensive / hero.total_lower_star, 2)
+            else:
+                values["star_price_anomaly_pct"] = None
+        else:
+            values["star_price_anomaly_pct"] = None
+            values["hero_star_rating"] = None
+
+        # Module 5
+        if current_best is not None and min_price is not None and min_price > 0:
+            values["floor_proximity_pct"] = round(
+                (current_best - min_price) / min_price * 100, 1
+            )
+        else:
+            values["floor_proximity_pct"] = None
+
+        # Module 7
+        if hero is not None and hero.total_count:
+            score = round(hero.better_count / hero.total_count * 100)
+            values["value_score"] = min(100, max(0, score))
+        else:
+            values["value_score"] = None
+
+        results[sid] = values
+
+    return results
+
+
+def _bulk_upsert(db: Session, rows: list[dict]) -> int:
+    """Upsert many signal_intel_cache rows sharing the same keys. Returns rows written."""
+    if not rows:
+        return 0
+    keys = list(rows[0])
+    # Core table insert: the ORM bulk path would split batches on None values
+    table = cast(Table, SignalIntelCache.__table__)
+    stmt = pg_insert(table)
+    upsert = stmt.on_conflict_do_update(
+        index_elements=["signal_id"],
+        set_={k: stmt.excluded[k] for k in keys if k != "signal_id"},
+    ).returning(table.c.signal_id)
+    # RETURNING lets SQLAlchemy batch the rows into multi-row VALUES statements
+    return len(db.execute(upsert, [{k: row[k] for k in keys} for row in rows]).all())
+
+
+def refresh_intel_caches(db: Session, signal_ids: list) -> int:
+    """Set-based refresh of signal_intel_cache for many signals. Returns count refreshed.
+
+    Signals without matches only update total_matches and cache_refreshed_at,
+    leaving their other cached values untouched, exactly like _upsert does for
+    a single signal. Book Window results are stored alongside.
+    """
+    results = compute_intel_values_bulk(db, signal_ids)
+    empty = [v for v in results.values() if v["total_matches"] == 0]
+    full = [v for v in results.values() if v["total_matches"] > 0]
+    refreshed = _bulk_upsert(db, empty) + _bulk_upsert(db, full)
+    persist_book_windows(db, list(results))
+    db.commit()
+    return refreshed
+
+
+def refresh_all_active_signal_caches(db: Session, per_signal: bool = False) -> int:
+    """Refresh intel cache for all active signals. Returns count refreshed.
+
+    Uses the set-based refresh by default and falls back to refreshing one
+    signal at a time (per_signal=True) if the batch fails.
+    """
+    signal_ids = list(db.execute(
         select(Signal.id).where(Signal.status == "active")
-    ).scalars().all()
+    ).scalars())
 
     refreshed = 0
+    if not per_signal:
+        try:
+            refreshed = refresh_intel_caches(db, signal_ids)
+            logger.info("Refreshed intel cache for %d / %d active signals", refreshed, len(signal_ids))
+            return refreshed
+        except Exception:
+            logger.exception("Set-based intel cache refresh failed; falling back to per-signal refresh")
+            db.rollback()
+
     for sid in signal_ids:
         result = refresh_intel_cache(db, sid)
         if result is not None:
             refreshed += 1
 
+    try:
+        persist_book_windows(db, signal_ids)
+        db.commit()
+    except Exception:
+        logger.exception("Book window persist failed")
+        db.rollback()
+
     logger.info("Refreshed intel cache for %d / %d active signals", refreshed, len(signal_ids))
     return refreshed
 
@@ -376,136 +663,184 @@ def refresh_all_active_signal_caches(db: Session) -> int:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
-def refresh_route_intel_cache(db: Session) -> int:
+_ACTIVE_ROUTES_SQL = sa_text("""
+    SELECT DISTINCT origin, destination
+    FROM deals
+    WHERE is_active = true
+      AND depart_date >= CURRENT_DATE
+""")
+
+_TOUCHED_ACTIVE_ROUTES_SQL = sa_text("""
+    WITH r AS (
+        SELECT * FROM unnest(CAST(:origins AS text[]), CAST(:dests AS text[])) AS r(origin, destination)
+    )
+    SELECT DISTINCT d.origin, d.destination
+    FROM deals d
+    JOIN r ON d.origin = r.origin AND d.destination = r.destination
+    WHERE d.is_active = true
+      AND d.depart_date >= CURRENT_DATE
+""")
+
+# Departure Window Heatmap — average price by departure week (future dates only)
+_ROUTE_WEEKS_SQL = sa_text("""
+    WITH r AS (
+        SELECT * FROM unnest(CAST(:origins AS text[]), CAST(:dests AS text[])) AS r(origin, destination)
+    )
+    SELECT d.origin, d.destination,
+           DATE_TRUNC('week', d.depart_date)::date AS week,
+           AVG(d.price_cents)::int AS avg_price,
+           COUNT(*) AS deal_count
+    FROM deals d
+    JOIN r ON d.origin = r.origin AND d.destination = r.destination
+    WHERE d.depart_date >= CURRENT_DATE
+    GROUP BY d.origin, d.destination, week
+    HAVING COUNT(*) >= 3
+    ORDER BY d.origin, d.destination, avg_price ASC, week ASC
+""")
+
+# Destination Price Index — current week avg vs previous week avg
+_ROUTE_INDEX_SQL = sa_text("""
+    WITH r AS (
+        SELECT * FROM unnest(CAST(:origins AS text[]), CAST(:dests AS text[])) AS r(origin, destination)
+    )
+    SELECT d.origin, d.destination,
+        AVG(d.price_cents) FILTER (
+            WHERE d.depart_date >= DATE_TRUNC('week', CURRENT_DATE)
+        )::int AS current_week_avg,
+        AVG(d.price_cents) FILTER (
+            WHERE d.depart_date >= DATE_TRUNC('week', CURRENT_DATE) - INTERVAL '7 days'
+              AND d.depart_date < DATE_TRUNC('week', CURRENT_DATE)
+        )::int AS prev_week_avg
+    FROM deals d
+    JOIN r ON d.origin = r.origin AND d.destination = r.destination
+    WHERE d.is_active = true
+    GROUP BY d.origin, d.destination
+""")
+
+# Booking Countdown Pressure — average price by days-until-departure buckets
+_ROUTE_COUNTDOWN_SQL = sa_text("""
+    WITH r AS (
+        SELECT * FROM unnest(CAST(:origins AS text[]), CAST(:dests AS text[])) AS r(origin, destination)
+    )
+    SELECT d.origin, d.destination,
+        AVG(d.price_cents) FILTER (
+            WHERE (d.depart_date - d.found_at::date) >= 28
+        )::int AS avg_4plus_weeks,
+        AVG(d.price_cents) FILTER (
+            WHERE (d.depart_date - d.found_at::date) >= 14
+              AND (d.depart_date - d.found_at::date) < 28
+        )::int AS avg_2to4_weeks,
+        AVG(d.price_cents) FILTER (
+            WHERE (d.depart_date - d.found_at::date) < 14
+        )::int AS avg_under_2_weeks
+    FROM deals d
+    JOIN r ON d.origin = r.origin AND d.destination = r.destination
+    WHERE d.found_at IS NOT NULL
+    GROUP BY d.origin, d.destination
+""")
+
+
+def refresh_route_intel_cache(db: Session, routes: set[tuple[str, str]] | None = None) -> int:
     """Recompute route-level intelligence for all active routes.
 
     A route is any (origin, destination) pair with active deals.
     Computes: departure window heatmap, destination price index, booking countdown.
 
+    Each metric family is one query grouped by route over every route at once,
+    and the results are bulk-upserted. Pass ``routes`` (e.g. the routes of
+    deals upserted this cycle) to recompute only those routes; routes no
+    longer active are skipped, as in a full refresh.
+
     Returns count of routes refreshed.
     """
     try:
-        # Find all distinct active routes
-        routes = db.execute(
-            sa_text("""
-                SELECT DISTINCT origin, destination
-                FROM deals
-                WHERE is_active = true
-                  AND depart_date >= CURRENT_DATE
-            """)
-        ).fetchall()
-
-        refreshed = 0
+        if routes is None:
+            route_rows = db.execute(_ACTIVE_ROUTES_SQL).fetchall()
+        elif routes:
+            touched = sorted(routes)
+            route_rows = db.execute(_TOUCHED_ACTIVE_ROUTES_SQL, {
+                "origins": [o for o, _ in touched],
+                "dests": [d for _, d in touched],
+            }).fetchall()
+        else:
+            route_rows = []
+
+        # A route without an origin or region cannot be keyed in route_intel_cache
+        route_keys = sorted((o, d) for o, d in route_rows if o is not None and d is not None)
+        if len(route_keys) < len(route_rows):
+            logger.warning("Skipping %d routes with no origin or region", len(route_rows) - len(route_keys))
+        if not route_keys:
+            db.commit()
+            logger.info("Refreshed route intel cache for 0 / %d routes", len(route_rows))
+            return 0
+
+        params = {"origins": [o for o, _ in route_keys], "dests": [d for _, d in route_keys]}
         now = datetime.now(timezone.utc)
 
-        for origin, destination in routes:
-            try:
-                values: dict = {
-                    "origin": origin,
-                    "destination_region": destination,
-                    "cache_refreshed_at": now,
-                }
-
-                # ── Departure Window Heatmap ──
-                # Average price by departure week (future dates only)
-                week_prices = db.execute(
-                    sa_text("""
-                        SELECT DATE_TRUNC('week', depart_date)::date AS week,
-                               AVG(price_cents)::int AS avg_price,
-                               COUNT(*) AS deal_count
-                        FROM deals
-                        WHERE origin = :origin AND destination = :dest
-                          AND depart_date >= CURRENT_DATE
-                        GROUP BY week
-                        HAVING COUNT(*) >= 3
-                        ORDER BY avg_price ASC
-                    """),
-                    {"origin": origin, "dest": destination},
-                ).fetchall()
-
-                if week_prices:
-                    cheapest = week_prices[0]
-                    priciest = week_prices[-1]
-                    values["cheapest_depart_week"] = cheapest[0]
-                    values["cheapest_week_avg_cents"] = cheapest[1]
-                    values["priciest_depart_week"] = priciest[0]
-                    values["priciest_week_avg_cents"] = priciest[1]
-                    values["total_deals_analyzed"] = sum(w[2] for w in week_prices)
-
-                # ── Destination Price Index ──
-                # Current week avg vs previous week avg
-                index_result = db.execute(
-                    sa_text("""
-                        SELECT
-                            AVG(price_cents) FILTER (
-                                WHERE depart_date >= DATE_TRUNC('week', CURRENT_DATE)
-                            )::int AS current_week_avg,
-                            AVG(price_cents) FILTER (
-                                WHERE depart_date >= DATE_TRUNC('week', CURRENT_DATE) - INTERVAL '7 days'
-                                  AND depart_date < DATE_TRUNC('week', CURRENT_DATE)
-                            )::int AS prev_week_avg
-                        FROM deals
-                        WHERE origin = :origin AND destination = :dest
-                          AND is_active = true
-                    """),
-                    {"origin": origin, "dest": destination},
-                ).fetchone()
-
-                if index_result:
-                    values["current_week_avg_cents"] = index_result[0]
-                    values["prev_week_avg_cents"] = index_result[1]
-                    if index_result[0] and index_result[1] and index_result[1] > 0:
-                        values["week_over_week_pct"] = round(
-                            (index_result[0] - index_result[1]) / index_result[1] * 100, 1
-                        )
-
-                # ── Booking Countdown Pressure ──
-                # Average price by days-until-departure buckets
-                countdown_result = db.execute(
-                    sa_text("""
-                        SELECT
-                            AVG(price_cents) FILTER (
-                                WHERE (depart_date - found_at::date) >= 28
-                            )::int AS avg_4plus_weeks,
-                            AVG(price_cents) FILTER (
-                                WHERE (depart_date - found_at::date) >= 14
-                                  AND (depart_date - found_at::date) < 28
-                            )::int AS avg_2to4_weeks,
-                            AVG(price_cents) FILTER (
-                                WHERE (depart_date - found_at::date) < 14
-                            )::int AS avg_under_2_weeks
-                        FROM deals
-                        WHERE origin = :origin AND destination = :dest
-                          AND found_at IS NOT NULL
-                    """),
-                    {"origin": origin, "dest": destination},
-                ).fetchone()
-
-                if countdown_result:
-                    values["avg_price_4plus_weeks_cents"] = countdown_result[0]
-                    values["avg_price_2to4_weeks_cents"] = countdown_result[1]
-                    values["avg_price_under_2_weeks_cents"] = countdown_result[2]
-
-                    if countdown_result[0] and countdown_result[2] and countdown_result[0] > 0:
-                        values["late_booking_premium_pct"] = round(
-                            (countdown_result[2] - countdown_result[0]) / countdown_result[0] * 100, 1
-                        )
-
-                # Upsert route intel
-                stmt = pg_insert(RouteIntelCache).values(**values)
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=["origin", "destination_region"],
-                    set_={k: v for k, v in values.items() if k not in ("origin", "destination_region")},
-                )
-                db.execute(stmt)
-                refreshed += 1
+        week_prices: dict = {}
+        for row in db.execute(_ROUTE_WEEKS_SQL, params):
+            week_prices.setdefault((row.origin, row.destination), []).append(
+                (row.week, row.avg_price, row.deal_count)
+            )
+        index_results = {(row.origin, row.destination): row for row in db.execute(_ROUTE_INDEX_SQL, params)}
+        countdown_results = {
+            (row.origin, row.destination): row for row in db.execute(_ROUTE_COUNTDOWN_SQL, params)
+        }
+
+        # Rows are grouped by column set: metrics that could not be computed
+        # for a route are left out so their previously cached values survive.
+        rows_by_keys: dict[tuple, list[dict]] = {}
+        for origin, destination in route_keys:
+            values: dict = {
+                "origin": origin,
+                "destination_region": destination,
+                "cache_refreshed_at": now,
+            }
+
+            # ── Departure Window Heatmap ──
+            weeks = week_prices.get((origin, destination))
+            if weeks:
+                cheapest = weeks[0]
+                priciest = weeks[-1]
+                values["cheapest_depart_week"] = cheapest[0]
+                values["cheapest_week_avg_cents"] = cheapest[1]
+                values["priciest_depart_week"] = priciest[0]
+                values["priciest_week_avg_cents"] = priciest[1]
+                values["total_deals_analyzed"] = sum(w[2] for w in weeks)
+
+            # ── Destination Price Index ──
+            index_result = index_results.get((origin, destination))
+            current_avg = index_result.current_week_avg if index_result else None
+            prev_avg = index_result.prev_week_avg if index_result else None
+            values["current_week_avg_cents"] = current_avg
+            values["prev_week_avg_cents"] = prev_avg
+            if current_avg and prev_avg and prev_avg > 0:
+                values["week_over_week_pct"] = round((current_avg - prev_avg) / prev_avg * 100, 1)
+
+            # ── Booking Countdown Pressure ──
+            countdown = countdown_results.get((origin, destination))
+            avg_4plus = countdown.avg_4plus_weeks if countdown else None
+            avg_under_2 = countdown.avg_under_2_weeks if countdown else None
+            values["avg_price_4plus_weeks_cents"] = avg_4plus
+            values["avg_price_2to4_weeks_cents"] = countdown.avg_2to4_weeks if countdown else None
+            values["avg_price_under_2_weeks_cents"] = avg_under_2
+            if avg_4plus and avg_under_2 and avg_4plus > 0:
+                values["late_booking_premium_pct"] = round((avg_under_2 - avg_4plus) / avg_4plus * 100, 1)
+
+            rows_by_keys.setdefault(tuple(values), []).append(values)
 
-            except Exception:
-                logger.exception("Failed to refresh route intel for %s → %s", origin, destination)
-                continue
+        refreshed = 0
+        table = cast(Table, RouteIntelCache.__table__)
+        for keys, rows in rows_by_keys.items():
+            stmt = pg_insert(table)
+            upsert = stmt.on_conflict_do_update(
+                index_elements=["origin", "destination_region"],
+                set_={k: stmt.excluded[k] for k in keys if k not in ("origin", "destination_region")},
+            ).returning(table.c.origin)
+            refreshed += len(db.execute(upsert, rows).all())
 
         db.commit()
-        logger.info("Refreshed route intel cache for %d / %d routes", refreshed, len(routes))
+        logger.info("Refreshed route intel cache for %d / %d routes", refreshed, len(route_rows))
         return refreshed
 
     except Exception:
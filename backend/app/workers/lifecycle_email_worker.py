@@ -22,6 +22,9 @@ from __future__ import annotations
 import logging
 import os
 import time
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import func, select
@@ -36,6 +39,7 @@ from app.services.email_orchestrator import (
     EmailType,
     drain_deferred_emails,
     trigger as email_trigger,
+    trigger_many as email_trigger_many,
 )
 from app.services.email_queue import drain as drain_email_queue
 
@@ -605,150 +609,184 @@ def _run_user_mode_refresh(db: Session, now: datetime) -> dict:
 
 # ── Job 9: Weekly digest (passive users, Sundays only) ──────────────────────
 
+# Passive users whose digests are built and triggered per round of queries
+WEEKLY_DIGEST_BATCH = 1000
+# Cheapest deals per signal considered for a digest
+WEEKLY_DIGEST_DEALS_PER_SIGNAL = 10
+
+
 def _run_weekly_digests(db: Session, now: datetime) -> int:
     """Send WEEKLY_DIGEST to passive users on Sundays.
 
     For each passive user, find the best deals from their signals over the
     last 7 days. If no deals found that week, skip silently (per spec).
     Returns the number of digests sent.
+
+    Users are processed in batches of WEEKLY_DIGEST_BATCH: signals, the top
+    deals per signal and signal intel are loaded with one query each, and
+    the batch is handed to the orchestrator in one trigger_many() call.
+    Destination indexes and departure heatmaps are computed once per
+    airport / (airport, region) for the whole run.
     """
     # Only send on Sundays (weekday 6)
     if now.weekday() != 6:
         return 0
 
-    # Only send once per Sunday — check if we already ran today
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     # Use a simple time window: only run between 8-10 AM UTC on Sundays
     if now.hour < 8 or now.hour >= 10:
         return 0
 
-    from app.db.models.deal import Deal
-    from app.db.models.signal_intel_cache import SignalIntelCache
-
-    passive_users = db.execute(
-        select(User).where(
+    passive_user_ids = db.execute(
+        select(User.id).where(
             User.email_mode == "passive",
             User.deleted_at.is_(None),
             User.email_opt_out == False,  # noqa: E712
             User.email != "",
-        )
+        ).order_by(User.id)
     ).scalars().all()
 
-    week_ago = now - timedelta(days=7)
-    week_iso = now.strftime("%Y-W%W")
+    route_memo: dict = {}
     sent = 0
+    for start in range(0, len(passive_user_ids), WEEKLY_DIGEST_BATCH):
+        batch = passive_user_ids[start:start + WEEKLY_DIGEST_BATCH]
+        items = _build_weekly_digests(db, batch, now, route_memo)
+        if not items:
+            continue
+        try:
+            results = email_trigger_many(db=db, email_type=EmailType.WEEKLY_DIGEST, items=items)
+        except Exception:
+            logger.exception("weekly_digest failed for a batch of %d users", len(items))
+            db.rollback()
+            continue
+        sent += sum(1 for r in results if r["status"] != "error")
 
-    for user in passive_users:
-        # Get all active signals for this user
-        signals = db.execute(
-            select(Signal).where(
-                Signal.user_id == user.id,
-                Signal.status == "active",
-            )
-        ).scalars().all()
+    if passive_user_ids:
+        logger.info("weekly_digest: checked %d passive users, sent %d", len(passive_user_ids), sent)
+    return sent
 
-        if not signals:
-            continue
 
-        # Find best deals across all signals from the past 7 days
-        all_deals = []
-        best_intel = None
-        for sig in signals:
-            deals = db.execute(
-                select(
-                    Deal.hotel_name, Deal.price_cents, Deal.depart_date,
-                    Deal.return_date, Deal.star_rating,
-                )
-                .join(DealMatch, DealMatch.deal_id == Deal.id)
-                .where(
-                    DealMatch.signal_id == sig.id,
-                    DealMatch.matched_at >= week_ago,
-                )
-                .order_by(Deal.price_cents.asc())
-                .limit(10)
-            ).all()
-
-            for d in deals:
-                nights = 7
-                if d.return_date and d.depart_date:
-                    nights = (d.return_date - d.depart_date).days or 7
-                all_deals.append({
-                    "hotel_name": d.hotel_name or "",
-                    "star_rating": d.star_rating,
-                    "price_cents": d.price_cents,
-                    "duration_nights": nights,
-                    "depart_date": str(d.depart_date) if d.depart_date else "",
-                })
-
-            # Grab intel for context
-            if not best_intel:
-                best_intel = db.execute(
-                    select(SignalIntelCache).where(SignalIntelCache.signal_id == sig.id)
-                ).scalar_one_or_none()
+def _build_weekly_digests(
+    db: Session, user_ids: Sequence[uuid.UUID], now: datetime, route_memo: dict,
+) -> list[dict]:
+    """trigger_many() items for the users that had deals this week.
+
+    route_memo caches destination indexes ("index", airport) and departure
+    heatmaps ("heatmap", airport, region) across batches.
+    """
+    from app.db.models.deal import Deal
+    from app.db.models.signal_intel_cache import SignalIntelCache
+    from app.services.signal_intel import get_departure_heatmap, get_destination_index
 
+    week_ago = now - timedelta(days=7)
+    week_iso = now.strftime("%Y-W%W")
+
+    signals_by_user: dict = defaultdict(list)
+    for sig in db.execute(
+        select(
+            Signal.id, Signal.user_id, Signal.name, Signal.created_at,
+            Signal.departure_airports, Signal.destination_regions,
+        )
+        .where(Signal.user_id.in_(user_ids), Signal.status == "active")
+        .order_by(Signal.user_id, Signal.created_at, Signal.id)
+    ).all():
+        signals_by_user[sig.user_id].append(sig)
+    if not signals_by_user:
+        return []
+    signal_ids = [sig.id for sigs in signals_by_user.values() for sig in sigs]
+
+    # Cheapest deals matched this week, per signal
+    ranked = (
+        select(
+            DealMatch.signal_id, Deal.hotel_name, Deal.price_cents, Deal.depart_date,
+            Deal.return_date, Deal.star_rating,
+            func.row_number().over(
+                partition_by=DealMatch.signal_id, order_by=(Deal.price_cents.asc(), Deal.id),
+            ).label("rank"),
+        )
+        .join(Deal, Deal.id == DealMatch.deal_id)
+        .where(DealMatch.signal_id.in_(signal_ids), DealMatch.matched_at >= week_ago)
+        .subquery()
+    )
+    deals_by_signal: dict = defaultdict(list)
+    for d in db.execute(
+        select(ranked)
+        .where(ranked.c.rank <= WEEKLY_DIGEST_DEALS_PER_SIGNAL)
+        .order_by(ranked.c.signal_id, ranked.c.rank)
+    ).all():
+        nights = 7
+        if d.return_date and d.depart_date:
+            nights = (d.return_date - d.depart_date).days or 7
+        deals_by_signal[d.signal_id].append({
+            "hotel_name": d.hotel_name or "",
+            "star_rating": d.star_rating,
+            "price_cents": d.price_cents,
+            "duration_nights": nights,
+            "depart_date": str(d.depart_date) if d.depart_date else "",
+        })
+
+    intel_by_signal = {
+        intel.signal_id: intel
+        for intel in db.execute(
+            select(
+                SignalIntelCache.signal_id, SignalIntelCache.trend_direction,
+                SignalIntelCache.trend_consecutive_weeks, SignalIntelCache.best_value_nights,
+                SignalIntelCache.best_value_pct_saving, SignalIntelCache.total_matches,
+            ).where(SignalIntelCache.signal_id.in_(signal_ids))
+        ).all()
+    }
+
+    items = []
+    for user_id, signals in signals_by_user.items():
+        all_deals = [deal for sig in signals for deal in deals_by_signal.get(sig.id, [])]
         # Spec: skip silently if no deals found that week
         if not all_deals:
             continue
 
         # Sort by price, take best
         all_deals.sort(key=lambda d: d["price_cents"])
+        best_intel = next((intel_by_signal[sig.id] for sig in signals if sig.id in intel_by_signal), None)
 
-        days_monitoring = 0
-        first_signal = signals[0] if signals else None
-        if first_signal and first_signal.created_at:
-            days_monitoring = (now - first_signal.created_at).days
+        first_signal = signals[0]
+        days_monitoring = (now - first_signal.created_at).days if first_signal.created_at else 0
 
-        # Get destination price index for the user's primary departure airport
+        # Destination price index for the user's primary departure airport,
+        # and the departure heatmap towards the first signal's first region
+        primary_airport = next((sig.departure_airports[0] for sig in signals if sig.departure_airports), None)
         dest_index = None
-        primary_airport = None
-        for sig in signals:
-            if sig.departure_airports:
-                primary_airport = sig.departure_airports[0]
-                break
-        if primary_airport:
-            from app.services.signal_intel import get_destination_index, get_departure_heatmap
-            dest_index = get_destination_index(db, primary_airport, limit=5)
-
-        # Departure heatmap for the user's primary route
         heatmap = None
-        if primary_airport and first_signal:
-            # Use the first signal's destination regions to get a heatmap
+        if primary_airport:
+            index_key = ("index", primary_airport)
+            if index_key not in route_memo:
+                route_memo[index_key] = get_destination_index(db, primary_airport, limit=5)
+            dest_index = route_memo[index_key]
             dest_regions = first_signal.destination_regions or []
             if dest_regions:
-                heatmap = get_departure_heatmap(db, primary_airport, dest_regions[0])
-
-        context = {
-            "deal_count": len(all_deals),
-            "deals": all_deals[:5],  # Top 5 deals
-            "signal_name": first_signal.name if first_signal else "your signals",
-            "route": "",
-            "destination": "",
-            "best_price_cents": all_deals[0]["price_cents"] if all_deals else None,
-            "trend_direction": best_intel.trend_direction if best_intel else "stable",
-            "trend_weeks": best_intel.trend_consecutive_weeks if best_intel else 0,
-            "best_value_nights": best_intel.best_value_nights if best_intel else None,
-            "best_value_pct_saving": best_intel.best_value_pct_saving if best_intel else None,
-            "total_matches": best_intel.total_matches if best_intel else 0,
-            "days_monitoring": days_monitoring,
-            "week_iso": week_iso,
-            "destination_index": dest_index or None,
-            "departure_heatmap": heatmap,
-        }
-
-        try:
-            email_trigger(
-                db=db,
-                email_type=EmailType.WEEKLY_DIGEST,
-                user_id=str(user.id),
-                context=context,
-            )
-            sent += 1
-        except Exception:
-            logger.exception("weekly_digest failed for %s", user.email)
-
-    if passive_users:
-        logger.info("weekly_digest: checked %d passive users, sent %d", len(passive_users), sent)
-    return sent
+                heatmap_key = ("heatmap", primary_airport, dest_regions[0])
+                if heatmap_key not in route_memo:
+                    route_memo[heatmap_key] = get_departure_heatmap(db, primary_airport, dest_regions[0])
+                heatmap = route_memo[heatmap_key]
+
+        items.append({
+            "user_id": str(user_id),
+            "context": {
+                "deal_count": len(all_deals),
+                "deals": all_deals[:5],  # Top 5 deals
+                "signal_name": first_signal.name,
+                "route": "",
+                "destination": "",
+                "best_price_cents": all_deals[0]["price_cents"],
+                "trend_direction": best_intel.trend_direction if best_intel else "stable",
+                "trend_weeks": best_intel.trend_consecutive_weeks if best_intel else 0,
+                "best_value_nights": best_intel.best_value_nights if best_intel else None,
+                "best_value_pct_saving": best_intel.best_value_pct_saving if best_intel else None,
+                "total_matches": best_intel.total_matches if best_intel else 0,
+                "days_monitoring": days_monitoring,
+                "week_iso": week_iso,
+                "destination_index": dest_index or None,
+                "departure_heatmap": heatmap,
+            },
+        })
+    return items
 
 
 # ── Job 10: Hard-delete cleanup (soft-deleted users >30 days) ────────────────
@@ -21,18 +21,16 @@ import time
 import traceback
 from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 from curl_cffi.requests import Session as CffiSession
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.db.models.deal import Deal
-from app.db.models.deal_match import DealMatch
 from app.db.session import get_db
 from app.workers.shared.regions import map_destination_to_region
-from app.workers.shared.matching import match_deal_to_signals
-from app.workers.shared.upsert import upsert_deal
+from app.workers.shared.matching import bulk_create_deal_matches, load_signal_index, match_deal_to_signals
+from app.workers.shared.staleness import deactivate_expired_deals, mark_unseen_deals
+from app.workers.shared.upsert import bulk_upsert_deals
 from app.workers.shared.browser_profiles import (
     check_ua_staleness,
     pick_cycle_profile,
@@ -99,6 +97,18 @@ REDTAG_DEAL_CITIES = {
 # Regex to extract data-deal JSON from Continue buttons
 _DATA_DEAL_RE = re.compile(r'data-deal="([^"]+)"')
 
+# Pre-filters read from the still HTML-escaped JSON ("MealType":"AI" -> &quot;MealType&quot;:&quot;AI&quot;)
+_ENCODED_QUOTE = r'(?:&quot;|&#34;|&#x22;|")'
+_ENCODED_MEAL_TYPE_RE = re.compile(
+    r"MealType" + _ENCODED_QUOTE + r"\s*:\s*" + _ENCODED_QUOTE + r"([^&\"]*)"
+)
+_ENCODED_DEPARTURE_RE = re.compile(
+    r"DepartureCode" + _ENCODED_QUOTE + r"\s*:\s*" + _ENCODED_QUOTE + r"([^&\"]*)"
+)
+
+# Deals per upsert/match batch while a page is still being parsed
+_STREAM_BATCH_SIZE = 50
+
 # Block detection: HTTP codes and page body markers
 _BLOCK_STATUS_CODES = {403, 429, 503}
 _BLOCK_MARKERS = [
@@ -205,6 +215,11 @@ def parse_date(date_str: str) -> Optional[date]:
     if not date_str:
         return None
     date_str = date_str.strip()
+    if len(date_str) == 8 and date_str.isdigit():
+        try:
+            return date(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:]))
+        except ValueError:
+            return None
     for fmt in ("%Y%m%d", "%Y-%m-%d", "%b %d, %Y"):
         try:
             return datetime.strptime(date_str, fmt).date()
@@ -214,48 +229,68 @@ def parse_date(date_str: str) -> Optional[date]:
 
 
 
-def parse_deals_from_html(html_str: str, city: str) -> list[dict]:
-    """Extract deal metadata dicts from data-deal JSON attributes in listing HTML.
+def _unescape_attribute(value: str) -> str:
+    """html.unescape for data-deal values, skipping the generic entity scan when only &quot; is used."""
+    value = value.replace("&quot;", '"')
+    return html_module.unescape(value) if "&" in value else value
+
 
-    Only returns All Inclusive (MealType == "AI") packages.
+def iter_deals_from_html(html_str: str, city: str) -> Iterator[dict]:
+    """Yield deal metadata dicts from data-deal JSON attributes as they are found.
+
+    Only yields All Inclusive (MealType == "AI") packages.
     Validates that each deal's DepartureCode matches the expected gateway for this city
     to catch RedTag fallback pages that silently return deals from a different city.
-    Deduplicates by dedupe_key.
-    """
-    raw_matches = _DATA_DEAL_RE.findall(html_str)
-    if not raw_matches:
-        return []
+    Deduplicates by dedupe_key as it goes.
 
+    Attributes are scanned one at a time with finditer. MealType and
+    DepartureCode are read straight from the still-encoded attribute, so deals
+    that would be discarded never pay for html.unescape + json.loads. Attributes
+    whose fields the pre-filter cannot read are fully decoded and checked as before.
+    """
     expected_gateway = REDTAG_DEAL_CITIES.get(city, "")
-    deals = []
     seen_keys = set()
     skipped_count = 0
-    total_count = len(raw_matches)
+    total_count = 0
     last_actual_departure = ""
 
-    for encoded_json in raw_matches:
-        try:
-            deal = json.loads(html_module.unescape(encoded_json))
-        except (json.JSONDecodeError, Exception) as e:
-            logger.warning("Failed to parse data-deal JSON: %s", e)
-            continue
+    for match in _DATA_DEAL_RE.finditer(html_str):
+        total_count += 1
+        encoded_json = match.group(1)
 
         # Validate departure code matches the expected city gateway.
         # RedTag sometimes returns another city's deals (e.g. fallback to Toronto)
         # when a city page has no real inventory.
         if expected_gateway:
-            actual_departure_raw = deal.get("DepartureCode", "")
-            actual_departure = actual_departure_raw.split(",")[0].strip() if actual_departure_raw else ""
+            departure = _ENCODED_DEPARTURE_RE.search(encoded_json)
+            actual_departure = departure.group(1).split(",")[0].strip() if departure else ""
             if actual_departure and actual_departure != expected_gateway:
-                logger.warning(
-                    "Departure code mismatch for %s: expected %s, got %s — skipping deal (hotel=%s)",
+                logger.debug(
+                    "Departure code mismatch for %s: expected %s, got %s — skipping deal",
                     city, expected_gateway, actual_departure,
-                    deal.get("HotelName", "unknown"),
                 )
                 skipped_count += 1
                 last_actual_departure = actual_departure
                 continue
 
+        meal_type = _ENCODED_MEAL_TYPE_RE.search(encoded_json)
+        if meal_type and meal_type.group(1) != "AI":
+            continue
+
+        try:
+            deal = json.loads(_unescape_attribute(encoded_json))
+        except (json.JSONDecodeError, Exception) as e:
+            logger.warning("Failed to parse data-deal JSON: %s", e)
+            continue
+
+        if expected_gateway and not departure:
+            actual_departure_raw = deal.get("DepartureCode", "")
+            actual_departure = actual_departure_raw.split(",")[0].strip() if actual_departure_raw else ""
+            if actual_departure and actual_departure != expected_gateway:
+                skipped_count += 1
+                last_actual_departure = actual_departure
+                continue
+
         deal_meta = _parse_single_deal(deal, city)
         if not deal_meta:
             continue
@@ -263,7 +298,7 @@ def parse_deals_from_html(html_str: str, city: str) -> list[dict]:
         if deal_meta["dedupe_key"] in seen_keys:
             continue
         seen_keys.add(deal_meta["dedupe_key"])
-        deals.append(deal_meta)
+        yield deal_meta
 
     if skipped_count > 0:
         logger.warning(
@@ -271,7 +306,22 @@ def parse_deals_from_html(html_str: str, city: str) -> list[dict]:
             city, skipped_count, total_count, last_actual_departure, expected_gateway,
         )
 
-    return deals
+
+def parse_deals_from_html(html_str: str, city: str) -> list[dict]:
+    """Extract all deal metadata dicts from a listing page. See iter_deals_from_html."""
+    return list(iter_deals_from_html(html_str, city))
+
+
+def _batched(items: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    """Group a stream of deals into lists of at most ``size``."""
+    batch: list[dict] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 def _parse_single_deal(deal: dict, city: str) -> Optional[dict]:
@@ -406,6 +456,13 @@ def run_once(dry_run: bool = False) -> dict:
     session = _create_session(cycle_profile, proxy_url)
     logger.info("Cycle browser profile: %s (%s)", cycle_profile["impersonate"], cycle_profile["platform"])
 
+    # Pre-load and index active signals once for the entire cycle
+    signal_index = None
+    if not dry_run:
+        with next(get_db()) as sig_db:
+            signal_index = load_signal_index(sig_db)
+        logger.info("Loaded %d active signals for matching", len(signal_index))
+
     # Shuffle city order each cycle for unpredictable access pattern
     city_items = list(REDTAG_DEAL_CITIES.items())
     random.shuffle(city_items)
@@ -428,14 +485,14 @@ def run_once(dry_run: bool = False) -> dict:
             cycle_errors.append({"city": city, "error": "Fetch failed or blocked", "type": "block"})
             break
 
-        deals = parse_deals_from_html(html, city)
-        logger.info("Parsed %d AI deals from %s", len(deals), city)
-
-        if not deals:
-            continue
+        # Deals stream out of the page; each batch is upserted and matched
+        # while the rest of the page is still being parsed
+        deal_stream = iter_deals_from_html(html, city)
+        parsed_count = 0
 
         if dry_run:
-            for deal_meta in deals:
+            for deal_meta in deal_stream:
+                parsed_count += 1
                 total_deals += 1
                 logger.info(
                     "[DRY-RUN] #%d %s | %s→%s | %s | %d nights | $%d/pp",
@@ -445,68 +502,86 @@ def run_once(dry_run: bool = False) -> dict:
                 )
         else:
             with next(get_db()) as db:
-                for deal_meta in deals:
+                for deals in _batched(deal_stream, _STREAM_BATCH_SIZE):
+                    parsed_count += len(deals)
+                    # One INSERT ... ON CONFLICT and one commit per batch
                     try:
-                        deal_obj = upsert_deal(db, "redtag", deal_meta)
-                        if not deal_obj:
-                            continue
-
-                        seen_dedupe_keys.add(deal_obj.dedupe_key)
-                        total_deals += 1
-
-                        matched_signals = match_deal_to_signals(db, deal_obj, deal_meta)
-                        for signal in matched_signals:
-                            existing = db.execute(
-                                select(DealMatch).where(
-                                    DealMatch.signal_id == signal.id,
-                                    DealMatch.deal_id == deal_obj.id,
-                                )
-                            ).scalar_one_or_none()
-
-                            if existing:
-                                continue
-
+                        page_deals = bulk_upsert_deals(db, "redtag", deals)
+                    except Exception as e:
+                        logger.error("Error upserting deals for %s: %s", city, e)
+                        db.rollback()
+                        cycle_errors.append({"city": city, "error": str(e), "type": "error"})
+                        page_deals = []
+                    meta_by_key = {d["dedupe_key"]: d for d in deals}
+
+                    # (signal, deal, duration_days) for every matched pair in the batch
+                    page_matches: list[tuple] = []
+                    for deal_obj in page_deals:
+                        deal_meta = meta_by_key[deal_obj.dedupe_key]
+                        try:
+                            seen_dedupe_keys.add(deal_obj.dedupe_key)
+                            total_deals += 1
+
+                            matched_signals = match_deal_to_signals(db, deal_obj, deal_meta, signals=signal_index)
                             duration_days = deal_meta.get("duration_days", 7)
-                            ppn = deal_obj.price_cents // duration_days if duration_days > 0 else None
-                            match = DealMatch(
-                                signal_id=signal.id,
-                                deal_id=deal_obj.id,
-                                price_per_night_cents=ppn,
-                            )
-                            db.add(match)
-                            db.commit()
-                            total_matches += 1
-                            logger.info(
-                                "Match: %s -> %s %s $%d",
-                                signal.name, deal_obj.destination,
-                                deal_obj.depart_date, deal_obj.price_cents // 100,
-                            )
-
-                            # Accumulate for match alerts
-                            sig_key = str(signal.id)
-                            v2_signal_deals[sig_key].append({
-                                "deal_id": str(deal_obj.id),
-                                "price_cents": deal_obj.price_cents,
-                                "price_dropped": getattr(deal_obj, "_price_dropped", False),
-                                "price_delta": getattr(deal_obj, "_price_delta", 0),
-                                "hotel_name": deal_obj.hotel_name or "",
-                                "hotel_id": deal_obj.hotel_id or "",
-                                "star_rating": deal_obj.star_rating,
-                                "depart_date": deal_obj.depart_date,
-                                "return_date": deal_obj.return_date,
-                                "duration_nights": duration_days,
-                                "destination": deal_obj.destination or "",
-                                "destination_str": deal_obj.destination_str or deal_obj.destination or "",
-                                "origin": deal_obj.origin or "",
-                                "deeplink_url": deal_obj.deeplink_url or "",
-                                "provider": "redtag",
-                            })
+                            for signal in matched_signals:
+                                page_matches.append((signal, deal_obj, duration_days))
 
+                        except Exception as e:
+                            logger.error("Error processing deal: %s", e)
+                            cycle_errors.append({"city": city, "error": str(e), "type": "error"})
+                            continue
+
+                    # One INSERT ... ON CONFLICT DO NOTHING per batch; only the
+                    # pairs that were actually inserted are alerted on
+                    try:
+                        created = bulk_create_deal_matches(db, [
+                            {
+                                "signal_id": signal.id,
+                                "deal_id": deal_obj.id,
+                                "price_per_night_cents": (
+                                    deal_obj.price_cents // duration_days if duration_days > 0 else None
+                                ),
+                            }
+                            for signal, deal_obj, duration_days in page_matches
+                        ])
                     except Exception as e:
-                        logger.error("Error processing deal: %s", e)
+                        logger.error("Error saving matches for %s: %s", city, e)
                         db.rollback()
                         cycle_errors.append({"city": city, "error": str(e), "type": "error"})
-                        continue
+                        created = set()
+
+                    for signal, deal_obj, duration_days in page_matches:
+                        if (signal.id, deal_obj.id) not in created:
+                            continue
+                        total_matches += 1
+                        logger.info(
+                            "Match: %s -> %s %s $%d",
+                            signal.name, deal_obj.destination,
+                            deal_obj.depart_date, deal_obj.price_cents // 100,
+                        )
+
+                        # Accumulate for match alerts
+                        sig_key = str(signal.id)
+                        v2_signal_deals[sig_key].append({
+                            "deal_id": str(deal_obj.id),
+                            "price_cents": deal_obj.price_cents,
+                            "price_dropped": getattr(deal_obj, "_price_dropped", False),
+                            "price_delta": getattr(deal_obj, "_price_delta", 0),
+                            "hotel_name": deal_obj.hotel_name or "",
+                            "hotel_id": deal_obj.hotel_id or "",
+                            "star_rating": deal_obj.star_rating,
+                            "depart_date": deal_obj.depart_date,
+                            "return_date": deal_obj.return_date,
+                            "duration_nights": duration_days,
+                            "destination": deal_obj.destination or "",
+                            "destination_str": deal_obj.destination_str or deal_obj.destination or "",
+                            "origin": deal_obj.origin or "",
+                            "deeplink_url": deal_obj.deeplink_url or "",
+                            "provider": "redtag",
+                        })
+
+        logger.info("Parsed %d AI deals from %s", parsed_count, city)
 
         # Human-like delay between pages
         if pages_fetched < len(REDTAG_DEAL_CITIES):
@@ -518,25 +593,14 @@ def run_once(dry_run: bool = False) -> dict:
     if not dry_run and seen_dedupe_keys and not blocked:
         try:
             with next(get_db()) as db:
-                unseen = db.query(Deal).filter(
-                    Deal.is_active,
-                    Deal.provider == "redtag",
-                    Deal.dedupe_key.notin_(seen_dedupe_keys),
-                ).all()
-                deactivated_now = datetime.now(timezone.utc)
-                newly_deactivated = 0
-                for deal in unseen:
-                    deal.missed_cycles = (deal.missed_cycles or 0) + 1
-                    if deal.missed_cycles >= DEACTIVATION_THRESHOLD:
-                        deal.is_active = False
-                        deal.deactivated_at = deactivated_now
-                        newly_deactivated += 1
-                db.commit()
+                unseen, newly_deactivated = mark_unseen_deals(
+                    db, "redtag", seen_dedupe_keys, DEACTIVATION_THRESHOLD,
+                )
                 deals_deactivated = newly_deactivated
                 if unseen:
                     logger.info(
                         "Staleness: %d unseen (%d incremented, %d deactivated after %d+ misses)",
-                        len(unseen), len(unseen) - newly_deactivated,
+                        unseen, unseen - newly_deactivated,
                         newly_deactivated, DEACTIVATION_THRESHOLD,
                     )
         except Exception as e:
@@ -547,18 +611,9 @@ def run_once(dry_run: bool = False) -> dict:
     if not dry_run:
         try:
             with next(get_db()) as db:
-                expired = db.query(Deal).filter(
-                    Deal.is_active,
-                    Deal.provider == "redtag",
-                    Deal.depart_date < date.today(),
-                ).all()
+                expired = deactivate_expired_deals(db, "redtag")
                 if expired:
-                    deactivated_now = datetime.now(timezone.utc)
-                    for deal in expired:
-                        deal.is_active = False
-                        deal.deactivated_at = deactivated_now
-                    db.commit()
-                    logger.info("Marked %d expired RedTag deals inactive", len(expired))
+                    logger.info("Marked %d expired RedTag deals inactive", expired)
         except Exception as e:
             logger.error("Expired deal cleanup failed: %s", e)
             cycle_errors.append({"error": str(e), "type": "expired_cleanup"})
@@ -438,6 +438,24 @@ def run_orchestrated_cycle() -> dict:
     # if not _shutdown_requested:
     #     _run_ta_enrichment(results)
 
+    # --- Rebuild precomputed market bucket stats ---
+    try:
+        from app.services.market_intel import refresh_market_bucket_stats
+        from app.db.session import get_db
+        with next(get_db()) as db:
+            refresh_market_bucket_stats(db)
+    except Exception as e:
+        logger.warning("Market bucket stats refresh failed: %s", e)
+
+    # --- Today's market snapshots (replaced by each cycle) ---
+    try:
+        from app.services.market_intel import generate_daily_snapshots
+        from app.db.session import get_db
+        with next(get_db()) as db:
+            generate_daily_snapshots(db)
+    except Exception as e:
+        logger.warning("Market snapshot generation failed: %s", e)
+
     # --- Refresh intelligence caches ---
     try:
         from app.services.signal_intel import refresh_all_active_signal_caches, refresh_route_intel_cache
@@ -449,6 +467,17 @@ def run_orchestrated_cycle() -> dict:
     except Exception as e:
         logger.warning("Intel cache refresh failed: %s", e)
 
+    # Intel caches changed after the scrapers' collection-complete: roll the
+    # briefing generation again and let the API pre-warm active users' briefings
+    try:
+        import requests as _req
+        _req.post(
+            "http://api:8000/api/system/briefing-prewarm",
+            headers=_SYSTEM_API_HEADERS, timeout=5,
+        )
+    except Exception as e:
+        logger.warning("Briefing pre-warm request failed: %s", e)
+
     cycle_end = datetime.now(timezone.utc)
     elapsed = (cycle_end - cycle_start).total_seconds()
     logger.info(
@@ -457,6 +486,14 @@ def run_orchestrated_cycle() -> dict:
         ", ".join(f"{r['provider']}={r['status']}" for r in results),
     )
 
+    from app.db.session import db_pool_stats
+    pool = db_pool_stats()["sync"]
+    logger.info(
+        "DB pool: %d checkouts, %d overflow, %d timeouts, wait p99 %.1fms max %.1fms",
+        pool["checkouts"], pool["overflow_checkouts"], pool["checkout_timeouts"],
+        pool["wait_ms_p99"], pool["wait_ms_max"],
+    )
+
     return {
         "started_at": cycle_start,
         "completed_at": cycle_end,
@@ -0,0 +1,171 @@
+"""SellOff Vacations listing page parser.
+
+A listing page is a sequence of deal cards, each with a destination heading,
+hotel subheading, departure date, price, optional "Save up to N%" badge,
+booking link and star rating. All of those fields are matched by one
+precompiled alternation in a single left-to-right scan. Each card's fields are
+collected together, so a card with a missing field cannot shift its neighbours'
+fields the way index-zipping separate findall lists did.
+
+Card boundaries: the first card field seen on the page (ignoring the optional
+discount badge) is the card's leading field. Each later occurrence of it opens a
+new card. A field repeating inside an open card also opens a new card, which
+keeps cards apart when the leading field is missing from one of them. Fields
+collected before a card opens that are all optional (a promo banner's badge)
+are dropped rather than merged into the next card.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from app.workers.shared.regions import map_destination_to_region
+
+logger = logging.getLogger(__name__)
+
+_CARD_FIELD_RE = re.compile(
+    r'adModuleHeading--\w+">(?P<destination>[^<]+)</h2>'
+    r'|adModuleSubheading--\w+">(?P<hotel>[^<]+)</p>'
+    r'|adModuleDetailsDays--\w+"><span>(?P<date>[^<]+)</span>'
+    r'|adModuleDetailsAmount--\w+">[$](?P<price>\d+)<'
+    r'|Save up to (?P<discount>\d+)%'
+    r'|href="(?P<link>https://shopping\.selloffvacations\.com/cgi-bin/handler\.cgi\?[^"]+)"'
+    r'|StarRating-module--rating--\w+" rating="(?P<star>[\d.]+)"'
+)
+
+_LINK_PARAM_RE = re.compile(
+    r"gateway_dep=(?P<gateway>[A-Z]+)"
+    r"|no_hotel=(?P<hotel_id>\d+)"
+    r"|date_dep=(?P<date>\d+)"
+    r"|duration=(?P<duration>[A-Z0-9]+)"
+)
+
+_DURATION_RE = re.compile(r"(\d+)")
+
+# Optional card fields never open a card on their own (promo banners reuse the badge text)
+_OPTIONAL_FIELDS = frozenset({"discount"})
+
+
+@dataclass
+class ParsedPage:
+    """Deals parsed from one listing page plus card-level diagnostics."""
+
+    deals: list[dict] = field(default_factory=list)
+    cards: int = 0
+    malformed: int = 0
+
+
+def parse_duration_days(duration_str: str) -> int:
+    match = _DURATION_RE.search(duration_str)
+    return int(match.group(1)) if match else 7
+
+
+def parse_date(date_str: str) -> Optional[date]:
+    date_str = date_str.strip()
+    if len(date_str) == 8 and date_str.isdigit():
+        # Link date_dep (YYYYMMDD): skip strptime, which dominates page parse time
+        try:
+            return date(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:]))
+        except ValueError:
+            return None
+    for fmt in ("%b %d, %Y", "%Y%m%d", "%B %d, %Y"):
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def clean_url(url: str) -> str:
+    return url.replace("&amp;", "&")
+
+
+def split_cards(html: str) -> list[dict[str, str]]:
+    """Scan the page once and group card fields into one dict per card."""
+    cards: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    leading: Optional[str] = None
+
+    for match in _CARD_FIELD_RE.finditer(html):
+        kind = match.lastgroup
+        if kind is None:  # every alternative is a named group; narrows the type
+            continue
+        if leading is None and kind not in _OPTIONAL_FIELDS:
+            leading = kind
+        if kind in current or (kind == leading and current):
+            # Optional fields seen before any card field belong to a banner, not a card
+            if not current.keys() <= _OPTIONAL_FIELDS:
+                cards.append(current)
+            current = {}
+        current[kind] = match.group(kind)
+
+    if current and not current.keys() <= _OPTIONAL_FIELDS:
+        cards.append(current)
+    return cards
+
+
+def _link_params(link: str) -> dict[str, str]:
+    params: dict[str, str] = {}
+    for match in _LINK_PARAM_RE.finditer(link):
+        kind = match.lastgroup
+        if kind is not None:
+            params.setdefault(kind, match.group(kind))
+    return params
+
+
+def parse_card(card: dict[str, str], index: int) -> Optional[dict]:
+    """Build a deal dict from one card's fields, or None if the card is unusable."""
+    if "price" not in card:
+        return None
+
+    clean_link = clean_url(card.get("link", ""))
+    params = _link_params(clean_link)
+
+    depart_date = parse_date(params.get("date") or card.get("date", ""))
+    if not depart_date:
+        return None
+
+    hotel_name = card.get("hotel", "").replace("&amp;", "&").strip()
+    star_raw = card.get("star")
+    if not hotel_name or star_raw is None:
+        return None
+
+    duration_days = parse_duration_days(params.get("duration", "7DAYS"))
+    destination_str = card.get("destination", "").strip()
+    return {
+        "gateway": params.get("gateway", ""),
+        "destination_str": destination_str,
+        "hotel_name": hotel_name,
+        "region": map_destination_to_region(destination_str),
+        "depart_date": depart_date,
+        "return_date": depart_date + timedelta(days=duration_days),
+        "duration_days": duration_days,
+        "price_cents": int(card["price"]) * 100,
+        "discount_pct": int(card["discount"]) if "discount" in card else 0,
+        "deeplink_url": clean_link,
+        "hotel_id": params.get("hotel_id", str(index)),
+        "star_rating": float(star_raw),
+    }
+
+
+def parse_listing_page(html: str) -> ParsedPage:
+    """Parse every deal card on a SellOff listing page.
+
+    Cards missing a price, hotel name, star rating or parseable departure date
+    are counted in ``malformed`` and skipped.
+    """
+    page = ParsedPage()
+    for index, card in enumerate(split_cards(html)):
+        page.cards += 1
+        try:
+            deal = parse_card(card, index)
+        except Exception as e:
+            logger.warning("Failed to parse deal card %d: %s", index, e)
+            deal = None
+        if deal is None:
+            page.malformed += 1
+        else:
+            page.deals.append(deal)
+    return page
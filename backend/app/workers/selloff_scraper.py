@@ -3,20 +3,20 @@ import json
 import logging
 import os
 import random
-import re
 import signal as _signal
 import time
 import traceback
 import ipaddress
 import socket
 from collections import defaultdict
+from dataclasses import dataclass, field
 from urllib.parse import urlparse
-from datetime import date, datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Optional
 from zoneinfo import ZoneInfo
 
 from curl_cffi.requests import Session as CffiSession
-from sqlalchemy import select, text
+from sqlalchemy import select, text, update
 from sqlalchemy.orm import Session
 
 from app.db.models.deal import Deal
@@ -25,6 +25,7 @@ from app.db.models.deal_price_history import DealPriceHistory
 from app.db.models.signal import Signal
 from app.db.models.user import User
 from app.db.session import get_db
+from app.workers.selloff_parser import parse_listing_page
 from app.workers.shared.browser_profiles import (
     check_ua_staleness,
     pick_cycle_profile,
@@ -36,12 +37,20 @@ from app.workers.shared.browser_profiles import (
     SELLOFF_NAV_PAGES,
     SELLOFF_WARMUP_PAGES,
 )
+from app.workers.shared.page_fetcher import FetchPool, PageTask
+from app.workers.shared.staleness import deactivate_expired_deals, mark_unseen_deals
 
 logger = logging.getLogger("selloff_scraper")
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 NEXT_SCAN_FILE = "/tmp/next_scan.json"
 _SYSTEM_API_HEADERS = {"X-Admin-Token": os.getenv("ADMIN_TOKEN", "")}
 MAX_CYCLE_SECONDS = int(os.getenv("MAX_CYCLE_SECONDS", "18000"))  # 5 hours default
+# Independent fetch sessions per cycle (1 = serial). Each session keeps the
+# serial per-IP pacing, so N sessions cut cycle time ~N-fold.
+FETCH_CONCURRENCY = max(1, int(os.getenv("SELLOFF_FETCH_CONCURRENCY", "1")))
+# Cap on simultaneous in-flight requests to one host across those sessions.
+# Pacing sleeps happen outside the cap, so it only bounds bursts of overlap.
+FETCH_MAX_PER_HOST = max(1, int(os.getenv("SELLOFF_FETCH_MAX_PER_HOST", "2")))
 
 # Postgres advisory lock key — prevents concurrent scrape cycles
 _SCRAPE_ADVISORY_LOCK_KEY = 8675309  # arbitrary unique integer
@@ -101,13 +110,13 @@ def _build_proxy_url() -> Optional[str]:
     return f"http://{PROXY_USER}__{PROXY_COUNTRY}:{PROXY_PASS}@{PROXY_HOST}:{PROXY_PORT}"
 
 
-def _create_session(proxy_url: Optional[str] = None) -> CffiSession:
-    """Create a new curl_cffi session with the cycle's browser profile.
+def _create_session(proxy_url: Optional[str] = None, profile: Optional[dict] = None) -> CffiSession:
+    """Create a new curl_cffi session with the cycle's (or the given) browser profile.
 
     Each session gets a fresh cookie jar and, if proxied, a new IP from
     DataImpulse's rotating residential pool.
     """
-    profile = _cycle_profile or pick_cycle_profile()
+    profile = profile or _cycle_profile or pick_cycle_profile()
     session = CffiSession(impersonate=profile["impersonate"])
     if proxy_url:
         session.proxies = {"http": proxy_url, "https": proxy_url}
@@ -236,32 +245,20 @@ from app.workers.shared.regions import (
     DESTINATION_REGION_MAP,
     PARENT_REGION_MAP,
     deal_matches_signal_region,
-    map_destination_to_region,
 )
-from app.workers.shared.matching import match_deal_to_signals as _shared_match_deal_to_signals, load_active_signals
-from app.workers.shared.upsert import upsert_deal as _shared_upsert_deal
+from app.workers.shared.matching import (
+    SignalIndex,
+    bulk_create_deal_matches,
+    load_signal_index,
+    match_deal_to_signals as _shared_match_deal_to_signals,
+)
+from app.workers.shared.upsert import (
+    bulk_upsert_deals as _shared_bulk_upsert_deals,
+    upsert_deal as _shared_upsert_deal,
+)
 from app.services.market_intel import score_deal_for_match
 
 
-def parse_duration_days(duration_str: str) -> int:
-    match = re.search(r"(\d+)", duration_str)
-    return int(match.group(1)) if match else 7
-
-
-def parse_date(date_str: str) -> Optional[date]:
-    date_str = date_str.strip()
-    for fmt in ("%b %d, %Y", "%Y%m%d", "%B %d, %Y"):
-        try:
-            return datetime.strptime(date_str, fmt).date()
-        except ValueError:
-            continue
-    return None
-
-
-def clean_url(url: str) -> str:
-    return url.replace("&amp;", "&")
-
-
 _SCRAPER_ALLOWED_DOMAINS = {"www.selloffvacations.com", "selloffvacations.com"}
 
 
@@ -308,64 +305,15 @@ def fetch_deals_from_page(url: str) -> list[dict]:
             logger.warning("Failed to fetch %s: %s", url, e)
         return []
 
-    destinations = re.findall(r'adModuleHeading--\w+\">([^<]+)</h2>', html)
-    hotels = re.findall(r'adModuleSubheading--\w+\">([^<]+)</p>', html)
-    dates = re.findall(r'adModuleDetailsDays--\w+\"><span>([^<]+)</span>', html)
-    prices = re.findall(r'adModuleDetailsAmount--\w+\">[$](\d+)<', html)
-    discounts = re.findall(r'Save up to (\d+)%', html)
-    links = re.findall(r'href=\"(https://shopping\.selloffvacations\.com/cgi-bin/handler\.cgi\?[^\"]+)\"', html)
-    star_ratings = re.findall(r'StarRating-module--rating--\w+\" rating=\"([\d.]+)\"', html)
+    return parse_deals_from_html(html)
 
-    deals = []
-    for i in range(len(prices)):
-        try:
-            link = links[i] if i < len(links) else ""
-            clean_link = clean_url(link)
 
-            gateway_match = re.search(r'gateway_dep=([A-Z]+)', clean_link)
-            hotel_match = re.search(r'no_hotel=(\d+)', clean_link)
-            date_param_match = re.search(r'date_dep=(\d+)', clean_link)
-            duration_param_match = re.search(r'duration=([A-Z0-9]+)', clean_link)
-
-            gateway = gateway_match.group(1) if gateway_match else ""
-            hotel_id = hotel_match.group(1) if hotel_match else str(i)
-            depart_date_str = date_param_match.group(1) if date_param_match else (dates[i] if i < len(dates) else "")
-            duration_str = duration_param_match.group(1) if duration_param_match else "7DAYS"
-
-            depart_date = parse_date(depart_date_str)
-            if not depart_date:
-                continue
-
-            duration_days = parse_duration_days(duration_str)
-            return_date = depart_date + timedelta(days=duration_days)
-            price_cents = int(prices[i]) * 100
-            destination_str = destinations[i].strip() if i < len(destinations) else ""
-            hotel_name = hotels[i].replace("&amp;", "&").strip() if i < len(hotels) else ""
-            star_rating = float(star_ratings[i]) if i < len(star_ratings) else None
-            region = map_destination_to_region(destination_str)
-
-            if not hotel_name or star_rating is None:
-                continue
-
-            deals.append({
-                "gateway": gateway,
-                "destination_str": destination_str,
-                "hotel_name": hotel_name,
-                "region": region,
-                "depart_date": depart_date,
-                "return_date": return_date,
-                "duration_days": duration_days,
-                "price_cents": price_cents,
-                "discount_pct": int(discounts[i]) if i < len(discounts) else 0,
-                "deeplink_url": clean_link,
-                "hotel_id": hotel_id,
-                "star_rating": star_rating,
-            })
-        except Exception as e:
-            logger.warning("Failed to parse deal %d: %s", i, e)
-            continue
-
-    return deals
+def parse_deals_from_html(html: str) -> list[dict]:
+    """Extract deal dicts from a SellOff listing page, logging malformed cards."""
+    page = parse_listing_page(html)
+    if page.malformed:
+        logger.warning("Skipped %d/%d malformed deal cards", page.malformed, page.cards)
+    return page.deals
 
 
 def _warmup_session() -> None:
@@ -397,12 +345,25 @@ def _visit_nav_page() -> None:
         logger.debug("Nav visit failed for %s: %s (continuing)", url, e)
 
 
-def upsert_deal(db: Session, deal: dict) -> Optional[Deal]:
+def _set_dedupe_key(deal: dict) -> None:
     deal["dedupe_key"] = f"selloff:{deal['gateway']}:{deal['hotel_id']}:{deal['depart_date']}:{deal['duration_days']}"
+
+
+def upsert_deal(db: Session, deal: dict) -> Optional[Deal]:
+    _set_dedupe_key(deal)
     return _shared_upsert_deal(db, "selloff", deal)
 
 
-def match_deal_to_signals(db: Session, deal: Deal, deal_meta: dict, signals=None) -> list[Signal]:
+def bulk_upsert_deals(db: Session, deals: list[dict]) -> list[Deal]:
+    """Upsert a page of SellOff deals in one statement. See shared bulk_upsert_deals."""
+    for deal in deals:
+        _set_dedupe_key(deal)
+    return _shared_bulk_upsert_deals(db, "selloff", deals)
+
+
+def match_deal_to_signals(
+    db: Session, deal: Deal, deal_meta: dict, signals: SignalIndex | list[Signal] | None = None,
+) -> list[Signal]:
     return _shared_match_deal_to_signals(db, deal, deal_meta, signals=signals)
 
 
@@ -455,57 +416,35 @@ def _star_display(rating) -> str:
     return f"★ {rating:.1f}"
 
 
-def _create_deal_match(
-    db: Session,
+def _match_value_label(db: Session, deal: Deal, stats_cache: dict) -> str | None:
+    """Value label stored on a deal's matches; it depends on the deal alone, so score once per deal."""
+    try:
+        return score_deal_for_match(db, deal, stats_cache=stats_cache)
+    except Exception as exc:
+        logger.warning("Failed to score deal %s: %s", deal.id, exc)
+        return None
+
+
+def _deal_match_row(
     signal: Signal,
     deal: Deal,
     duration_days: int,
     price_delta_cents: int | None,
-    *,
-    stats_cache: dict | None = None,
-) -> DealMatch:
-    """Create a DealMatch, score it, persist, and return it.
+    value_label: str | None,
+) -> dict:
+    """DealMatch column values for bulk_create_deal_matches.
 
     price_delta_cents uses standard delta convention:
     negative = price dropped, positive = price increased, None = unknown.
     """
     ppn = deal.price_cents // duration_days if duration_days > 0 else None
-    try:
-        vlabel = score_deal_for_match(db, deal, stats_cache=stats_cache or {})
-    except Exception as exc:
-        logger.warning("Failed to score deal %s: %s", deal.id, exc)
-        vlabel = None
-    match = DealMatch(
-        signal_id=signal.id,
-        deal_id=deal.id,
-        price_per_night_cents=ppn,
-        value_label=vlabel,
-        price_delta_cents=price_delta_cents,
-    )
-    db.add(match)
-    db.commit()
-    return match
-
-
-def _build_price_delta_map(db: Session) -> dict:
-    """Query price history to find the most recent price change per deal.
-
-    Returns {deal_id_uuid: delta_cents} where delta > 0 means a drop,
-    delta < 0 means an increase, and delta == 0 means unchanged.
-    Only includes deals with at least two price history entries.
-    """
-    rows = db.execute(text("""
-        WITH recent AS (
-            SELECT deal_id, price_cents,
-                   LAG(price_cents) OVER (PARTITION BY deal_id ORDER BY recorded_at ASC) as prev_price,
-                   ROW_NUMBER() OVER (PARTITION BY deal_id ORDER BY recorded_at DESC) as rn
-            FROM deal_price_history
-        )
-        SELECT deal_id, (prev_price - price_cents) as delta
-        FROM recent
-        WHERE rn = 1 AND prev_price IS NOT NULL
-    """)).fetchall()
-    return {row[0]: row[1] for row in rows}
+    return {
+        "signal_id": signal.id,
+        "deal_id": deal.id,
+        "price_per_night_cents": ppn,
+        "value_label": value_label,
+        "price_delta_cents": price_delta_cents,
+    }
 
 
 def _send_cycle_alerts(
@@ -542,19 +481,19 @@ def _send_cycle_alerts(
             db.add(run)
             db.flush()
 
-            # Update DealMatch rows with run_id
-            for deal_dict in deals:
-                deal_id = deal_dict.get("deal_id")
-                if deal_id:
-                    dm = db.execute(
-                        select(DealMatch).where(
-                            DealMatch.signal_id == signal_id_str,
-                            DealMatch.deal_id == deal_id,
-                            DealMatch.run_id.is_(None),
-                        )
-                    ).scalar_one_or_none()
-                    if dm:
-                        dm.run_id = run.id
+            # Attach this cycle's new DealMatch rows to the run
+            deal_ids = [d["deal_id"] for d in deals if d.get("deal_id")]
+            if deal_ids:
+                db.execute(
+                    update(DealMatch)
+                    .where(
+                        DealMatch.signal_id == signal_id_str,
+                        DealMatch.deal_id.in_(deal_ids),
+                        DealMatch.run_id.is_(None),
+                    )
+                    .values(run_id=run.id)
+                    .execution_options(synchronize_session=False)
+                )
 
             db.flush()
             run_map[signal_id_str] = (str(run.id), deals)
@@ -582,13 +521,14 @@ def run_matching_only(db: Session) -> None:
     deals = db.execute(select(Deal).where(Deal.is_active)).scalars().all()
     logger.info("Matching %d active deals against active signals", len(deals))
 
-    # Pre-compute price deltas from history for all deals
-    price_delta_map = _build_price_delta_map(db)
+    # Compile and index active signals once instead of reloading them per deal
+    signal_index = load_signal_index(db)
 
     user_digest: dict = defaultdict(dict)
     v2_signal_deals: dict = defaultdict(list)
-    total_matches = 0
     value_stats_cache: dict = {}
+    # (signal, deal, duration_days, drop, match_row) for every matched pair
+    pending: list[tuple] = []
     for deal in deals:
         duration_days = (deal.return_date - deal.depart_date).days if deal.return_date else 7
         deal_meta = {
@@ -600,37 +540,144 @@ def run_matching_only(db: Session) -> None:
             "discount_pct": deal.discount_pct or 0,
         }
 
-        matched_signals = match_deal_to_signals(db, deal, deal_meta)
+        matched_signals = match_deal_to_signals(db, deal, deal_meta, signals=signal_index)
+        if not matched_signals:
+            continue
+        value_label = _match_value_label(db, deal, value_stats_cache)
         for signal in matched_signals:
-            existing = db.execute(
-                select(DealMatch).where(
-                    DealMatch.signal_id == signal.id,
-                    DealMatch.deal_id == deal.id,
-                )
-            ).scalar_one_or_none()
+            # last_price_delta_cents uses the standard delta convention (negative = drop);
+            # drop is the positive-for-drop amount used by the alert payload
+            row = _deal_match_row(signal, deal, duration_days, deal.last_price_delta_cents, value_label)
+            drop = -deal.last_price_delta_cents if deal.last_price_delta_cents is not None else None
+            pending.append((signal, deal, duration_days, drop, row))
+
+    # One INSERT ... ON CONFLICT DO NOTHING for every matched pair; existing
+    # matches are skipped by the unique constraint instead of a SELECT each
+    created = bulk_create_deal_matches(db, [p[4] for p in pending])
+    total_matches = len(created)
+
+    for signal, deal, duration_days, drop, row in pending:
+        if (signal.id, deal.id) not in created:
+            continue
+        delta = drop if drop is not None else 0
+        sig_key = str(signal.id)
+
+        # Accumulate for V2 match alerts
+        v2_signal_deals[sig_key].append({
+            "deal_id": str(deal.id),
+            "price_cents": deal.price_cents,
+            "price_dropped": delta > 0,
+            "price_delta": delta,
+            "hotel_name": deal.hotel_name or "",
+            "hotel_id": deal.hotel_id or "",
+            "star_rating": deal.star_rating,
+            "depart_date": deal.depart_date,
+            "return_date": deal.return_date,
+            "duration_nights": duration_days,
+            "destination": deal.destination or "",
+            "destination_str": deal.destination_str or deal.destination or "",
+            "origin": deal.origin or "",
+            "deeplink_url": deal.deeplink_url or "",
+            "provider": "selloff",
+            "value_label": row["value_label"],
+        })
+
+    # Send match alert emails
+    _send_cycle_alerts(v2_signal_deals, user_digest, db_override=db)
+
+    # Refresh signal + route intelligence caches
+    try:
+        from app.services.signal_intel import refresh_all_active_signal_caches, refresh_route_intel_cache
+        refresh_all_active_signal_caches(db)
+        refresh_route_intel_cache(db)
+    except Exception as e:
+        logger.warning("Intel cache refresh failed: %s", e)
+
+    logger.info("Match-only complete. New matches: %d", total_matches)
 
-            if existing:
+
+@dataclass
+class _CycleState:
+    """Accumulators shared by every page processed in one scrape cycle."""
+
+    signals: SignalIndex | None = None
+    cycle_errors: list = field(default_factory=list)
+    seen_dedupe_keys: set[str] = field(default_factory=set)
+    # (origin, destination) of every deal upserted this cycle, for incremental route intel
+    touched_routes: set[tuple[str, str]] = field(default_factory=set)
+    scrape_value_stats_cache: dict = field(default_factory=dict)
+    # V2 match alert accumulator: {signal_id_str: [deal_dict, ...]}
+    v2_signal_deals: dict = field(default_factory=lambda: defaultdict(list))
+    total_deals: int = 0
+    total_matches: int = 0
+
+
+def _process_page(state: _CycleState, url: str, deals: list[dict]) -> None:
+    """Upsert one page of deals, match them and queue alerts for new matches."""
+    with next(get_db()) as db:
+        # One INSERT ... ON CONFLICT and one commit for the whole page
+        try:
+            page_deals = bulk_upsert_deals(db, deals) if deals else []
+            meta_by_key = {d["dedupe_key"]: d for d in deals}
+        except Exception as e:
+            logger.error("Error upserting deals from %s: %s", url, e)
+            db.rollback()
+            state.cycle_errors.append({"url": url, "error": str(e), "type": "error"})
+            page_deals = []
+
+        # (signal, deal, duration_days, match_row) for every matched pair on the page
+        page_matches: list[tuple] = []
+        for deal in page_deals:
+            deal_meta = meta_by_key[deal.dedupe_key]
+            try:
+                state.seen_dedupe_keys.add(deal.dedupe_key)
+                state.touched_routes.add((deal.origin, deal.destination))
+                state.total_deals += 1
+                matched_signals = match_deal_to_signals(db, deal, deal_meta, signals=state.signals)
+
+                if not matched_signals:
+                    continue
+                duration_days = deal_meta.get("duration_days", 7)
+                value_label = _match_value_label(db, deal, state.scrape_value_stats_cache)
+                # _price_delta stores drop amount (positive = drop);
+                # negate to standard delta convention (negative = drop)
+                drop = getattr(deal, "_price_delta", None)
+                for signal in matched_signals:
+                    row = _deal_match_row(
+                        signal, deal, duration_days, -drop if drop is not None else None, value_label,
+                    )
+                    page_matches.append((signal, deal, duration_days, row))
+
+            except Exception as e:
+                logger.error("Error processing deal: %s", e)
+                state.cycle_errors.append({"url": url, "error": str(e), "type": "error"})
                 continue
 
-            # price_delta_map stores drop amounts (positive = drop);
-            # negate to standard delta convention (negative = drop)
-            drop = price_delta_map.get(deal.id)
-            match = _create_deal_match(
-                db, signal, deal, duration_days,
-                -drop if drop is not None else None,
-                stats_cache=value_stats_cache,
-            )
-            total_matches += 1
+        # One INSERT ... ON CONFLICT DO NOTHING per page; only the
+        # pairs that were actually inserted are alerted on
+        try:
+            created = bulk_create_deal_matches(db, [m[3] for m in page_matches])
+        except Exception as e:
+            logger.error("Error saving matches from %s: %s", url, e)
+            db.rollback()
+            state.cycle_errors.append({"url": url, "error": str(e), "type": "error"})
+            created = set()
 
-            delta = drop if drop is not None else 0
-            sig_key = str(signal.id)
+        for signal, deal, duration_days, row in page_matches:
+            if (signal.id, deal.id) not in created:
+                continue
+            state.total_matches += 1
+            logger.info(
+                "Match: %s -> %s %s $%d", signal.name, deal.destination, deal.depart_date, deal.price_cents // 100,
+            )
 
             # Accumulate for V2 match alerts
-            v2_signal_deals[sig_key].append({
+            sig_key = str(signal.id)
+            state.v2_signal_deals[sig_key].append({
                 "deal_id": str(deal.id),
                 "price_cents": deal.price_cents,
-                "price_dropped": delta > 0,
-                "price_delta": delta,
+                "price_dropped": getattr(deal, "_price_dropped", False),
+                "price_delta": getattr(deal, "_price_delta", 0),
                 "hotel_name": deal.hotel_name or "",
                 "hotel_id": deal.hotel_id or "",
                 "star_rating": deal.star_rating,
@@ -642,21 +689,92 @@ def run_matching_only(db: Session) -> None:
                 "origin": deal.origin or "",
                 "deeplink_url": deal.deeplink_url or "",
                 "provider": "selloff",
-                "value_label": vlabel,
+                "value_label": row["value_label"],
             })
 
-    # Send match alert emails
-    _send_cycle_alerts(v2_signal_deals, user_digest, db_override=db)
 
-    # Refresh signal + route intelligence caches
-    try:
-        from app.services.signal_intel import refresh_all_active_signal_caches, refresh_route_intel_cache
-        refresh_all_active_signal_caches(db)
-        refresh_route_intel_cache(db)
-    except Exception as e:
-        logger.warning("Intel cache refresh failed: %s", e)
+def _page_tasks(cycle_destinations: list[str], cycle_gateways: list[tuple[str, str]]) -> list[PageTask]:
+    """Build this cycle's page list (destination-major), randomly skipping ~5% of pages."""
+    tasks = []
+    for slug in cycle_destinations:
+        for _gateway_code, city_slug in cycle_gateways:
+            if random.random() < 0.05:
+                logger.debug("Random skip: %s from %s", slug, city_slug)
+                continue
+            tasks.append(PageTask(f"https://www.selloffvacations.com/en/{slug}/from-{city_slug}", group=slug))
+    return tasks
 
-    logger.info("Match-only complete. New matches: %d", total_matches)
+
+def _run_concurrent_fetch(
+    cycle_destinations: list[str],
+    cycle_gateways: list[tuple[str, str]],
+    *,
+    proxy_url: Optional[str],
+    started_at: datetime,
+    state: _CycleState,
+    block_threshold: int,
+) -> None:
+    """Fetch the cycle's pages with FETCH_CONCURRENCY independent sessions.
+
+    Each session has its own browser profile, proxy IP and referer chain and
+    keeps the serial pacing (human_delay per page, category_pause between
+    destinations). This thread parses each page and hands it to _process_page.
+    The block circuit breaker counts consecutive empty pages per session, since
+    a block hits one IP; any blocked session stops the whole cycle, as in the
+    serial loop.
+    """
+    tasks = _page_tasks(cycle_destinations, cycle_gateways)
+    logger.info("Concurrent fetch: %d pages across %d sessions", len(tasks), FETCH_CONCURRENCY)
+
+    pool = FetchPool(
+        tasks,
+        workers=FETCH_CONCURRENCY,
+        profile_factory=pick_cycle_profile,
+        session_factory=lambda profile: _create_session(proxy_url, profile=profile),
+        delay=human_delay,
+        group_pause=category_pause,
+        warmup_urls=SELLOFF_WARMUP_PAGES,
+        nav_urls=SELLOFF_NAV_PAGES,
+        url_guard=_assert_safe_url,
+        max_per_host=FETCH_MAX_PER_HOST,
+        should_stop=lambda: _shutdown_requested,
+    )
+    consecutive_empty: dict[int, int] = defaultdict(int)
+    with pool:
+        for result in pool.results():
+            url = result.task.url
+            deals = parse_deals_from_html(result.html) if result.html else []
+            logger.info("Found %d deals on %s (session %d)", len(deals), url, result.worker_id)
+
+            # Block detection circuit breaker (per session)
+            if not deals and not result.not_found:
+                consecutive_empty[result.worker_id] += 1
+                if consecutive_empty[result.worker_id] >= block_threshold:
+                    logger.error(
+                        "POSSIBLE BLOCK: %d consecutive non-404 pages returned 0 deals on session %d. "
+                        "Stopping cycle to avoid wasting requests.",
+                        consecutive_empty[result.worker_id], result.worker_id,
+                    )
+                    state.cycle_errors.append({"error": "Block detected: consecutive empty pages", "type": "block"})
+                    pool.stop()
+                    break
+            elif deals:
+                consecutive_empty[result.worker_id] = 0
+
+            if not deals:
+                state.cycle_errors.append({"url": url, "error": "No deals found", "type": "empty"})
+
+            _process_page(state, url, deals)
+
+            elapsed = (datetime.now(timezone.utc) - started_at).total_seconds()
+            if elapsed > MAX_CYCLE_SECONDS:
+                logger.warning(
+                    "CYCLE TIMEOUT: %d seconds elapsed (limit %d). Stopping concurrent fetch early.",
+                    int(elapsed), MAX_CYCLE_SECONDS,
+                )
+                state.cycle_errors.append({"error": f"Cycle timeout after {int(elapsed)}s", "type": "timeout"})
+                pool.stop()
+                break
 
 
 def _acquire_scrape_lock(db: Session) -> bool:
@@ -717,21 +835,17 @@ def _run_scraper_inner(once: bool, defer_alerts: bool = False) -> dict | None:
     Args:
         once: If True, run a single cycle and return.
         defer_alerts: If True, skip sending match alert emails and return
-            the v2_signal_deals dict so the caller can consolidate alerts
+            the state.v2_signal_deals dict so the caller can consolidate alerts
             across multiple scrapers.
 
     Returns:
-        When defer_alerts=True and once=True, returns the v2_signal_deals dict.
+        When defer_alerts=True and once=True, returns the state.v2_signal_deals dict.
         Otherwise returns None.
     """
     while True:
-        cycle_errors: list = []
-        total_deals = 0
-        total_matches = 0
+        state = _CycleState()
         deals_deactivated = 0
         deals_expired = 0
-        seen_dedupe_keys: set[str] = set()
-        scrape_value_stats_cache: dict = {}
         started_at = datetime.now(timezone.utc)
         run_id = None
         _deferred_signal_deals: dict = {}
@@ -804,21 +918,16 @@ def _run_scraper_inner(once: bool, defer_alerts: bool = False) -> dict | None:
                 logger.warning("Failed to post scrape-started: %s", e)
 
             user_digest: dict = defaultdict(dict)
-            # V2 match alert accumulator: {signal_id_str: [deal_dict, ...]}
-            v2_signal_deals: dict = defaultdict(list)
 
-            # Pre-load active signals once for the entire cycle
+            # Pre-load and index active signals once for the entire cycle
             with next(get_db()) as sig_db:
-                _cycle_signals = load_active_signals(sig_db)
-            logger.info("Loaded %d active signals for matching", len(_cycle_signals))
+                state.signals = load_signal_index(sig_db)
+            logger.info("Loaded %d active signals for matching", len(state.signals))
 
             # Block detection: consecutive non-404 pages with 0 deals
             _consecutive_empty = 0
             _BLOCK_THRESHOLD = 8  # stop after 8 consecutive empty (non-404) pages
 
-            # Warm up the session with top-level page visits (collects cookies)
-            _warmup_session()
-
             # Tiered destination and gateway selection — high-volume routes daily,
             # low-volume routes probabilistically to reduce footprint
             cycle_destinations = select_cycle_destinations(DESTINATION_SLUGS)
@@ -830,6 +939,19 @@ def _run_scraper_inner(once: bool, defer_alerts: bool = False) -> dict | None:
             )
 
             elapsed = 0
+            if FETCH_CONCURRENCY > 1:
+                _run_concurrent_fetch(
+                    cycle_destinations, cycle_gateways,
+                    proxy_url=proxy_url if proxy_ip else None,
+                    started_at=started_at,
+                    state=state,
+                    block_threshold=_BLOCK_THRESHOLD,
+                )
+                cycle_destinations = []  # every page was handled by the pool; skip the serial walk
+            else:
+                # Warm up the session with top-level page visits (collects cookies)
+                _warmup_session()
+
             for slug in cycle_destinations:
                 if _shutdown_requested:
                     logger.info("Shutdown requested — breaking out of destination loop")
@@ -857,73 +979,17 @@ def _run_scraper_inner(once: bool, defer_alerts: bool = False) -> dict | None:
                                 "Stopping cycle to avoid wasting requests.",
                                 _consecutive_empty,
                             )
-                            cycle_errors.append({"error": "Block detected: consecutive empty pages", "type": "block"})
+                            state.cycle_errors.append(
+                                {"error": "Block detected: consecutive empty pages", "type": "block"}
+                            )
                             break
                     elif deals:
                         _consecutive_empty = 0
 
                     if not deals:
-                        cycle_errors.append({"url": url, "error": "No deals found", "type": "empty"})
+                        state.cycle_errors.append({"url": url, "error": "No deals found", "type": "empty"})
 
-                    with next(get_db()) as db:
-                        for deal_meta in deals:
-                            try:
-                                deal = upsert_deal(db, deal_meta)
-                                if not deal:
-                                    continue
-
-                                seen_dedupe_keys.add(deal.dedupe_key)
-                                total_deals += 1
-                                matched_signals = match_deal_to_signals(db, deal, deal_meta, signals=_cycle_signals)
-
-                                for signal in matched_signals:
-                                    existing = db.execute(
-                                        select(DealMatch).where(
-                                            DealMatch.signal_id == signal.id,
-                                            DealMatch.deal_id == deal.id,
-                                        )
-                                    ).scalar_one_or_none()
-
-                                    if existing:
-                                        continue
-
-                                    duration_days = deal_meta.get("duration_days", 7)
-                                    # _price_delta stores drop amount (positive = drop);
-                                    # negate to standard delta convention (negative = drop)
-                                    drop = getattr(deal, "_price_delta", None)
-                                    match = _create_deal_match(
-                                        db, signal, deal, duration_days,
-                                        -drop if drop is not None else None,
-                                        stats_cache=scrape_value_stats_cache,
-                                    )
-                                    total_matches += 1
-                                    logger.info("Match: %s -> %s %s $%d", signal.name, deal.destination, deal.depart_date, deal.price_cents // 100)
-
-                                    # Accumulate for V2 match alerts
-                                    sig_key = str(signal.id)
-                                    v2_signal_deals[sig_key].append({
-                                        "deal_id": str(deal.id),
-                                        "price_cents": deal.price_cents,
-                                        "price_dropped": getattr(deal, "_price_dropped", False),
-                                        "price_delta": getattr(deal, "_price_delta", 0),
-                                        "hotel_name": deal.hotel_name or "",
-                                        "hotel_id": deal.hotel_id or "",
-                                        "star_rating": deal.star_rating,
-                                        "depart_date": deal.depart_date,
-                                        "return_date": deal.return_date,
-                                        "duration_nights": duration_days,
-                                        "destination": deal.destination or "",
-                                        "destination_str": deal.destination_str or deal.destination or "",
-                                        "origin": deal.origin or "",
-                                        "deeplink_url": deal.deeplink_url or "",
-                                        "provider": "selloff",
-                                        "value_label": vlabel,
-                                    })
-
-                            except Exception as e:
-                                logger.error("Error processing deal: %s", e)
-                                cycle_errors.append({"url": url, "error": str(e), "type": "error"})
-                                continue
+                    _process_page(state, url, deals)
 
                     # Human-like delay between pages (skip for 404s)
                     if not _last_fetch_was_404:
@@ -939,9 +1005,9 @@ def _run_scraper_inner(once: bool, defer_alerts: bool = False) -> dict | None:
                         logger.warning(
                             "CYCLE TIMEOUT: %d seconds elapsed (limit %d). "
                             "Stopping early with %d deals scraped so far.",
-                            int(elapsed), MAX_CYCLE_SECONDS, total_deals,
+                            int(elapsed), MAX_CYCLE_SECONDS, state.total_deals,
                         )
-                        cycle_errors.append({
+                        state.cycle_errors.append({
                             "error": f"Cycle timeout after {int(elapsed)}s",
                             "type": "timeout",
                         })
@@ -966,79 +1032,68 @@ def _run_scraper_inner(once: bool, defer_alerts: bool = False) -> dict | None:
             # Skip if shutdown was requested — incomplete cycle would incorrectly penalize unseen deals
             DEACTIVATION_THRESHOLD = 3
             try:
-                if seen_dedupe_keys and not _shutdown_requested:
+                if state.seen_dedupe_keys and not _shutdown_requested:
                     with next(get_db()) as db:
-                        unseen = db.query(Deal).filter(
-                            Deal.is_active,
-                            Deal.dedupe_key.notin_(seen_dedupe_keys)
-                        ).all()
-                        deactivated_now = datetime.now(timezone.utc)
-                        newly_deactivated = 0
-                        for deal in unseen:
-                            deal.missed_cycles = (deal.missed_cycles or 0) + 1
-                            if deal.missed_cycles >= DEACTIVATION_THRESHOLD:
-                                deal.is_active = False
-                                deal.deactivated_at = deactivated_now
-                                newly_deactivated += 1
-                        db.commit()
+                        unseen, newly_deactivated = mark_unseen_deals(
+                            db, "selloff", state.seen_dedupe_keys, DEACTIVATION_THRESHOLD,
+                        )
                         deals_deactivated = newly_deactivated
                         if unseen:
                             logger.info(
                                 "Staleness: %d unseen (%d incremented, %d deactivated after %d+ misses)",
-                                len(unseen), len(unseen) - newly_deactivated,
+                                unseen, unseen - newly_deactivated,
                                 newly_deactivated, DEACTIVATION_THRESHOLD,
                             )
             except Exception as e:
                 logger.error("Stale deal deactivation failed: %s", e)
-                cycle_errors.append({"error": str(e), "type": "stale_deactivation"})
+                state.cycle_errors.append({"error": str(e), "type": "stale_deactivation"})
 
             # Mark expired deals (past departure date) inactive
             try:
                 with next(get_db()) as db:
-                    expired = db.query(Deal).filter(
-                        Deal.is_active,
-                        Deal.depart_date < date.today()
-                    ).all()
-                    if expired:
-                        deactivated_now = datetime.now(timezone.utc)
-                        for deal in expired:
-                            deal.is_active = False
-                            deal.deactivated_at = deactivated_now
-                        db.commit()
-                        deals_expired = len(expired)
+                    deals_expired = deactivate_expired_deals(db, "selloff")
+                    if deals_expired:
                         logger.info("Marked %d expired deals inactive", deals_expired)
             except Exception as e:
                 logger.error("Expired deal cleanup failed: %s", e)
-                cycle_errors.append({"error": str(e), "type": "expired_cleanup"})
+                state.cycle_errors.append({"error": str(e), "type": "expired_cleanup"})
 
             # Send match alert emails after full cycle (unless deferred to orchestrator)
             if defer_alerts:
-                _deferred_signal_deals = dict(v2_signal_deals)
+                _deferred_signal_deals = dict(state.v2_signal_deals)
                 logger.info(
                     "Alert sending deferred to orchestrator (%d signals with deals)",
                     len(_deferred_signal_deals),
                 )
             else:
                 try:
-                    _send_cycle_alerts(v2_signal_deals, user_digest)
+                    _send_cycle_alerts(state.v2_signal_deals, user_digest)
                 except Exception as e:
                     logger.error("Match alert sending failed: %s", e)
-                    cycle_errors.append({"error": str(e), "type": "alert_send"})
+                    state.cycle_errors.append({"error": str(e), "type": "alert_send"})
 
             # Refresh signal + route intelligence caches after each scrape cycle.
             # Skip when orchestrator will do it after all scrapers finish (defer_alerts mode).
+            # Route intel only needs the routes upserted this cycle unless deals were
+            # deactivated, which can change any route.
             if not defer_alerts:
                 try:
                     from app.services.signal_intel import refresh_all_active_signal_caches, refresh_route_intel_cache
                     with next(get_db()) as intel_db:
                         refresh_all_active_signal_caches(intel_db)
-                        refresh_route_intel_cache(intel_db)
+                        if deals_deactivated or deals_expired:
+                            refresh_route_intel_cache(intel_db)
+                        else:
+                            refresh_route_intel_cache(intel_db, routes=state.touched_routes)
                 except Exception as e:
                     logger.warning("Intel cache refresh failed: %s", e)
 
             completed_at = datetime.now(timezone.utc)
-            logger.info("Scrape complete. Deals: %d, Matches: %d", total_deals, total_matches)
-            logger.info("Unique dedupe keys this cycle: %d (total upserts: %d)", len(seen_dedupe_keys), total_deals)
+            logger.info("Scrape complete. Deals: %d, Matches: %d", state.total_deals, state.total_matches)
+            logger.info(
+                "Unique dedupe keys this cycle: %d (total upserts: %d)",
+                len(state.seen_dedupe_keys), state.total_deals,
+            )
 
             # Post completion summary to API
             try:
@@ -1047,10 +1102,10 @@ def _run_scraper_inner(once: bool, defer_alerts: bool = False) -> dict | None:
                     "run_id": run_id,
                     "started_at": started_at.isoformat(),
                     "completed_at": completed_at.isoformat(),
-                    "total_deals": total_deals,
-                    "total_matches": total_matches,
-                    "error_count": sum(1 for e in cycle_errors if e.get("type") == "error"),
-                    "errors": cycle_errors,
+                    "total_deals": state.total_deals,
+                    "total_matches": state.total_matches,
+                    "error_count": sum(1 for e in state.cycle_errors if e.get("type") == "error"),
+                    "errors": state.cycle_errors,
                     "deals_deactivated": deals_deactivated,
                     "deals_expired": deals_expired,
                     "status": "completed",
@@ -1070,8 +1125,8 @@ def _run_scraper_inner(once: bool, defer_alerts: bool = False) -> dict | None:
                     "run_id": run_id,
                     "started_at": started_at.isoformat(),
                     "completed_at": datetime.now(timezone.utc).isoformat(),
-                    "total_deals": total_deals,
-                    "total_matches": total_matches,
+                    "total_deals": state.total_deals,
+                    "total_matches": state.total_matches,
                     "error_count": 1,
                     "errors": [{"error": str(e), "type": "crash"}],
                     "deals_deactivated": deals_deactivated,
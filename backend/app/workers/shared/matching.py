@@ -1,99 +1,245 @@
-"""Shared deal-to-signal matching logic used by all scrapers."""
+"""Shared deal-to-signal matching logic used by all scrapers.
+
+Signals are compiled once per cycle into ``CompiledSignal`` records (parsed
+travel window, budget in cents, night bounds, expanded region set) and indexed
+by (departure airport, deal region) in a ``SignalIndex``. A deal lookup only
+evaluates the signals that could possibly match its route instead of scanning
+every active signal.
+
+New (signal, deal) pairs are persisted with ``bulk_create_deal_matches``, one
+``INSERT ... ON CONFLICT DO NOTHING`` per page instead of an existence SELECT
+and commit per match.
+"""
 
 import logging
-from datetime import datetime, timedelta
-from typing import Optional
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional, Union
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.db.models.deal import Deal
+from app.db.models.deal_match import DealMatch
 from app.db.models.signal import Signal
-from app.workers.shared.regions import deal_matches_signal_region
+from app.workers.shared.regions import PARENT_REGION_MAP
 
 logger = logging.getLogger(__name__)
 
+# Child regions for each parent catch-all, e.g. "mexico" -> {"cancun", "riviera_maya", ...}
+_CHILD_REGIONS: dict[str, frozenset[str]] = {
+    parent: frozenset(child for child, p in PARENT_REGION_MAP.items() if p == parent)
+    for parent in set(PARENT_REGION_MAP.values())
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledSignal:
+    """A signal's matching criteria, parsed once from ``signal.config``.
+
+    ``window_start``/``window_end`` bound the departure date. When
+    ``window_checks_return`` is True (exact travel dates), ``window_end`` bounds
+    the return date instead, mirroring the start_date/end_date semantics.
+    """
+
+    signal: Signal
+    position: int
+    airports: frozenset[str]
+    match_regions: frozenset[str]
+    window_start: Optional[date]
+    window_end: Optional[date]
+    window_checks_return: bool
+    min_nights: Optional[int]
+    max_nights: Optional[int]
+    min_star_rating: Optional[float]
+    budget_cents: Optional[int]
+
+    def matches(self, deal: Deal, duration_days: int) -> bool:
+        """Evaluate date, nights, star and budget criteria (route already matched)."""
+        if self.window_start is not None and self.window_end is not None:  # set together
+            if deal.depart_date < self.window_start:
+                return False
+            if self.window_checks_return:
+                deal_return = deal.return_date or (deal.depart_date + timedelta(days=duration_days))
+                if deal_return > self.window_end:
+                    return False
+            elif deal.depart_date > self.window_end:
+                return False
+
+        if self.min_nights and duration_days < self.min_nights:
+            return False
+        if self.max_nights and duration_days > self.max_nights:
+            return False
+
+        if self.min_star_rating and deal.star_rating is not None:
+            if deal.star_rating < self.min_star_rating:
+                return False
+
+        # Budget check (deal prices are per-person, target_pp is per-person)
+        if self.budget_cents is not None and deal.price_cents > self.budget_cents:
+            return False
+
+        return True
+
+
+def _month_bounds(start_month_str: str, end_month_str: str) -> tuple[date, date]:
+    """Return (first day of start month, last day of end month)."""
+    start_month = datetime.strptime(start_month_str, "%Y-%m").date().replace(day=1)
+    end_month_dt = datetime.strptime(end_month_str, "%Y-%m")
+    if end_month_dt.month == 12:
+        end_month = end_month_dt.replace(day=31).date()
+    else:
+        end_month = (end_month_dt.replace(month=end_month_dt.month + 1, day=1) - timedelta(days=1)).date()
+    return start_month, end_month
+
+
+def _expand_regions(signal_regions: list[str]) -> frozenset[str]:
+    """Every deal region that matches a signal: exact regions plus children of parent catch-alls."""
+    expanded = set(signal_regions)
+    for region in signal_regions:
+        expanded |= _CHILD_REGIONS.get(region, frozenset())
+    return frozenset(expanded)
+
+
+def compile_signal(signal: Signal, position: int = 0) -> CompiledSignal:
+    """Parse a signal's config into a CompiledSignal. Raises on malformed config."""
+    config = signal.config or {}
+    budget = config.get("budget", {})
+    travel_window = config.get("travel_window", {})
+    preferences = config.get("preferences", {})
+
+    window_start = window_end = None
+    window_checks_return = False
+    start_date_str = travel_window.get("start_date")
+    end_date_str = travel_window.get("end_date")
+    if start_date_str and end_date_str:
+        # start_date = earliest departure, end_date = latest return
+        window_start = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+        window_end = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+        window_checks_return = True
+    else:
+        start_month_str = travel_window.get("start_month")
+        end_month_str = travel_window.get("end_month")
+        if start_month_str and end_month_str:
+            window_start, window_end = _month_bounds(start_month_str, end_month_str)
+
+    min_nights = travel_window.get("min_nights")
+    max_nights = travel_window.get("max_nights")
+    min_star_rating = preferences.get("min_star_rating")
+    target_pp = budget.get("target_pp")
+
+    return CompiledSignal(
+        signal=signal,
+        position=position,
+        airports=frozenset(signal.departure_airports or ()),
+        match_regions=_expand_regions(signal.destination_regions or []),
+        window_start=window_start,
+        window_end=window_end,
+        window_checks_return=window_checks_return,
+        min_nights=int(min_nights) if min_nights else None,
+        max_nights=int(max_nights) if max_nights else None,
+        min_star_rating=float(min_star_rating) if min_star_rating else None,
+        budget_cents=int(target_pp) * 100 if target_pp else None,
+    )
+
+
+class SignalIndex:
+    """Active signals compiled and indexed by (departure airport, deal region).
+
+    Build once per cycle with ``load_signal_index`` (or ``SignalIndex(signals)``)
+    and pass to ``match_deal_to_signals``. Signals with malformed configs are
+    logged and left out of the index.
+    """
+
+    def __init__(self, signals: list[Signal]):
+        self.signals = list(signals)
+        self.compiled: list[CompiledSignal] = []
+        self._by_route: dict[tuple[str, str], list[CompiledSignal]] = defaultdict(list)
+        for position, signal in enumerate(self.signals):
+            try:
+                compiled = compile_signal(signal, position)
+            except Exception as e:
+                logger.warning("Error compiling signal %s: %s", signal.id, e)
+                continue
+            self.compiled.append(compiled)
+            for airport in compiled.airports:
+                for region in compiled.match_regions:
+                    self._by_route[(airport, region)].append(compiled)
+        self._by_route = dict(self._by_route)
+
+    def __len__(self) -> int:
+        return len(self.signals)
+
+    def candidates(self, gateway: str, region: Optional[str]) -> list[CompiledSignal]:
+        """Compiled signals whose airports and regions cover this route, in load order."""
+        if not region:
+            return []
+        return self._by_route.get((gateway, region), [])
+
+    def match(self, deal: Deal, deal_meta: dict) -> list[Signal]:
+        """Return the signals matching a deal. deal_meta needs gateway, region, duration_days."""
+        duration_days = deal_meta.get("duration_days", 7)
+        return [
+            compiled.signal
+            for compiled in self.candidates(deal_meta["gateway"], deal_meta["region"])
+            if compiled.matches(deal, duration_days)
+        ]
+
 
 def load_active_signals(db: Session) -> list[Signal]:
     """Load all active signals once. Call at cycle start and pass to match_deal_to_signals."""
-    return db.execute(
+    return list(db.execute(
         select(Signal).where(Signal.status == "active")
-    ).scalars().all()
+    ).scalars())
+
+
+def load_signal_index(db: Session) -> SignalIndex:
+    """Load and compile all active signals into a SignalIndex for this cycle."""
+    return SignalIndex(load_active_signals(db))
 
 
 def match_deal_to_signals(
     db: Session,
     deal: Deal,
     deal_meta: dict,
-    signals: Optional[list[Signal]] = None,
+    signals: Optional[Union[SignalIndex, list[Signal]]] = None,
 ) -> list[Signal]:
     """Match a single deal against active signals. Returns matched signals.
 
-    If signals is None, queries the DB (backwards-compatible fallback).
-    Pass pre-loaded signals from load_active_signals() to avoid repeated queries.
+    Pass a SignalIndex from load_signal_index() so each deal only touches the
+    signals indexed under its gateway and region. A plain list of signals is
+    compiled on the fly; None queries the DB (backwards-compatible fallbacks).
     """
     if signals is None:
-        signals = load_active_signals(db)
+        signals = load_signal_index(db)
+    elif not isinstance(signals, SignalIndex):
+        signals = SignalIndex(signals)
+    return signals.match(deal, deal_meta)
 
-    matches = []
-    for signal in signals:
-        try:
-            config = signal.config
-            budget = config.get("budget", {})
-            travel_window = config.get("travel_window", {})
 
-            if deal_meta["gateway"] not in signal.departure_airports:
-                continue
-            if not deal_matches_signal_region(deal_meta["region"], signal.destination_regions):
-                continue
+def bulk_create_deal_matches(db: Session, rows: list[dict]) -> set[tuple[uuid.UUID, uuid.UUID]]:
+    """Insert DealMatch rows, skipping pairs that already exist, and commit.
 
-            start_date_str = travel_window.get("start_date")
-            end_date_str = travel_window.get("end_date")
-            if start_date_str and end_date_str:
-                start_dt = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-                end_dt = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-                # start_date = earliest departure, end_date = latest return
-                if deal.depart_date < start_dt:
-                    continue
-                deal_return = deal.return_date or (deal.depart_date + timedelta(days=deal_meta.get("duration_days", 7)))
-                if deal_return > end_dt:
-                    continue
-            else:
-                start_month_str = travel_window.get("start_month")
-                end_month_str = travel_window.get("end_month")
-                if start_month_str and end_month_str:
-                    start_month = datetime.strptime(start_month_str, "%Y-%m").date().replace(day=1)
-                    end_month_dt = datetime.strptime(end_month_str, "%Y-%m")
-                    if end_month_dt.month == 12:
-                        end_month = end_month_dt.replace(day=31).date()
-                    else:
-                        end_month = (end_month_dt.replace(month=end_month_dt.month + 1, day=1) - timedelta(days=1)).date()
-                    if not (start_month <= deal.depart_date <= end_month):
-                        continue
-
-            min_nights = travel_window.get("min_nights")
-            max_nights = travel_window.get("max_nights")
-            if min_nights and deal_meta["duration_days"] < min_nights:
-                continue
-            if max_nights and deal_meta["duration_days"] > max_nights:
-                continue
+    Each row is a dict of DealMatch column values and must include signal_id
+    and deal_id (plus optional price_per_night_cents, value_label,
+    price_delta_cents). Existing (signal_id, deal_id) pairs are left untouched
+    via ON CONFLICT on uq_deal_matches_signal_deal.
 
-            preferences = config.get("preferences", {})
-            min_star_rating = preferences.get("min_star_rating")
-            if min_star_rating and deal.star_rating is not None:
-                if deal.star_rating < float(min_star_rating):
-                    continue
-
-            # Budget check (deal prices are per-person, target_pp is per-person)
-            target_pp = budget.get("target_pp")
-            if target_pp:
-                budget_cents = int(target_pp) * 100
-                if deal.price_cents > budget_cents:
-                    continue
-
-            matches.append(signal)
-        except Exception as e:
-            logger.warning("Error matching signal %s: %s", signal.id, e)
-            continue
-
-    return matches
+    Returns the (signal_id, deal_id) pairs that were actually inserted, so
+    callers only alert on truly new matches.
+    """
+    unique_rows = list({(r["signal_id"], r["deal_id"]): r for r in rows}.values())
+    if not unique_rows:
+        return set()
+
+    stmt = (
+        pg_insert(DealMatch)
+        .on_conflict_do_nothing(constraint="uq_deal_matches_signal_deal")
+        .returning(DealMatch.signal_id, DealMatch.deal_id)
+    )
+    created = {(row.signal_id, row.deal_id) for row in db.execute(stmt, unique_rows)}
+    db.commit()
+    return created
@@ -0,0 +1,279 @@
+"""Concurrent page fetching with per-session human-like pacing.
+
+A ``FetchPool`` runs N worker threads over a shared queue of page tasks. Each
+worker owns one HTTP session — its own browser profile, proxy connection (new
+IP) and referer chain — and paces itself exactly like the serial scraper does:
+``delay()`` after every page except 404s, ``group_pause()`` plus an occasional
+navigation visit when it moves to a new task group (destination), and a fresh
+session every 30-80 pages. Per-IP request rate is therefore unchanged while
+wall-clock time drops roughly N-fold.
+
+Workers only fetch. Raw responses are handed to the consumer through
+``results()``, which is where parsing, block detection and DB writes happen.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional, Protocol
+from urllib.parse import urlparse
+
+from app.workers.shared.browser_profiles import build_request_headers
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class FetchSession(Protocol):
+    """What FetchPool needs from an HTTP session (e.g. curl_cffi's Session)."""
+
+    def get(self, url: str, *args: Any, **kwargs: Any) -> Any: ...
+
+    def close(self) -> None: ...
+
+
+@dataclass(frozen=True)
+class PageTask:
+    """A page to fetch. ``group`` is the pacing group (e.g. destination slug)."""
+
+    url: str
+    group: str = ""
+
+
+@dataclass
+class PageResult:
+    """Raw outcome of fetching one PageTask."""
+
+    task: PageTask
+    worker_id: int
+    status_code: Optional[int]
+    html: Optional[str]
+    error: Optional[str] = None
+
+    @property
+    def not_found(self) -> bool:
+        return self.status_code == 404
+
+
+class FetchPool:
+    """Fetch page tasks with ``workers`` independently paced sessions.
+
+    Args:
+        tasks: Pages to fetch, in the order they should be handed out.
+        workers: Number of concurrent sessions (threads).
+        profile_factory: Returns a browser profile dict for a new worker.
+        session_factory: Builds an HTTP session (curl_cffi-compatible ``get``)
+            for a profile. Called again whenever a worker rotates its IP.
+        delay: Seconds to pause after each non-404 page.
+        group_pause: Seconds to pause when a worker switches task group.
+        warmup_urls: A worker visits 1-2 of these before its first task.
+        nav_urls: Occasionally visited between groups (``nav_probability``).
+        url_guard: Raises ValueError for URLs that must not be fetched.
+        max_per_host: Cap on in-flight requests per host across all workers.
+            None leaves it uncapped (at most ``workers`` in flight).
+        should_stop: Polled during pauses; True stops the pool (e.g. SIGTERM).
+    """
+
+    def __init__(
+        self,
+        tasks: Iterable[PageTask],
+        *,
+        workers: int,
+        profile_factory: Callable[[], dict],
+        session_factory: Callable[[dict], FetchSession],
+        delay: Callable[[], float],
+        group_pause: Callable[[], float],
+        warmup_urls: Iterable[str] = (),
+        nav_urls: Iterable[str] = (),
+        nav_probability: float = 0.30,
+        url_guard: Optional[Callable[[str], None]] = None,
+        max_per_host: Optional[int] = None,
+        rotate_pages: tuple[int, int] = (30, 80),
+        should_stop: Optional[Callable[[], bool]] = None,
+        timeout: float = 30,
+    ):
+        self.workers = max(1, workers)
+        self._tasks: queue.Queue = queue.Queue()
+        for task in tasks:
+            self._tasks.put(task)
+        self._results: queue.Queue = queue.Queue()
+        self._profile_factory = profile_factory
+        self._session_factory = session_factory
+        self._delay = delay
+        self._group_pause = group_pause
+        self._warmup_urls = list(warmup_urls)
+        self._nav_urls = list(nav_urls)
+        self._nav_probability = nav_probability
+        self._url_guard = url_guard
+        self._max_per_host = max_per_host
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        self._rotate_pages = rotate_pages
+        self._should_stop = should_stop or (lambda: False)
+        self._timeout = timeout
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._rng = random.Random()  # noqa: S311 - pacing jitter, not security-sensitive
+
+    # ── Consumer side ─────────────────────────────────────────────────────────
+
+    def results(self) -> Iterator[PageResult]:
+        """Start the workers and yield results as pages complete."""
+        self._threads = [
+            threading.Thread(target=self._run_worker, args=(i,), name=f"fetch-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        finished = 0
+        try:
+            while finished < self.workers:
+                item = self._results.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+                yield item
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        """Ask workers to stop after their in-flight request; pauses end immediately."""
+        self._stop.set()
+
+    def close(self) -> None:
+        self.stop()
+        for thread in self._threads:
+            thread.join(timeout=self._timeout + 5)
+
+    def __enter__(self) -> "FetchPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── Worker side ───────────────────────────────────────────────────────────
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _sleep(self, seconds: float) -> None:
+        """Interruptible pause, polling should_stop once a second."""
+        end = time.monotonic() + seconds
+        while not self._stop.is_set():
+            if self._should_stop():
+                self._stop.set()
+                break
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            self._stop.wait(min(1.0, remaining))
+
+    def _host_slot(self, url: str, limit: int) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(max(1, limit))
+            return slot
+
+    def _get(self, session: FetchSession, profile: dict, url: str, referer: Optional[str], timeout: float):
+        headers = build_request_headers(profile, referer=referer)
+        limit = self._max_per_host
+        if limit is None or limit >= self.workers:
+            return session.get(url, headers=headers, timeout=timeout)
+        with self._host_slot(url, limit):
+            return session.get(url, headers=headers, timeout=timeout)
+
+    def _visit(self, session: FetchSession, profile: dict, url: str, referer: Optional[str]) -> Optional[str]:
+        """Best-effort warmup/nav visit. Returns the new referer."""
+        try:
+            self._get(session, profile, url, referer, timeout=15)
+            return url
+        except Exception as e:
+            logger.debug("Visit failed for %s: %s (continuing)", url, e)
+            return referer
+
+    def _fetch(
+        self, worker_id: int, session: FetchSession, profile: dict, referer: Optional[str], task: PageTask,
+    ) -> PageResult:
+        if self._url_guard:
+            try:
+                self._url_guard(task.url)
+            except ValueError as e:
+                logger.warning("Fetch blocked: %s", e)
+                return PageResult(task, worker_id, None, None, error=str(e))
+        try:
+            resp = self._get(session, profile, task.url, referer, timeout=self._timeout)
+        except Exception as e:
+            if "404" in str(e):
+                return PageResult(task, worker_id, 404, None)
+            logger.warning("Failed to fetch %s: %s", task.url, e)
+            return PageResult(task, worker_id, None, None, error=str(e))
+        if resp.status_code == 404:
+            logger.debug("404 for %s — skipping", task.url)
+            return PageResult(task, worker_id, 404, None)
+        if resp.status_code >= 400:
+            logger.warning("Failed to fetch %s: HTTP %d", task.url, resp.status_code)
+            return PageResult(task, worker_id, resp.status_code, None, error=f"HTTP {resp.status_code}")
+        return PageResult(task, worker_id, resp.status_code, resp.text)
+
+    def _run_worker(self, worker_id: int) -> None:
+        session: Optional[FetchSession] = None
+        try:
+            profile = self._profile_factory()
+            session = self._session_factory(profile)
+            referer: Optional[str] = None
+            pages_on_ip = 0
+            rotate_at = self._rng.randint(*self._rotate_pages)
+            last_group: Optional[str] = None
+
+            if self._warmup_urls:
+                for url in self._rng.sample(self._warmup_urls, k=min(len(self._warmup_urls), self._rng.randint(1, 2))):
+                    referer = self._visit(session, profile, url, referer)
+                    self._sleep(self._rng.uniform(3, 8))
+
+            while not self._stop.is_set():
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+                if last_group is not None and task.group != last_group:
+                    self._sleep(self._group_pause())
+                    if self._nav_urls and self._rng.random() < self._nav_probability:
+                        referer = self._visit(session, profile, self._rng.choice(self._nav_urls), referer)
+                        self._sleep(self._rng.uniform(3, 8))
+                    if self._stop.is_set():
+                        break
+                last_group = task.group
+
+                result = self._fetch(worker_id, session, profile, referer, task)
+                if result.html is not None:
+                    referer = task.url
+                self._results.put(result)
+
+                if not result.not_found:
+                    self._sleep(self._delay())
+
+                pages_on_ip += 1
+                if pages_on_ip >= rotate_at:
+                    session.close()
+                    session = self._session_factory(profile)
+                    pages_on_ip = 0
+                    rotate_at = self._rng.randint(*self._rotate_pages)
+                    logger.debug("Worker %d rotated session (next in %d pages)", worker_id, rotate_at)
+        except Exception:
+            logger.exception("Fetch worker %d crashed", worker_id)
+        finally:
+            if session is not None:
+                try:
+                    session.close()
+                except Exception:
+                    logger.debug("Worker %d session close failed", worker_id)
+            self._results.put(_DONE)
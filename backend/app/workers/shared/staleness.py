@@ -0,0 +1,85 @@
+"""Shared end-of-cycle deal staleness and expiry logic used by all scrapers.
+
+Both passes run as a single server-side UPDATE per provider, so memory use and
+round trips stay flat as the deals table grows. Seen dedupe keys are sent as one
+text[] parameter and anti-joined via UNNEST instead of a NOT IN literal list.
+"""
+
+import logging
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_MARK_UNSEEN_SQL = text("""
+    WITH seen AS (
+        SELECT DISTINCT unnest(CAST(:seen_keys AS text[])) AS dedupe_key
+    ),
+    updated AS (
+        UPDATE deals d
+        SET missed_cycles = COALESCE(d.missed_cycles, 0) + 1,
+            is_active = COALESCE(d.missed_cycles, 0) + 1 < :threshold,
+            deactivated_at = CASE
+                WHEN COALESCE(d.missed_cycles, 0) + 1 >= :threshold THEN :now
+                ELSE d.deactivated_at
+            END
+        WHERE d.is_active
+          AND d.provider = :provider
+          AND NOT EXISTS (SELECT 1 FROM seen s WHERE s.dedupe_key = d.dedupe_key)
+        RETURNING d.is_active
+    )
+    SELECT count(*) AS unseen,
+           count(*) FILTER (WHERE NOT is_active) AS deactivated
+    FROM updated
+""")
+
+_DEACTIVATE_EXPIRED_SQL = text("""
+    WITH updated AS (
+        UPDATE deals
+        SET is_active = false,
+            deactivated_at = :now
+        WHERE is_active
+          AND provider = :provider
+          AND depart_date < :today
+        RETURNING 1
+    )
+    SELECT count(*) FROM updated
+""")
+
+
+def mark_unseen_deals(
+    db: Session,
+    provider: str,
+    seen_dedupe_keys: set[str],
+    threshold: int,
+) -> tuple[int, int]:
+    """Graduated staleness for one provider's active deals not seen this cycle.
+
+    Increments missed_cycles on every unseen active deal and deactivates those
+    reaching ``threshold`` misses. Commits and returns (unseen, deactivated).
+    """
+    row = db.execute(_MARK_UNSEEN_SQL, {
+        "seen_keys": list(seen_dedupe_keys),
+        "threshold": threshold,
+        "now": datetime.now(timezone.utc),
+        "provider": provider,
+    }).one()
+    db.commit()
+    return row.unseen, row.deactivated
+
+
+def deactivate_expired_deals(db: Session, provider: str, today: Optional[date] = None) -> int:
+    """Mark one provider's active deals with a past departure date inactive.
+
+    Commits and returns the number of deals deactivated.
+    """
+    count = db.execute(_DEACTIVATE_EXPIRED_SQL, {
+        "now": datetime.now(timezone.utc),
+        "provider": provider,
+        "today": today or date.today(),
+    }).scalar_one()
+    db.commit()
+    return int(count)
@@ -6,7 +6,8 @@ import re
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import case, func, insert, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.db.models.deal import Deal
@@ -69,6 +70,9 @@ def upsert_deal(db: Session, provider: str, deal: dict) -> Optional[Deal]:
         existing._price_delta = delta
 
         if existing.price_cents != deal["price_cents"]:
+            existing.prev_price_cents = old_price
+            existing.last_price_change_at = existing.last_seen_at
+            existing.last_price_delta_cents = deal["price_cents"] - old_price
             existing.price_cents = deal["price_cents"]
             # Only record price history when the price actually changes
             db.add(DealPriceHistory(deal_id=existing.id, price_cents=deal["price_cents"]))
@@ -100,3 +104,107 @@ def upsert_deal(db: Session, provider: str, deal: dict) -> Optional[Deal]:
     db.add(DealPriceHistory(deal_id=new_deal.id, price_cents=new_deal.price_cents))
     db.commit()
     return new_deal
+
+
+def _new_deal_row(provider: str, deal: dict) -> dict:
+    """Column values for inserting a scraped deal (same sanitization as upsert_deal)."""
+    return {
+        "provider": provider,
+        "origin": deal["gateway"],
+        "destination": _sanitize_text(deal["region"] or deal.get("destination_str", ""), max_len=200),
+        "depart_date": deal["depart_date"],
+        "return_date": deal["return_date"],
+        "price_cents": deal["price_cents"],
+        "currency": "CAD",
+        "deeplink_url": _sanitize_url(deal.get("deeplink_url")),
+        "dedupe_key": deal["dedupe_key"],
+        "hotel_name": _sanitize_text(deal.get("hotel_name"), max_len=300),
+        "hotel_id": deal.get("hotel_id"),
+        "discount_pct": deal.get("discount_pct"),
+        "destination_str": _sanitize_text(deal.get("destination_str"), max_len=200),
+        "star_rating": deal.get("star_rating"),
+    }
+
+
+def bulk_upsert_deals(db: Session, provider: str, deals: list[dict]) -> list[Deal]:
+    """Create or update a page (or cycle) of deals in one statement and one commit.
+
+    Same semantics as calling upsert_deal() per deal: existing deals get
+    last_seen_at/missed_cycles reset, are reactivated if inactive, and take the
+    new price; a DealPriceHistory row is written for new deals and for deals
+    whose price changed, and prev_price_cents/last_price_change_at/
+    last_price_delta_cents record the change. Returned Deals carry
+    _price_dropped/_price_delta.
+
+    The pre-update prices come from a CTE evaluated against the statement's
+    snapshot, so a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING yields
+    both old and new prices. Deals repeated within the batch keep the last
+    occurrence (Postgres cannot update the same row twice in one statement).
+    Returns detached deals in first-seen order of their dedupe_key.
+    """
+    by_key: dict[str, dict] = {}
+    for deal in deals:
+        by_key[deal["dedupe_key"]] = deal
+    if not by_key:
+        return []
+
+    old_prices = (
+        select(Deal.id, Deal.price_cents)
+        .where(Deal.dedupe_key.in_(list(by_key)))
+        .cte("old_prices")
+    )
+    stmt = pg_insert(Deal).values([_new_deal_row(provider, d) for d in by_key.values()])
+    price_changed = Deal.price_cents != stmt.excluded.price_cents
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Deal.dedupe_key],
+        set_={
+            "price_cents": stmt.excluded.price_cents,
+            # SET expressions see the pre-update row
+            "prev_price_cents": case((price_changed, Deal.price_cents), else_=Deal.prev_price_cents),
+            "last_price_change_at": case((price_changed, func.now()), else_=Deal.last_price_change_at),
+            "last_price_delta_cents": case(
+                (price_changed, stmt.excluded.price_cents - Deal.price_cents), else_=Deal.last_price_delta_cents,
+            ),
+            "last_seen_at": func.now(),
+            "missed_cycles": 0,
+            "is_active": True,
+            "deactivated_at": case((Deal.is_active, Deal.deactivated_at), else_=None),
+            "reactivated_at": case((Deal.is_active, Deal.reactivated_at), else_=func.now()),
+        },
+    )
+    old_price_col = (
+        select(old_prices.c.price_cents)
+        # RETURNING subqueries aren't auto-correlated; reference the upserted row directly
+        .where(old_prices.c.id == literal_column("deals.id"))
+        .scalar_subquery()
+        .label("old_price_cents")
+    )
+    upsert = stmt.add_cte(old_prices).returning(Deal, old_price_col)
+
+    rows = db.execute(upsert, execution_options={"populate_existing": True}).all()
+
+    upserted: dict[str, Deal] = {}
+    history_rows = []
+    for deal_obj, old_price in rows:
+        if old_price is None:
+            deal_obj._price_dropped = False
+            deal_obj._price_delta = 0
+            history_rows.append({"deal_id": deal_obj.id, "price_cents": deal_obj.price_cents})
+        else:
+            delta = old_price - deal_obj.price_cents
+            deal_obj._price_dropped = delta > 0
+            deal_obj._price_delta = delta
+            # Only record price history when the price actually changes
+            if delta != 0:
+                history_rows.append({"deal_id": deal_obj.id, "price_cents": deal_obj.price_cents})
+        upserted[deal_obj.dedupe_key] = deal_obj
+
+    if history_rows:
+        db.execute(insert(DealPriceHistory), history_rows)
+    # Detach before committing so reading the returned deals afterwards doesn't
+    # trigger a refresh SELECT per row (expire_on_commit)
+    for deal_obj in upserted.values():
+        db.expunge(deal_obj)
+    db.commit()
+
+    return [upserted[key] for key in by_key if key in upserted]
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Load test: API latency under concurrent Scout briefing + market requests.
+
+Seeds a bench Pro user with signals, deals (provider "bench") and matches,
+starts the app under uvicorn in a subprocess (auth overridden to the bench
+user, rate limiting off) and drives it over HTTP at a fixed concurrency,
+mixing /api/scout/briefing, /api/market/overview and /health. Reports p50/p99
+and throughput per endpoint. A handler that blocks the event loop shows up as
+inflated latency on every other endpoint, /health in particular. All bench
+rows are deleted afterwards.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_api_latency
+    python -m benchmarks.bench_api_latency --concurrency 32 --requests 600 --signals 10
+
+Requires POSTGRES_* env vars pointing at a migrated database, plus the settings
+app.main needs at import time (e.g. UNSUB_SECRET).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from sqlalchemy import delete, insert
+
+from app.api.deps import get_clerk_user_id
+from app.core.rate_limit import limiter
+from app.db.models.deal import Deal
+from app.db.models.deal_match import DealMatch
+from app.db.models.signal import Signal
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.main import app
+
+PROVIDER = "bench"
+ENDPOINTS = {
+    "briefing": "/api/scout/briefing",
+    "market_overview": "/api/market/overview",
+    "health": "/health",
+}
+MIX = ["briefing"] * 4 + ["market_overview"] * 4 + ["health"] * 2
+
+
+def seed(db, user_id, n_signals: int, deals: int, rng: random.Random) -> None:
+    now = datetime.now(timezone.utc)
+    origins = ["YYZ", "YUL", "YVR"]
+    regions = ["cancun", "punta_cana", "varadero"]
+    deal_rows = []
+    for _ in range(deals):
+        depart = date.today() + timedelta(days=rng.randint(10, 150))
+        deal_rows.append({
+            "id": uuid.uuid4(),
+            "provider": PROVIDER,
+            "origin": rng.choice(origins),
+            "destination": rng.choice(regions),
+            "depart_date": depart,
+            "return_date": depart + timedelta(days=7),
+            "price_cents": rng.randint(700, 3000) * 100,
+            "star_rating": rng.choice([3.5, 4.0, 4.5]),
+            "hotel_name": f"Bench Resort {rng.randint(1, 200)}",
+            "hotel_id": str(rng.randint(1, 200)),
+            "is_active": True,
+            "dedupe_key": f"{PROVIDER}:{uuid.uuid4().hex}",
+        })
+    db.execute(insert(Deal), deal_rows)
+
+    signal_rows, match_rows = [], []
+    for i in range(n_signals):
+        origin, region = origins[i % len(origins)], regions[i % len(regions)]
+        sid = uuid.uuid4()
+        signal_rows.append({
+            "id": sid,
+            "name": f"Bench Signal {i}",
+            "status": "active",
+            "user_id": user_id,
+            "departure_airports": [origin],
+            "destination_regions": [region],
+            "config": {
+                "departure": {"airports": [origin]},
+                "destination": {"regions": [region]},
+                "travel_window": {"min_nights": 5, "max_nights": 10},
+                "travellers": {"adults": 2},
+                "budget": {"target_pp": 2500},
+                "notifications": {},
+                "preferences": {},
+            },
+        })
+        for deal in deal_rows:
+            if deal["origin"] == origin and deal["destination"] == region:
+                match_rows.append({"signal_id": sid, "deal_id": deal["id"], "matched_at": now})
+    db.execute(insert(Signal), signal_rows)
+    if match_rows:
+        db.execute(insert(DealMatch), match_rows)
+    db.commit()
+
+
+def cleanup(db, user_id) -> None:
+    db.execute(delete(Signal).where(Signal.user_id == user_id))
+    db.execute(delete(Deal).where(Deal.provider == PROVIDER))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+
+def serve(port: int, clerk_id: str) -> None:
+    """Run the app under uvicorn with auth pinned to the bench user (subprocess entry point)."""
+    import uvicorn
+
+    limiter.enabled = False
+    app.dependency_overrides[get_clerk_user_id] = lambda: clerk_id
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("API server did not start")
+
+
+async def run_load(base_url: str, total: int, concurrency: int, rng: random.Random) -> dict[str, list[float]]:
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(rng.choice(MIX))
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def worker():
+            while True:
+                try:
+                    name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = time.perf_counter()
+                resp = await client.get(ENDPOINTS[name])
+                latencies[name].append(time.perf_counter() - t0)
+                if resp.status_code != 200:
+                    errors[name] += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    for name, count in errors.items():
+        print(f"warning: {count} non-200 responses from {name}")
+    return latencies
+
+
+def _pct(values: list[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent briefing + market API latency")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--signals", type=int, default=6)
+    parser.add_argument("--deals", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--serve", nargs=2, metavar=("PORT", "CLERK_ID"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(int(args.serve[0]), args.serve[1])
+        return
+
+    rng = random.Random(args.seed)
+    user_id = uuid.uuid4()
+    clerk_id = f"bench_{user_id.hex[:12]}"
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with SessionLocal() as db:
+        db.add(User(id=user_id, clerk_id=clerk_id, email="bench@example.com", plan_type="pro"))
+        db.commit()
+        server = None
+        try:
+            seed(db, user_id, args.signals, args.deals, rng)
+            server = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_api_latency", "--serve", str(port), clerk_id],
+                env=os.environ.copy(),
+            )
+            _wait_until_up(base_url)
+            asyncio.run(run_load(base_url, 20, 4, rng))  # warm up pools and caches
+            t0 = time.perf_counter()
+            latencies = asyncio.run(run_load(base_url, args.requests, args.concurrency, rng))
+            elapsed = time.perf_counter() - t0
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+            db.rollback()
+            cleanup(db, user_id)
+
+    print(f"concurrency={args.concurrency} requests={args.requests} elapsed={elapsed:.2f}s "
+          f"throughput={args.requests / elapsed:.1f} req/s")
+    print(f"{'endpoint':>16} {'n':>5} {'p50 ms':>9} {'p99 ms':>9}")
+    for name in ENDPOINTS:
+        values = latencies.get(name, [])
+        print(f"{name:>16} {len(values):>5} {_pct(values, 50) * 1000:>9.1f} {_pct(values, 99) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark market bucket loads: full Deal entities vs DealLite projections.
+
+Seeds one private bucket (provider "bench") with enough fresh deals to hit the
+deals_in_bucket cap, then loads it repeatedly as ORM entities (the previous
+select(Deal) query) and as DealLite rows, reporting latency per load and the
+peak Python memory allocated while the rows are held (tracemalloc). All bench
+rows are deleted afterwards.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_deal_projection
+    python -m benchmarks.bench_deal_projection --deals 5000 --repeat 50
+
+Requires POSTGRES_* env vars pointing at a migrated database.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, insert
+
+from app.db.models.deal import Deal
+from app.db.session import SessionLocal
+from app.services.market_intel.core import _base_fresh_deals_query, deals_in_bucket
+from app.services.market_intel.types import MarketBucket
+
+PROVIDER = "bench"
+BUCKET = MarketBucket(origin="BPJ", destination="cancun", duration_bucket="one_week")
+
+
+def seed(db, n: int, rng: random.Random) -> None:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for _ in range(n):
+        depart = date.today() + timedelta(days=rng.randint(1, 180))
+        rows.append({
+            "id": uuid.uuid4(),
+            "provider": PROVIDER,
+            "origin": BUCKET.origin,
+            "destination": BUCKET.destination,
+            "depart_date": depart,
+            "return_date": depart + timedelta(days=rng.choice([6, 7, 8])),
+            "price_cents": rng.randint(600, 3000) * 100,
+            "star_rating": rng.choice([None, 3.0, 3.5, 4.0, 4.5, 5.0]),
+            "hotel_id": str(rng.randint(1, 300)),
+            "hotel_name": f"Bench Resort {rng.randint(1, 300)}",
+            "deeplink_url": f"https://example.com/deal/{uuid.uuid4().hex}",
+            "is_active": True,
+            "last_seen_at": now,
+            "dedupe_key": f"{PROVIDER}:{uuid.uuid4().hex}",
+        })
+    db.execute(insert(Deal), rows)
+    db.commit()
+
+
+def load_entities(db, limit: int) -> list:
+    """The pre-DealLite deals_in_bucket query."""
+    stmt = (
+        _base_fresh_deals_query()
+        .where(Deal.origin == BUCKET.origin)
+        .where(Deal.destination == BUCKET.destination)
+        .where(Deal.return_date.isnot(None))
+        .where((Deal.return_date - Deal.depart_date).between(6, 8))
+        .order_by(Deal.price_cents)
+        .limit(limit)
+    )
+    return db.execute(stmt).scalars().all()
+
+
+def load_lite(db, limit: int) -> list:
+    return deals_in_bucket(db, BUCKET, limit=limit)
+
+
+def measure(db, loader, limit: int, repeat: int) -> tuple[int, float, float, int]:
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        t0 = time.perf_counter()
+        rows = loader(db, limit)
+        timings.append((time.perf_counter() - t0) * 1000)
+        del rows
+
+    db.expunge_all()
+    tracemalloc.start()
+    rows = loader(db, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(rows)
+    del rows
+    db.expunge_all()
+    return count, statistics.median(timings), max(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Deal entity vs DealLite bucket loads")
+    parser.add_argument("--deals", type=int, default=2500)
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        try:
+            seed(db, args.deals, random.Random(args.seed))
+            print(f"{'path':>8} {'rows':>6} {'p50 ms':>8} {'max ms':>8} {'peak KiB':>9}")
+            for name, loader in (("entity", load_entities), ("lite", load_lite)):
+                count, p50, worst, peak = measure(db, loader, args.limit, args.repeat)
+                print(f"{name:>8} {count:>6} {p50:>8.1f} {worst:>8.1f} {peak / 1024:>9.0f}")
+        finally:
+            db.rollback()
+            db.execute(delete(Deal).where(Deal.provider == PROVIDER))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
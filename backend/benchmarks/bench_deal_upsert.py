@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Benchmark scraped-deal upsert throughput: per-row upsert_deal vs bulk_upsert_deals.
+
+Writes synthetic pages of deals (provider "bench") into the configured
+Postgres, first as inserts and then as a re-scrape where a share of prices
+change, and reports rows/sec and SQL statements per page for each path.
+All bench rows are deleted afterwards.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_deal_upsert
+    python -m benchmarks.bench_deal_upsert --pages 50 --page-size 40 --price-change-pct 20
+
+Requires POSTGRES_* env vars pointing at a migrated database.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, event
+
+from app.db.models.deal import Deal
+from app.db.session import SessionLocal, engine
+from app.workers.shared.upsert import bulk_upsert_deals, upsert_deal
+
+PROVIDER = "bench"
+
+
+class StatementCounter:
+    """Counts SQL statements sent to the server (one per round trip)."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def make_pages(prefix: str, pages: int, page_size: int, rng: random.Random) -> list[list[dict]]:
+    result = []
+    for p in range(pages):
+        page = []
+        for i in range(page_size):
+            depart = date(2026, 6, 1) + timedelta(days=rng.randint(0, 180))
+            page.append({
+                "dedupe_key": f"{PROVIDER}:{prefix}:{p}:{i}",
+                "gateway": "YYZ",
+                "region": "cancun",
+                "destination_str": "Cancun, Mexico",
+                "hotel_name": f"Bench Resort {i}",
+                "hotel_id": str(i),
+                "depart_date": depart,
+                "return_date": depart + timedelta(days=7),
+                "duration_days": 7,
+                "price_cents": rng.randint(800, 3000) * 100,
+                "discount_pct": 0,
+                "deeplink_url": "https://example.com/deal",
+                "star_rating": 4.0,
+            })
+        result.append(page)
+    return result
+
+
+def reprice(pages: list[list[dict]], pct: int, rng: random.Random) -> list[list[dict]]:
+    return [
+        [dict(d, price_cents=d["price_cents"] - 1000) if rng.randint(1, 100) <= pct else dict(d) for d in page]
+        for page in pages
+    ]
+
+
+def run_per_row(pages: list[list[dict]], counter: StatementCounter) -> tuple[float, int]:
+    start_count = counter.count
+    t0 = time.perf_counter()
+    for page in pages:
+        with SessionLocal() as db:
+            for deal in page:
+                upsert_deal(db, PROVIDER, deal)
+    return time.perf_counter() - t0, counter.count - start_count
+
+
+def run_bulk(pages: list[list[dict]], counter: StatementCounter) -> tuple[float, int]:
+    start_count = counter.count
+    t0 = time.perf_counter()
+    for page in pages:
+        with SessionLocal() as db:
+            bulk_upsert_deals(db, PROVIDER, page)
+    return time.perf_counter() - t0, counter.count - start_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark deal upsert throughput")
+    parser.add_argument("--pages", type=int, default=25)
+    parser.add_argument("--page-size", type=int, default=40)
+    parser.add_argument("--price-change-pct", type=int, default=20, help="Share of deals repriced on re-scrape")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    counter = StatementCounter()
+    rows = args.pages * args.page_size
+
+    try:
+        print(f"{'path':>8} {'pass':>8} {'rows/sec':>10} {'stmts/page':>11}")
+        for name, runner in (("per-row", run_per_row), ("bulk", run_bulk)):
+            first = make_pages(name, args.pages, args.page_size, rng)
+            second = reprice(first, args.price_change_pct, rng)
+            for label, pages in (("insert", first), ("rescrape", second)):
+                elapsed, stmts = runner(pages, counter)
+                print(f"{name:>8} {label:>8} {rows / elapsed:>10.0f} {stmts / args.pages:>11.1f}")
+    finally:
+        with SessionLocal() as db:
+            db.execute(delete(Deal).where(Deal.provider == PROVIDER))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
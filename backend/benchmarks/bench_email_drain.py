@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Benchmark email queue drain throughput against a local Resend stub.
+
+Enqueues synthetic emails (email_type "bench") into the configured Postgres,
+starts benchmarks.resend_stub with a simulated provider latency and rate limit,
+then drains the queue with different numbers of calls in flight per drainer
+and of concurrent drainers. Reports emails/sec, API calls and 429s for each.
+All bench rows (and the bench rate bucket) are deleted afterwards.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_email_drain
+    python -m benchmarks.bench_email_drain --emails 5000 --latency-ms 150 --rate-limit 10 --batch-size 50
+
+Requires POSTGRES_* env vars pointing at a migrated database.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, insert, text
+
+from app.core.config import settings
+from app.db.models.email_queue import EmailQueue
+from app.db.session import SessionLocal, engine
+from app.services import email_queue
+from benchmarks.resend_stub import ResendStub
+
+EMAIL_TYPE = "bench"
+BUCKET_KEY = "bench_email_rate_bucket"
+
+
+def enqueue(n: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(EmailQueue), [
+            {
+                "to_email": f"user{i}@bench.test",
+                "subject": f"Bench {i}",
+                "html_body": "<p>" + "x" * 2000 + "</p>",
+                "email_type": EMAIL_TYPE,
+                "priority": 2,
+            }
+            for i in range(n)
+        ])
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(delete(EmailQueue).where(EmailQueue.email_type == EMAIL_TYPE))
+        conn.execute(text("DELETE FROM system_config WHERE key = :key"), {"key": BUCKET_KEY})
+
+
+def run(n_emails: int, concurrency: int, drainers: int, rate: float, stub: ResendStub) -> dict:
+    cleanup()
+    enqueue(n_emails)
+    email_queue.SEND_CONCURRENCY = concurrency
+    calls_before, rejected_before, sent_before = stub.calls, stub.rejected, len(stub.emails)
+
+    def drainer():
+        bucket = email_queue.SharedTokenBucket(engine, rate, key=BUCKET_KEY)
+        with SessionLocal() as db:
+            while drain_once(db, bucket):
+                pass
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=drainer) for _ in range(drainers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    sent = len(stub.emails) - sent_before
+    return {
+        "sent": sent,
+        "seconds": elapsed,
+        "per_sec": sent / elapsed if elapsed else 0.0,
+        "calls": stub.calls - calls_before,
+        "rejected": stub.rejected - rejected_before,
+    }
+
+
+def drain_once(db, bucket) -> bool:
+    stats = email_queue.drain(db, bucket=bucket)
+    return stats["batches"] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark email queue drain throughput")
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--rate-limit", type=float, default=10, help="provider API calls/sec")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--drainers", type=int, nargs="+", default=[1, 3])
+    args = parser.parse_args()
+
+    settings.EMAIL_DRY_RUN = False
+    stub = ResendStub(latency=args.latency_ms / 1000, rate_limit=args.rate_limit).start()
+    email_queue.RESEND_API_URL = stub.url
+    email_queue.RESEND_API_KEY = "bench"
+    email_queue.BATCH_SIZE = args.batch_size
+
+    ceiling = args.rate_limit * args.batch_size
+    print(f"provider limit {args.rate_limit:g} calls/s x {args.batch_size} = {ceiling:g} emails/s ceiling")
+    print(f"{'drainers':>8} {'in flight':>9} {'sent':>6} {'seconds':>8} {'emails/s':>9} {'calls':>6} {'429s':>5}")
+    try:
+        for drainers in args.drainers:
+            for concurrency in args.concurrency:
+                r = run(args.emails, concurrency, drainers, args.rate_limit, stub)
+                print(
+                    f"{drainers:>8} {concurrency:>9} {r['sent']:>6} {r['seconds']:>8.2f} "
+                    f"{r['per_sec']:>9.0f} {r['calls']:>6} {r['rejected']:>5}"
+                )
+    finally:
+        cleanup()
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
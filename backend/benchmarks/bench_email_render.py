@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Benchmark batch email rendering (emails rendered/sec).
+
+Builds synthetic match alert or weekly digest contexts for N users spread over
+a number of routes. Users on the same route share deals, the departure heatmap
+and the destination index, as they do within one scan cycle. Then renders them:
+
+- per_email:   render_template() per user, with no fragment memo
+- memoized:    render_many() in-process; route-level fragments rendered once
+- pool:        render_many() across a process pool of --workers processes
+
+With --db, also per_email_db: render_template(db=...) with the override cache
+dropped before each call, i.e. one email_template_overrides query per email as
+before the cache, against render_many(db=...), which looks it up once.
+
+Checks that every mode produces identical output. No database is needed
+unless --db is given.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_email_render
+    python -m benchmarks.bench_email_render --users 10000 --routes 40 --type weekly_digest --workers 4
+    python -m benchmarks.bench_email_render --db   # needs POSTGRES_* env vars
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import email_templates
+from app.services.email_orchestrator import EmailType
+from app.services.email_templates import invalidate_override, render_many, render_template
+
+DESTINATIONS = ["cancun", "varadero", "punta_cana", "montego_bay", "puerto_vallarta", "riviera_maya"]
+ORIGINS = ["YYZ", "YUL", "YVR", "YYC", "YEG", "YWG", "YOW", "YQR", "YHZ", "YXE"]
+
+
+class BenchUser:
+    def __init__(self, i: int, rng: random.Random):
+        self.email = f"user{i}@bench.test"
+        self.display_name = rng.choice([None, "Sam", "Alex", "Jordan"])
+        self.first_name = None
+        self.plan_type = rng.choice(["free", "pro"])
+        self.plan_status = "active"
+
+
+def route_data(n_routes: int, rng: random.Random) -> list[dict]:
+    routes = []
+    for r in range(n_routes):
+        origin, destination = ORIGINS[r % len(ORIGINS)], DESTINATIONS[r % len(DESTINATIONS)]
+        weeks = [
+            {"week": f"2026-{m:02d}-{d:02d}", "avg_cents": rng.randint(80, 200) * 1000,
+             "deal_count": rng.randint(3, 40)}
+            for m in (3, 4) for d in (2, 9, 16, 23)
+        ]
+        prices = [w["avg_cents"] for w in weeks]
+        for w in weeks:
+            w["is_cheapest"] = w["avg_cents"] == min(prices)
+            w["is_priciest"] = w["avg_cents"] == max(prices)
+        routes.append({
+            "origin": origin,
+            "route": f"{origin} → {destination.replace('_', ' ').title()}",
+            "deals": [
+                {
+                    "deal_id": f"{r}-{k}",
+                    "hotel_name": f"Resort {r}-{k}",
+                    "star_rating": rng.choice([3.5, 4.0, 4.5, 5.0]),
+                    "price_cents": rng.randint(70, 250) * 1000,
+                    "price_delta": rng.choice([0, 5000, 12000]),
+                    "duration_nights": rng.choice([7, 10, 14]),
+                    "depart_date": "2026-03-16",
+                    "provider": rng.choice(["redtag", "selloff"]),
+                    "value_label": rng.choice([None, "Great value", "Rare value"]),
+                    "deeplink_url": f"https://example.com/deal/{r}-{k}",
+                }
+                for k in range(6)
+            ],
+            "departure_heatmap": weeks,
+            "destination_index": [
+                {"destination_region": d, "current_week_avg_cents": rng.randint(80, 200) * 1000,
+                 "week_over_week_pct": rng.uniform(-8, 8)}
+                for d in DESTINATIONS[:5]
+            ],
+        })
+    return routes
+
+
+def match_alert_context(i: int, routes: list[dict], rng: random.Random) -> dict:
+    signals = []
+    for s in range(rng.randint(1, 3)):
+        route = rng.choice(routes)
+        signals.append({
+            "signal_id": f"sig-{i}-{s}",
+            "signal_name": f"Signal {s}",
+            "route": route["route"],
+            "deal_count": len(route["deals"]),
+            "deals": route["deals"][: rng.randint(2, 6)],
+            "intel_sentence": "Prices on this route are 12% below the 30-day average.",
+            "days_monitoring": rng.randint(1, 90),
+            "best_price_cents": route["deals"][0]["price_cents"],
+            "departure_heatmap": route["departure_heatmap"],
+        })
+    return {
+        **signals[0],
+        "active_signal_count": len(signals) + 1,
+        "signals_with_activity_count": len(signals),
+        "quiet_signal_count": 1,
+        "signals_with_activity": signals,
+        "quiet_signals": [{"signal_id": f"q-{i}", "signal_name": "Quiet signal"}],
+        "plan_type": rng.choice(["free", "pro"]),
+        "_unsub_url": f"https://tripsignal.ca/unsubscribe?token={i}",
+    }
+
+
+def weekly_digest_context(i: int, routes: list[dict], rng: random.Random) -> dict:
+    route = rng.choice(routes)
+    return {
+        "deal_count": len(route["deals"]),
+        "deals": route["deals"],
+        "trend_direction": rng.choice(["down", "up", "stable"]),
+        "trend_weeks": rng.randint(0, 4),
+        "best_value_nights": 7,
+        "best_value_pct_saving": 12,
+        "total_matches": rng.randint(0, 80),
+        "days_monitoring": rng.randint(0, 120),
+        "signal_name": f"Signal {i}",
+        "route": route["route"],
+        "best_price_cents": route["deals"][0]["price_cents"],
+        "destination_index": route["destination_index"],
+        "departure_heatmap": route["departure_heatmap"],
+        "_unsub_url": f"https://tripsignal.ca/unsubscribe?token={i}",
+    }
+
+
+def timed(label: str, n: int, fn) -> list:
+    t0 = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<12} {elapsed:>8.2f}s {n / elapsed:>10.0f} emails/s")
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--routes", type=int, default=40)
+    parser.add_argument("--type", choices=["match_alert", "weekly_digest"], default="match_alert")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--db", action="store_true", help="include the per-email override lookup")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    routes = route_data(args.routes, rng)
+    build = match_alert_context if args.type == "match_alert" else weekly_digest_context
+    email_type = EmailType.MATCH_ALERT if args.type == "match_alert" else EmailType.WEEKLY_DIGEST
+    items = [(BenchUser(i, rng), build(i, routes, rng)) for i in range(args.users)]
+    n = len(items)
+
+    print(f"{n} {args.type} emails over {args.routes} routes, {os.cpu_count()} CPUs")
+    baseline = timed("per_email", n, lambda: [render_template(email_type, user=u, context=c) for u, c in items])
+    memoized = timed("memoized", n, lambda: render_many(email_type, items, workers=1))
+    assert memoized == baseline, "memoized output differs"
+
+    if args.db:
+        from app.db.session import SessionLocal
+
+        def per_email_db(db):
+            out = []
+            for u, c in items:
+                invalidate_override(email_type)
+                out.append(render_template(email_type, user=u, context=c, db=db))
+            return out
+
+        with SessionLocal() as db:
+            timed("per_email_db", n, lambda: per_email_db(db))
+            invalidate_override(email_type)
+            timed("memoized_db", n, lambda: render_many(email_type, items, db=db, workers=1))
+
+    if args.workers > 1:
+        email_templates.PARALLEL_RENDER_MIN = 0
+        # First call pays worker start-up (spawn + app import); report it separately
+        timed("pool_warmup", min(n, args.workers * 2), lambda: render_many(
+            email_type, items[: args.workers * 2], workers=args.workers,
+        ))
+        pooled = timed(f"pool x{args.workers}", n, lambda: render_many(email_type, items, workers=args.workers))
+        assert pooled == baseline, "pool output differs"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark market stats + deal scoring: pure Python vs the NumPy backend.
+
+Builds a synthetic deal table in memory (bucket id and price per row, spread
+over a few thousand buckets), then times each backend computing the price
+distribution of every bucket and the value label of every deal against its
+bucket. The NumPy results are checked for exact equality with the pure-Python
+ones.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_market_vectorized
+    python -m benchmarks.bench_market_vectorized --deals 200000 1000000 --buckets 5000
+
+No database required.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.market_intel import vectorized
+from app.services.market_intel.scoring import score_deal
+from app.services.market_intel.types import MarketStats, compute_percentile, compute_stddev
+
+
+def build_table(n_deals: int, n_buckets: int, rng: random.Random) -> tuple[list[int], list[int]]:
+    # Skewed bucket sizes, like real routes: a few big markets and a long tail
+    weights = [1 / (i + 1) for i in range(n_buckets)]
+    bucket_ids = rng.choices(range(n_buckets), weights=weights, k=n_deals)
+    prices = [rng.randint(400, 6000) * 100 + rng.choice((0, 0, 1, 50)) for _ in range(n_deals)]
+    return bucket_ids, prices
+
+
+def pure_stats(bucket_ids: list[int], prices: list[int]) -> dict:
+    grouped: dict[int, list[int]] = {}
+    for bucket, price in zip(bucket_ids, prices, strict=True):
+        grouped.setdefault(bucket, []).append(price)
+
+    stats_by_bucket = {}
+    for bucket, bucket_prices in grouped.items():
+        ordered = sorted(bucket_prices)
+        stats_by_bucket[bucket] = MarketStats(
+            sample_size=len(ordered),
+            min_price=ordered[0],
+            p25_price=compute_percentile(ordered, 0.25),
+            median_price=compute_percentile(ordered, 0.50),
+            p75_price=compute_percentile(ordered, 0.75),
+            max_price=ordered[-1],
+            price_stddev=compute_stddev(ordered),
+            prices=ordered,
+        )
+    return stats_by_bucket
+
+
+def pure_labels(bucket_ids: list[int], prices: list[int], stats_by_bucket: dict) -> list:
+    return [score_deal(price, stats_by_bucket[bucket]).label for bucket, price in zip(bucket_ids, prices, strict=True)]
+
+
+def numpy_labels(bucket_ids: list[int], prices: list[int], stats_by_bucket: dict) -> list:
+    import numpy as np
+
+    buckets = np.asarray(bucket_ids)
+    values = np.asarray(prices)
+    order = np.argsort(buckets, kind="stable")
+    starts = np.flatnonzero(np.r_[True, buckets[order][1:] != buckets[order][:-1]])
+    labels: list = [None] * len(prices)
+    for rows in np.split(order, starts[1:]):
+        bucket_labels = vectorized.label_prices(values[rows], stats_by_bucket[int(buckets[rows[0]])])
+        for i, label in zip(rows.tolist(), bucket_labels, strict=True):
+            labels[i] = label
+    return labels
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized market stats and scoring")
+    parser.add_argument("--deals", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--buckets", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'deals':>9} {'phase':>7} {'pure s':>8} {'numpy s':>8} {'speedup':>8} {'identical':>10}")
+    for n in args.deals:
+        bucket_ids, prices = build_table(n, args.buckets, rng)
+
+        pure, pure_s = timed(pure_stats, bucket_ids, prices)
+        fast, numpy_s = timed(vectorized.bucket_distributions, bucket_ids, prices)
+        print(f"{n:>9} {'stats':>7} {pure_s:>8.2f} {numpy_s:>8.2f} {pure_s / numpy_s:>7.1f}x {str(pure == fast):>10}")
+
+        pure, pure_s = timed(pure_labels, bucket_ids, prices, pure)
+        fast, numpy_s = timed(numpy_labels, bucket_ids, prices, fast)
+        print(f"{n:>9} {'labels':>7} {pure_s:>8.2f} {numpy_s:>8.2f} {pure_s / numpy_s:>7.1f}x {str(pure == fast):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""Benchmark the scraper page pipeline offline by replaying recorded listing pages.
+
+Each page goes through the same stages as a live scrape cycle:
+
+    parse        SellOff parse_listing_page (the parser behind
+                 fetch_deals_from_page) / RedTag parse_deals_from_html
+    upsert       bulk_upsert_deals (or upsert_deal per deal with --upsert per-row)
+    match        match_deal_to_signals against a SignalIndex of synthetic signals
+    match_write  bulk_create_deal_matches
+
+and the harness reports pages/sec, deals/sec, matches/sec, SQL statements
+(round trips) per page and p50/p99 latency per stage. Pages are replayed
+--passes times; the first pass inserts, later passes exercise the update path.
+
+The corpus is a directory with one saved listing page per file:
+
+    <corpus>/selloff/*.html          any name
+    <corpus>/redtag/<city>.html      city slug from REDTAG_DEAL_CITIES, optionally
+                                     suffixed: toronto--2026-03-14.html
+
+Record one from the live sites with --record (one request per page, same
+browser profiles as the scrapers). Without a corpus, deterministic synthetic
+pages in the scrapers' markup are generated instead.
+
+Deals are written as provider "bench" with "bench:"-prefixed dedupe keys and
+signals belong to a throwaway bench user; all bench rows are deleted afterwards.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_scraper_pipeline
+    python -m benchmarks.bench_scraper_pipeline --corpus benchmarks/corpus --signals 5000 --json out.json
+    python -m benchmarks.bench_scraper_pipeline --record benchmarks/corpus --record-pages 20
+
+Requires POSTGRES_* env vars pointing at a migrated database.
+"""
+
+import argparse
+import html as html_module
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, event, insert, select
+
+from app.db.models.deal import Deal
+from app.db.models.signal import Signal
+from app.db.models.user import User
+from app.db.session import SessionLocal, engine
+from app.workers import redtag_scraper, selloff_scraper
+from app.workers.selloff_parser import parse_listing_page
+from app.workers.shared.matching import SignalIndex, bulk_create_deal_matches, match_deal_to_signals
+from app.workers.shared.regions import map_destination_to_region
+from app.workers.shared.upsert import bulk_upsert_deals, upsert_deal
+
+PROVIDER = "bench"
+STAGES = ("parse", "upsert", "match", "match_write")
+
+DESTINATIONS = [
+    "Cancun, Mexico",
+    "Riviera Maya, Mexico",
+    "Puerto Vallarta, Mexico",
+    "Punta Cana, Dominican Republic",
+    "Varadero, Cuba",
+    "Cayo Coco, Cuba",
+    "Montego Bay, Jamaica",
+    "Aruba",
+]
+GATEWAYS = ["YYZ", "YUL", "YYC", "YVR", "YEG", "YOW", "YHZ", "YWG"]
+REDTAG_CITIES = [city for city, code in redtag_scraper.REDTAG_DEAL_CITIES.items() if code in GATEWAYS]
+
+
+class StatementCounter:
+    """Counts SQL statements sent to the server (one per round trip)."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+# ── Corpus ────────────────────────────────────────────────────────────────────
+
+
+def _selloff_card(rng: random.Random, gateway: str) -> str:
+    depart = date(2099, 1, 1) + timedelta(days=rng.randint(0, 180))
+    hotel_id = rng.randint(1, 400)
+    return (
+        f'<h2 class="adModuleHeading--x1">{rng.choice(DESTINATIONS)}</h2>'
+        f'<p class="adModuleSubheading--x1">Bench Resort {hotel_id} &amp; Spa</p>'
+        f'<div class="adModuleDetailsDays--x1"><span>{depart:%b %d, %Y}</span></div>'
+        f'<span class="adModuleDetailsAmount--x1">${rng.randint(700, 3200)}</span>'
+        f'<p>Save up to {rng.randint(5, 40)}%</p>'
+        f'<div class="StarRating-module--rating--x1" rating="{rng.choice([3.0, 3.5, 4.0, 4.5, 5.0])}"></div>'
+        f'<a href="https://shopping.selloffvacations.com/cgi-bin/handler.cgi?gateway_dep={gateway}'
+        f'&amp;no_hotel={hotel_id}&amp;date_dep={depart:%Y%m%d}&amp;duration={rng.choice([7, 7, 10, 14])}DAYS">Book</a>'
+    )
+
+
+def _redtag_button(rng: random.Random, gateway: str) -> str:
+    deal = {
+        "MealType": "AI" if rng.random() < 0.85 else "RO",
+        "HotelName": f"Bench Hotel {rng.randint(1, 400)}",
+        "HotelID": rng.randint(1, 400),
+        "TotalPrice": f"{rng.randint(700, 3200)}.00",
+        "DepartureDate": (date(2099, 1, 1) + timedelta(days=rng.randint(0, 180))).strftime("%Y%m%d"),
+        "Duration": str(rng.choice([7, 7, 10, 14])),
+        "DepartureCode": gateway,
+        "Destination": rng.choice(DESTINATIONS),
+        "Star": str(rng.choice([3, 3.5, 4, 4.5, 5])),
+    }
+    return f'<button class="btn" data-deal="{html_module.escape(json.dumps(deal))}">Continue</button>'
+
+
+def synthetic_corpus(pages: int, deals_per_page: int, rng: random.Random) -> dict[str, list[tuple[str, str]]]:
+    """Generate {provider: [(name, html)]} in each site's listing markup."""
+    selloff, redtag = [], []
+    for i in range(pages):
+        gateway = GATEWAYS[i % len(GATEWAYS)]
+        cards = "".join(_selloff_card(rng, gateway) for _ in range(deals_per_page))
+        selloff.append((f"synthetic-{i}", f"<html><body>{cards}</body></html>"))
+
+        city = REDTAG_CITIES[i % len(REDTAG_CITIES)]
+        buttons = "".join(
+            _redtag_button(rng, redtag_scraper.REDTAG_DEAL_CITIES[city]) for _ in range(deals_per_page)
+        )
+        redtag.append((city, f"<html><body>{buttons}</body></html>"))
+    return {"selloff": selloff, "redtag": redtag}
+
+
+def load_corpus(path: Path) -> dict[str, list[tuple[str, str]]]:
+    """Read {provider: [(name, html)]}; RedTag names are city slugs."""
+    corpus = {}
+    for provider in ("selloff", "redtag"):
+        files = sorted((path / provider).glob("*.html"))
+        if provider == "redtag":
+            corpus[provider] = [(f.stem.split("--")[0], f.read_text()) for f in files]
+        else:
+            corpus[provider] = [(f.stem, f.read_text()) for f in files]
+    return corpus
+
+
+def record_corpus(path: Path, pages: int, rng: random.Random) -> None:
+    """Save live listing pages for later replay (one request per page, paced)."""
+    from app.workers.shared.browser_profiles import build_request_headers, human_delay, pick_cycle_profile
+
+    profile = pick_cycle_profile()
+    session = selloff_scraper._create_session(profile=profile)
+    (path / "selloff").mkdir(parents=True, exist_ok=True)
+    (path / "redtag").mkdir(parents=True, exist_ok=True)
+    stamp = date.today().isoformat()
+
+    slugs = rng.sample(selloff_scraper.DESTINATION_SLUGS, min(pages, len(selloff_scraper.DESTINATION_SLUGS)))
+    city_slugs = rng.choices(list(selloff_scraper.GATEWAY_SLUGS.values()), k=len(slugs))
+    for slug, city_slug in zip(slugs, city_slugs, strict=True):
+        url = f"https://www.selloffvacations.com/en/{slug}/from-{city_slug}"
+        resp = session.get(url, headers=build_request_headers(profile), timeout=30)
+        if resp.status_code == 200:
+            (path / "selloff" / f"{slug}--{city_slug}--{stamp}.html").write_text(resp.text)
+            print(f"saved {url}")
+        time.sleep(human_delay())
+
+    for city in rng.sample(list(redtag_scraper.REDTAG_DEAL_CITIES), min(pages, len(redtag_scraper.REDTAG_DEAL_CITIES))):
+        page = redtag_scraper.fetch_listing_page(city, session=session, profile=profile)
+        if page:
+            (path / "redtag" / f"{city}--{stamp}.html").write_text(page)
+            print(f"saved redtag {city}")
+        time.sleep(human_delay())
+    session.close()
+
+
+# ── Pipeline ──────────────────────────────────────────────────────────────────
+
+
+def parse_page(provider: str, name: str, page: str) -> tuple[list[dict], int]:
+    """Parse one page into deal dicts; returns (deals, malformed SellOff cards)."""
+    malformed = 0
+    if provider == "selloff":
+        parsed = parse_listing_page(page)
+        deals, malformed = parsed.deals, parsed.malformed
+        for deal in deals:
+            selloff_scraper._set_dedupe_key(deal)
+    else:
+        deals = redtag_scraper.parse_deals_from_html(page, name)
+    for deal in deals:
+        deal["dedupe_key"] = f"{PROVIDER}:{deal['dedupe_key']}"
+    return deals, malformed
+
+
+def seed_signals(db, user_id, n: int, rng: random.Random) -> SignalIndex:
+    """Insert n active signals spread over the corpus routes and return their index."""
+    regions = sorted({map_destination_to_region(d) for d in DESTINATIONS} | {"mexico", "cuba"})
+    rows = []
+    for i in range(n):
+        start = date(2099, 1, 1) + timedelta(days=30 * rng.randint(0, 4))
+        travel_window = {"start_month": f"{start:%Y-%m}", "end_month": f"{start + timedelta(days=60):%Y-%m}"}
+        if rng.random() < 0.5:
+            travel_window.update(min_nights=rng.choice([5, 7]), max_nights=rng.choice([10, 14]))
+        rows.append({
+            "id": uuid.uuid4(),
+            "name": f"Bench Signal {i}",
+            "status": "active",
+            "user_id": user_id,
+            "departure_airports": rng.sample(GATEWAYS, rng.randint(1, 2)),
+            "destination_regions": rng.sample(regions, rng.randint(1, 3)),
+            "config": {
+                "travel_window": travel_window,
+                "budget": {"target_pp": rng.randint(1200, 3500)} if rng.random() < 0.7 else {},
+                "preferences": {"min_star_rating": rng.choice([None, 3.5, 4.0])},
+            },
+        })
+    if rows:
+        db.execute(insert(Signal), rows)
+    db.commit()
+    signals = db.execute(select(Signal).where(Signal.user_id == user_id)).scalars().all()
+    return SignalIndex(signals)
+
+
+def run_pages(provider, pages, signal_index, upsert_mode, counter) -> dict:
+    """Replay pages once; returns totals plus per-page stage timings."""
+    timings: dict[str, list[float]] = defaultdict(list)
+    stmts = 0
+    deals_total = matches_total = 0
+    t_start = time.perf_counter()
+    with SessionLocal() as db:
+        for name, page in pages:
+            t0 = time.perf_counter()
+            deals, malformed = parse_page(provider, name, page)
+            t1 = time.perf_counter()
+
+            c0 = counter.count
+            if upsert_mode == "bulk":
+                page_deals = bulk_upsert_deals(db, PROVIDER, deals) if deals else []
+                meta_by_key = {d["dedupe_key"]: d for d in deals}
+                pairs = [(deal, meta_by_key[deal.dedupe_key]) for deal in page_deals]
+            else:
+                pairs = [(upsert_deal(db, PROVIDER, d), d) for d in deals]
+            t2 = time.perf_counter()
+
+            rows = []
+            for deal, meta in pairs:
+                for signal in match_deal_to_signals(db, deal, meta, signals=signal_index):
+                    rows.append({"signal_id": signal.id, "deal_id": deal.id})
+            t3 = time.perf_counter()
+
+            created = bulk_create_deal_matches(db, rows)
+            t4 = time.perf_counter()
+            stmts += counter.count - c0
+
+            deals_total += len(pairs)
+            matches_total += len(rows)
+            for stage, seconds in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3), strict=True):
+                timings[stage].append(seconds)
+            timings["new_matches"].append(len(created))
+            timings["malformed"].append(malformed)
+    elapsed = time.perf_counter() - t_start
+    return {
+        "elapsed": elapsed,
+        "pages": len(pages),
+        "deals": deals_total,
+        "matches": matches_total,
+        "new_matches": int(sum(timings.pop("new_matches", []))),
+        "malformed_cards": int(sum(timings.pop("malformed", []))),
+        "statements": stmts,
+        "timings": timings,
+    }
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def summarize(run: dict) -> dict:
+    elapsed = run["elapsed"] or 1e-9
+    pages = run["pages"] or 1
+    return {
+        "pages": run["pages"],
+        "deals": run["deals"],
+        "matches": run["matches"],
+        "new_matches": run["new_matches"],
+        "malformed_cards": run["malformed_cards"],
+        "seconds": round(run["elapsed"], 4),
+        "pages_per_sec": round(run["pages"] / elapsed, 2),
+        "deals_per_sec": round(run["deals"] / elapsed, 2),
+        "matches_per_sec": round(run["matches"] / elapsed, 2),
+        "db_round_trips_per_page": round(run["statements"] / pages, 2),
+        "stages_ms": {
+            stage: {
+                "p50": round(_percentile(run["timings"][stage], 50) * 1000, 3),
+                "p99": round(_percentile(run["timings"][stage], 99) * 1000, 3),
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def cleanup(db, user_id) -> None:
+    db.execute(delete(Signal).where(Signal.user_id == user_id))
+    db.execute(delete(Deal).where(Deal.provider == PROVIDER))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper parse + upsert + match on recorded pages")
+    parser.add_argument("--corpus", type=Path, help="Directory with selloff/ and redtag/ listing pages")
+    parser.add_argument("--synthetic-pages", type=int, default=40, help="Pages per provider without --corpus")
+    parser.add_argument("--deals-per-page", type=int, default=30, help="Deals per synthetic page")
+    parser.add_argument("--providers", nargs="+", choices=["selloff", "redtag"], default=["selloff", "redtag"])
+    parser.add_argument("--signals", type=int, default=2000)
+    parser.add_argument("--passes", type=int, default=2, help="Replays of the corpus (1st inserts, rest update)")
+    parser.add_argument("--upsert", choices=["bulk", "per-row"], default="bulk")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON to this path ('-' for stdout)")
+    parser.add_argument("--record", type=Path, help="Save live listing pages into this corpus directory and exit")
+    parser.add_argument("--record-pages", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.record:
+        record_corpus(args.record, args.record_pages, rng)
+        return
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = synthetic_corpus(args.synthetic_pages, args.deals_per_page, rng)
+
+    counter = StatementCounter()
+    results = []
+    user_id = uuid.uuid4()
+    with SessionLocal() as db:
+        db.add(User(id=user_id, clerk_id=f"bench_{user_id.hex[:12]}", email="bench@example.com"))
+        db.commit()
+        try:
+            signal_index = seed_signals(db, user_id, args.signals, rng)
+            if args.json_path != "-":
+                print(f"{'provider':>8} {'pass':>4} {'pages/s':>9} {'deals/s':>9} {'matches/s':>10} {'rt/page':>8}  "
+                      + " ".join(f"{s + ' p50/p99 ms':>22}" for s in STAGES))
+            for provider in args.providers:
+                pages = corpus.get(provider, [])
+                if not pages:
+                    continue
+                for n in range(1, args.passes + 1):
+                    summary = summarize(run_pages(provider, pages, signal_index, args.upsert, counter))
+                    results.append({"provider": provider, "pass": n, **summary})
+                    if args.json_path != "-":
+                        stages = " ".join(
+                            f"{summary['stages_ms'][s]['p50']:>10.2f}/{summary['stages_ms'][s]['p99']:<11.2f}"
+                            for s in STAGES
+                        )
+                        print(
+                            f"{provider:>8} {n:>4} {summary['pages_per_sec']:>9.1f} {summary['deals_per_sec']:>9.0f} "
+                            f"{summary['matches_per_sec']:>10.0f} {summary['db_round_trips_per_page']:>8.1f}  {stages}"
+                        )
+        finally:
+            db.rollback()
+            cleanup(db, user_id)
+
+    if args.json_path:
+        report = {
+            "benchmark": "scraper_pipeline",
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "corpus": str(args.corpus) if args.corpus else "synthetic",
+            "config": {
+                "signals": args.signals,
+                "passes": args.passes,
+                "upsert": args.upsert,
+                "seed": args.seed,
+                "deals_per_page": None if args.corpus else args.deals_per_page,
+            },
+            "results": results,
+        }
+        if args.json_path == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            Path(args.json_path).write_text(json.dumps(report, indent=2) + "\n")
+            print(f"wrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Benchmark signal_intel_cache refresh: per-signal loop vs set-based refresh.
+
+Seeds synthetic signals (one bench user), a shared pool of deals on a few
+private routes (provider "bench") and deal_matches spread over several weeks,
+then times refresh_intel_cache per signal against refresh_intel_caches and
+reports wall time and SQL statements for each. All bench rows are deleted
+afterwards.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_signal_intel
+    python -m benchmarks.bench_signal_intel --signals 500 2000 --matches-per-signal 40
+
+Requires POSTGRES_* env vars pointing at a migrated database.
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, event, insert
+
+from app.db.models.deal import Deal
+from app.db.models.deal_match import DealMatch
+from app.db.models.signal import Signal
+from app.db.models.user import User
+from app.db.session import SessionLocal, engine
+from app.services.signal_intel import refresh_intel_cache, refresh_intel_caches
+
+PROVIDER = "bench"
+ROUTES = [(f"B{i:02d}", region) for i in range(5) for region in ("cancun", "punta_cana", "varadero")]
+
+
+class StatementCounter:
+    """Counts SQL statements sent to the server (one per round trip)."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def seed(db, user_id, n_signals: int, matches_per_signal: int, deals_per_route: int, rng: random.Random) -> list:
+    now = datetime.now(timezone.utc)
+    deal_rows = []
+    for origin, region in ROUTES:
+        for _ in range(deals_per_route):
+            depart = date(2099, 1, 1) + timedelta(days=rng.randint(0, 120))
+            deal_rows.append({
+                "id": uuid.uuid4(),
+                "provider": PROVIDER,
+                "origin": origin,
+                "destination": region,
+                "depart_date": depart,
+                "return_date": depart + timedelta(days=rng.choice([5, 7, 7, 10, 14])),
+                "price_cents": rng.randint(600, 3000) * 100,
+                "star_rating": rng.choice([None, 3.0, 3.5, 4.0, 4.5, 5.0]),
+                "is_active": rng.random() > 0.2,
+                "dedupe_key": f"{PROVIDER}:{uuid.uuid4().hex}",
+            })
+    db.execute(insert(Deal), deal_rows)
+
+    by_route: dict = {}
+    for row in deal_rows:
+        by_route.setdefault((row["origin"], row["destination"]), []).append(row["id"])
+
+    signal_rows, match_rows = [], []
+    for i in range(n_signals):
+        origin, region = rng.choice(ROUTES)
+        sid = uuid.uuid4()
+        signal_rows.append({
+            "id": sid,
+            "name": f"Bench Signal {i}",
+            "status": "active",
+            "user_id": user_id,
+            "departure_airports": [origin],
+            "destination_regions": [region],
+            "config": {},
+        })
+        pool = by_route[(origin, region)]
+        for deal_id in rng.sample(pool, min(matches_per_signal, len(pool))):
+            match_rows.append({
+                "signal_id": sid,
+                "deal_id": deal_id,
+                "matched_at": now - timedelta(days=rng.randint(0, 60)),
+            })
+    db.execute(insert(Signal), signal_rows)
+    db.execute(insert(DealMatch), match_rows)
+    db.commit()
+    return [row["id"] for row in signal_rows]
+
+
+def cleanup(db, user_id) -> None:
+    db.execute(delete(Signal).where(Signal.user_id == user_id))
+    db.execute(delete(Deal).where(Deal.provider == PROVIDER))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark signal intel cache refresh")
+    parser.add_argument("--signals", type=int, nargs="+", default=[250, 1000])
+    parser.add_argument("--matches-per-signal", type=int, default=40)
+    parser.add_argument("--deals-per-route", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    counter = StatementCounter()
+
+    print(f"{'signals':>8} {'path':>11} {'seconds':>9} {'stmts':>8}")
+    for n in args.signals:
+        user_id = uuid.uuid4()
+        with SessionLocal() as db:
+            db.add(User(id=user_id, clerk_id=f"bench_{user_id.hex[:12]}", email="bench@example.com"))
+            db.commit()
+            try:
+                signal_ids = seed(db, user_id, n, args.matches_per_signal, args.deals_per_route, rng)
+
+                start_count = counter.count
+                t0 = time.perf_counter()
+                for sid in signal_ids:
+                    refresh_intel_cache(db, sid)
+                elapsed = time.perf_counter() - t0
+                print(f"{n:>8} {'per-signal':>11} {elapsed:>9.2f} {counter.count - start_count:>8}")
+
+                start_count = counter.count
+                t0 = time.perf_counter()
+                refresh_intel_caches(db, signal_ids)
+                elapsed = time.perf_counter() - t0
+                print(f"{n:>8} {'set-based':>11} {elapsed:>9.2f} {counter.count - start_count:>8}")
+            finally:
+                db.rollback()
+                cleanup(db, user_id)
+
+
+if __name__ == "__main__":
+    main()
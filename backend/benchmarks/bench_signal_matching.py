@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark per-deal signal matching latency at growing signal counts.
+
+Builds synthetic active-signal populations (no DB), then times
+SignalIndex.match() against a linear scan over the same compiled signals
+for a fixed set of synthetic deals.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_signal_matching
+    python -m benchmarks.bench_signal_matching --sizes 1000 10000 50000 --deals 2000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.models.deal import Deal
+from app.db.models.signal import Signal
+from app.workers.selloff_scraper import GATEWAY_SLUGS
+from app.workers.shared.matching import SignalIndex
+from app.workers.shared.regions import PARENT_REGION_MAP
+
+_GATEWAYS = list(GATEWAY_SLUGS)
+_REGIONS = sorted(set(PARENT_REGION_MAP) | set(PARENT_REGION_MAP.values()))
+_DEAL_REGIONS = sorted(PARENT_REGION_MAP)
+
+
+def make_signals(n: int, rng: random.Random) -> list[Signal]:
+    """Synthetic active signals with realistic airport/region/window spreads."""
+    signals = []
+    for _ in range(n):
+        start = date(2026, rng.randint(1, 10), 1)
+        if rng.random() < 0.3:
+            window = {
+                "start_date": (start + timedelta(days=rng.randint(0, 20))).isoformat(),
+                "end_date": (start + timedelta(days=rng.randint(30, 90))).isoformat(),
+            }
+        else:
+            window = {"start_month": start.strftime("%Y-%m"), "end_month": f"2026-{rng.randint(start.month, 12):02d}"}
+        min_nights = rng.choice([3, 5, 7])
+        window.update({"min_nights": min_nights, "max_nights": min_nights + rng.choice([2, 4, 7])})
+        signals.append(Signal(
+            id=uuid.uuid4(),
+            name="bench",
+            status="active",
+            departure_airports=rng.sample(_GATEWAYS, k=rng.randint(1, 3)),
+            destination_regions=rng.sample(_REGIONS, k=rng.randint(1, 3)),
+            config={
+                "travel_window": window,
+                "budget": {"target_pp": rng.choice([None, 1200, 1800, 2500])},
+                "preferences": {"min_star_rating": rng.choice([None, 3.5, 4.0])},
+            },
+        ))
+    return signals
+
+
+def make_deals(n: int, rng: random.Random) -> list[tuple[Deal, dict]]:
+    deals = []
+    for _ in range(n):
+        nights = rng.choice([4, 5, 7, 10, 14])
+        depart = date(2026, 1, 1) + timedelta(days=rng.randint(0, 330))
+        deal = Deal(
+            depart_date=depart,
+            return_date=depart + timedelta(days=nights),
+            price_cents=rng.randint(600, 4000) * 100,
+            star_rating=rng.choice([3.0, 3.5, 4.0, 4.5, 5.0]),
+        )
+        meta = {"gateway": rng.choice(_GATEWAYS), "region": rng.choice(_DEAL_REGIONS), "duration_days": nights}
+        deals.append((deal, meta))
+    return deals
+
+
+def _time_per_deal(fn, deals: list[tuple[Deal, dict]]) -> tuple[list[float], int]:
+    latencies = []
+    matched = 0
+    for deal, meta in deals:
+        t0 = time.perf_counter()
+        matched += len(fn(deal, meta))
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    return latencies, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark signal matching latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Signal counts")
+    parser.add_argument("--deals", type=int, default=2000, help="Deals matched per size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    deals = make_deals(args.deals, rng)
+
+    print(f"{'signals':>8} {'build ms':>9} {'index p50 us':>13} {'index p99 us':>13} "
+          f"{'scan p50 us':>12} {'speedup':>8} {'matches':>8}")
+    for size in args.sizes:
+        signals = make_signals(size, rng)
+
+        t0 = time.perf_counter()
+        index = SignalIndex(signals)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        def linear_scan(deal, meta, compiled=index.compiled):
+            return [
+                c.signal for c in compiled
+                if meta["gateway"] in c.airports and meta["region"] in c.match_regions
+                and c.matches(deal, meta["duration_days"])
+            ]
+
+        idx_lat, idx_matches = _time_per_deal(index.match, deals)
+        scan_lat, scan_matches = _time_per_deal(linear_scan, deals)
+        assert idx_matches == scan_matches, "index and linear scan disagree"
+
+        idx_p50 = statistics.median(idx_lat)
+        idx_p99 = statistics.quantiles(idx_lat, n=100)[98]
+        scan_p50 = statistics.median(scan_lat)
+        print(f"{size:>8} {build_ms:>9.1f} {idx_p50:>13.1f} {idx_p99:>13.1f} "
+              f"{scan_p50:>12.1f} {scan_p50 / idx_p50:>7.0f}x {idx_matches:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Benchmark the Sunday weekly digest job at a given number of passive users.
+
+Seeds passive users (1-3 active signals each over a set of routes), a pool of
+deals per route and this week's deal matches into the configured Postgres,
+then times lifecycle_email_worker._run_weekly_digests() for a Sunday 09:00
+UTC run, including triggering the digests through the orchestrator. Reports
+total seconds, users/sec and SQL statements executed. All bench rows
+(users, cascading signals/matches, deals, email_log/email_queue) are deleted
+afterwards.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_weekly_digest
+    python -m benchmarks.bench_weekly_digest --users 20000 --routes 60
+
+Requires POSTGRES_* env vars pointing at a migrated database.
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, event, insert
+
+from app.db.models.deal import Deal
+from app.db.models.deal_match import DealMatch
+from app.db.models.email_log import EmailLog
+from app.db.models.email_queue import EmailQueue
+from app.db.models.signal import Signal
+from app.db.models.user import User
+from app.db.session import SessionLocal, engine
+from app.workers.lifecycle_email_worker import _run_weekly_digests
+
+PROVIDER = "bench"
+EMAIL_DOMAIN = "@digest.bench.test"
+SUNDAY = datetime(2040, 6, 17, 9, 0, 0, tzinfo=timezone.utc)
+ORIGINS = ["YYZ", "YUL", "YVR", "YYC", "YEG", "YWG", "YOW", "YQR", "YHZ", "YXE"]
+REGIONS = ["cancun", "varadero", "punta_cana", "montego_bay", "puerto_vallarta", "riviera_maya"]
+
+
+def seed(n_users: int, n_routes: int, rng: random.Random) -> None:
+    routes = [(ORIGINS[r % len(ORIGINS)], REGIONS[r % len(REGIONS)]) for r in range(n_routes)]
+    depart = SUNDAY.date() + timedelta(days=45)
+    deals_by_route: dict[int, list[uuid.UUID]] = {}
+    deal_rows = []
+    for r, (origin, region) in enumerate(routes):
+        deals_by_route[r] = []
+        for k in range(40):
+            deal_id = uuid.uuid4()
+            deals_by_route[r].append(deal_id)
+            deal_rows.append({
+                "id": deal_id, "provider": PROVIDER, "origin": origin, "destination": region,
+                "depart_date": depart + timedelta(days=k % 20), "return_date": depart + timedelta(days=k % 20 + 7),
+                "price_cents": rng.randint(70, 250) * 1000, "hotel_name": f"Resort {r}-{k}",
+                "is_active": True, "dedupe_key": f"{PROVIDER}:{deal_id.hex}",
+            })
+
+    user_rows, signal_rows, match_rows = [], [], []
+    for i in range(n_users):
+        user_id = uuid.uuid4()
+        user_rows.append({
+            "id": user_id, "clerk_id": f"bench_{user_id.hex[:12]}", "email": f"u{i}{EMAIL_DOMAIN}",
+            "plan_type": "pro", "plan_status": "active", "email_mode": "passive", "email_enabled": True,
+        })
+        for _ in range(rng.randint(1, 3)):
+            r = rng.randrange(n_routes)
+            signal_id = uuid.uuid4()
+            signal_rows.append({
+                "id": signal_id, "user_id": user_id, "name": "bench", "status": "active", "config": {},
+                "departure_airports": [routes[r][0]], "destination_regions": [routes[r][1]],
+            })
+            for deal_id in rng.sample(deals_by_route[r], k=rng.randint(0, 15)):
+                match_rows.append({
+                    "signal_id": signal_id, "deal_id": deal_id, "matched_at": SUNDAY - timedelta(days=2),
+                })
+
+    with engine.begin() as conn:
+        conn.execute(insert(Deal), deal_rows)
+        for table, rows in ((User, user_rows), (Signal, signal_rows), (DealMatch, match_rows)):
+            for start in range(0, len(rows), 5000):
+                conn.execute(insert(table), rows[start:start + 5000])
+    print(f"seeded {n_users} users, {len(signal_rows)} signals, {len(match_rows)} matches over {n_routes} routes")
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(delete(EmailQueue).where(EmailQueue.to_email.like(f"%{EMAIL_DOMAIN}")))
+        conn.execute(delete(EmailLog).where(EmailLog.to_email.like(f"%{EMAIL_DOMAIN}")))
+        conn.execute(delete(User).where(User.email.like(f"%{EMAIL_DOMAIN}")))
+        conn.execute(delete(Deal).where(Deal.provider == PROVIDER))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--routes", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    cleanup()
+    seed(args.users, args.routes, random.Random(args.seed))
+    statements = []
+
+    def count(conn, cursor, statement, *a):
+        statements.append(statement)
+
+    try:
+        event.listen(engine, "before_cursor_execute", count)
+        with SessionLocal() as db:
+            t0 = time.perf_counter()
+            sent = _run_weekly_digests(db, SUNDAY)
+            elapsed = time.perf_counter() - t0
+        event.remove(engine, "before_cursor_execute", count)
+        print(f"digests={sent} seconds={elapsed:.2f} users/s={args.users / elapsed:.0f} statements={len(statements)}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Resend email API (POST /emails and /emails/batch).
+
+Accepts the same payloads as Resend and answers with message ids, after an
+optional simulated latency. It can enforce a requests-per-second limit
+(answering 429 like Resend) or fail every call with a fixed status. Used by
+the email queue tests and bench_email_drain; it can also back a local worker:
+
+Usage:
+    cd backend
+    python -m benchmarks.resend_stub --port 8025 --latency-ms 80 --rate-limit 10
+    RESEND_API_URL=http://127.0.0.1:8025 RESEND_API_KEY=stub python -m app.workers.lifecycle_email_worker
+
+No database required.
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ResendStub:
+    """Threaded HTTP server recording every email it accepts."""
+
+    def __init__(self, latency: float = 0.0, rate_limit: float = 0, fail_status: int | None = None, port: int = 0):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.fail_status = fail_status
+        self.emails: list[dict] = []
+        self.calls = 0
+        self.connections = 0
+        self.rejected = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._recent: deque[float] = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ResendStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _admit(self) -> int | None:
+        """Status to reject the call with, or None to accept it."""
+        with self._lock:
+            self.calls += 1
+            if self.fail_status is not None:
+                return self.fail_status
+            if self.rate_limit:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    self.rejected += 1
+                    return 429
+                self._recent.append(now)
+        return None
+
+    def _accept(self, emails: list[dict]) -> list[str]:
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                self.emails.extend(emails)
+            return [f"stub_{uuid.uuid4().hex[:12]}" for _ in emails]
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+                if self.path not in ("/emails", "/emails/batch"):
+                    return self._reply(404, {"message": "not found"})
+                rejected = stub._admit()
+                if rejected is not None:
+                    return self._reply(rejected, {"message": "rejected by stub"})
+                if self.path == "/emails":
+                    return self._reply(200, {"id": stub._accept([body])[0]})
+                ids = stub._accept(body)
+                return self._reply(200, {"data": [{"id": i} for i in ids]})
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def _reply(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Resend API stub")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests/sec before answering 429 (0 = none)")
+    args = parser.parse_args()
+
+    stub = ResendStub(latency=args.latency_ms / 1000, rate_limit=args.rate_limit, port=args.port).start()
+    print(f"Resend stub listening on {stub.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"calls={stub.calls} emails={len(stub.emails)} rejected={stub.rejected}")
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
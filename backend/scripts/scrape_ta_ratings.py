@@ -50,6 +50,7 @@ MAX_DELAY = 8.0
 RATE_LIMIT_BACKOFF = 60.0
 
 
+from app.core.http import get_http_client  # noqa: E402
 from scripts.utils import build_proxy_config, get_engine  # noqa: E402
 
 _PROXIES = None  # initialized lazily
@@ -67,13 +68,13 @@ def _search_ddg(query: str) -> str | None:
     url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
     proxies = _get_proxies()
     try:
-        resp = requests.get(url, headers=_HEADERS, proxies=proxies, timeout=15)
+        resp = get_http_client().get(url, headers=_HEADERS, proxies=proxies)
         if resp.status_code in (429, 403, 202):
             logger.warning("DuckDuckGo rate-limited (%d) — backing off %.0fs",
                            resp.status_code, RATE_LIMIT_BACKOFF)
             time.sleep(RATE_LIMIT_BACKOFF)
             # Retry once after backoff
-            resp = requests.get(url, headers=_HEADERS, proxies=proxies, timeout=15)
+            resp = get_http_client().get(url, headers=_HEADERS, proxies=proxies)
             if resp.status_code != 200:
                 logger.warning("Still rate-limited after backoff (%d)", resp.status_code)
                 return None
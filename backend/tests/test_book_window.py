@@ -0,0 +1,157 @@
+"""
+Integration tests for batched Book Window evaluation.
+
+Tests verify:
+- compute_book_windows returns the same result as get_book_window per signal.
+- Persisted results are reused until the signal is edited.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_book_window.py -v
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models.deal import Deal
+from app.db.models.deal_match import DealMatch
+from app.db.models.deal_price_history import DealPriceHistory
+from app.db.models.signal import Signal
+from app.db.models.signal_intel_cache import SignalIntelCache
+from app.db.models.user import User
+from app.services import book_window
+from app.services.book_window import compute_book_windows, get_book_window, get_book_windows, persist_book_windows
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def _make_signal(db: Session) -> Signal:
+    user = User(
+        id=uuid.uuid4(),
+        clerk_id=f"test_{uuid.uuid4().hex[:8]}",
+        email=f"test_{uuid.uuid4().hex[:8]}@example.com",
+    )
+    db.add(user)
+    db.flush()
+    signal = Signal(
+        id=uuid.uuid4(),
+        name="Test Signal",
+        status="active",
+        user_id=user.id,
+        departure_airports=["YYZ"],
+        destination_regions=["cancun"],
+        config={},
+    )
+    db.add(signal)
+    db.flush()
+    return signal
+
+
+def _seed_history(db: Session, signal: Signal, deals: int, days: int, drift: int, rng: random.Random) -> None:
+    """Matched deals with one price snapshot per 6-hour cycle over the last `days` days."""
+    now = datetime.now(timezone.utc)
+    cycles = days * 4
+    for _ in range(deals):
+        depart = date(2099, 1, 1) + timedelta(days=rng.randint(0, 90))
+        deal = Deal(
+            provider="test",
+            origin="YYZ",
+            destination="cancun",
+            depart_date=depart,
+            return_date=depart + timedelta(days=7),
+            price_cents=100_000,
+            is_active=True,
+            dedupe_key=f"test:{uuid.uuid4().hex[:12]}",
+        )
+        db.add(deal)
+        db.flush()
+        db.add(DealMatch(signal_id=signal.id, deal_id=deal.id, matched_at=now))
+        base = rng.randint(80, 160) * 1000
+        db.execute(insert(DealPriceHistory), [
+            {
+                "deal_id": deal.id,
+                "price_cents": base + drift * c + rng.randint(-2, 2) * 1000,
+                "recorded_at": now - timedelta(hours=6 * (cycles - c)) + timedelta(minutes=5),
+            }
+            for c in range(cycles)
+            if rng.random() > 0.2
+        ])
+    db.flush()
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestBatchedBookWindows:
+    def test_batch_matches_per_signal(self, db, monkeypatch):
+        monkeypatch.setattr(book_window, "SNAPSHOT_BATCH_SIZE", 2)
+        rng = random.Random(7)
+        signals = [_make_signal(db) for _ in range(5)]
+        _seed_history(db, signals[0], deals=1, days=1, drift=0, rng=rng)  # too few points
+        _seed_history(db, signals[1], deals=3, days=5, drift=-3000, rng=rng)
+        _seed_history(db, signals[2], deals=4, days=10, drift=2500, rng=rng)
+        _seed_history(db, signals[3], deals=6, days=40, drift=-200, rng=rng)
+        ids = [s.id for s in signals]
+
+        batch = compute_book_windows(db, ids)
+
+        assert batch[signals[0].id] is None
+        assert batch[signals[4].id] is None
+        for s in signals:
+            single = get_book_window(s.id, s.name, "route", db)
+            assert batch[s.id] == single.result, s.id
+        assert {batch[s.id].recommendation for s in signals[1:4]} <= {"book_now", "wait", "watch"}
+
+    def test_persisted_results_reused_until_signal_edited(self, db, monkeypatch):
+        rng = random.Random(11)
+        signal = _make_signal(db)
+        _seed_history(db, signal, deals=3, days=8, drift=-2000, rng=rng)
+        db.add(SignalIntelCache(signal_id=signal.id))
+        db.flush()
+
+        persist_book_windows(db, [signal.id])
+        db.flush()
+        intel = db.get(SignalIntelCache, signal.id)
+        db.refresh(intel)
+        assert intel.book_window_refreshed_at is not None
+        expected = get_book_window(signal.id, signal.name, "route", db).result
+
+        def fail(*args, **kwargs):
+            raise AssertionError("should read the persisted result")
+
+        with monkeypatch.context() as m:
+            m.setattr(book_window, "compute_book_windows", fail)
+            assert get_book_windows(db, [signal], {signal.id: intel}) == {signal.id: expected}
+
+        signal.updated_at = intel.book_window_refreshed_at + timedelta(seconds=1)
+        assert get_book_windows(db, [signal], {signal.id: intel}) == {signal.id: expected}
@@ -0,0 +1,126 @@
+"""
+Tests for the per-user Scout briefing cache.
+
+Tests verify:
+- The scrape generation starts at 0 and bump_generation increments it.
+- The cache key changes with the generation and with any signal edit.
+- Cached briefings are served until the key changes or the user is invalidated.
+- The shared directory backend lets a second worker reuse an entry.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_briefing_cache.py -v
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.scout import briefing as briefing_route
+from app.core import cache as cache_module
+from app.services import briefing_cache
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache(monkeypatch):
+    monkeypatch.setattr(cache_module.settings, "SHARED_CACHE_DIR", "")
+    briefing_cache.clear()
+    yield
+    briefing_cache.clear()
+
+
+def _signal(updated_at=None):
+    return SimpleNamespace(id=uuid.uuid4(), updated_at=updated_at or datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+
+class TestGeneration:
+    def test_bump(self, db):
+        db.execute(text("DELETE FROM system_config WHERE key = :k"), {"k": briefing_cache.GENERATION_KEY})
+        assert briefing_cache.get_generation(db) == "0"
+
+        briefing_cache.bump_generation(db)
+        briefing_cache.bump_generation(db)
+
+        assert briefing_cache.get_generation(db) == "2"
+
+
+class TestCacheKey:
+    def test_changes_with_generation_and_signal_edits(self):
+        a, b = _signal(), _signal()
+        key = briefing_cache.cache_key("3", [a, b])
+
+        assert briefing_cache.cache_key("3", [b, a]) == key
+        assert briefing_cache.cache_key("4", [a, b]) != key
+        assert briefing_cache.cache_key("3", [a]) != key
+        a.updated_at += timedelta(seconds=1)
+        assert briefing_cache.cache_key("3", [a, b]) != key
+
+
+class TestCachedBriefing:
+    def test_served_until_key_changes_or_invalidated(self, db, monkeypatch):
+        calls = []
+
+        def fake_build(_db, signals):
+            calls.append(len(signals))
+            return {"summary": f"build {len(calls)}", "signals": []}
+
+        monkeypatch.setattr(briefing_route, "build_briefing", fake_build)
+        db.execute(text("DELETE FROM system_config WHERE key = :k"), {"k": briefing_cache.GENERATION_KEY})
+        user = SimpleNamespace(id=uuid.uuid4())
+        signals = [_signal()]
+
+        assert briefing_route._cached_briefing(db, user, signals)["summary"] == "build 1"
+        assert briefing_route._cached_briefing(db, user, signals)["summary"] == "build 1"
+
+        briefing_cache.bump_generation(db)
+        assert briefing_route._cached_briefing(db, user, signals)["summary"] == "build 2"
+
+        briefing_cache.invalidate_user(user.id)
+        assert briefing_route._cached_briefing(db, user, signals)["summary"] == "build 3"
+        assert len(calls) == 3
+
+
+class TestSharedBackend:
+    def test_second_worker_reads_shared_entry(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache_module.settings, "SHARED_CACHE_DIR", str(tmp_path))
+        user_id = uuid.uuid4()
+        briefing_cache.put(user_id, "1:abc", {"summary": "shared"})
+
+        briefing_cache._briefings._entries.clear()  # a different process has an empty in-process cache
+        assert briefing_cache.get(user_id, "1:abc") == {"summary": "shared"}
+        assert briefing_cache.get(user_id, "2:abc") is None
+
+        briefing_cache.invalidate_user(user_id)
+        assert briefing_cache.get(user_id, "1:abc") is None
+        assert list(tmp_path.rglob("*.json")) == []
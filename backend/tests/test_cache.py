@@ -0,0 +1,191 @@
+"""
+Tests for the shared read-through cache (app.core.cache).
+
+Tests verify:
+- Concurrent callers of an expired key share one computation (single flight),
+  and the per-key flight lock is dropped once they finish.
+- Stale values are served while another caller recomputes, and when the recompute fails.
+- A second worker reads entries from the shared directory tier.
+- Sweeps delete expired shared entries and cap the directory at max_entries,
+  and a lock file swept mid-acquire is reopened rather than locked orphaned.
+- Hit/miss/latency counters are reported per cache.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_cache.py -v
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import Cache, cache_stats
+
+
+@pytest.fixture(autouse=True)
+def _no_shared_dir(monkeypatch):
+    monkeypatch.setattr(cache_module.settings, "SHARED_CACHE_DIR", "")
+
+
+def _cache(**kwargs) -> Cache:
+    return Cache(f"test-{uuid.uuid4().hex[:8]}", **kwargs)
+
+
+def _expire(cache: Cache, key: str, age: float) -> None:
+    stored_at, value = cache._entries[key]
+    cache._entries[key] = (time.time() - age, value)
+
+
+class TestSingleFlight:
+    def test_concurrent_misses_compute_once(self):
+        cache = _cache(ttl_seconds=60)
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"value": len(calls)}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        assert len(calls) == 1
+        assert results == [{"value": 1}] * 8
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced"] == 7
+        assert cache._flights == {}  # finished flights are dropped, not kept per key
+
+
+class TestStaleWhileRevalidate:
+    def test_stale_served_while_another_caller_recomputes(self):
+        cache = _cache(ttl_seconds=60, stale_seconds=60)
+        cache.get_or_compute("k", lambda: "old")
+        _expire(cache, "k", 90)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_compute():
+            started.set()
+            release.wait(5)
+            return "new"
+
+        refresher = threading.Thread(target=lambda: cache.get_or_compute("k", slow_compute))
+        refresher.start()
+        started.wait(5)
+
+        assert cache.get_or_compute("k", lambda: pytest.fail("should not recompute")) == "old"
+        release.set()
+        refresher.join(5)
+        assert cache.get_or_compute("k", lambda: pytest.fail("should be fresh")) == "new"
+        assert cache.stats()["stale_hits"] == 1
+        assert cache._flights == {}
+
+    def test_failed_recompute_serves_stale(self):
+        cache = _cache(ttl_seconds=60, stale_seconds=60)
+        cache.get_or_compute("k", lambda: "old")
+        _expire(cache, "k", 90)
+
+        def broken():
+            raise RuntimeError("db down")
+
+        assert cache.get_or_compute("k", broken) == "old"
+        assert cache.stats()["errors"] == 1
+
+    def test_expired_past_stale_window_recomputes(self):
+        cache = _cache(ttl_seconds=60, stale_seconds=60)
+        cache.get_or_compute("k", lambda: "old")
+        _expire(cache, "k", 200)
+
+        assert cache.get_or_compute("k", lambda: "new") == "new"
+
+        def broken():
+            raise RuntimeError("db down")
+
+        _expire(cache, "k", 200)
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute("k", broken)
+
+
+class TestSharedTier:
+    def test_second_worker_reads_shared_entry(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache_module.settings, "SHARED_CACHE_DIR", str(tmp_path))
+        name = f"test-{uuid.uuid4().hex[:8]}"
+        Cache(name, ttl_seconds=60).get_or_compute("k", lambda: {"n": 1})
+
+        other_worker = Cache(name, ttl_seconds=60)
+        assert other_worker.get_or_compute("k", lambda: pytest.fail("should read shared")) == {"n": 1}
+        assert other_worker.stats()["shared_hits"] == 1
+
+        other_worker.invalidate()
+        assert not list((tmp_path / name).glob("*.json"))
+        assert Cache(name, ttl_seconds=60).get("k") is None
+
+    def test_sweep_removes_expired_entries(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache_module.settings, "SHARED_CACHE_DIR", str(tmp_path))
+        cache = _cache(ttl_seconds=60, stale_seconds=60)
+        cache.get_or_compute("old", lambda: 1)
+        cache.get_or_compute("new", lambda: 2)
+        old_entry = tmp_path / cache.name / cache._filename("old")
+        long_ago = time.time() - 200
+        os.utime(old_entry, (long_ago, long_ago))
+
+        assert cache.sweep() == 1
+        assert not old_entry.exists()
+        assert not old_entry.with_suffix(".lock").exists()
+        assert (tmp_path / cache.name / cache._filename("new")).exists()
+
+    def test_write_sweeps_down_to_max_entries(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache_module.settings, "SHARED_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(cache_module, "SHARED_SWEEP_INTERVAL_SECONDS", 0.0)
+        cache = _cache(ttl_seconds=60, max_entries=3)
+        for i in range(5):
+            path = tmp_path / cache.name / cache._filename(f"k{i}")
+            cache.set(f"k{i}", i)
+            os.utime(path, (time.time() - 10 + i, time.time() - 10 + i))
+
+        remaining = {p.name for p in (tmp_path / cache.name).glob("*.json")}
+        assert remaining == {cache._filename(f"k{i}") for i in (2, 3, 4)}
+
+    def test_lock_swept_before_flock_is_reopened(self, tmp_path, monkeypatch):
+        lock_path = tmp_path / "k.lock"
+        real_flock = cache_module._flock
+        calls = []
+
+        def flock_after_sweep(fd, deadline):
+            if not calls:
+                lock_path.unlink()  # a sweep removes the file this worker just opened
+            calls.append(fd)
+            return real_flock(fd, deadline)
+
+        monkeypatch.setattr(cache_module, "_flock", flock_after_sweep)
+        file_lock = cache_module._FileLock(lock_path, wait=True)
+        with file_lock as owned:
+            assert owned
+            assert len(calls) == 2
+            assert os.fstat(file_lock._fd).st_ino == os.stat(lock_path).st_ino
+
+
+class TestStats:
+    def test_registered_counters(self):
+        cache = _cache(ttl_seconds=60)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("a", lambda: 2)
+        cache.get_or_compute("b", lambda: 3)
+
+        stats = cache_stats()[cache.name]
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+        assert stats["hit_rate"] == pytest.approx(1 / 3, abs=0.001)
+        assert stats["compute_ms_max"] >= 0
@@ -0,0 +1,119 @@
+"""
+Tests for per-role connection pool profiles and pool metrics.
+
+Tests verify:
+- DB_ROLE selects a profile and DB_POOL_* settings override it.
+- PgBouncer mode disables prepared statements and startup options.
+- The statement timeout is applied to new connections.
+- Checkouts, overflow checkouts and checkout timeouts are counted.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_db_pool.py -v
+"""
+from __future__ import annotations
+
+import os
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.db.pool import POOL_PROFILES, PoolProfile, connect_args, engine_kwargs, pool_stats, resolve_profile
+
+
+def _settings(**overrides):
+    values = {
+        "DB_ROLE": "api",
+        "DB_POOL_SIZE": None,
+        "DB_MAX_OVERFLOW": None,
+        "DB_POOL_TIMEOUT": None,
+        "DB_POOL_RECYCLE": None,
+        "DB_STATEMENT_TIMEOUT_MS": None,
+        "DB_PGBOUNCER": False,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _url() -> str:
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    return os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+
+
+class TestProfiles:
+    def test_role_selects_profile(self):
+        assert resolve_profile(_settings(DB_ROLE="scraper")) == POOL_PROFILES["scraper"]
+
+    def test_unknown_role_falls_back_to_api(self):
+        assert resolve_profile(_settings(DB_ROLE="nope")) == POOL_PROFILES["api"]
+
+    def test_overrides(self):
+        profile = resolve_profile(_settings(DB_ROLE="email_worker", DB_POOL_SIZE=7, DB_STATEMENT_TIMEOUT_MS=0))
+
+        assert profile.pool_size == 7
+        assert profile.statement_timeout_ms == 0
+        assert profile.max_overflow == POOL_PROFILES["email_worker"].max_overflow
+
+
+class TestConnectArgs:
+    profile = PoolProfile(pool_size=1, max_overflow=0, pool_timeout=1, pool_recycle=60, statement_timeout_ms=5000)
+
+    def test_psycopg_statement_timeout(self):
+        args = connect_args("postgresql+psycopg://x", self.profile, pgbouncer=False)
+        assert args == {"options": "-c statement_timeout=5000"}
+
+    def test_psycopg_pgbouncer(self):
+        args = connect_args("postgresql+psycopg://x", self.profile, pgbouncer=True)
+        assert args == {"prepare_threshold": None}
+
+    def test_asyncpg(self):
+        assert connect_args("postgresql+asyncpg://x", self.profile, pgbouncer=False) == {
+            "server_settings": {"statement_timeout": "5000"}
+        }
+        assert connect_args("postgresql+asyncpg://x", self.profile, pgbouncer=True) == {"statement_cache_size": 0}
+
+
+@pytest.fixture
+def small_engine():
+    settings = _settings(
+        DB_ROLE=f"test_{uuid.uuid4().hex[:8]}",
+        DB_POOL_SIZE=1,
+        DB_MAX_OVERFLOW=1,
+        DB_POOL_TIMEOUT=0.1,
+        DB_STATEMENT_TIMEOUT_MS=1234,
+    )
+    engine = create_engine(_url(), **engine_kwargs(_url(), settings))
+    yield engine
+    engine.dispose()
+
+
+class TestPoolMetrics:
+    def test_statement_timeout_applied(self, small_engine):
+        with small_engine.connect() as conn:
+            assert conn.execute(text("SHOW statement_timeout")).scalar() == "1234ms"
+
+    def test_counts_checkouts_overflow_and_timeouts(self, small_engine):
+        first = small_engine.connect()
+        second = small_engine.connect()  # overflow connection
+        stats = pool_stats(small_engine)
+        assert stats["checked_out"] == 2
+        assert stats["overflow"] == 1
+
+        with pytest.raises(exc.TimeoutError):
+            small_engine.connect()
+        first.close()
+        second.close()
+
+        stats = pool_stats(small_engine)
+        assert stats["checkouts"] == 2
+        assert stats["overflow_checkouts"] == 1
+        assert stats["checkout_timeouts"] == 1
+        assert stats["checked_out"] == 0
+        assert stats["wait_ms_max"] >= 100
@@ -0,0 +1,151 @@
+"""
+Integration tests for the batched DealMatch writer.
+
+Tests verify:
+- New (signal, deal) pairs are inserted and returned.
+- Pairs that already exist are skipped and left untouched.
+- Duplicate pairs within one batch are inserted once.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_deal_match_writer.py -v
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models.deal import Deal
+from app.db.models.deal_match import DealMatch
+from app.db.models.signal import Signal
+from app.db.models.user import User
+from app.workers.shared.matching import bulk_create_deal_matches
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def _make_signal(db: Session) -> Signal:
+    user = User(
+        id=uuid.uuid4(),
+        clerk_id=f"test_{uuid.uuid4().hex[:8]}",
+        email=f"test_{uuid.uuid4().hex[:8]}@example.com",
+    )
+    db.add(user)
+    db.flush()
+    signal = Signal(
+        id=uuid.uuid4(),
+        name="Test Signal",
+        status="active",
+        user_id=user.id,
+        departure_airports=["YYZ"],
+        destination_regions=["cancun"],
+        config={},
+    )
+    db.add(signal)
+    db.flush()
+    return signal
+
+
+def _make_deal(db: Session) -> Deal:
+    deal = Deal(
+        provider="test",
+        origin="YYZ",
+        destination="cancun",
+        depart_date=date(2026, 5, 1),
+        return_date=date(2026, 5, 8),
+        price_cents=100000,
+        currency="CAD",
+        dedupe_key=f"test:{uuid.uuid4().hex[:12]}",
+    )
+    db.add(deal)
+    db.flush()
+    return deal
+
+
+def _row(signal: Signal, deal: Deal, value_label: str | None = None) -> dict:
+    return {
+        "signal_id": signal.id,
+        "deal_id": deal.id,
+        "price_per_night_cents": 14285,
+        "value_label": value_label,
+        "price_delta_cents": None,
+    }
+
+
+def _match_count(db: Session, signal: Signal) -> int:
+    return db.execute(
+        select(func.count()).select_from(DealMatch).where(DealMatch.signal_id == signal.id)
+    ).scalar()
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestBulkCreateDealMatches:
+    def test_inserts_new_pairs(self, db):
+        signal = _make_signal(db)
+        d1, d2 = _make_deal(db), _make_deal(db)
+
+        created = bulk_create_deal_matches(db, [_row(signal, d1), _row(signal, d2, "Great value")])
+
+        assert created == {(signal.id, d1.id), (signal.id, d2.id)}
+        assert _match_count(db, signal) == 2
+        stored = db.execute(
+            select(DealMatch).where(DealMatch.deal_id == d2.id)
+        ).scalar_one()
+        assert stored.value_label == "Great value"
+        assert stored.price_per_night_cents == 14285
+
+    def test_existing_pair_is_skipped(self, db):
+        signal = _make_signal(db)
+        old, new = _make_deal(db), _make_deal(db)
+        bulk_create_deal_matches(db, [_row(signal, old, "Rare value")])
+
+        created = bulk_create_deal_matches(db, [_row(signal, old), _row(signal, new)])
+
+        assert created == {(signal.id, new.id)}
+        assert _match_count(db, signal) == 2
+        kept = db.execute(
+            select(DealMatch).where(DealMatch.deal_id == old.id)
+        ).scalar_one()
+        assert kept.value_label == "Rare value"
+
+    def test_duplicate_pairs_in_batch(self, db):
+        signal = _make_signal(db)
+        deal = _make_deal(db)
+
+        created = bulk_create_deal_matches(db, [_row(signal, deal), _row(signal, deal)])
+
+        assert created == {(signal.id, deal.id)}
+        assert _match_count(db, signal) == 1
+
+    def test_empty_batch(self, db):
+        assert bulk_create_deal_matches(db, []) == set()
@@ -0,0 +1,127 @@
+"""
+Integration tests for end-of-cycle deal staleness and expiry.
+
+Tests verify:
+- Unseen active deals get missed_cycles incremented.
+- Deals reaching the threshold are deactivated with deactivated_at set.
+- Seen deals, inactive deals and other providers are untouched.
+- Expired deals (past departure) are deactivated per provider.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_deal_staleness.py -v
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models.deal import Deal
+from app.workers.shared.staleness import deactivate_expired_deals, mark_unseen_deals
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def provider() -> str:
+    """Unique provider name so tests only see their own deals."""
+    return f"test_{uuid.uuid4().hex[:8]}"
+
+
+def _make_deal(
+    db: Session,
+    provider: str,
+    *,
+    missed_cycles: int = 0,
+    is_active: bool = True,
+    depart_date: date = date(2099, 5, 1),
+) -> Deal:
+    deal = Deal(
+        provider=provider,
+        origin="YYZ",
+        destination="cancun",
+        depart_date=depart_date,
+        return_date=depart_date + timedelta(days=7),
+        price_cents=100000,
+        dedupe_key=f"{provider}:{uuid.uuid4().hex[:12]}",
+        missed_cycles=missed_cycles,
+        is_active=is_active,
+    )
+    db.add(deal)
+    db.flush()
+    return deal
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestMarkUnseenDeals:
+    def test_increments_and_deactivates_at_threshold(self, db, provider):
+        seen = _make_deal(db, provider)
+        fresh = _make_deal(db, provider)
+        stale = _make_deal(db, provider, missed_cycles=2)
+
+        unseen, deactivated = mark_unseen_deals(db, provider, {seen.dedupe_key}, threshold=3)
+
+        assert (unseen, deactivated) == (2, 1)
+        for deal in (seen, fresh, stale):
+            db.refresh(deal)
+        assert seen.missed_cycles == 0 and seen.is_active
+        assert fresh.missed_cycles == 1 and fresh.is_active
+        assert fresh.deactivated_at is None
+        assert stale.missed_cycles == 3 and not stale.is_active
+        assert stale.deactivated_at is not None
+
+    def test_other_providers_and_inactive_untouched(self, db, provider):
+        other = _make_deal(db, f"{provider}_other")
+        inactive = _make_deal(db, provider, is_active=False, missed_cycles=5)
+        seen = _make_deal(db, provider)
+
+        assert mark_unseen_deals(db, provider, {seen.dedupe_key}, threshold=3) == (0, 0)
+        db.refresh(other)
+        db.refresh(inactive)
+        assert other.missed_cycles == 0
+        assert inactive.missed_cycles == 5
+
+
+class TestDeactivateExpiredDeals:
+    def test_past_departures_deactivated(self, db, provider):
+        today = date(2026, 6, 1)
+        past = _make_deal(db, provider, depart_date=today - timedelta(days=1))
+        departing = _make_deal(db, provider, depart_date=today)
+        other = _make_deal(db, f"{provider}_other", depart_date=today - timedelta(days=1))
+
+        assert deactivate_expired_deals(db, provider, today=today) == 1
+        for deal in (past, departing, other):
+            db.refresh(deal)
+        assert not past.is_active and past.deactivated_at is not None
+        assert departing.is_active
+        assert other.is_active
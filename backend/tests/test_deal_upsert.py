@@ -0,0 +1,183 @@
+"""
+Integration tests for the bulk deal upsert pipeline.
+
+Tests verify:
+- New deals are inserted with one price-history row each.
+- Re-scraped deals report _price_dropped/_price_delta from the old price.
+- Price history is only appended when the price changes.
+- Inactive deals are reactivated (deactivated_at cleared, reactivated_at set).
+- Duplicate dedupe keys within one batch keep the last occurrence.
+- Both upsert paths maintain prev_price_cents / last_price_change_at /
+  last_price_delta_cents, and the 24h market activity count reads them.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_deal_upsert.py -v
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.deal import Deal
+from app.db.models.deal_price_history import DealPriceHistory
+from app.services.market_intel.coverage import compute_market_activity
+from app.workers.shared.upsert import bulk_upsert_deals, upsert_deal
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def _deal_meta(key: str, price_cents: int) -> dict:
+    return {
+        "dedupe_key": key,
+        "gateway": "YYZ",
+        "region": "cancun",
+        "destination_str": "Cancun, Mexico",
+        "hotel_name": "Test &amp; Resort",
+        "hotel_id": "123",
+        "depart_date": date(2026, 5, 1),
+        "return_date": date(2026, 5, 8),
+        "duration_days": 7,
+        "price_cents": price_cents,
+        "deeplink_url": "https://example.com/deal",
+        "star_rating": 4.5,
+    }
+
+
+def _key() -> str:
+    return f"test:{uuid.uuid4().hex[:12]}"
+
+
+def _history_count(db, deal_id) -> int:
+    return db.execute(
+        select(func.count()).select_from(DealPriceHistory).where(DealPriceHistory.deal_id == deal_id)
+    ).scalar()
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestBulkUpsert:
+    def test_inserts_new_deals(self, db):
+        k1, k2 = _key(), _key()
+        deals = bulk_upsert_deals(db, "test", [_deal_meta(k1, 100000), _deal_meta(k2, 120000)])
+
+        assert [d.dedupe_key for d in deals] == [k1, k2]
+        assert all(d._price_dropped is False and d._price_delta == 0 for d in deals)
+        assert deals[0].hotel_name == "Test & Resort"
+        assert deals[0].origin == "YYZ"
+        assert _history_count(db, deals[0].id) == 1
+
+    def test_price_drop_reports_delta(self, db):
+        k = _key()
+        first = bulk_upsert_deals(db, "test", [_deal_meta(k, 100000)])[0]
+        second = bulk_upsert_deals(db, "test", [_deal_meta(k, 90000)])[0]
+
+        assert second.id == first.id
+        assert second.price_cents == 90000
+        assert second._price_dropped is True
+        assert second._price_delta == 10000
+        assert _history_count(db, first.id) == 2
+
+    def test_unchanged_price_skips_history(self, db):
+        k = _key()
+        first = bulk_upsert_deals(db, "test", [_deal_meta(k, 100000)])[0]
+        second = bulk_upsert_deals(db, "test", [_deal_meta(k, 100000)])[0]
+
+        assert second._price_dropped is False
+        assert second._price_delta == 0
+        assert _history_count(db, first.id) == 1
+
+    def test_reactivates_and_resets_staleness(self, db):
+        k = _key()
+        first = bulk_upsert_deals(db, "test", [_deal_meta(k, 100000)])[0]
+        stored = db.get(Deal, first.id)
+        stored.is_active = False
+        stored.missed_cycles = 3
+        stored.deactivated_at = datetime.now(timezone.utc)
+        db.commit()
+
+        again = bulk_upsert_deals(db, "test", [_deal_meta(k, 100000)])[0]
+        assert again.is_active is True
+        assert again.missed_cycles == 0
+        assert again.deactivated_at is None
+        assert again.reactivated_at is not None
+
+    def test_duplicate_keys_keep_last(self, db):
+        k = _key()
+        deals = bulk_upsert_deals(db, "test", [_deal_meta(k, 100000), _deal_meta(k, 95000)])
+
+        assert len(deals) == 1
+        assert deals[0].price_cents == 95000
+
+    def test_empty_batch(self, db):
+        assert bulk_upsert_deals(db, "test", []) == []
+
+
+class TestLastPriceChange:
+    def test_bulk_upsert_tracks_last_change(self, db):
+        k = _key()
+        first = bulk_upsert_deals(db, "test", [_deal_meta(k, 100000)])[0]
+        assert (first.prev_price_cents, first.last_price_change_at, first.last_price_delta_cents) == (None, None, None)
+
+        dropped = bulk_upsert_deals(db, "test", [_deal_meta(k, 90000)])[0]
+        assert (dropped.prev_price_cents, dropped.last_price_delta_cents) == (100000, -10000)
+        assert dropped.last_price_change_at is not None
+        changed_at = dropped.last_price_change_at
+
+        unchanged = bulk_upsert_deals(db, "test", [_deal_meta(k, 90000)])[0]
+        assert (unchanged.prev_price_cents, unchanged.last_price_delta_cents) == (100000, -10000)
+        assert unchanged.last_price_change_at == changed_at
+
+        raised = bulk_upsert_deals(db, "test", [_deal_meta(k, 95000)])[0]
+        assert (raised.prev_price_cents, raised.last_price_delta_cents) == (90000, 5000)
+
+    def test_single_upsert_tracks_last_change(self, db):
+        k = _key()
+        upsert_deal(db, "test", _deal_meta(k, 100000))
+        db.flush()
+        deal = upsert_deal(db, "test", _deal_meta(k, 80000))
+        db.flush()
+
+        assert (deal.prev_price_cents, deal.last_price_delta_cents) == (100000, -20000)
+        assert deal.last_price_change_at is not None
+
+    def test_market_activity_counts_recent_drops(self, db):
+        before = compute_market_activity(db)["price_drops_today"]
+        keys = [_key() for _ in range(3)]
+        bulk_upsert_deals(db, "test", [_deal_meta(k, 100000) for k in keys])
+        bulk_upsert_deals(db, "test", [
+            _deal_meta(keys[0], 90000),   # drop
+            _deal_meta(keys[1], 110000),  # rise
+            _deal_meta(keys[2], 100000),  # unchanged
+        ])
+
+        assert compute_market_activity(db)["price_drops_today"] == before + 1
@@ -0,0 +1,195 @@
+"""
+Integration tests for the email queue drainer against a local Resend stub.
+
+Tests verify:
+- Queued emails are sent in batches and marked sent with provider message ids.
+- Provider errors mark rows failed with a retry time; 429s re-queue without
+  spending an attempt.
+- Concurrent drainers claim disjoint rows (SKIP LOCKED): each email goes out once.
+- Rows stuck in "sending" past the lease are claimed again.
+- The shared token bucket caps API calls across threads.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_email_queue.py -v
+"""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, delete, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.models.email_queue import EmailQueue
+from app.services import email_queue
+from app.services.email_queue import SharedTokenBucket, drain, enqueue
+from benchmarks.resend_stub import ResendStub
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ResendStub().start()
+    monkeypatch.setattr(email_queue, "RESEND_API_URL", server.url)
+    monkeypatch.setattr(email_queue, "RESEND_API_KEY", "test-key")
+    monkeypatch.setattr(email_queue, "RATE_LIMIT_PER_SEC", 0)
+    monkeypatch.setattr(settings, "EMAIL_DRY_RUN", False)
+    yield server
+    server.stop()
+
+
+def _enqueue(db, count: int, domain: str = "queue.test") -> list[uuid.UUID]:
+    ids = [
+        enqueue(db, to_email=f"user{i}@{domain}", subject=f"Subject {i}", html_body="<p>hi</p>", email_type="test")
+        for i in range(count)
+    ]
+    db.commit()
+    return ids
+
+
+def _rows(db, ids) -> list[EmailQueue]:
+    db.expire_all()
+    return db.execute(select(EmailQueue).where(EmailQueue.id.in_(ids))).scalars().all()
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestDrain:
+    def test_sends_batches_and_records_message_ids(self, db, stub, monkeypatch):
+        monkeypatch.setattr(email_queue, "BATCH_SIZE", 10)
+        ids = _enqueue(db, 25)
+
+        stats = drain(db)
+
+        assert (stats["sent"], stats["batches"]) == (25, 3)
+        assert stub.calls == 3
+        rows = _rows(db, ids)
+        assert {r.status for r in rows} == {"sent"}
+        assert all(r.provider_message_id.startswith("stub_") and r.attempts == 1 for r in rows)
+        assert sorted(e["to"][0] for e in stub.emails) == sorted(r.to_email for r in rows)
+
+    def test_provider_error_schedules_retry(self, db, stub):
+        stub.fail_status = 500
+        ids = _enqueue(db, 3)
+
+        stats = drain(db)
+
+        assert stats["failed"] == 3
+        rows = _rows(db, ids)
+        assert {r.status for r in rows} == {"failed"}
+        assert all(r.next_retry_at is not None and "HTTP 500" in r.error_message for r in rows)
+        assert drain(db)["sent"] == 0  # not retryable yet
+
+    def test_rate_limited_requeues_without_attempt(self, db, stub):
+        stub.fail_status = 429
+        ids = _enqueue(db, 2)
+
+        assert drain(db)["skipped"] == 2
+        rows = _rows(db, ids)
+        assert {(r.status, r.attempts) for r in rows} == {("queued", 0)}
+        assert drain(db)["batches"] == 0  # backing off
+
+    def test_reclaims_rows_stuck_in_sending(self, db, stub):
+        ids = _enqueue(db, 2)
+        stuck, fresh = _rows(db, ids)
+        stuck.status = fresh.status = "sending"
+        stuck.last_attempt_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        fresh.last_attempt_at = datetime.now(timezone.utc)
+        db.commit()
+
+        assert drain(db)["sent"] == 1
+        assert {r.id: r.status for r in _rows(db, ids)} == {stuck.id: "sent", fresh.id: "sending"}
+
+
+class TestConcurrentDrainers:
+    @pytest.fixture
+    def committed(self, engine):
+        """Rows committed for real so several sessions can see them."""
+        domain = f"{uuid.uuid4().hex[:8]}.queue.test"
+        yield domain
+        with engine.begin() as conn:
+            conn.execute(delete(EmailQueue).where(EmailQueue.to_email.like(f"%@{domain}")))
+
+    def test_each_email_sent_once(self, engine, stub, committed, monkeypatch):
+        monkeypatch.setattr(email_queue, "BATCH_SIZE", 5)
+        monkeypatch.setattr(email_queue, "DRAIN_LIMIT", 20)
+        stub.latency = 0.05
+        Session = sessionmaker(bind=engine)
+        with Session() as setup:
+            _enqueue(setup, 60, committed)
+
+        def run():
+            with Session() as session:
+                while drain(session)["batches"]:
+                    pass
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+
+        sent = [e["to"][0] for e in stub.emails if e["to"][0].endswith(committed)]
+        assert len(sent) == 60
+        assert len(set(sent)) == 60
+        assert stub.max_in_flight > 1
+
+
+class TestSharedTokenBucket:
+    @pytest.fixture
+    def key(self, engine):
+        key = f"test_bucket_{uuid.uuid4().hex[:8]}"
+        yield key
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM system_config WHERE key = :key"), {"key": key})
+
+    def test_caps_rate_across_threads(self, engine, key):
+        acquired = []
+
+        def take(n):
+            bucket = SharedTokenBucket(engine, rate=20, capacity=5, key=key)
+            for _ in range(n):
+                bucket.acquire()
+                acquired.append(time.monotonic())
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=take, args=(5,)) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+
+        assert len(acquired) == 15
+        # 5 tokens of burst, then 10 more at 20/s
+        assert time.monotonic() - start >= 0.45
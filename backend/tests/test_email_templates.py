@@ -567,3 +567,92 @@ class TestRegistry:
         from app.services.email_templates import TEMPLATE_VARIABLES
         for et in EmailType:
             assert et in TEMPLATE_VARIABLES, f"Missing TEMPLATE_VARIABLES for {et}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BATCH RENDERING — render_many, shared fragments, override cache
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _alert_batch(n: int) -> list[tuple]:
+    """n match alert renders spread over 3 routes, so deal rows repeat across users."""
+    heatmap = [
+        {"week": f"2026-03-{d:02d}", "avg_cents": 90000 + d * 100, "deal_count": 5,
+         "is_cheapest": d == 2, "is_priciest": d == 23}
+        for d in (2, 9, 16, 23)
+    ]
+    items = []
+    for i in range(n):
+        route = ["Regina (YQR) → Cancun", "Toronto (YYZ) → Varadero", "Calgary (YYC) → Punta Cana"][i % 3]
+        deals = [_deal(hotel_name=f"Resort {i % 3}"), _deal(hotel_name=f"Resort {i % 3}b", price_cents=95000)]
+        user = _FakeUser()
+        user.email = f"user{i}@example.com"
+        items.append((user, {
+            "signal_name": f"Signal {i}", "route": route, "deal_count": 2, "deals": deals,
+            "departure_heatmap": heatmap, "plan_type": "pro" if i % 2 else "free",
+            "_unsub_url": f"https://tripsignal.ca/unsub/{i}",
+        }))
+    return items
+
+
+class TestRenderMany:
+
+    def test_matches_render_template(self):
+        from app.services.email_templates import render_many, render_template
+        items = _alert_batch(12)
+        expected = [render_template(EmailType.MATCH_ALERT, user=u, context=c) for u, c in items]
+        assert render_many(EmailType.MATCH_ALERT, items, workers=1) == expected
+
+    def test_process_pool_matches_serial(self, monkeypatch):
+        from app.services import email_templates
+        monkeypatch.setattr(email_templates, "PARALLEL_RENDER_MIN", 1)
+        monkeypatch.setattr(email_templates, "_RENDER_CHUNK", 4)
+        items = _alert_batch(10)
+        items[3][1]["deals"] = [None]  # breaks the template for this user only
+
+        serial = email_templates.render_many(EmailType.MATCH_ALERT, items, workers=1)
+        parallel = email_templates.render_many(EmailType.MATCH_ALERT, items, workers=2)
+
+        assert parallel == serial
+        assert serial[3] is None
+        assert all(r is not None for i, r in enumerate(serial) if i != 3)
+
+    def test_shared_fragment_memoized_within_batch(self):
+        from app.services.email_templates.base import fragment_cache, shared_fragment
+        calls = []
+
+        @shared_fragment
+        def fragment(rows: list[dict]) -> str:
+            calls.append(1)
+            return f"<p>{len(rows)}</p>"
+
+        fragment([{"a": 1}])
+        with fragment_cache():
+            assert fragment([{"a": 1}]) == fragment([{"a": 1}]) == "<p>1</p>"
+            fragment([{"a": 2}])
+        fragment([{"a": 1}])
+        assert len(calls) == 4
+
+
+class TestOverrideCache:
+
+    def test_override_looked_up_once_until_invalidated(self, monkeypatch):
+        from app.services import email_templates
+        lookups = []
+
+        def fake_get_override(db, email_type):
+            lookups.append(email_type)
+            return {"subject": "Custom for {email}", "body_html": None}
+
+        monkeypatch.setattr(email_templates, "_get_override", fake_get_override)
+        email_templates.invalidate_override(EmailType.WELCOME)
+        try:
+            for _ in range(3):
+                subject, _ = email_templates.render_template(EmailType.WELCOME, user=_user(), context={}, db=object())
+                assert subject == "Custom for test@example.com"
+            assert len(lookups) == 1
+
+            email_templates.invalidate_override(EmailType.WELCOME)
+            email_templates.render_many(EmailType.WELCOME, [(_user(), {})] * 5, db=object(), workers=1)
+            assert len(lookups) == 2
+        finally:
+            email_templates.invalidate_override(EmailType.WELCOME)
@@ -0,0 +1,253 @@
+"""
+Integration tests for batched email orchestration (trigger_many).
+
+Tests verify:
+- Every item gets the same outcome trigger() gives it: queued, suppressed
+  (each rule), deferred, duplicate (existing or repeated key) and error.
+- The email_log and email_queue rows written match trigger()'s.
+- Users, suppression history and keys are loaded in a fixed number of
+  queries, whatever the batch size.
+- A chunk that fails only errors its own items; committed chunks keep theirs.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_email_trigger_many.py -v
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.email_log import EmailLog
+from app.db.models.email_queue import EmailQueue
+from app.db.models.user import User
+from app.services.email_orchestrator import EmailType, trigger, trigger_many
+from app.services.email_templates import _sample_context_for_type, invalidate_override
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test.
+
+    Commits release savepoints, so a chunk's rollback keeps earlier chunks' rows.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection, join_transaction_mode="create_savepoint")()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def _user(db, **overrides) -> User:
+    user = User(
+        id=uuid.uuid4(),
+        clerk_id=f"test_clerk_{uuid.uuid4().hex[:8]}",
+        email=f"test_{uuid.uuid4().hex[:8]}@example.com",
+        plan_type="pro",
+        plan_status="active",
+        email_enabled=True,
+        email_opt_out=False,
+    )
+    for name, value in overrides.items():
+        setattr(user, name, value)
+    db.add(user)
+    return user
+
+
+def _history(db, user: User, email_type: EmailType, category: str, sent_at: datetime, n: int = 1) -> None:
+    for _ in range(n):
+        db.add(EmailLog(
+            user_id=user.id, email_type=email_type.value, category=category,
+            idempotency_key=f"history:{uuid.uuid4().hex}", to_email=user.email,
+            status="sent", sent_at=sent_at,
+        ))
+
+
+def _alert_scenarios(db) -> list[dict]:
+    """One item per outcome of a MATCH_ALERT trigger."""
+    now = datetime.now(timezone.utc)
+    healthy = _user(db)
+    paused = _user(db, email_enabled=False)
+    deleted = _user(db, deleted_at=now - timedelta(days=1))
+    capped = _user(db)
+    batched = _user(db, notification_delivery_frequency="morning")
+    already = _user(db)
+    db.flush()
+    _history(db, capped, EmailType.MATCH_ALERT, "alert", now, n=3)
+    db.add(EmailLog(
+        user_id=already.id, email_type=EmailType.MATCH_ALERT.value, category="alert",
+        idempotency_key=f"match_alert:{already.id}:run1", to_email=already.email, status="sent",
+    ))
+    db.flush()
+
+    users = [healthy, paused, deleted, capped, batched, already]
+    items = [
+        {
+            "user_id": str(u.id),
+            "context": dict(_sample_context_for_type(EmailType.MATCH_ALERT)),
+            "idempotency_key": f"match_alert:{u.id}:run1",
+        }
+        for u in users
+    ]
+    items.append({"user_id": str(uuid.uuid4()), "context": {}})  # unknown user
+    items.append(dict(items[0], context=dict(items[0]["context"])))  # same key twice
+    return items
+
+
+def _reengage_scenarios(db) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    healthy = _user(db)
+    opted_out = _user(db, email_opt_out=True)
+    rate_limited = _user(db)
+    reengaged = _user(db)
+    db.flush()
+    _history(db, rate_limited, EmailType.NO_SIGNAL_REMINDER, "engagement", now - timedelta(hours=2), n=2)
+    _history(db, reengaged, EmailType.INACTIVE_REENGAGEMENT, "engagement", now - timedelta(days=40))
+    db.flush()
+    return [
+        {"user_id": str(u.id), "context": {"window_start": "2026-01-01"}}
+        for u in (healthy, opted_out, rate_limited, reengaged)
+    ]
+
+
+def _outcomes(results: list[dict]) -> list[tuple]:
+    return [(r["status"], r["reason"]) for r in results]
+
+
+def _log_rows(db, items: list[dict]) -> list[list[tuple]]:
+    """email_log rows (status, reason, subject) per item's user, excluding seeded history."""
+    db.expire_all()
+    rows = []
+    for item in items:
+        logs = db.execute(
+            select(EmailLog.status, EmailLog.suppressed_reason, EmailLog.subject)
+            .where(EmailLog.user_id == uuid.UUID(item["user_id"]), ~EmailLog.idempotency_key.like("history:%"))
+            .order_by(EmailLog.status)
+        ).all()
+        rows.append([tuple(r) for r in logs])
+    return rows
+
+
+def _queued_count(db, items: list[dict]) -> int:
+    ids = {uuid.UUID(i["user_id"]) for i in items}
+    return len(db.execute(select(EmailQueue.id).where(EmailQueue.user_id.in_(ids))).all())
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestParityWithTrigger:
+    @pytest.mark.parametrize("email_type,scenarios", [
+        (EmailType.MATCH_ALERT, _alert_scenarios),
+        (EmailType.INACTIVE_REENGAGEMENT, _reengage_scenarios),
+    ])
+    def test_same_outcomes_and_rows(self, db, email_type, scenarios):
+        single_items = scenarios(db)
+        batch_items = scenarios(db)
+
+        single = [
+            trigger(db=db, email_type=email_type, user_id=i["user_id"],
+                    context=i.get("context"), idempotency_key=i.get("idempotency_key"))
+            for i in single_items
+        ]
+        batch = trigger_many(db=db, email_type=email_type, items=batch_items)
+
+        assert _outcomes(batch) == _outcomes(single)
+        assert len({r["reason"] for r in batch}) >= 4
+        assert _log_rows(db, batch_items) == _log_rows(db, single_items)
+        assert _queued_count(db, batch_items) == _queued_count(db, single_items) >= 1
+
+    def test_expected_alert_outcomes(self, db):
+        results = trigger_many(db=db, email_type=EmailType.MATCH_ALERT, items=_alert_scenarios(db))
+
+        assert _outcomes(results) == [
+            ("queued", None),
+            ("suppressed", "email_disabled"),
+            ("suppressed", "user_deleted"),
+            ("suppressed", "daily_cap"),
+            ("deferred", "frequency_deferred"),
+            ("duplicate", "idempotency_key_exists"),
+            ("error", "user_not_found"),
+            ("duplicate", "idempotency_key_exists"),
+        ]
+
+
+class TestBatching:
+    def test_query_count_independent_of_batch_size(self, db, engine):
+        def statements(n: int) -> int:
+            users = [_user(db) for _ in range(n)]
+            db.flush()
+            items = [
+                {"user_id": str(u.id), "context": dict(_sample_context_for_type(EmailType.MATCH_ALERT)),
+                 "idempotency_key": f"match_alert:{u.id}:batch"}
+                for u in users
+            ]
+            seen = []
+
+            def count(conn, cursor, statement, *args):
+                seen.append(statement)
+
+            invalidate_override()  # one override lookup per run, not per email
+            event.listen(engine, "before_cursor_execute", count)
+            try:
+                results = trigger_many(db=db, email_type=EmailType.MATCH_ALERT, items=items)
+            finally:
+                event.remove(engine, "before_cursor_execute", count)
+            assert {r["status"] for r in results} == {"queued"}
+            return len(seen)
+
+        assert statements(40) == statements(5)
+
+    def test_chunks_commit_separately(self, db):
+        users = [_user(db) for _ in range(7)]
+        db.flush()
+        items = [{"user_id": str(u.id), "context": {"window_start": "w1"}} for u in users]
+
+        results = trigger_many(db=db, email_type=EmailType.INACTIVE_REENGAGEMENT, items=items, chunk_size=3)
+
+        assert [r["status"] for r in results] == ["queued"] * 7
+        assert all(u.email in {q.to_email for q in db.execute(select(EmailQueue)).scalars()} for u in users)
+
+    def test_failed_chunk_only_fails_its_items(self, db, monkeypatch):
+        from app.services import email_templates
+
+        users = [_user(db) for _ in range(7)]
+        db.flush()
+        items = [{"user_id": str(u.id), "context": {"window_start": "w1"}} for u in users]
+        render_many = email_templates.render_many
+        calls = []
+
+        def flaky_render_many(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("render backend down")
+            return render_many(*args, **kwargs)
+
+        monkeypatch.setattr(email_templates, "render_many", flaky_render_many)
+        results = trigger_many(db=db, email_type=EmailType.INACTIVE_REENGAGEMENT, items=items, chunk_size=3)
+
+        assert _outcomes(results) == (
+            [("queued", None)] * 3 + [("error", "trigger_exception")] * 3 + [("queued", None)]
+        )
+        assert _queued_count(db, items[:3]) == 3
+        assert _queued_count(db, items[3:6]) == 0
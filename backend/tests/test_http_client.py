@@ -0,0 +1,91 @@
+"""
+Tests for the shared outbound HTTP client (app.core.http).
+
+Tests verify:
+- Calls to one host reuse a single keep-alive connection.
+- Transient 5xx responses and connection errors are retried with backoff.
+- POSTs are only retried when they carry an Idempotency-Key.
+- Per-host call, retry and latency counters are reported.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_http_client.py -v
+"""
+from __future__ import annotations
+
+import pytest
+import requests
+
+from app.core.http import HttpClient
+from benchmarks.resend_stub import ResendStub
+
+
+@pytest.fixture
+def stub():
+    server = ResendStub().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client():
+    c = HttpClient(max_retries=2, backoff_seconds=0.01)
+    yield c
+    c.close()
+
+
+def _email(i: int = 0) -> dict:
+    return {"from": "a@test", "to": [f"user{i}@test"], "subject": "s", "html": "h"}
+
+
+class TestKeepAlive:
+    def test_calls_share_one_connection(self, stub, client):
+        for i in range(20):
+            assert client.post(f"{stub.url}/emails", json=_email(i)).status_code == 200
+
+        assert stub.calls == 20
+        assert stub.connections == 1
+
+
+class TestRetries:
+    def test_idempotent_post_retried_until_success(self, stub, client, monkeypatch):
+        statuses = iter([503, 502])
+        original = stub._admit
+        monkeypatch.setattr(stub, "_admit", lambda: next(statuses, None) or original())
+
+        resp = client.post(f"{stub.url}/emails", json=_email(), headers={"Idempotency-Key": "k1"})
+
+        assert resp.status_code == 200
+        assert len(stub.emails) == 1
+        assert client.stats()["127.0.0.1"]["retries"] == 2
+
+    def test_plain_post_not_retried(self, stub, client):
+        stub.fail_status = 503
+
+        assert client.post(f"{stub.url}/emails", json=_email()).status_code == 503
+        assert stub.calls == 1
+
+    def test_retries_exhausted_returns_last_response(self, stub, client):
+        stub.fail_status = 503
+
+        resp = client.post(f"{stub.url}/emails", json=_email(), headers={"Idempotency-Key": "k2"})
+
+        assert resp.status_code == 503
+        assert stub.calls == 3
+
+    def test_connection_error_retried_then_raised(self, client):
+        with pytest.raises(requests.ConnectionError):
+            client.get("http://127.0.0.1:9/unreachable", timeout=1)
+
+        stats = client.stats()["127.0.0.1"]
+        assert (stats["calls"], stats["errors"], stats["retries"]) == (3, 3, 2)
+
+
+class TestStats:
+    def test_latency_per_host(self, stub, client):
+        stub.latency = 0.02
+        for i in range(3):
+            client.post(f"{stub.url}/emails", json=_email(i))
+
+        stats = client.stats()["127.0.0.1"]
+        assert stats["calls"] == 3
+        assert stats["latency_ms_avg"] >= 20
+        assert stats["latency_ms_max"] >= stats["latency_ms_avg"]
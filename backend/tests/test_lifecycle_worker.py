@@ -15,13 +15,15 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import patch, MagicMock
 
 import pytest
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, event, select
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.db.base import Base
+from app.db.models.deal import Deal
 from app.db.models.deal_match import DealMatch
 from app.db.models.email_log import EmailLog
 from app.db.models.signal import Signal
+from app.db.models.signal_intel_cache import SignalIntelCache
 from app.db.models.user import User
 from app.services.email_orchestrator import EmailType
 from app.workers.lifecycle_email_worker import (
@@ -32,6 +34,7 @@ from app.workers.lifecycle_email_worker import (
     _run_inactive_reengagement,
     _run_no_match_update,
     _run_payment_failed_reminders,
+    _run_weekly_digests,
     run_cycle,
 )
 
@@ -971,3 +974,123 @@ class TestSuspendNoncritical:
         # BILLING is never suppressed
         assert log is not None
         assert log.status == "sent"
+
+
+# ── Weekly Digest Tests ──────────────────────────────────────────────────────
+
+SUNDAY = datetime(2040, 6, 17, 9, 0, 0, tzinfo=timezone.utc)
+
+
+def _passive_user(db: Session) -> User:
+    user = _make_user(db, plan_type="pro")
+    user.email_mode = "passive"
+    db.flush()
+    return user
+
+
+def _match_deals(db: Session, sig: Signal, prices: list[int], matched_at: datetime = SUNDAY) -> None:
+    depart = SUNDAY.date() + timedelta(days=60)
+    for price in prices:
+        deal = Deal(
+            id=uuid.uuid4(),
+            provider="test",
+            origin="YQR",
+            destination="cancun",
+            depart_date=depart,
+            return_date=depart + timedelta(days=7),
+            price_cents=price,
+            hotel_name=f"Resort {price}",
+            is_active=True,
+            dedupe_key=f"test:{uuid.uuid4().hex}",
+        )
+        db.add(deal)
+        db.flush()
+        db.add(DealMatch(signal_id=sig.id, deal_id=deal.id, matched_at=matched_at))
+    db.flush()
+
+
+def _digest_items(db: Session, user_ids: set) -> dict:
+    """Run the job with the orchestrator patched out; return {user_id: context} for user_ids."""
+    captured = []
+
+    def fake_trigger_many(*, db, email_type, items):
+        captured.extend(items)
+        return [{"status": "queued", "reason": None} for _ in items]
+
+    with patch("app.workers.lifecycle_email_worker.email_trigger_many", side_effect=fake_trigger_many):
+        _run_weekly_digests(db, SUNDAY)
+    return {item["user_id"]: item["context"] for item in captured if item["user_id"] in user_ids}
+
+
+class TestWeeklyDigest:
+
+    @patch("app.services.signal_intel.get_departure_heatmap", return_value=None)
+    @patch("app.services.signal_intel.get_destination_index", return_value=[])
+    def test_context_from_all_signals(self, mock_index, mock_heatmap, db):
+        """Deals from every signal merged by price; intel from the first signal that has it."""
+        user = _passive_user(db)
+        first = _make_signal(db, user, created_at=SUNDAY - timedelta(days=30))
+        second = _make_signal(db, user, created_at=SUNDAY - timedelta(days=10))
+        _match_deals(db, first, [90_000 + i * 1000 for i in range(12)])  # only the 10 cheapest count
+        _match_deals(db, second, [85_000, 95_500])
+        _match_deals(db, second, [10_000], matched_at=SUNDAY - timedelta(days=8))  # outside the week
+        db.add(SignalIntelCache(
+            signal_id=second.id, trend_direction="down", trend_consecutive_weeks=3, total_matches=40,
+        ))
+        quiet = _passive_user(db)
+        _make_signal(db, quiet)
+        db.flush()
+
+        contexts = _digest_items(db, {str(user.id), str(quiet.id)})
+
+        assert list(contexts) == [str(user.id)]
+        context = contexts[str(user.id)]
+        assert context["deal_count"] == 12
+        assert [d["price_cents"] for d in context["deals"]] == [85_000, 90_000, 91_000, 92_000, 93_000]
+        assert context["best_price_cents"] == 85_000
+        assert context["deals"][0]["duration_nights"] == 7
+        assert (context["trend_direction"], context["trend_weeks"], context["total_matches"]) == ("down", 3, 40)
+        assert context["days_monitoring"] == 30
+        assert context["week_iso"] == SUNDAY.strftime("%Y-W%W")
+
+    @patch("app.services.signal_intel.get_departure_heatmap", return_value=None)
+    @patch("app.services.signal_intel.get_destination_index", return_value=[])
+    def test_queries_independent_of_user_count(self, mock_index, mock_heatmap, db, engine):
+        """Signals, deals and intel are loaded per batch; routes are looked up once per run."""
+        def statements(n: int) -> int:
+            for _ in range(n):
+                sig = _make_signal(db, _passive_user(db))
+                _match_deals(db, sig, [99_000])
+            seen = []
+
+            def count(conn, cursor, statement, *args):
+                seen.append(statement)
+
+            event.listen(engine, "before_cursor_execute", count)
+            try:
+                _digest_items(db, set())
+            finally:
+                event.remove(engine, "before_cursor_execute", count)
+            return len(seen)
+
+        assert statements(2) == statements(20)
+        assert mock_index.call_count == 2  # one YQR lookup per run
+        assert mock_heatmap.call_count == 2
+
+    def test_skips_outside_sunday_window(self, db):
+        user = _passive_user(db)
+        _match_deals(db, _make_signal(db, user), [99_000])
+
+        with patch("app.workers.lifecycle_email_worker.email_trigger_many") as mock_trigger:
+            assert _run_weekly_digests(db, SUNDAY - timedelta(days=1)) == 0
+            assert _run_weekly_digests(db, SUNDAY.replace(hour=11)) == 0
+        mock_trigger.assert_not_called()
+
+    def test_digest_reaches_orchestrator(self, db):
+        """Queued or deferred (quiet hours), the digest is logged for the user."""
+        user = _passive_user(db)
+        _match_deals(db, _make_signal(db, user), [99_000])
+
+        _run_weekly_digests(db, SUNDAY)
+
+        assert _has_email_log(db, user.id, EmailType.WEEKLY_DIGEST)
@@ -0,0 +1,160 @@
+"""
+Integration tests for precomputed market bucket statistics.
+
+Tests verify:
+- Stored stats match compute_market_stats_live for every covered bucket.
+- Buckets the store does not cover fall back to the live query.
+- Covered buckets with no fresh deals return empty stats without a live query.
+- deals_in_bucket returns DealLite projections of the same rows an entity query loads.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_market_bucket_stats.py -v
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.deal import Deal
+from app.services.market_intel import core, stats_store
+from app.services.market_intel.core import compute_market_stats, compute_market_stats_live, deals_in_bucket
+from app.services.market_intel.stats_store import get_stored_stats, refresh_market_bucket_stats
+from app.services.market_intel.types import DURATION_BUCKETS, STAR_BUCKETS, DealLite, MarketBucket
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(autouse=True)
+def _clear_store_cache():
+    stats_store.clear_cache()
+    yield
+    stats_store.clear_cache()
+
+
+@pytest.fixture
+def origin() -> str:
+    """Private origin code so tests only see their own deals."""
+    return f"T{uuid.uuid4().hex[:5].upper()}"
+
+
+def _seed(db, origin: str, n: int, rng: random.Random) -> None:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(n):
+        depart = date.today() + timedelta(days=rng.randint(1, 120))
+        rows.append({
+            "id": uuid.uuid4(),
+            "provider": "test",
+            "origin": origin,
+            "destination": rng.choice(["cancun", "varadero"]),
+            "depart_date": depart,
+            "return_date": depart + timedelta(days=rng.choice([4, 7, 7, 8, 10, 14, 20])),
+            "price_cents": rng.randint(60, 250) * 1001,  # odd steps give .5 medians
+            "star_rating": rng.choice([None, 2.0, 3.0, 3.45, 3.5, 4.0, 4.5, 5.0]),
+            "hotel_name": rng.choice(["Resort A", " resort a ", "Resort B", "", None, "Hotel C"]),
+            "hotel_id": rng.choice([None, "", str(rng.randint(1, 6))]),
+            "is_active": rng.random() > 0.1,
+            "last_seen_at": now - timedelta(days=rng.choice([0, 1, 3, 10])),
+            "dedupe_key": f"test:{uuid.uuid4().hex}:{i}",
+        })
+    db.execute(insert(Deal), rows)
+    db.flush()
+
+
+def _buckets(origin: str):
+    for destination in ("cancun", "varadero"):
+        for duration in DURATION_BUCKETS:
+            yield MarketBucket(origin, destination, duration)
+            for star in STAR_BUCKETS:
+                yield MarketBucket(origin, destination, duration, star_bucket=star)
+            for min_star in (1.0, 3.0, 4.0, 5.0):
+                yield MarketBucket(origin, destination, duration, min_star_rating=min_star)
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestMarketBucketStats:
+    def test_store_matches_live(self, db, origin):
+        _seed(db, origin, 400, random.Random(3))
+        assert refresh_market_bucket_stats(db) > 0
+
+        checked = 0
+        for bucket in _buckets(origin):
+            stored = get_stored_stats(db, bucket)
+            live = compute_market_stats_live(db, bucket)
+            assert stored is not None, bucket
+            assert stored.price_stddev == pytest.approx(live.price_stddev), bucket
+            stored.price_stddev = live.price_stddev
+            assert stored == live, bucket
+            checked += live.sample_size > 0
+        assert checked > 20
+
+    def test_uncovered_bucket_falls_back_to_live(self, db, origin):
+        _seed(db, origin, 100, random.Random(5))
+        refresh_market_bucket_stats(db)
+        bucket = MarketBucket(origin, "cancun", "one_week", min_star_rating=3.5)
+
+        assert get_stored_stats(db, bucket) is None
+        assert compute_market_stats(db, bucket) == compute_market_stats_live(db, bucket)
+
+    def test_empty_covered_bucket_skips_live_query(self, db, origin, monkeypatch):
+        _seed(db, origin, 50, random.Random(9))
+        refresh_market_bucket_stats(db)
+        monkeypatch.setattr(core, "deals_in_bucket", lambda *a, **k: pytest.fail("live query"))
+
+        stats = compute_market_stats(db, MarketBucket(origin, "nowhere", "one_week"))
+
+        assert stats.sample_size == 0
+        assert stats.prices == []
+
+    def test_empty_store_is_not_used(self, db, origin):
+        _seed(db, origin, 50, random.Random(11))
+        db.execute(stats_store.MarketBucketStats.__table__.delete())
+
+        assert get_stored_stats(db, MarketBucket(origin, "cancun", "one_week")) is None
+
+
+class TestDealsInBucket:
+    def test_projection_matches_entities(self, db, origin):
+        _seed(db, origin, 200, random.Random(13))
+        bucket = MarketBucket(origin, "cancun", "one_week", min_star_rating=3.0)
+
+        lite = deals_in_bucket(db, bucket)
+        ids = [d.id for d in lite]
+        entities = {d.id: d for d in db.execute(select(Deal).where(Deal.id.in_(ids))).scalars()}
+
+        assert lite and all(isinstance(d, DealLite) for d in lite)
+        assert [d.price_cents for d in lite] == sorted(d.price_cents for d in lite)
+        for d in lite:
+            assert d == tuple(getattr(entities[d.id], name) for name in DealLite._fields)
@@ -8,12 +8,14 @@ Tests cover:
 - Gap validation downgrades
 - Sample-size suppression
 - Null-safe / edge-case behavior
+- NumPy backend parity with the pure-Python stats and scoring
 
 Run: cd /opt/tripsignal/backend && python -m pytest tests/test_market_intel_scoring.py -v
 """
 from __future__ import annotations
 
 import math
+import random
 
 import pytest
 
@@ -26,6 +28,8 @@ from app.services.market_intel import (
     STRONG_SAMPLE_SIZE,
     DealValueScore,
     MarketStats,
+    compute_percentile,
+    compute_stddev,
     duration_to_bucket,
     score_deal,
     star_to_bucket,
@@ -346,3 +350,78 @@ class TestMarketStatsHelpers:
     def test_is_strong_false(self):
         stats = _make_stats([50000, 60000, 70000, 80000, 90000, 100000])  # 6 prices
         assert not stats.is_strong()
+
+
+# ── NumPy Backend Parity ─────────────────────────────────────────────────────
+
+
+def _baseline_stddev(prices: list[int]) -> float | None:
+    # The mean/variance formula compute_market_stats_live has always used
+    n = len(prices)
+    mean = sum(prices) / n
+    variance = sum((p - mean) ** 2 for p in prices) / n if n > 1 else 0
+    return math.sqrt(variance) if variance > 0 else None
+
+
+def _pure_distribution(prices: list[int]) -> MarketStats:
+    return MarketStats(
+        sample_size=len(prices),
+        min_price=prices[0],
+        p25_price=compute_percentile(prices, 0.25),
+        median_price=compute_percentile(prices, 0.50),
+        p75_price=compute_percentile(prices, 0.75),
+        max_price=prices[-1],
+        price_stddev=_baseline_stddev(prices),
+        prices=prices,
+    )
+
+
+class TestVectorizedBackend:
+    def test_stddev_matches_baseline_formula(self):
+        rng = random.Random(23)
+        for _ in range(2000):
+            prices = sorted(rng.randint(300, 9000) * 100 + rng.choice([0, 1, 50]) for _ in range(rng.randint(2, 60)))
+            assert compute_stddev(prices) == _baseline_stddev(prices), prices
+        assert compute_stddev([100000] * 5) is None
+        assert compute_stddev([100000]) is None
+
+    def test_bucket_distributions_match_pure_python(self):
+        from app.services.market_intel.vectorized import bucket_distributions
+
+        rng = random.Random(17)
+        bucket_ids, prices = [], []
+        for bucket in range(300):
+            for _ in range(rng.choice([1, 2, 3, 4, 5, 7, 50, 401])):
+                bucket_ids.append(bucket)
+                prices.append(rng.choice([0, rng.randint(300, 9000) * 100 + rng.choice([0, 1, 50])]))
+
+        result = bucket_distributions(bucket_ids, prices)
+
+        by_bucket: dict[int, list[int]] = {}
+        for bucket, price in zip(bucket_ids, prices, strict=True):
+            if price > 0:
+                by_bucket.setdefault(bucket, []).append(price)
+        assert result.keys() == by_bucket.keys()
+        for bucket, bucket_prices in by_bucket.items():
+            assert result[bucket] == _pure_distribution(sorted(bucket_prices)), bucket
+
+    @pytest.mark.parametrize("n", [0, 3, 6, 7, 8, 40])
+    def test_score_prices_match_score_deal(self, n: int):
+        from app.services.market_intel.vectorized import label_prices, score_prices
+
+        rng = random.Random(n)
+        prices = sorted(rng.randint(500, 3000) * 100 for _ in range(n))
+        stats = _pure_distribution(prices) if prices else MarketStats()
+        candidates = prices + [1, 40000, 49999, 100000, 250000, 400000]
+        if prices:
+            candidates += [prices[0], prices[0] - 1, prices[0] - 20000]
+
+        expected = [score_deal(p, stats) for p in candidates]
+        assert score_prices(candidates, stats) == expected
+        assert label_prices(candidates, stats) == [e.label for e in expected]
+
+    def test_price_ranks(self):
+        from app.services.market_intel.vectorized import price_ranks
+
+        assert price_ranks([100, 200, 200, 300], [50, 100, 200, 250, 400]) == [0.0, 0.0, 0.25, 0.75, 1.0]
+        assert price_ranks([], [100]) == [0.0]
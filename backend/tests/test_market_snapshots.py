@@ -0,0 +1,220 @@
+"""
+Integration tests for batched daily market snapshots.
+
+Tests verify:
+- Today's snapshot rows match compute_market_stats_live for every bucket.
+- Re-running a day replaces its rows instead of duplicating them.
+- Backfilled days use the price a deal had on that day and skip deals not yet found.
+- Long backfills are written one week per statement, and a failing week raises
+  with the rows already committed.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_market_snapshots.py -v
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models.deal import Deal
+from app.db.models.deal_price_history import DealPriceHistory
+from app.db.models.market_snapshot import MarketSnapshot
+from app.services.market_intel import snapshots
+from app.services.market_intel.core import compute_market_stats_live
+from app.services.market_intel.snapshots import (
+    SnapshotBackfillError,
+    backfill_daily_snapshots,
+    generate_daily_snapshots,
+)
+from app.services.market_intel.types import DURATION_BUCKETS, MarketBucket
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def origin() -> str:
+    """Private origin code so tests only see their own deals."""
+    return f"T{uuid.uuid4().hex[:5].upper()}"
+
+
+def _snapshots(db, origin: str, day: date) -> dict[tuple[str, str], MarketSnapshot]:
+    rows = db.execute(
+        select(MarketSnapshot)
+        .where(MarketSnapshot.departure_airport == origin, MarketSnapshot.snapshot_date == day)
+    ).scalars().all()
+    return {(r.destination_region, r.duration_bucket): r for r in rows}
+
+
+def _deal(origin: str, price: int, found_at: datetime, **overrides) -> dict:
+    depart = date.today() + timedelta(days=30)
+    row = {
+        "id": uuid.uuid4(),
+        "provider": "test",
+        "origin": origin,
+        "destination": "cancun",
+        "depart_date": depart,
+        "return_date": depart + timedelta(days=7),
+        "price_cents": price,
+        "hotel_name": "Resort A",
+        "is_active": True,
+        "found_at": found_at,
+        "last_seen_at": datetime.now(timezone.utc),
+        "dedupe_key": f"test:{uuid.uuid4().hex}",
+    }
+    row.update(overrides)
+    return row
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestGenerateDailySnapshots:
+    def test_rows_match_live_stats(self, db, origin):
+        rng = random.Random(21)
+        now = datetime.now(timezone.utc)
+        rows = []
+        for _ in range(300):
+            depart = date.today() + timedelta(days=rng.randint(1, 90))
+            rows.append(_deal(
+                origin, rng.randint(60, 250) * 1001, now,
+                destination=rng.choice(["cancun", "varadero"]),
+                depart_date=depart,
+                return_date=depart + timedelta(days=rng.choice([4, 7, 10, 14, 20])),
+                hotel_name=rng.choice(["Resort A", " resort a ", "Resort B", "", None]),
+                is_active=rng.random() > 0.1,
+                last_seen_at=now - timedelta(days=rng.choice([0, 2, 10])),
+            ))
+        db.execute(insert(Deal), rows)
+        db.flush()
+
+        assert generate_daily_snapshots(db) > 0
+        snapshots = _snapshots(db, origin, date.today())
+
+        checked = 0
+        for destination in ("cancun", "varadero"):
+            for duration in DURATION_BUCKETS:
+                live = compute_market_stats_live(db, MarketBucket(origin, destination, duration))
+                snap = snapshots.get((destination, duration))
+                if live.sample_size == 0:
+                    assert snap is None
+                    continue
+                checked += 1
+                assert snap.star_bucket is None
+                assert (snap.package_count, snap.unique_resort_count) == (live.sample_size, live.unique_resort_count)
+                assert (snap.min_price, snap.median_price, snap.p75_price, snap.max_price) == (
+                    live.min_price, live.median_price, live.p75_price, live.max_price,
+                )
+                assert snap.price_stddev == pytest.approx(live.price_stddev)
+        assert checked >= 6
+
+    def test_rerun_replaces_rows(self, db, origin):
+        db.execute(insert(Deal), [_deal(origin, 100_000 + i, datetime.now(timezone.utc)) for i in range(5)])
+        db.flush()
+
+        generate_daily_snapshots(db)
+        generate_daily_snapshots(db)
+
+        rows = db.execute(
+            select(MarketSnapshot).where(MarketSnapshot.departure_airport == origin)
+        ).scalars().all()
+        assert len(rows) == 1
+        assert rows[0].package_count == 5
+
+
+class TestBackfillDailySnapshots:
+    def test_uses_price_as_of_each_day(self, db, origin):
+        today = date.today()
+        day = [today - timedelta(days=n) for n in range(4)]  # day[n] = n days ago
+        noon = [datetime.combine(d, time(12), tzinfo=timezone.utc).astimezone() for d in day]
+
+        old = _deal(origin, 90_000, noon[3])
+        new = _deal(origin, 50_000, noon[1])
+        db.execute(insert(Deal), [old, new])
+        db.execute(insert(DealPriceHistory), [
+            {"deal_id": old["id"], "price_cents": 120_000, "recorded_at": noon[3]},
+            {"deal_id": old["id"], "price_cents": 90_000, "recorded_at": noon[1]},
+            {"deal_id": new["id"], "price_cents": 50_000, "recorded_at": noon[1]},
+        ])
+        db.flush()
+
+        assert backfill_daily_snapshots(db, day[3], today) >= 3
+
+        by_day = {n: _snapshots(db, origin, day[n]).get(("cancun", "one_week")) for n in range(4)}
+        assert (by_day[3].package_count, by_day[3].min_price) == (1, 120_000)
+        assert (by_day[2].package_count, by_day[2].min_price) == (1, 120_000)
+        assert (by_day[1].package_count, by_day[1].min_price, by_day[1].max_price) == (2, 50_000, 90_000)
+        assert by_day[0] is None  # today is left to generate_daily_snapshots
+
+    def test_long_range_is_written_in_weekly_chunks(self, db, origin, monkeypatch):
+        today = date.today()
+        start = today - timedelta(days=20)
+        found = datetime.combine(start, time(12), tzinfo=timezone.utc)
+        db.execute(insert(Deal), [_deal(origin, 80_000, found)])
+        db.flush()
+
+        chunks = []
+        write = snapshots._write
+
+        def _recording_write(db, sql, chunk_start, chunk_end, **params):
+            chunks.append((chunk_start, chunk_end))
+            return write(db, sql, chunk_start, chunk_end, **params)
+
+        monkeypatch.setattr(snapshots, "_write", _recording_write)
+        created = backfill_daily_snapshots(db, start, today)
+
+        assert chunks == [
+            (start, start + timedelta(days=6)),
+            (start + timedelta(days=7), start + timedelta(days=13)),
+            (start + timedelta(days=14), today - timedelta(days=1)),
+        ]
+        assert created >= 20
+        assert all(_snapshots(db, origin, start + timedelta(days=n)) for n in range(20))
+
+    def test_failed_chunk_raises_with_progress(self, db, origin, monkeypatch):
+        today = date.today()
+        start = today - timedelta(days=10)
+        calls = []
+
+        def _failing_write(db, sql, chunk_start, chunk_end, **params):
+            calls.append(chunk_start)
+            if len(calls) == 2:
+                raise RuntimeError("canceling statement due to statement timeout")
+            return 4
+
+        monkeypatch.setattr(snapshots, "_write", _failing_write)
+        with pytest.raises(SnapshotBackfillError) as exc_info:
+            backfill_daily_snapshots(db, start, today)
+
+        assert exc_info.value.created == 4
+        assert exc_info.value.start == start + timedelta(days=7)
+        assert isinstance(exc_info.value.__cause__, RuntimeError)
@@ -0,0 +1,182 @@
+"""
+Tests for the concurrent SellOff page fetcher against a local HTTP stub.
+
+Tests verify:
+- Every task is fetched exactly once and parses with parse_deals_from_html.
+- Each worker sends its own referer chain (previous page it fetched).
+- 404 pages are reported as not_found without HTML.
+- Multiple sessions fetch concurrently.
+- max_per_host bounds concurrent in-flight requests to one host.
+- stop() ends the run early.
+- A worker that fails to start still lets results() finish.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_page_fetcher.py -v
+"""
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from curl_cffi.requests import Session
+
+from app.workers.selloff_scraper import parse_deals_from_html
+from app.workers.shared.page_fetcher import FetchPool, PageTask
+
+_CARD = (
+    '<h2 class="adModuleHeading--abc">Cancun, Mexico</h2>'
+    '<p class="adModuleSubheading--abc">Stub Resort &amp; Spa</p>'
+    '<div class="adModuleDetailsDays--abc"><span>May 01, 2099</span></div>'
+    '<span class="adModuleDetailsAmount--abc">$1299<sup></sup></span>'
+    '<div class="StarRating-module--rating--abc" rating="4.5"></div>'
+    '<a href="https://shopping.selloffvacations.com/cgi-bin/handler.cgi?gateway_dep=YYZ'
+    '&amp;no_hotel=42&amp;date_dep=20990501&amp;duration=7DAYS">Book</a>'
+)
+
+
+class _StubState:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests: list[tuple[str, str | None]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+
+def _make_handler(state: _StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            with state.lock:
+                state.requests.append((self.path, self.headers.get("Referer")))
+                state.in_flight += 1
+                state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+            try:
+                time.sleep(state.latency)
+                if self.path.startswith("/missing"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = f"<html><body>{_CARD}</body></html>".encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def stub():
+    state = _StubState(latency=0.05)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _pool(tasks, workers: int, **kwargs) -> FetchPool:
+    kwargs.setdefault("profile_factory", lambda: {"user_agent": "stub-agent"})
+    return FetchPool(
+        tasks,
+        workers=workers,
+        session_factory=lambda profile: Session(),
+        delay=lambda: 0,
+        group_pause=lambda: 0,
+        timeout=5,
+        **kwargs,
+    )
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestFetchPool:
+    def test_fetches_every_task_once(self, stub):
+        tasks = [PageTask(f"{stub.base}/en/dest-{d}/from-{g}", group=f"dest-{d}") for d in range(3) for g in range(4)]
+        results = list(_pool(tasks, workers=3).results())
+
+        assert sorted(r.task.url for r in results) == sorted(t.url for t in tasks)
+        assert all(r.status_code == 200 and r.error is None for r in results)
+        deals = parse_deals_from_html(results[0].html)
+        assert len(deals) == 1
+        assert deals[0]["hotel_name"] == "Stub Resort & Spa"
+        assert deals[0]["price_cents"] == 129900
+
+    def test_referer_chain_per_worker(self, stub):
+        tasks = [PageTask(f"{stub.base}/en/page-{i}", group="a") for i in range(6)]
+        results = list(_pool(tasks, workers=1, warmup_urls=[f"{stub.base}/warmup"]).results())
+
+        assert [r.task.url for r in results] == [t.url for t in tasks]
+        referers = dict(stub.requests)
+        assert referers["/en/page-0"] == f"{stub.base}/warmup"
+        for i in range(1, 6):
+            assert referers[f"/en/page-{i}"] == f"{stub.base}/en/page-{i - 1}"
+
+    def test_not_found(self, stub):
+        tasks = [PageTask(f"{stub.base}/missing/a"), PageTask(f"{stub.base}/en/ok")]
+        results = {r.task.url: r for r in _pool(tasks, workers=1).results()}
+
+        missing = results[f"{stub.base}/missing/a"]
+        assert missing.not_found and missing.html is None and missing.error is None
+        assert not results[f"{stub.base}/en/ok"].not_found
+
+    def test_sessions_run_concurrently(self, stub):
+        tasks = [PageTask(f"{stub.base}/en/page-{i}") for i in range(12)]
+        results = list(_pool(tasks, workers=4).results())
+
+        assert len(results) == 12
+        assert len({r.worker_id for r in results}) > 1
+        assert stub.peak_in_flight > 1
+
+    def test_max_per_host_limits_in_flight(self, stub):
+        tasks = [PageTask(f"{stub.base}/en/page-{i}") for i in range(12)]
+        results = list(_pool(tasks, workers=4, max_per_host=2).results())
+
+        assert len(results) == 12
+        assert stub.peak_in_flight == 2
+
+    def test_url_guard_blocks(self, stub):
+        def guard(url):
+            if "blocked" in url:
+                raise ValueError("Blocked: test")
+
+        tasks = [PageTask(f"{stub.base}/blocked"), PageTask(f"{stub.base}/en/ok")]
+        results = {r.task.url: r for r in _pool(tasks, workers=1, url_guard=guard).results()}
+
+        assert results[f"{stub.base}/blocked"].error == "Blocked: test"
+        assert ("/blocked", None) not in stub.requests
+
+    def test_stop_ends_run_early(self, stub):
+        tasks = [PageTask(f"{stub.base}/en/page-{i}") for i in range(50)]
+        pool = _pool(tasks, workers=2)
+        seen = []
+        with pool:
+            for result in pool.results():
+                seen.append(result)
+                if len(seen) == 3:
+                    pool.stop()
+                    break
+
+        assert len(seen) == 3
+        assert len(stub.requests) < 50
+
+    def test_profile_factory_failure_finishes(self, stub):
+        def broken_profile():
+            raise RuntimeError("no profiles")
+
+        tasks = [PageTask(f"{stub.base}/en/page-{i}") for i in range(3)]
+        results = list(_pool(tasks, workers=2, profile_factory=broken_profile).results())
+
+        assert results == []
+        assert stub.requests == []
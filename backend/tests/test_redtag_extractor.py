@@ -0,0 +1,107 @@
+"""
+Unit tests for the streaming RedTag data-deal extractor.
+
+Tests verify:
+- Deals are yielded lazily, one attribute at a time.
+- Non-AI and other-gateway deals are dropped before JSON decoding.
+- Attributes the pre-filter cannot read are decoded and checked in full.
+- Duplicate dedupe keys are dropped as the page streams.
+- _batched groups the stream for per-batch upsert/match.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_redtag_extractor.py -v
+"""
+from __future__ import annotations
+
+import html as html_module
+import json
+import types
+from datetime import date
+
+from app.workers import redtag_scraper
+from app.workers.redtag_scraper import _batched, iter_deals_from_html, parse_deals_from_html
+
+
+def _button(hotel_id=1, meal="AI", departure="YYZ", depart="20990501", **extra) -> str:
+    deal = {
+        "MealType": meal,
+        "HotelName": f"Hotel {hotel_id} & Spa",
+        "HotelID": hotel_id,
+        "TotalPrice": "1299.00",
+        "DepartureDate": depart,
+        "Duration": "7",
+        "DepartureCode": departure,
+        "Destination": "Cancun, Mexico",
+        "Star": "4.5",
+        **extra,
+    }
+    return f'<button data-deal="{html_module.escape(json.dumps(deal))}">Continue</button>'
+
+
+def _page(*buttons: str) -> str:
+    return f"<html><body>{''.join(buttons)}</body></html>"
+
+
+class _CountingJson:
+    """Stands in for the module's json to count full decodes."""
+
+    def __init__(self):
+        self.calls = 0
+        self.JSONDecodeError = json.JSONDecodeError
+
+    def loads(self, s):
+        self.calls += 1
+        return json.loads(s)
+
+
+class TestIterDeals:
+    def test_yields_lazily(self):
+        stream = iter_deals_from_html(_page(_button(1), _button(2), _button(3)), "toronto")
+
+        assert isinstance(stream, types.GeneratorType)
+        first = next(stream)
+        assert first["hotel_id"] == "1"
+        assert first["hotel_name"] == "Hotel 1 & Spa"
+        assert first["depart_date"] == date(2099, 5, 1)
+        assert [d["hotel_id"] for d in stream] == ["2", "3"]
+
+    def test_prefilters_before_decoding(self, monkeypatch):
+        counter = _CountingJson()
+        monkeypatch.setattr(redtag_scraper, "json", counter)
+        page = _page(_button(1), _button(2, meal="RO"), _button(3, departure="YUL"), _button(4, departure="YYZ,YTZ"))
+
+        deals = parse_deals_from_html(page, "toronto")
+
+        assert [d["hotel_id"] for d in deals] == ["1", "4"]
+        assert deals[1]["gateway"] == "YYZ"
+        assert counter.calls == 2
+
+    def test_undecodable_blob_is_skipped(self):
+        page = _page('<button data-deal="{&#39;MealType&#39;: &#39;AI&#39;}">', _button(1))
+
+        assert [d["hotel_id"] for d in parse_deals_from_html(page, "toronto")] == ["1"]
+
+    def test_mismatch_checked_after_decode_when_prefilter_misses(self):
+        # A JSON-escaped key the pre-filter cannot read; the decoded deal is still rejected
+        raw = html_module.escape(
+            '{"MealType": "AI", "HotelName": "Escaped", "HotelID": 9, "TotalPrice": "999", '
+            '"DepartureDate": "20990101", "DepartureCod\\u0065": "YUL"}'
+        )
+        page = _page(f'<button data-deal="{raw}">', _button(1))
+
+        assert [d["hotel_id"] for d in parse_deals_from_html(page, "toronto")] == ["1"]
+
+    def test_dedupes_while_streaming(self):
+        page = _page(_button(1), _button(1), _button(2), _button(1))
+
+        assert [d["hotel_id"] for d in iter_deals_from_html(page, "toronto")] == ["1", "2"]
+
+    def test_invalid_date_is_skipped(self):
+        page = _page(_button(1, depart="20991399"), _button(2))
+
+        assert [d["hotel_id"] for d in parse_deals_from_html(page, "toronto")] == ["2"]
+
+
+class TestBatched:
+    def test_groups_stream(self):
+        assert list(_batched(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(_batched(iter([]), 2)) == []
@@ -0,0 +1,141 @@
+"""
+Integration tests for the grouped route intel cache refresh.
+
+Tests verify:
+- Heatmap, price index and countdown values per route.
+- Incremental mode only refreshes the given (still active) routes.
+- Metrics that cannot be computed keep their previously cached values.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_route_intel.py -v
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models.deal import Deal
+from app.db.models.route_intel_cache import RouteIntelCache
+from app.services.signal_intel import refresh_route_intel_cache
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def _origin() -> str:
+    return f"T{uuid.uuid4().hex[:5]}"
+
+
+def _add_deal(db: Session, origin: str, depart: date, price_cents: int, *, found_days_before: int = 30) -> Deal:
+    deal = Deal(
+        provider="test",
+        origin=origin,
+        destination="cancun",
+        depart_date=depart,
+        return_date=depart + timedelta(days=7),
+        price_cents=price_cents,
+        dedupe_key=f"test:{uuid.uuid4().hex[:12]}",
+        found_at=datetime.combine(depart - timedelta(days=found_days_before), datetime.min.time(), timezone.utc),
+    )
+    db.add(deal)
+    db.flush()
+    return deal
+
+
+def _monday(weeks_ahead: int) -> date:
+    today = date.today()
+    return today - timedelta(days=today.weekday()) + timedelta(weeks=weeks_ahead)
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestRouteIntelRefresh:
+    def test_route_values(self, db):
+        origin = _origin()
+        cheap_week, pricey_week = _monday(4), _monday(6)
+        for price in (80000, 90000, 100000):
+            _add_deal(db, origin, cheap_week, price, found_days_before=40)
+        for price in (150000, 160000, 170000):
+            _add_deal(db, origin, pricey_week, price, found_days_before=10)
+
+        assert refresh_route_intel_cache(db, routes={(origin, "cancun")}) == 1
+        cached = db.get(RouteIntelCache, (origin, "cancun"))
+        assert cached.cheapest_depart_week == cheap_week
+        assert cached.cheapest_week_avg_cents == 90000
+        assert cached.priciest_depart_week == pricey_week
+        assert cached.priciest_week_avg_cents == 160000
+        assert cached.total_deals_analyzed == 6
+        assert cached.current_week_avg_cents == 125000
+        assert cached.prev_week_avg_cents is None
+        assert cached.avg_price_4plus_weeks_cents == 90000
+        assert cached.avg_price_under_2_weeks_cents == 160000
+        assert cached.late_booking_premium_pct == 77.8
+
+    def test_incremental_only_touches_given_routes(self, db):
+        touched, untouched, inactive = _origin(), _origin(), _origin()
+        for origin in (touched, untouched):
+            _add_deal(db, origin, _monday(3), 100000)
+        _add_deal(db, inactive, _monday(3), 100000).is_active = False
+        db.flush()
+
+        refreshed = refresh_route_intel_cache(db, routes={(touched, "cancun"), (inactive, "cancun")})
+        assert refreshed == 1
+        assert db.get(RouteIntelCache, (touched, "cancun")) is not None
+        assert db.get(RouteIntelCache, (untouched, "cancun")) is None
+        assert db.get(RouteIntelCache, (inactive, "cancun")) is None
+
+        assert refresh_route_intel_cache(db, routes=set()) == 0
+
+    def test_missing_heatmap_keeps_cached_week(self, db):
+        origin = _origin()
+        _add_deal(db, origin, _monday(3), 100000)
+        db.add(RouteIntelCache(
+            origin=origin,
+            destination_region="cancun",
+            cheapest_depart_week=date(2099, 1, 5),
+            cheapest_week_avg_cents=12345,
+        ))
+        db.flush()
+
+        refresh_route_intel_cache(db, routes={(origin, "cancun")})
+        cached = db.get(RouteIntelCache, (origin, "cancun"))
+        db.refresh(cached)
+        # Fewer than 3 deals in any week: heatmap not recomputed
+        assert cached.cheapest_depart_week == date(2099, 1, 5)
+        assert cached.cheapest_week_avg_cents == 12345
+        assert cached.current_week_avg_cents == 100000
+
+    def test_full_refresh_includes_new_route(self, db):
+        origin = _origin()
+        _add_deal(db, origin, _monday(3), 100000)
+        assert refresh_route_intel_cache(db) >= 1
+        assert db.get(RouteIntelCache, (origin, "cancun")) is not None
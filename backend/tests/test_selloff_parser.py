@@ -0,0 +1,125 @@
+"""
+Unit tests for the single-pass SellOff listing parser.
+
+Tests verify:
+- Card fields are extracted (link params, entities, discount, region).
+- A card missing a field is counted as malformed without shifting the others.
+- Cards without a booking link fall back to the date span and card index.
+- Cards are split correctly when the leading field is missing from one card.
+- A promo badge before the first card does not open a card.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_selloff_parser.py -v
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from app.workers.selloff_parser import parse_date, parse_listing_page, split_cards
+
+
+def _card(
+    dest="Cancun, Mexico",
+    hotel="Resort &amp; Spa",
+    price=1299,
+    star="4.5",
+    discount=None,
+    link_params="gateway_dep=YYZ&amp;no_hotel=42&amp;date_dep=20990501&amp;duration=7DAYS",
+    days="May 01, 2099",
+) -> str:
+    parts = [f'<h2 class="adModuleHeading--a1">{dest}</h2>']
+    if hotel is not None:
+        parts.append(f'<p class="adModuleSubheading--a1">{hotel}</p>')
+    parts.append(f'<div class="adModuleDetailsDays--a1"><span>{days}</span></div>')
+    parts.append(f'<span class="adModuleDetailsAmount--a1">${price}<sup></sup></span>')
+    if discount is not None:
+        parts.append(f"<em>Save up to {discount}%</em>")
+    if star is not None:
+        parts.append(f'<div class="StarRating-module--rating--a1" rating="{star}"></div>')
+    if link_params is not None:
+        parts.append(f'<a href="https://shopping.selloffvacations.com/cgi-bin/handler.cgi?{link_params}">Book</a>')
+    return "<article>" + "".join(parts) + "</article>"
+
+
+def _page(*cards: str, prefix: str = "") -> str:
+    return f"<html><body>{prefix}{''.join(cards)}</body></html>"
+
+
+class TestParseListingPage:
+    def test_extracts_card_fields(self):
+        page = parse_listing_page(_page(_card(discount=30)))
+
+        assert page.cards == 1 and page.malformed == 0
+        deal = page.deals[0]
+        assert deal["gateway"] == "YYZ"
+        assert deal["hotel_id"] == "42"
+        assert deal["hotel_name"] == "Resort & Spa"
+        assert deal["region"] == "cancun"
+        assert deal["depart_date"] == date(2099, 5, 1)
+        assert deal["return_date"] == date(2099, 5, 8)
+        assert deal["duration_days"] == 7
+        assert deal["price_cents"] == 129900
+        assert deal["discount_pct"] == 30
+        assert deal["star_rating"] == 4.5
+        assert deal["deeplink_url"].endswith("no_hotel=42&date_dep=20990501&duration=7DAYS")
+
+    def test_malformed_card_does_not_misalign(self):
+        html = _page(
+            _card(price=1000, star="3.0"),
+            _card(price=2000, star=None),
+            _card(price=3000, star="5.0", dest="Varadero, Cuba"),
+        )
+        page = parse_listing_page(html)
+
+        assert page.cards == 3
+        assert page.malformed == 1
+        assert [(d["price_cents"], d["star_rating"], d["region"]) for d in page.deals] == [
+            (100000, 3.0, "cancun"),
+            (300000, 5.0, "varadero"),
+        ]
+
+    def test_card_without_link_uses_date_span_and_index(self):
+        page = parse_listing_page(_page(_card(), _card(link_params=None, days="Jun 02, 2099")))
+
+        deal = page.deals[1]
+        assert deal["gateway"] == ""
+        assert deal["hotel_id"] == "1"
+        assert deal["depart_date"] == date(2099, 6, 2)
+        assert deal["duration_days"] == 7
+
+    def test_missing_leading_field_still_splits(self):
+        no_heading = _card(price=2000).replace('<h2 class="adModuleHeading--a1">Cancun, Mexico</h2>', "")
+        cards = split_cards(_page(_card(price=1000), no_heading, _card(price=3000)))
+
+        assert [c["price"] for c in cards] == ["1000", "2000", "3000"]
+        assert "destination" not in cards[1]
+
+    def test_promo_badge_before_first_card(self):
+        page = parse_listing_page(_page(_card(), _card(), prefix="<div>Save up to 60% this week</div>"))
+
+        assert page.cards == 2
+        assert [d["discount_pct"] for d in page.deals] == [0, 0]
+
+    def test_promo_badge_before_discounted_card(self):
+        page = parse_listing_page(_page(_card(discount=30), _card(), prefix="<div>Save up to 60% this week</div>"))
+
+        assert (page.cards, page.malformed) == (2, 0)
+        assert [d["discount_pct"] for d in page.deals] == [30, 0]
+
+    def test_unparseable_date_is_malformed(self):
+        page = parse_listing_page(_page(_card(link_params="gateway_dep=YYZ&amp;date_dep=20991399", days="soon")))
+
+        assert page.deals == []
+        assert page.malformed == 1
+
+    def test_empty_page(self):
+        page = parse_listing_page("<html></html>")
+        assert (page.deals, page.cards, page.malformed) == ([], 0, 0)
+
+
+class TestParseDate:
+    def test_formats(self):
+        assert parse_date("20990501") == date(2099, 5, 1)
+        assert parse_date("May 01, 2099") == date(2099, 5, 1)
+        assert parse_date("September 10, 2099") == date(2099, 9, 10)
+        assert parse_date("20991399") is None
+        assert parse_date("") is None
@@ -0,0 +1,167 @@
+"""
+Integration tests for the set-based signal intel cache refresh.
+
+Tests verify:
+- compute_intel_values_bulk matches refresh_intel_cache value for value.
+- Trend inflection uses the previously cached direction.
+- Signals without matches only update total_matches.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_signal_intel_bulk.py -v
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models.deal import Deal
+from app.db.models.deal_match import DealMatch
+from app.db.models.signal import Signal
+from app.db.models.signal_intel_cache import SignalIntelCache
+from app.db.models.user import User
+from app.services.signal_intel import (
+    compute_intel_values_bulk,
+    refresh_intel_cache,
+    refresh_intel_caches,
+)
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def engine():
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    url = os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+psycopg://{user}:{password}@{host}:{port}/{db_name}",
+    )
+    return create_engine(url)
+
+
+@pytest.fixture
+def db(engine):
+    """Transactional session that rolls back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(bind=connection)()
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def _make_signal(db: Session) -> Signal:
+    user = User(
+        id=uuid.uuid4(),
+        clerk_id=f"test_{uuid.uuid4().hex[:8]}",
+        email=f"test_{uuid.uuid4().hex[:8]}@example.com",
+    )
+    db.add(user)
+    db.flush()
+    signal = Signal(
+        id=uuid.uuid4(),
+        name="Test Signal",
+        status="active",
+        user_id=user.id,
+        departure_airports=["YYZ"],
+        destination_regions=["cancun"],
+        config={},
+    )
+    db.add(signal)
+    db.flush()
+    return signal
+
+
+def _seed_matches(db: Session, signal: Signal, origin: str, n: int, rng: random.Random) -> None:
+    """Create n deals on a private route, matched to signal across several weeks."""
+    now = datetime.now(timezone.utc)
+    for _ in range(n):
+        depart = date(2099, 1, 1) + timedelta(days=rng.randint(0, 90))
+        deal = Deal(
+            provider="test",
+            origin=origin,
+            destination="cancun",
+            depart_date=depart,
+            return_date=depart + timedelta(days=rng.choice([5, 7, 7, 10])),
+            price_cents=rng.randint(60, 200) * 1000,
+            star_rating=rng.choice([None, 3.0, 3.5, 4.0, 4.5, 5.0]),
+            is_active=rng.random() > 0.2,
+            dedupe_key=f"test:{uuid.uuid4().hex[:12]}",
+        )
+        db.add(deal)
+        db.flush()
+        db.add(DealMatch(
+            signal_id=signal.id,
+            deal_id=deal.id,
+            matched_at=now - timedelta(days=rng.randint(0, 50)),
+        ))
+    db.flush()
+
+
+def _strip(values: dict) -> dict:
+    return {k: v for k, v in values.items() if k != "cache_refreshed_at"}
+
+
+# ── Tests ─────────────────────────────────────────────────────────────────────
+
+
+class TestBulkIntelRefresh:
+    def test_bulk_matches_per_signal(self, db):
+        rng = random.Random(42)
+        origin = f"T{uuid.uuid4().hex[:5]}"
+        signals = [_make_signal(db) for _ in range(4)]
+        for i, signal in enumerate(signals):
+            _seed_matches(db, signal, origin, [1, 2, 25, 60][i], rng)
+        empty = _make_signal(db)
+        ids = [s.id for s in signals] + [empty.id]
+
+        bulk = compute_intel_values_bulk(db, ids)
+        for sid in ids:
+            single = refresh_intel_cache(db, sid)
+            assert _strip(bulk[sid]) == _strip(single), sid
+
+        richest = bulk[signals[-1].id]
+        assert richest["best_value_nights"] is not None
+        assert richest["value_score"] is not None
+        assert richest["trend_consecutive_weeks"] >= 1
+
+    def test_inflection_uses_previous_direction(self, db):
+        signal = _make_signal(db)
+        origin = f"T{uuid.uuid4().hex[:5]}"
+        now = datetime.now(timezone.utc)
+        # Cheap two weeks ago, expensive this week -> direction "up"
+        for days_ago, price in [(14, 80000), (14, 80000), (0, 120000), (0, 120000)]:
+            deal = Deal(
+                provider="test", origin=origin, destination="cancun",
+                depart_date=date(2099, 2, 1), return_date=date(2099, 2, 8),
+                price_cents=price, dedupe_key=f"test:{uuid.uuid4().hex[:12]}",
+            )
+            db.add(deal)
+            db.flush()
+            db.add(DealMatch(signal_id=signal.id, deal_id=deal.id, matched_at=now - timedelta(days=days_ago)))
+        db.add(SignalIntelCache(signal_id=signal.id, trend_direction="down"))
+        db.flush()
+
+        values = compute_intel_values_bulk(db, [signal.id])[signal.id]
+        assert values["trend_direction"] == "up"
+        assert values["trend_inflection"] is True
+        assert values["inflection_pct_change"] == 50.0
+
+    def test_empty_signal_keeps_other_columns(self, db):
+        signal = _make_signal(db)
+        db.add(SignalIntelCache(signal_id=signal.id, value_score=77, total_matches=3))
+        db.flush()
+
+        assert refresh_intel_caches(db, [signal.id]) == 1
+        cached = db.get(SignalIntelCache, signal.id)
+        db.refresh(cached)
+        assert cached.total_matches == 0
+        assert cached.value_score == 77
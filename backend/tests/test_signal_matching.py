@@ -0,0 +1,163 @@
+"""
+Unit tests for the compiled signal index (no DB required).
+
+Tests cover:
+- Route indexing by departure airport and region (incl. parent catch-alls)
+- Exact-date and month travel windows
+- Night bounds, star rating and budget filters
+- Malformed signal configs are skipped, not fatal
+- Match order follows signal load order
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_signal_matching.py -v
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date
+
+from app.db.models.deal import Deal
+from app.db.models.signal import Signal
+from app.workers.shared.matching import SignalIndex, compile_signal, match_deal_to_signals
+
+
+def _signal(
+    *,
+    airports: list[str] | None = None,
+    regions: list[str] | None = None,
+    travel_window: dict | None = None,
+    budget: dict | None = None,
+    preferences: dict | None = None,
+) -> Signal:
+    return Signal(
+        id=uuid.uuid4(),
+        name="Test Signal",
+        status="active",
+        departure_airports=airports if airports is not None else ["YYZ"],
+        destination_regions=regions if regions is not None else ["cancun"],
+        config={
+            "travel_window": travel_window if travel_window is not None else {
+                "start_month": "2026-03", "end_month": "2026-04", "min_nights": 7, "max_nights": 10,
+            },
+            "budget": budget if budget is not None else {"target_pp": 1500},
+            "preferences": preferences or {},
+        },
+    )
+
+
+def _deal(
+    *,
+    depart: date = date(2026, 3, 10),
+    nights: int = 7,
+    price_cents: int = 120000,
+    star_rating: float | None = 4.0,
+) -> tuple[Deal, dict]:
+    deal = Deal(
+        id=uuid.uuid4(),
+        depart_date=depart,
+        return_date=date.fromordinal(depart.toordinal() + nights),
+        price_cents=price_cents,
+        star_rating=star_rating,
+    )
+    meta = {"gateway": "YYZ", "region": "cancun", "duration_days": nights}
+    return deal, meta
+
+
+class TestRouteIndex:
+    def test_exact_region_match(self):
+        sig = _signal()
+        deal, meta = _deal()
+        assert SignalIndex([sig]).match(deal, meta) == [sig]
+
+    def test_parent_region_matches_sub_region_deal(self):
+        sig = _signal(regions=["mexico"])
+        deal, meta = _deal()
+        assert SignalIndex([sig]).match(deal, meta) == [sig]
+
+    def test_sub_region_signal_does_not_match_parent_deal(self):
+        sig = _signal(regions=["cancun"])
+        deal, meta = _deal()
+        meta["region"] = "mexico"
+        assert SignalIndex([sig]).match(deal, meta) == []
+
+    def test_gateway_mismatch(self):
+        sig = _signal(airports=["YUL"])
+        deal, meta = _deal()
+        assert SignalIndex([sig]).match(deal, meta) == []
+
+    def test_missing_deal_region_never_matches(self):
+        sig = _signal()
+        deal, meta = _deal()
+        meta["region"] = None
+        assert SignalIndex([sig]).match(deal, meta) == []
+
+    def test_overlapping_regions_match_once_in_load_order(self):
+        first = _signal(regions=["mexico", "cancun"])
+        second = _signal(regions=["cancun"])
+        deal, meta = _deal()
+        assert SignalIndex([first, second]).match(deal, meta) == [first, second]
+
+
+class TestCriteria:
+    def test_month_window_bounds(self):
+        sig = _signal()
+        index = SignalIndex([sig])
+        assert index.match(*_deal(depart=date(2026, 4, 30))) == [sig]
+        assert index.match(*_deal(depart=date(2026, 5, 1))) == []
+        assert index.match(*_deal(depart=date(2026, 2, 28))) == []
+
+    def test_december_end_month(self):
+        sig = _signal(travel_window={"start_month": "2026-11", "end_month": "2026-12"})
+        assert SignalIndex([sig]).match(*_deal(depart=date(2026, 12, 31))) == [sig]
+
+    def test_exact_dates_bound_return(self):
+        sig = _signal(travel_window={"start_date": "2026-03-01", "end_date": "2026-03-15"})
+        index = SignalIndex([sig])
+        assert index.match(*_deal(depart=date(2026, 3, 8), nights=7)) == [sig]
+        assert index.match(*_deal(depart=date(2026, 3, 10), nights=7)) == []
+
+    def test_night_bounds(self):
+        sig = _signal()
+        index = SignalIndex([sig])
+        assert index.match(*_deal(nights=6)) == []
+        assert index.match(*_deal(nights=11)) == []
+        assert index.match(*_deal(nights=10)) == [sig]
+
+    def test_min_star_rating(self):
+        sig = _signal(preferences={"min_star_rating": "4.5"})
+        index = SignalIndex([sig])
+        assert index.match(*_deal(star_rating=4.0)) == []
+        assert index.match(*_deal(star_rating=4.5)) == [sig]
+        # Unrated deals are not excluded
+        assert index.match(*_deal(star_rating=None)) == [sig]
+
+    def test_budget_per_person(self):
+        sig = _signal(budget={"target_pp": 1200})
+        index = SignalIndex([sig])
+        assert index.match(*_deal(price_cents=120000)) == [sig]
+        assert index.match(*_deal(price_cents=120001)) == []
+
+    def test_no_budget(self):
+        sig = _signal(budget={})
+        assert SignalIndex([sig]).match(*_deal(price_cents=9_999_900)) == [sig]
+
+
+class TestCompilation:
+    def test_compiled_fields(self):
+        compiled = compile_signal(_signal(regions=["jamaica"], budget={"target_pp": "900"}))
+        assert compiled.budget_cents == 90000
+        assert compiled.window_start == date(2026, 3, 1)
+        assert compiled.window_end == date(2026, 4, 30)
+        assert {"jamaica", "montego_bay", "negril", "ocho_rios"} <= compiled.match_regions
+
+    def test_malformed_config_is_skipped(self):
+        bad = _signal(travel_window={"start_month": "March", "end_month": "2026-04"})
+        good = _signal()
+        index = SignalIndex([bad, good])
+        assert len(index.compiled) == 1
+        assert len(index) == 2
+        assert index.match(*_deal()) == [good]
+
+    def test_match_deal_to_signals_accepts_plain_list(self):
+        sig = _signal()
+        deal, meta = _deal()
+        assert match_deal_to_signals(None, deal, meta, signals=[sig]) == [sig]
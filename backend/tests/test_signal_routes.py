@@ -0,0 +1,300 @@
+"""
+Integration tests for the signal get/update/delete endpoints.
+
+Tests verify:
+- GET returns the caller's signal and 404s for unknown users and other users' signals.
+- PATCH of name only updates the signal and leaves existing matches alone.
+- PATCH of search criteria clears old matches and re-matches via run_sync.
+- DELETE removes the signal and 404s when it is not the caller's.
+
+Requests go through the ASGI app with the session and Clerk auth dependencies
+overridden; each test runs in one rolled-back transaction. GET and DELETE use
+the async session, PATCH (a plain def route) the sync one.
+
+Run: cd /opt/tripsignal/backend && python -m pytest tests/test_signal_routes.py -v
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import date
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_clerk_user_id
+from app.core.config import settings
+from app.core.rate_limit import limiter
+from app.db.models.deal import Deal
+from app.db.models.deal_match import DealMatch
+from app.db.models.signal import Signal
+from app.db.models.user import User
+from app.db.session import get_async_db, get_db
+
+AIRPORT = "ZQT"  # no real deals depart from here, so re-matching only sees this file's rows
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+def _db_url(driver: str = "psycopg") -> str:
+    import os
+    host = os.getenv("POSTGRES_HOST", "localhost")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    user = os.getenv("POSTGRES_USER", "postgres")
+    password = os.getenv("POSTGRES_PASSWORD", "postgres")
+    db_name = os.getenv("POSTGRES_DB", "tripsignal")
+    return os.getenv(
+        "TEST_DATABASE_URL",
+        f"postgresql+{driver}://{user}:{password}@{host}:{port}/{db_name}",
+    )
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """Async session in a transaction that rolls back after each test.
+
+    Endpoint commits release savepoints instead of committing.
+    """
+    engine = create_async_engine(_db_url())
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        yield session
+        await session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+@pytest.fixture
+def sync_db():
+    """Sync session for plain def routes, rolled back the same way."""
+    engine = create_engine(_db_url())
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+    engine.dispose()
+
+
+def _user() -> User:
+    return User(id=uuid.uuid4(), clerk_id=f"test_{uuid.uuid4().hex[:12]}", email=f"{uuid.uuid4().hex[:8]}@test.com")
+
+
+@pytest.fixture
+async def owner(db):
+    user = _user()
+    db.add(user)
+    await db.flush()
+    return user
+
+
+@pytest.fixture
+def sync_owner(sync_db):
+    user = _user()
+    sync_db.add(user)
+    sync_db.flush()
+    return user
+
+
+async def _client(monkeypatch, overrides: dict, clerk_id: str):
+    monkeypatch.setattr(limiter, "enabled", False)
+    # app.main pulls in app.core.tokens, which refuses to import without a secret
+    if not settings.UNSUB_SECRET:
+        monkeypatch.setattr(settings, "UNSUB_SECRET", "test-unsub-secret")
+    from app.main import app
+
+    caller = {"clerk_id": clerk_id}
+    app.dependency_overrides.update(overrides)
+    app.dependency_overrides[get_clerk_user_id] = lambda: caller["clerk_id"]
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            c.caller = caller
+            yield c
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def client(db, owner, monkeypatch):
+    async def _db():
+        yield db
+
+    async for c in _client(monkeypatch, {get_async_db: _db}, owner.clerk_id):
+        yield c
+
+
+@pytest.fixture
+async def sync_client(sync_db, sync_owner, monkeypatch):
+    def _db():
+        yield sync_db
+
+    async for c in _client(monkeypatch, {get_db: _db}, sync_owner.clerk_id):
+        yield c
+
+
+def _config(target_pp: int = 1000) -> dict:
+    return {
+        "departure": {"mode": "single", "airports": [AIRPORT]},
+        "destination": {"mode": "single", "regions": ["cancun"], "airports": []},
+        "travel_window": {"start_month": "2040-03", "end_month": "2040-04", "min_nights": 7, "max_nights": 10},
+        "travellers": {"adults": 2, "children_ages": [], "rooms": 1},
+        "budget": {"currency": "CAD", "target_pp": target_pp, "strict": False},
+        "notifications": {"email_enabled": False, "email": None,
+                          "quiet_hours": {"enabled": False, "start": "21:00", "end": "08:00"}},
+        "preferences": {"min_star_rating": None, "nonstop_only": None},
+    }
+
+
+def _signal(user: User, **config) -> Signal:
+    return Signal(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        name="Cancun in March",
+        status="active",
+        departure_airports=[AIRPORT],
+        destination_regions=["cancun"],
+        config=_config(**config),
+    )
+
+
+def _deal(*, price_cents: int, is_active: bool = True) -> Deal:
+    deal_id = uuid.uuid4()
+    return Deal(
+        id=deal_id,
+        provider="test",
+        origin=AIRPORT,
+        destination="cancun",
+        depart_date=date(2040, 3, 10),
+        return_date=date(2040, 3, 17),
+        price_cents=price_cents,
+        hotel_name="Test Resort",
+        is_active=is_active,
+        dedupe_key=f"test:{deal_id.hex}",
+    )
+
+
+async def _make_signal(db: AsyncSession, user: User) -> Signal:
+    signal = _signal(user)
+    db.add(signal)
+    await db.flush()
+    return signal
+
+
+def _add(db: Session, *rows):
+    db.add_all(rows)
+    db.flush()
+    return rows
+
+
+def _matched_deal_ids(db: Session, signal: Signal) -> set:
+    return set(db.execute(select(DealMatch.deal_id).where(DealMatch.signal_id == signal.id)).scalars())
+
+
+# ── GET ───────────────────────────────────────────────────────────────────────
+
+@pytest.mark.anyio
+class TestGetSignal:
+    async def test_returns_own_signal(self, client, db, owner):
+        signal = await _make_signal(db, owner)
+        resp = await client.get(f"/api/signals/{signal.id}")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["id"] == str(signal.id)
+        assert body["name"] == "Cancun in March"
+        assert body["departure"]["airports"] == [AIRPORT]
+
+    async def test_unknown_signal_404(self, client):
+        resp = await client.get(f"/api/signals/{uuid.uuid4()}")
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == "Signal not found"
+
+    async def test_unknown_user_404(self, client, db, owner):
+        signal = await _make_signal(db, owner)
+        client.caller["clerk_id"] = "test_nobody"
+        resp = await client.get(f"/api/signals/{signal.id}")
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == "User not found"
+
+    async def test_other_users_signal_404(self, client, db):
+        other = _user()
+        db.add(other)
+        await db.flush()
+        signal = await _make_signal(db, other)
+        resp = await client.get(f"/api/signals/{signal.id}")
+        assert resp.status_code == 404
+
+
+# ── PATCH ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.anyio
+class TestUpdateSignal:
+    async def test_name_only_keeps_matches(self, sync_client, sync_db, sync_owner):
+        signal, deal = _add(sync_db, _signal(sync_owner), _deal(price_cents=90000))
+        _add(sync_db, DealMatch(signal_id=signal.id, deal_id=deal.id))
+
+        resp = await sync_client.patch(f"/api/signals/{signal.id}", json={"name": "Renamed"})
+
+        assert resp.status_code == 200
+        assert resp.json()["name"] == "Renamed"
+        assert _matched_deal_ids(sync_db, signal) == {deal.id}
+
+    async def test_criteria_change_rematches(self, sync_client, sync_db, sync_owner):
+        signal, stale, now_in_budget, over_budget = _add(
+            sync_db,
+            _signal(sync_owner, target_pp=1000),
+            _deal(price_cents=90000, is_active=False),
+            _deal(price_cents=140000),
+            _deal(price_cents=160000),
+        )
+        _add(sync_db, DealMatch(signal_id=signal.id, deal_id=stale.id))
+
+        resp = await sync_client.patch(
+            f"/api/signals/{signal.id}",
+            json={"budget": {"currency": "CAD", "target_pp": 1500, "strict": False}},
+        )
+
+        assert resp.status_code == 200
+        assert resp.json()["budget"]["target_pp"] == 1500
+        matched = _matched_deal_ids(sync_db, signal)
+        assert matched == {now_in_budget.id}
+        assert over_budget.id not in matched
+
+    async def test_departure_change_updates_mirrored_column(self, sync_client, sync_db, sync_owner):
+        (signal,) = _add(sync_db, _signal(sync_owner))
+        resp = await sync_client.patch(
+            f"/api/signals/{signal.id}",
+            json={"departure": {"mode": "single", "airports": ["yul"]}},
+        )
+        assert resp.status_code == 200
+        sync_db.refresh(signal)
+        assert signal.departure_airports == ["YUL"]
+
+    async def test_unknown_signal_404(self, sync_client):
+        resp = await sync_client.patch(f"/api/signals/{uuid.uuid4()}", json={"name": "x"})
+        assert resp.status_code == 404
+
+
+# ── DELETE ────────────────────────────────────────────────────────────────────
+
+@pytest.mark.anyio
+class TestDeleteSignal:
+    async def test_deletes_own_signal(self, client, db, owner):
+        signal = await _make_signal(db, owner)
+        resp = await client.delete(f"/api/signals/{signal.id}")
+        assert resp.status_code == 204
+        assert (await db.execute(select(Signal).where(Signal.id == signal.id))).scalar_one_or_none() is None
+
+    async def test_unknown_signal_404(self, client):
+        resp = await client.delete(f"/api/signals/{uuid.uuid4()}")
+        assert resp.status_code == 404